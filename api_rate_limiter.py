@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+===========================================
+API RATE LIMITER (GCRA) - BotPhia
+===========================================
+
+Generic Cell Rate Algorithm limiter used by the API security middleware.
+
+- One float per key (the theoretical arrival time, TAT) on the store's
+  clock: O(1) per request, no per-request history, no datetime parsing
+- A limit of N requests per window W allows bursts of up to N and then
+  one request every W/N seconds
+- Keys whose TAT is in the past carry no state and are evicted; the
+  local store is additionally capped with LRU eviction
+- SQLiteRateLimitStore shares one budget between processes on the same
+  host (e.g. gunicorn workers). The file outlives the processes and the
+  boot, so it uses wall-clock time (the monotonic clock restarts at zero
+  on reboot) and ignores TATs that are more than a window ahead, which
+  only a clock step backwards can produce.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+# Tracked keys per store / map before LRU eviction kicks in
+DEFAULT_MAX_KEYS = 100_000
+
+# Environment variable enabling the shared SQLite backend
+RATE_LIMIT_DB_ENV = 'RATE_LIMIT_DB_PATH'
+
+# Float slack so exactly N requests fit in a burst of N
+_EPSILON = 1e-9
+
+
+class BoundedLRUDict(OrderedDict):
+    """Dict that drops its least recently written key beyond max_keys"""
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        super().__init__()
+        self.max_keys = max_keys
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_keys:
+            self.popitem(last=False)
+
+
+class LocalRateLimitStore:
+    """In-process TAT store with idle-key and LRU eviction"""
+
+    # Never goes backwards and dies with the process
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        self._tats = BoundedLRUDict(max_keys)
+        self._lock = threading.Lock()
+
+    def update(self, keys: Sequence[str], interval: float, window: float,
+               now: float) -> Tuple[bool, float]:
+        """
+        Spend one request on every key, all or nothing
+
+        Returns:
+            (allowed, tat): tat is the most restrictive TAT after the
+            request if allowed, or the one that rejected it
+        """
+        with self._lock:
+            tats = self._tats
+            new_tat = max(max(tats.get(key, now), now) for key in keys) + interval
+            if new_tat - now > window + _EPSILON:
+                return False, new_tat
+
+            for key in keys:
+                tats[key] = max(tats.get(key, now), now) + interval
+
+            # Idle keys (TAT already reached) are equivalent to absent ones
+            for _ in range(2):
+                oldest = next(iter(tats))
+                if tats[oldest] > now:
+                    break
+                del tats[oldest]
+
+            return True, new_tat
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class SQLiteRateLimitStore:
+    """TAT store in a SQLite file shared by every worker on the host"""
+
+    # Comparable across processes and reboots
+    clock = staticmethod(time.time)
+
+    def __init__(self, path: str, sweep_every: int = 1000, timeout: float = 5.0):
+        self.path = path
+        self.sweep_every = sweep_every
+        self.timeout = timeout
+        self._local = threading.local()
+        self._updates = 0
+        self._connection()  # create the table up front
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    tat REAL NOT NULL
+                )
+            """)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _current_tat(tat: float, window: float, now: float) -> float:
+        """Stored TAT, dropping one that is more than a window ahead"""
+        # Only a clock that went backwards (or a file from another clock) gets here
+        if tat - now > window + _EPSILON:
+            return now
+        return max(tat, now)
+
+    def update(self, keys: Sequence[str], interval: float, window: float,
+               now: float) -> Tuple[bool, float]:
+        """Same contract as LocalRateLimitStore.update, atomic across processes"""
+        conn = self._connection()
+        placeholders = ','.join('?' * len(keys))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored = dict(conn.execute(
+                f"SELECT key, tat FROM rate_limits WHERE key IN ({placeholders})", list(keys)
+            ))
+            new_tats = [(key, self._current_tat(stored.get(key, now), window, now) + interval)
+                        for key in keys]
+            new_tat = max(tat for _, tat in new_tats)
+            allowed = new_tat - now <= window + _EPSILON
+            if allowed:
+                conn.executemany("""
+                    INSERT INTO rate_limits (key, tat) VALUES (?, ?)
+                    ON CONFLICT(key) DO UPDATE SET tat = excluded.tat
+                """, new_tats)
+
+                self._updates += 1
+                if self._updates % self.sweep_every == 0:
+                    conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, new_tat
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+class GCRARateLimiter:
+    """GCRA limiter over a pluggable TAT store"""
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else LocalRateLimitStore()
+
+    def check(self, keys: Sequence[str], limit: int, window: float,
+              now: Optional[float] = None) -> Tuple[bool, int, float]:
+        """
+        Spend one request on every key if all of them have budget
+
+        Returns:
+            (allowed, remaining, wait): remaining is the burst left after
+            this request; wait is the seconds until the next request is
+            allowed when rejected, or until the budget is full again
+
+        now defaults to the store's clock; pass it only on that same clock.
+        """
+        now = self.store.clock() if now is None else now
+        interval = window / limit
+        allowed, tat = self.store.update(keys, interval, window, now)
+        if not allowed:
+            return False, 0, tat - window - now
+        remaining = int((window - (tat - now)) / interval + _EPSILON)
+        return True, remaining, tat - now
+
+
+def create_rate_limit_store(max_keys: int = DEFAULT_MAX_KEYS):
+    """Shared SQLite store when RATE_LIMIT_DB_PATH is set, local otherwise"""
+    path = os.getenv(RATE_LIMIT_DB_ENV)
+    if path:
+        return SQLiteRateLimitStore(path)
+    return LocalRateLimitStore(max_keys)
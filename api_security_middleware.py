@@ -32,7 +32,7 @@ import json
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Set, Tuple, Any
-from collections import defaultdict, deque
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
 import ipaddress
@@ -43,6 +43,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.base import RequestResponseEndpoint
 
+from api_rate_limiter import (
+    BoundedLRUDict, GCRARateLimiter, create_rate_limit_store, DEFAULT_MAX_KEYS
+)
+
 # Import security logging
 from .secure_logging import (
     SecurityLoggerFactory, SecurityEventType, SecuritySeverity,
@@ -171,13 +175,20 @@ class RequestFingerprint:
 class AdvancedRateLimiter:
     """Advanced rate limiter with user-specific quotas and burst handling"""
     
-    def __init__(self):
+    def __init__(self, store=None, max_tracked_ips: int = DEFAULT_MAX_KEYS):
         self.rate_limits = DEFAULT_RATE_LIMITS.copy()
-        self.user_requests: Dict[str, Dict[str, deque]] = defaultdict(lambda: defaultdict(deque))
-        self.ip_requests: Dict[str, Dict[str, deque]] = defaultdict(lambda: defaultdict(deque))
-        self.blocked_ips: Set[str] = set()
-        self.blocked_until: Dict[str, datetime] = {}
-        self.suspicious_activities: Dict[str, int] = defaultdict(int)
+        # GCRA state per IP/user and endpoint type; shared between workers
+        # when RATE_LIMIT_DB_PATH is set
+        self.limiter = GCRARateLimiter(store if store is not None else create_rate_limit_store())
+        # ip -> monotonic deadline
+        self.blocked_until: Dict[str, float] = BoundedLRUDict(max_tracked_ips)
+        self.suspicious_activities: Dict[str, int] = BoundedLRUDict(max_tracked_ips)
+    
+    @property
+    def blocked_ips(self) -> Set[str]:
+        """IPs currently blocked"""
+        now = time.monotonic()
+        return {ip for ip, deadline in self.blocked_until.items() if deadline > now}
         
     def configure_rate_limit(self, endpoint: str, requests: int, window: int):
         """Configure rate limit for specific endpoint"""
@@ -188,22 +199,20 @@ class AdvancedRateLimiter:
                        user_id: Optional[str] = None,
                        endpoint_type: str = 'default') -> Tuple[bool, Optional[Dict[str, Any]]]:
         """Check if request should be rate limited"""
-        current_time = datetime.now()
+        current_time = time.monotonic()
         client_ip = request.client.host
         
         # Check if IP is blocked
-        if client_ip in self.blocked_ips:
-            if client_ip in self.blocked_until:
-                if current_time < self.blocked_until[client_ip]:
-                    return True, {
-                        'error': 'IP temporarily blocked',
-                        'blocked_until': self.blocked_until[client_ip].isoformat(),
-                        'reason': 'Suspicious activity detected'
-                    }
-                else:
-                    # Unblock IP
-                    self.blocked_ips.discard(client_ip)
-                    del self.blocked_until[client_ip]
+        blocked_until = self.blocked_until.get(client_ip)
+        if blocked_until is not None:
+            if current_time < blocked_until:
+                return True, {
+                    'error': 'IP temporarily blocked',
+                    'blocked_until': _wall_clock(blocked_until - current_time),
+                    'reason': 'Suspicious activity detected'
+                }
+            # Unblock IP
+            del self.blocked_until[client_ip]
         
         # Get rate limit configuration
         rate_config = self.rate_limits.get(endpoint_type, self.rate_limits['default'])
@@ -221,15 +230,16 @@ class AdvancedRateLimiter:
         
         # Check rate limits
         rate_limited, details = self._check_rate_limit(
-            client_ip, user_id, effective_limit, window, current_time
+            client_ip, user_id, effective_limit, window, endpoint_type
         )
         
         if rate_limited:
             # Track suspicious activity
-            self.suspicious_activities[client_ip] += 1
+            violations = self.suspicious_activities.get(client_ip, 0) + 1
+            self.suspicious_activities[client_ip] = violations
             
             # Block IP if too many rate limit violations
-            if self.suspicious_activities[client_ip] > 10:
+            if violations > 10:
                 self._block_ip(client_ip, minutes=30)
                 details['blocked'] = True
         
@@ -240,54 +250,33 @@ class AdvancedRateLimiter:
                          user_id: Optional[str], 
                          limit: int, 
                          window: int, 
-                         current_time: datetime) -> Tuple[bool, Dict[str, Any]]:
-        """Internal rate limit checking"""
-        cutoff_time = current_time - timedelta(seconds=window)
-        
-        # Check IP-based rate limiting
-        ip_requests = self.ip_requests[ip]['requests']
-        
-        # Remove old requests
-        while ip_requests and datetime.fromisoformat(ip_requests[0]) < cutoff_time:
-            ip_requests.popleft()
-        
-        # Check user-based rate limiting if user is authenticated
+                         endpoint_type: str = 'default') -> Tuple[bool, Dict[str, Any]]:
+        """Internal rate limit checking (GCRA, O(1) per request)"""
+        # The request must fit both the IP and the user budget (the more restrictive wins)
+        keys = [f"ip:{ip}:{endpoint_type}"]
         if user_id:
-            user_requests = self.user_requests[user_id]['requests']
-            while user_requests and datetime.fromisoformat(user_requests[0]) < cutoff_time:
-                user_requests.popleft()
-            
-            # Use the more restrictive limit
-            effective_requests = max(len(ip_requests), len(user_requests))
-        else:
-            effective_requests = len(ip_requests)
+            keys.append(f"user:{user_id}:{endpoint_type}")
         
-        # Check if limit exceeded
-        if effective_requests >= limit:
+        # Each store uses its own clock (wall clock for the shared SQLite file)
+        allowed, remaining, wait = self.limiter.check(keys, limit, window)
+        
+        if not allowed:
             return True, {
                 'error': 'Rate limit exceeded',
                 'limit': limit,
                 'window': window,
-                'current_requests': effective_requests,
-                'reset_time': (cutoff_time + timedelta(seconds=window)).isoformat()
+                'retry_after': round(wait, 3),
+                'reset_time': _wall_clock(wait)
             }
         
-        # Add current request
-        current_time_str = current_time.isoformat()
-        ip_requests.append(current_time_str)
-        
-        if user_id:
-            user_requests.append(current_time_str)
-        
         return False, {
-            'remaining': limit - effective_requests - 1,
-            'reset_time': (cutoff_time + timedelta(seconds=window)).isoformat()
+            'remaining': remaining,
+            'reset_time': _wall_clock(wait)
         }
     
     def _block_ip(self, ip: str, minutes: int = 30):
         """Block IP address temporarily"""
-        self.blocked_ips.add(ip)
-        self.blocked_until[ip] = datetime.now() + timedelta(minutes=minutes)
+        self.blocked_until[ip] = time.monotonic() + minutes * 60
         
         api_logger.log_security_event(
             SecurityEventType.SUSPICIOUS_ACTIVITY,
@@ -297,6 +286,11 @@ class AdvancedRateLimiter:
             context={'block_duration_minutes': minutes}
         )
 
+
+def _wall_clock(seconds_from_now: float) -> str:
+    """ISO timestamp for a monotonic offset (only for responses)"""
+    return (datetime.now() + timedelta(seconds=seconds_from_now)).isoformat()
+
 # ===========================================
 # SECURITY MIDDLEWARE
 # ===========================================
@@ -463,7 +457,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         # Check request frequency from same IP
         ip = request.client.host
         recent_fingerprints = [
-            fp for fp in self.request_fingerprints[ip]
+            fp for fp in self.request_fingerprints.get(ip, ())
             if (datetime.now() - datetime.fromisoformat(fp.accept_language) if fp.accept_language else datetime.now()) < timedelta(minutes=5)
         ]
         
@@ -8,7 +8,7 @@ import asyncio
 import logging
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
 import time
 
@@ -107,6 +107,8 @@ class PaperTradingBot:
         logger.info("🔍 Buscando nuevas oportunidades de trading...")
         
         best_signals = []
+        candidates = []
+        market_data = {}
         
         for symbol in self.symbols:
             try:
@@ -119,7 +121,7 @@ class PaperTradingBot:
                 
                 # Generar análisis de filósofos
                 philosophers = ['SOCRATES', 'ARISTOTELES', 'NIETZSCHE', 'CONFUCIO']
-                signals = self.trading_system.analyze_with_philosophers(df, symbol, philosophers)
+                signals = self.trading_system.analyze_with_philosophers(df, symbol, philosophers, "15m")
                 if not signals:
                     continue
                 
@@ -140,25 +142,28 @@ class PaperTradingBot:
                                 'timestamp': datetime.now().isoformat()
                             }
                             
-                            # Validar con pipeline
-                            prices = df['close'].tolist()
-                            high = df['high'].tolist()
-                            low = df['low'].tolist()
-                            volume = df['volume'].tolist()
+                            candidates.append(signal)
                             
-                            evaluation = self.signal_pipeline.validate_signal(
-                                signal, prices, high, low, volume
-                            )
-                            
-                            if evaluation.is_valid and evaluation.final_score >= 55:
-                                signal['validation_score'] = evaluation.final_score
-                                signal['market_condition'] = evaluation.market_condition
-                                best_signals.append(signal)
+                            # Snapshot del símbolo para validar todas sus señales juntas
+                            if symbol not in market_data:
+                                market_data[symbol] = {
+                                    'prices': df['close'].tolist(),
+                                    'high': df['high'].tolist(),
+                                    'low': df['low'].tolist(),
+                                    'volume': df['volume'].tolist()
+                                }
                 
             except Exception as e:
                 logger.error(f"Error analizando {symbol}: {e}")
                 continue
         
+        # Validar con pipeline (contexto BTC y mercado calculados una vez)
+        for signal, evaluation in self.validate_candidates(candidates, market_data):
+            if evaluation.is_valid and evaluation.final_score >= 55:
+                signal['validation_score'] = evaluation.final_score
+                signal['market_condition'] = evaluation.market_condition
+                best_signals.append(signal)
+        
         # Ordenar por confianza y score de validación
         best_signals.sort(key=lambda x: (x['confidence'] + x.get('validation_score', 0)) / 2, reverse=True)
         
@@ -167,6 +172,30 @@ class PaperTradingBot:
         for signal in best_signals[:spaces_available]:
             await self.open_position(signal)
     
+    def validate_candidates(self, candidates: List[Dict], market_data: Dict) -> List[Tuple[Dict, Any]]:
+        """
+        Pares (señal, evaluación) validados en lote
+        
+        Si el lote falla se valida símbolo a símbolo, de modo que un símbolo
+        con datos problemáticos no descarta las señales de los demás.
+        """
+        if not candidates:
+            return []
+        
+        try:
+            return list(zip(candidates, self.signal_pipeline.validate_signals(candidates, market_data)))
+        except Exception as e:
+            logger.error(f"Error validando señales en lote: {e}")
+        
+        results = []
+        for symbol in dict.fromkeys(signal['symbol'] for signal in candidates):
+            group = [signal for signal in candidates if signal['symbol'] == symbol]
+            try:
+                results.extend(zip(group, self.signal_pipeline.validate_signals(group, market_data)))
+            except Exception as e:
+                logger.error(f"Error validando señales de {symbol}: {e}")
+        return results
+    
     async def open_position(self, signal: Dict):
         """Abrir una nueva posición de paper trading"""
         symbol = signal['symbol']
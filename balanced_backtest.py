@@ -3,13 +3,12 @@
 Backtest del Sistema Balanceado - Con filtros adaptativos por timeframe
 """
 
-import asyncio
-import httpx
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import json
 
+from parallel_backtest import ParallelBacktestRunner, futures_kline_store, make_jobs, parse_workers
+
 # Configuración adaptativa por timeframe (igual que en balanced_futures_system.py)
 TIMEFRAME_CONFIG = {
     '15m': {
@@ -60,44 +59,6 @@ class BalancedBacktest:
         self.max_drawdown = 0
         self.peak_capital = capital
         
-    async def fetch_historical_data(self, symbol: str, interval: str, days: int = 90):
-        """Obtiene datos históricos de Binance"""
-        
-        end_time = int(datetime.now().timestamp() * 1000)
-        start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-        
-        all_data = []
-        current_start = start_time
-        
-        async with httpx.AsyncClient() as client:
-            while current_start < end_time:
-                try:
-                    response = await client.get(
-                        'https://fapi.binance.com/fapi/v1/klines',
-                        params={
-                            'symbol': symbol,
-                            'interval': interval,
-                            'startTime': current_start,
-                            'endTime': end_time,
-                            'limit': 1500
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if not data:
-                            break
-                        all_data.extend(data)
-                        current_start = data[-1][0] + 1
-                    else:
-                        break
-                        
-                except Exception as e:
-                    print(f"Error fetching data: {e}")
-                    break
-        
-        return all_data
-    
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calcula todos los indicadores necesarios"""
         
@@ -414,7 +375,15 @@ class BalancedBacktest:
             'avg_confidence': np.mean([t['confidence'] for t in self.trades]) if self.trades else 0
         }
 
-async def main():
+def run_balanced_job(job, df: pd.DataFrame):
+    """Trabajo de ParallelBacktestRunner: backtest independiente de un par y timeframe"""
+    if df.empty:
+        return None
+    backtest = BalancedBacktest()
+    backtest.run_backtest(df.reset_index(), job.symbol, job.timeframe)
+    return backtest.get_statistics()
+
+def main(workers: int = 1):
     """Ejecuta backtests del sistema balanceado"""
     
     print("="*60)
@@ -430,54 +399,38 @@ async def main():
     
     all_results = []
     
-    for symbol in symbols:
-        print(f"\n📊 {symbol}:")
-        print("-" * 40)
-        
-        for interval in intervals:
-            backtest = BalancedBacktest()
+    # Velas sincronizadas una vez en este proceso; cada trabajo en su propio proceso
+    runner = ParallelBacktestRunner(run_balanced_job, store=futures_kline_store(), workers=workers)
+    results = runner.run(make_jobs(symbols, intervals), days=90)
+    
+    for result in results:
+        symbol, interval = result.job.symbol, result.job.timeframe
+        if interval == intervals[0]:
+            print(f"\n📊 {symbol}:")
+            print("-" * 40)
+        
+        stats = result.result
+        if stats:
+            print(f"\n  {interval}:")
+            print(f"    Trades: {stats['total_trades']}")
+            print(f"    Win Rate: {stats['win_rate']:.1f}%")
+            print(f"    Profit Factor: {stats['profit_factor']:.2f}")
+            print(f"    Return: {stats['total_return']:.2f}%")
+            print(f"    Max Drawdown: {stats['max_drawdown']:.2f}%")
+            print(f"    Final Capital: ${stats['final_capital']:.2f}")
             
-            # Obtener datos
-            data = await backtest.fetch_historical_data(symbol, interval, 90)
+            # Análisis de salidas
+            if stats['exit_analysis']:
+                print(f"    Salidas:")
+                for reason, data in stats['exit_analysis'].items():
+                    wr = (data['wins'] / data['count']) * 100 if data['count'] > 0 else 0
+                    print(f"      • {reason}: {data['count']} trades ({wr:.1f}% win)")
             
-            if data:
-                # Convertir a DataFrame
-                df = pd.DataFrame(data, columns=[
-                    'timestamp', 'open', 'high', 'low', 'close', 
-                    'volume', 'close_time', 'quote_volume', 'trades',
-                    'taker_buy_volume', 'taker_buy_quote', 'ignore'
-                ])
-                
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = df[col].astype(float)
-                
-                # Ejecutar backtest
-                backtest.run_backtest(df, symbol, interval)
-                
-                # Obtener estadísticas
-                stats = backtest.get_statistics()
-                
-                print(f"\n  {interval}:")
-                print(f"    Trades: {stats['total_trades']}")
-                print(f"    Win Rate: {stats['win_rate']:.1f}%")
-                print(f"    Profit Factor: {stats['profit_factor']:.2f}")
-                print(f"    Return: {stats['total_return']:.2f}%")
-                print(f"    Max Drawdown: {stats['max_drawdown']:.2f}%")
-                print(f"    Final Capital: ${stats['final_capital']:.2f}")
-                
-                # Análisis de salidas
-                if stats['exit_analysis']:
-                    print(f"    Salidas:")
-                    for reason, data in stats['exit_analysis'].items():
-                        wr = (data['wins'] / data['count']) * 100 if data['count'] > 0 else 0
-                        print(f"      • {reason}: {data['count']} trades ({wr:.1f}% win)")
-                
-                all_results.append({
-                    'symbol': symbol,
-                    'interval': interval,
-                    **stats
-                })
+            all_results.append({
+                'symbol': symbol,
+                'interval': interval,
+                **stats
+            })
     
     # Resumen comparativo
     print("\n" + "="*60)
@@ -537,4 +490,4 @@ async def main():
         print(f"No se pudieron cargar resultados anteriores: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main(parse_workers("Backtest del sistema balanceado"))
\ No newline at end of file
@@ -4,6 +4,7 @@ Optimización de Binance API según documentación oficial 2024
 https://developers.binance.com/docs/binance-spot-api-docs/rest-api/market-data-endpoints
 """
 
+import asyncio
 import requests
 import pandas as pd
 import time
@@ -12,6 +13,9 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from binance_rate_limiter import get_rate_limiter, get_request_coalescer
+from candles import Candles
+
 # Import error handling system
 try:
     from error_handler import handle_api_error, ApiError, NetworkError
@@ -19,17 +23,34 @@ except ImportError:
     # Fallback if error_handler not available
     def handle_api_error(error, context=None):
         print(f"API Error: {error}")
-    class ApiError(Exception): pass
-    class NetworkError(Exception): pass
+    class _FallbackError(Exception):
+        # Misma firma que BotPhiaError: se lanzan con message=/context=
+        def __init__(self, message: str, error_code: str = None, context: Dict = None):
+            super().__init__(message)
+            self.message = message
+            self.error_code = error_code
+            self.context = context or {}
+    class ApiError(_FallbackError): pass
+    class NetworkError(_FallbackError): pass
 
 logger = logging.getLogger(__name__)
 
+
+def _in_event_loop() -> bool:
+    """True si el hilo actual está ejecutando un event loop"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
 @dataclass
 class BinanceConfig:
     """Configuración optimizada para Binance API"""
     # Endpoints oficiales recomendados
     spot_api_base = "https://api.binance.com"
     data_api_base = "https://data-api.binance.vision"  # Para datos de mercado puros
+    stream_base = "wss://data-stream.binance.vision"  # WebSocket solo de datos de mercado
     
     # Rate limits según documentación
     default_weight_limit = 1200  # Por minuto
@@ -54,29 +75,117 @@ class OptimizedBinanceAPI:
         self.base_url = (self.config.data_api_base if use_data_endpoint 
                         else self.config.spot_api_base)
         
-        # Rate limiting tracking
-        self.weight_used = 0
-        self.last_weight_reset = time.time()
+        # Rate limiting compartido por todo el proceso
+        self.rate_limiter = get_rate_limiter()
+        self.coalescer = get_request_coalescer()
         
         logger.info(f"🚀 Binance API optimizado inicializado: {self.base_url}")
     
     def _check_rate_limit(self, weight: int):
-        """Verifica límites de rate según documentación"""
-        current_time = time.time()
+        """
+        Espera a tener peso disponible en el limitador global del proceso
         
-        # Reset weight counter cada minuto
-        if current_time - self.last_weight_reset >= 60:
-            self.weight_used = 0
-            self.last_weight_reset = current_time
+        Solo para hilos: espera con time.sleep. En el hilo de un event loop
+        nunca duerme; sin saldo lanza ApiError (los métodos síncronos caen a
+        su valor por defecto) y el código asíncrono debe usar los *_async.
+        """
+        if _in_event_loop():
+            if not self.rate_limiter.try_acquire(weight):
+                raise ApiError(
+                    message="Límite de peso de Binance alcanzado en el event loop",
+                    context={'weight': weight, 'available': self.rate_limiter.available}
+                )
+            return
+        self.rate_limiter.acquire(weight)
+    
+    async def _check_rate_limit_async(self, weight: int):
+        """Espera el peso sin bloquear el event loop"""
+        await self.rate_limiter.acquire_async(weight)
+    
+    def _get(self, url: str, params: Dict) -> requests.Response:
+        """GET que actualiza el limitador con las cabeceras de peso de Binance"""
+        response = self.session.get(url, params=params)
+        self.rate_limiter.update_from_headers(response.headers, response.status_code)
+        return response
+    
+    async def _get_async(self, path: str, params: Dict, weight: int) -> requests.Response:
+        """GET para código asíncrono: espera el peso en el loop y hace la petición en un hilo"""
+        await self._check_rate_limit_async(weight)
+        return await asyncio.to_thread(self._get, f"{self.base_url}{path}", params)
+    
+    def _klines_params(self, symbol: str, interval: str, limit: int,
+                       start_time: Optional[int], end_time: Optional[int]) -> Dict:
+        """Parámetros de GET /api/v3/klines"""
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': min(limit, self.config.max_klines_limit)
+        }
+        
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+        return params
+    
+    def get_klines_raw(self, symbol: str, interval: str, limit: int = 500,
+                       start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[list]:
+        """
+        Obtiene klines sin procesar (listas tal como las devuelve Binance)
+        
+        Endpoint: GET /api/v3/klines
+        Weight: 2 por request
+        
+        Lanza la excepción de requests si la petición falla; get_klines
+        la captura y devuelve un DataFrame vacío.
+        """
+        params = self._klines_params(symbol, interval, limit, start_time, end_time)
+        
+        def fetch():
+            self._check_rate_limit(2)  # Weight = 2 según documentación
+            response = self._get(f"{self.base_url}/api/v3/klines", params)
+            response.raise_for_status()
+            return response.json()
+        
+        # Peticiones idénticas concurrentes comparten una sola llamada
+        key = ('klines', self.base_url, symbol, interval, params['limit'], start_time, end_time)
+        return self.coalescer.call(key, fetch)
+    
+    def get_candles(self, symbol: str, interval: str, limit: int = 500,
+                    start_time: Optional[int] = None, end_time: Optional[int] = None) -> Candles:
+        """
+        Obtiene klines como Candles (arrays columnares) parseando los bytes
+        de la respuesta directamente, sin json.loads ni DataFrame intermedio
+        
+        Endpoint: GET /api/v3/klines
+        Weight: 2 por request
+        
+        Lanza la excepción de requests si la petición falla.
+        """
+        params = self._klines_params(symbol, interval, limit, start_time, end_time)
+        
+        def fetch():
+            self._check_rate_limit(2)  # Weight = 2 según documentación
+            response = self._get(f"{self.base_url}/api/v3/klines", params)
+            response.raise_for_status()
+            return response.content
+        
+        key = ('klines_body', self.base_url, symbol, interval, params['limit'], start_time, end_time)
+        return Candles.from_json(self.coalescer.call(key, fetch), symbol, interval)
+    
+    async def get_candles_async(self, symbol: str, interval: str, limit: int = 500,
+                                start_time: Optional[int] = None,
+                                end_time: Optional[int] = None) -> Candles:
+        """Versión asíncrona de get_candles (el peso se espera sin bloquear el loop)"""
+        params = self._klines_params(symbol, interval, limit, start_time, end_time)
         
-        if self.weight_used + weight > self.config.default_weight_limit:
-            sleep_time = 60 - (current_time - self.last_weight_reset)
-            logger.warning(f"Rate limit alcanzado. Esperando {sleep_time:.1f}s")
-            time.sleep(sleep_time)
-            self.weight_used = 0
-            self.last_weight_reset = time.time()
+        async def fetch():
+            response = await self._get_async("/api/v3/klines", params, 2)
+            response.raise_for_status()
+            return response.content
         
-        self.weight_used += weight
+        key = ('klines_body', self.base_url, symbol, interval, params['limit'], start_time, end_time)
+        return Candles.from_json(await self.coalescer.call_async(key, fetch), symbol, interval)
     
     def get_klines(self, symbol: str, interval: str, limit: int = 500,
                    start_time: Optional[int] = None, end_time: Optional[int] = None) -> pd.DataFrame:
@@ -93,47 +202,21 @@ class OptimizedBinanceAPI:
             start_time: Timestamp de inicio en ms (opcional)
             end_time: Timestamp de fin en ms (opcional)
         """
-        self._check_rate_limit(2)  # Weight = 2 según documentación
-        
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'limit': min(limit, self.config.max_klines_limit)
-        }
-        
-        if start_time:
-            params['startTime'] = start_time
-        if end_time:
-            params['endTime'] = end_time
-        
         try:
-            url = f"{self.base_url}/api/v3/klines"
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            # DataFrame OHLCV sobre los arrays de Candles (sin copias)
+            return self.get_candles(symbol, interval, limit, start_time, end_time).to_frame()
             
-            # Convertir a DataFrame según formato oficial
-            df = pd.DataFrame(data, columns=[
-                'open_time', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            # Optimizar tipos de datos
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume', 
-                             'quote_asset_volume', 'taker_buy_base_asset_volume', 
-                             'taker_buy_quote_asset_volume']
-            
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Convertir timestamps a datetime
-            df['timestamp'] = pd.to_datetime(df['open_time'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            # Retornar solo columnas OHLCV principales para compatibilidad
-            return df[['open', 'high', 'low', 'close', 'volume']]
+        except Exception as e:
+            logger.error(f"Error obteniendo klines: {e}")
+            return pd.DataFrame()
+    
+    async def get_klines_async(self, symbol: str, interval: str, limit: int = 500,
+                               start_time: Optional[int] = None,
+                               end_time: Optional[int] = None) -> pd.DataFrame:
+        """Versión asíncrona de get_klines"""
+        try:
+            candles = await self.get_candles_async(symbol, interval, limit, start_time, end_time)
+            return candles.to_frame()
             
         except Exception as e:
             logger.error(f"Error obteniendo klines: {e}")
@@ -144,15 +227,23 @@ class OptimizedBinanceAPI:
         Obtiene precio actual usando endpoint optimizado
         
         Endpoint: GET /api/v3/ticker/price
-        Weight: 2 para símbolo único
+        Weight: 2 para símbolo único (0 si el stream de mercado lo tiene)
         """
-        self._check_rate_limit(2)
+        from market_stream import get_market_stream
+        stream = get_market_stream()
+        if stream is not None:
+            price = stream.get_price(symbol)
+            if price:
+                return price
         
         try:
+            # En el event loop sin saldo lanza ApiError: cae al valor por defecto
+            self._check_rate_limit(2)
+            
             url = f"{self.base_url}/api/v3/ticker/price"
             params = {'symbol': symbol}
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -162,6 +253,24 @@ class OptimizedBinanceAPI:
             logger.error(f"Error obteniendo precio: {e}")
             return 0.0
     
+    async def get_current_price_async(self, symbol: str) -> float:
+        """Versión asíncrona de get_current_price"""
+        from market_stream import get_market_stream
+        stream = get_market_stream()
+        if stream is not None:
+            price = stream.get_price(symbol)
+            if price:
+                return price
+        
+        try:
+            response = await self._get_async("/api/v3/ticker/price", {'symbol': symbol}, 2)
+            response.raise_for_status()
+            return float(response.json()['price'])
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo precio: {e}")
+            return 0.0
+    
     def get_24hr_ticker(self, symbol: str) -> Dict:
         """
         Obtiene estadísticas de 24h
@@ -169,13 +278,13 @@ class OptimizedBinanceAPI:
         Endpoint: GET /api/v3/ticker/24hr
         Weight: 2 para símbolo único
         """
-        self._check_rate_limit(2)
-        
         try:
+            self._check_rate_limit(2)
+            
             url = f"{self.base_url}/api/v3/ticker/24hr"
             params = {'symbol': symbol}
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             response.raise_for_status()
             
             return response.json()
@@ -203,13 +312,13 @@ class OptimizedBinanceAPI:
         else:
             weight = 250
             
-        self._check_rate_limit(weight)
-        
         try:
+            self._check_rate_limit(weight)
+            
             url = f"{self.base_url}/api/v3/depth"
             params = {'symbol': symbol, 'limit': limit}
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             response.raise_for_status()
             
             return response.json()
@@ -225,13 +334,13 @@ class OptimizedBinanceAPI:
         Endpoint: GET /api/v3/avgPrice
         Weight: 2
         """
-        self._check_rate_limit(2)
-        
         try:
+            self._check_rate_limit(2)
+            
             url = f"{self.base_url}/api/v3/avgPrice"
             params = {'symbol': symbol}
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -308,4 +417,4 @@ if __name__ == "__main__":
     if ticker:
         print(f"📈 Cambio 24h: {ticker.get('priceChangePercent', 'N/A')}%")
     
-    print(f"⚖️ Weight usado: {api.weight_used}/{api.config.default_weight_limit}")
\ No newline at end of file
+    print(f"⚖️ Weight disponible: {api.rate_limiter.available:.0f}/{api.config.default_weight_limit}")
\ No newline at end of file
@@ -23,6 +23,9 @@ import os
 from safe_math import SafeMath
 from enum import Enum
 from binance_api_optimized import OptimizedBinanceAPI
+from kline_store import KlineStore
+from market_data_gateway import get_market_data_gateway
+from market_stream import get_market_stream
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO)
@@ -99,7 +102,8 @@ class Position:
 class BinanceConnector:
     """Conector principal con Binance API"""
     
-    def __init__(self, api_key: str = None, secret: str = None, testnet: bool = True, use_optimized: bool = True):
+    def __init__(self, api_key: str = None, secret: str = None, testnet: bool = True, use_optimized: bool = True,
+                 kline_store: Optional[KlineStore] = None):
         """
         Inicializa conector de Binance
         
@@ -108,10 +112,12 @@ class BinanceConnector:
             secret: Secret key de Binance  
             testnet: Si usar testnet (True) o mainnet (False)
             use_optimized: Usar API optimizada (True) o CCXT tradicional (False)
+            kline_store: Almacén local de velas (histórico desde disco, solo se descarga la cola)
         """
         
         self.testnet = testnet
         self.use_optimized = use_optimized
+        self.kline_store = kline_store
         
         # Inicializar API optimizada si está habilitada
         if use_optimized:
@@ -168,6 +174,19 @@ class BinanceConnector:
         """
         
         try:
+            # Stream de mercado: velas en memoria, sin petición REST
+            stream = get_market_stream()
+            if stream is not None:
+                df = stream.get_klines(symbol, timeframe, limit)
+                if not df.empty:
+                    return df
+            
+            # Almacén local: histórico desde disco + cola descargada
+            if self.kline_store is not None:
+                df = self.kline_store.get_klines(symbol, timeframe, limit)
+                if not df.empty:
+                    return df
+            
             # Usar API optimizada si está disponible
             if self.use_optimized and hasattr(self, 'optimized_api'):
                 # Convertir símbolo al formato requerido (sin '/')
@@ -222,6 +241,32 @@ class BinanceConnector:
             logger.error(f"❌ Error obteniendo datos: {e}")
             return pd.DataFrame()
     
+    def get_historical_range(self, symbol: str, timeframe: str = '1h', days: int = 30) -> pd.DataFrame:
+        """
+        Obtiene un rango histórico completo (sin el tope de 1000 velas)
+        
+        Usa el almacén local: la primera vez pagina la API y después
+        solo descarga las velas que faltan.
+        
+        Args:
+            symbol: Símbolo (ej: 'BTC/USDT' o 'BTCUSDT')
+            timeframe: Temporalidad ('1m', '5m', '15m', '1h', '4h', '1d')
+            days: Días hacia atrás desde ahora
+            
+        Returns:
+            DataFrame con OHLCV
+        """
+        
+        if self.kline_store is None:
+            api = self.optimized_api if hasattr(self, 'optimized_api') else None
+            self.kline_store = KlineStore(api=api)
+        
+        try:
+            return self.kline_store.get_range(symbol, timeframe, days=days)
+        except Exception as e:
+            logger.error(f"❌ Error obteniendo rango histórico: {e}")
+            return pd.DataFrame()
+    
     def get_multiple_timeframes(self, symbol: str) -> Dict[str, pd.DataFrame]:
         """
         Obtiene datos en múltiples timeframes para análisis
@@ -243,6 +288,54 @@ class BinanceConnector:
         
         return data
     
+    async def get_historical_data_async(self, symbol: str, timeframe: str = '1h',
+                                        limit: int = 500) -> pd.DataFrame:
+        """
+        Versión asíncrona de get_historical_data (no bloquea el event loop)
+        
+        Con API optimizada usa el gateway aiohttp; el almacén local y el
+        fallback CCXT se ejecutan en un hilo.
+        """
+        
+        if self.kline_store is None and self.use_optimized:
+            df = await get_market_data_gateway().get_klines(symbol, timeframe, limit)
+            if not df.empty:
+                return df
+            logger.warning(f"⚠️ Gateway retornó datos vacíos para {symbol} {timeframe}, usando fallback")
+        
+        return await asyncio.to_thread(self.get_historical_data, symbol, timeframe, limit)
+    
+    async def get_market_snapshot(self, symbols: List[str], timeframes: List[str],
+                                  limit: int = 500) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Obtiene todos los símbolos x timeframes concurrentemente
+        
+        Returns:
+            Dict {símbolo: {timeframe: DataFrame}} sin los DataFrames vacíos
+        """
+        
+        pairs = [(symbol, tf) for symbol in symbols for tf in timeframes]
+        frames = await asyncio.gather(
+            *(self.get_historical_data_async(symbol, tf, limit) for symbol, tf in pairs),
+            return_exceptions=True
+        )
+        
+        data = {symbol: {} for symbol in symbols}
+        for (symbol, tf), df in zip(pairs, frames):
+            if isinstance(df, Exception):
+                logger.error(f"❌ Error obteniendo {symbol} {tf}: {df}")
+            elif not df.empty:
+                data[symbol][tf] = df
+        
+        return data
+    
+    async def get_multiple_timeframes_async(self, symbol: str,
+                                            timeframes: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """Versión asíncrona de get_multiple_timeframes (timeframes en paralelo)"""
+        
+        snapshot = await self.get_market_snapshot([symbol], timeframes or ['1h', '4h', '1d'])
+        return snapshot[symbol]
+    
     def get_current_price(self, symbol: str) -> float:
         """
         Obtiene precio actual
@@ -255,6 +348,13 @@ class BinanceConnector:
         """
         
         try:
+            # Precio del stream de mercado si está al día
+            stream = get_market_stream()
+            if stream is not None:
+                price = stream.get_price(symbol)
+                if price:
+                    return price
+            
             # Usar API optimizada si está disponible
             if self.use_optimized and hasattr(self, 'optimized_api'):
                 symbol_clean = symbol.replace('/', '')
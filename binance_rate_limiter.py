@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+===========================================
+LIMITADOR DE PESO BINANCE (GLOBAL AL PROCESO)
+===========================================
+
+Un único token bucket de peso por proceso compartido por todos los
+clientes REST (OptimizedBinanceAPI, gateway aiohttp, monitores...):
+
+- Se recarga de forma continua (1200 de peso por minuto por defecto)
+- Se ajusta con la cabecera X-MBX-USED-WEIGHT-1M que devuelve Binance,
+  así el peso consumido por otros clientes del mismo IP también cuenta
+- Respeta Retry-After en respuestas 429/418
+- acquire() para código síncrono y acquire_async() para el event loop
+  (nunca bloquea el loop con time.sleep)
+
+RequestCoalescer une peticiones idénticas concurrentes (mismo símbolo,
+intervalo y límite) en una sola llamada en vuelo cuyo resultado
+comparten todos los que esperan.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Límite de peso por minuto por IP (documentación de Binance)
+DEFAULT_WEIGHT_LIMIT = 1200
+WEIGHT_WINDOW_SECONDS = 60
+
+USED_WEIGHT_HEADERS = ('X-MBX-USED-WEIGHT-1M', 'X-MBX-USED-WEIGHT')
+
+
+class WeightRateLimiter:
+    """Token bucket de peso compartido entre hilos y event loops"""
+
+    def __init__(self, capacity: int = DEFAULT_WEIGHT_LIMIT,
+                 window: float = WEIGHT_WINDOW_SECONDS):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / window  # Peso por segundo
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {'acquired': 0, 'waits': 0, 'waited_seconds': 0.0,
+                      'server_used_weight': 0, 'penalties': 0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._updated = now
+
+    def _try_acquire(self, weight: float) -> float:
+        """Consume weight si hay saldo; si no, devuelve los segundos a esperar"""
+        weight = min(float(weight), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            if self._tokens >= weight:
+                self._tokens -= weight
+                self.stats['acquired'] += 1
+                return 0.0
+            return (weight - self._tokens) / self.refill_rate
+
+    def _record_wait(self, wait: float):
+        with self._lock:
+            self.stats['waits'] += 1
+            self.stats['waited_seconds'] += wait
+
+    def try_acquire(self, weight: float = 1) -> bool:
+        """Gasta weight solo si hay saldo ahora mismo (nunca espera)"""
+        return self._try_acquire(weight) <= 0
+
+    def acquire(self, weight: float = 1):
+        """Espera (bloqueando el hilo) hasta poder gastar weight: solo para hilos"""
+        while True:
+            wait = self._try_acquire(weight)
+            if wait <= 0:
+                return
+            self._record_wait(wait)
+            logger.debug(f"Límite de peso: esperando {wait:.2f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: float = 1):
+        """Espera sin bloquear el event loop hasta poder gastar weight"""
+        while True:
+            wait = self._try_acquire(weight)
+            if wait <= 0:
+                return
+            self._record_wait(wait)
+            logger.debug(f"Límite de peso: esperando {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str], status: Optional[int] = None):
+        """
+        Ajusta el saldo con el peso usado que informa Binance
+
+        El servidor cuenta todo el peso del IP en el minuto actual; el
+        saldo local nunca puede ser mayor que lo que queda en el servidor.
+        """
+        used = None
+        for name in USED_WEIGHT_HEADERS:
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    used = float(value)
+                    break
+                except ValueError:
+                    continue
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if used is not None:
+                self.stats['server_used_weight'] = used
+                self._tokens = min(self._tokens, max(0.0, self.capacity - used))
+
+            # 429 = límite superado, 418 = IP baneada: esperar lo que indique Retry-After
+            if status in (418, 429):
+                try:
+                    retry_after = float(headers.get('Retry-After', WEIGHT_WINDOW_SECONDS))
+                except ValueError:
+                    retry_after = WEIGHT_WINDOW_SECONDS
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self._tokens = 0.0
+                self.stats['penalties'] += 1
+                logger.warning(f"⚠️ Binance respondió {status}: pausando peticiones {retry_after:.0f}s")
+
+    @property
+    def available(self) -> float:
+        """Peso disponible ahora mismo"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['available'] = round(self.available, 1)
+        stats['capacity'] = self.capacity
+        return stats
+
+
+class RequestCoalescer:
+    """Une peticiones idénticas concurrentes en una sola llamada en vuelo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_async: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {'calls': 0, 'coalesced': 0}
+
+    def call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Ejecuta fn() o espera a la llamada en vuelo con la misma clave
+
+        El resultado se comparte entre todos los que esperan: no debe
+        modificarse en sitio.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.stats['calls'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def call_async(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Versión asíncrona de call (factory crea la corrutina)"""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._inflight_async.get(loop_key)
+            if task is None:
+                task = asyncio.ensure_future(factory())
+                self._inflight_async[loop_key] = task
+                task.add_done_callback(lambda _: self._forget(loop_key, task))
+                self.stats['calls'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        # shield: cancelar a un llamante no cancela la petición compartida
+        return await asyncio.shield(task)
+
+    def _forget(self, loop_key: Hashable, task: asyncio.Task):
+        with self._lock:
+            if self._inflight_async.get(loop_key) is task:
+                del self._inflight_async[loop_key]
+
+
+# Instancias globales
+_rate_limiter = None
+_request_coalescer = None
+_instances_lock = threading.Lock()
+
+
+def get_rate_limiter() -> WeightRateLimiter:
+    """Obtiene el limitador de peso global del proceso"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _instances_lock:
+            if _rate_limiter is None:
+                _rate_limiter = WeightRateLimiter()
+    return _rate_limiter
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """Obtiene el agrupador de peticiones global del proceso"""
+    global _request_coalescer
+    if _request_coalescer is None:
+        with _instances_lock:
+            if _request_coalescer is None:
+                _request_coalescer = RequestCoalescer()
+    return _request_coalescer
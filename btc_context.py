@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+===========================================
+CONTEXTO BTC COMPARTIDO
+===========================================
+
+Tendencia de BTC (SMA6 vs SMA24 en 1h), medias y volatilidad calculadas
+una sola vez por vela cerrada y compartidas por todo el proceso. Usa un
+único conector reutilizado en lugar de crear uno por validación.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from kline_store import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Si la descarga falla se reintenta pasado este tiempo (no en cada validación)
+ERROR_RETRY_SECONDS = 30
+
+
+@dataclass
+class BTCContext:
+    """Estado de BTC en la última vela cerrada"""
+    trend: str  # UP, DOWN o LATERAL
+    sma_short: float
+    sma_long: float
+    volatility: float  # Desviación típica de retornos por vela (%)
+    price: float
+    candle_time: Optional[datetime]
+    updated_at: datetime
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def calculate_btc_context(closes: np.ndarray, candle_time: Optional[datetime] = None,
+                          short: int = 6, long: int = 24) -> BTCContext:
+    """Tendencia con la misma regla del pipeline: SMA corta vs larga ±1%"""
+    closes = np.asarray(closes, dtype=float)
+    if len(closes) == 0:
+        return BTCContext('LATERAL', 0.0, 0.0, 0.0, 0.0, candle_time, datetime.now())
+
+    sma_short = float(closes[-short:].mean())
+    sma_long = float(closes[-long:].mean())
+
+    if sma_short > sma_long * 1.01:
+        trend = 'UP'
+    elif sma_short < sma_long * 0.99:
+        trend = 'DOWN'
+    else:
+        trend = 'LATERAL'
+
+    returns = np.diff(closes[-long:]) / closes[-long:-1] if len(closes) > 1 else np.array([])
+    volatility = float(returns.std() * 100) if len(returns) > 1 else 0.0
+
+    return BTCContext(trend, sma_short, sma_long, volatility, float(closes[-1]),
+                      candle_time, datetime.now())
+
+
+class BTCContextProvider:
+    """Contexto BTC cacheado hasta el cierre de la siguiente vela"""
+
+    def __init__(self, connector=None, symbol: str = 'BTCUSDT', timeframe: str = '1h',
+                 candles: int = 24):
+        self._connector = connector
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.candles = candles
+        self.interval_ms = interval_to_ms(timeframe)
+
+        self._context: Optional[BTCContext] = None
+        self._expires_at = 0.0  # epoch (s)
+        self._lock = threading.Lock()
+        self._refreshing: Optional[Future] = None  # descarga en vuelo
+
+        self.stats = {'refreshes': 0, 'hits': 0, 'errors': 0}
+
+    @property
+    def connector(self):
+        """Conector compartido (se crea una sola vez)"""
+        if self._connector is None:
+            from binance_integration import BinanceConnector
+            self._connector = BinanceConnector(testnet=True)
+        return self._connector
+
+    def _next_close(self, now_ms: int) -> float:
+        """Epoch (s) en que cierra la vela en formación"""
+        return (now_ms - now_ms % self.interval_ms + self.interval_ms) / 1000
+
+    def _refresh(self) -> BTCContext:
+        now_ms = int(time.time() * 1000)
+        # Una vela de más para descartar la que está en formación
+        df = self.connector.get_historical_data(self.symbol, timeframe=self.timeframe,
+                                                limit=self.candles + 1)
+        if df is None or df.empty:
+            raise ValueError(f"Sin datos de {self.symbol} {self.timeframe}")
+
+        index = df.index
+        if hasattr(index[-1], 'timestamp') and index[-1].timestamp() * 1000 + self.interval_ms > now_ms:
+            df = df.iloc[:-1]
+        df = df.tail(self.candles)
+
+        candle_time = df.index[-1].to_pydatetime() if hasattr(df.index[-1], 'to_pydatetime') else None
+        return calculate_btc_context(df['close'].to_numpy(dtype=float), candle_time)
+
+    def get_context(self, force: bool = False) -> BTCContext:
+        """
+        Contexto vigente; descarga solo tras el cierre de una vela nueva
+
+        La descarga se hace fuera del lock y una sola vez: los llamantes
+        concurrentes esperan el resultado de la que está en vuelo.
+        """
+        with self._lock:
+            now = time.time()
+            if not force and self._context is not None and now < self._expires_at:
+                self.stats['hits'] += 1
+                return self._context
+
+            future = self._refreshing
+            owner = future is None
+            if owner:
+                future = self._refreshing = Future()
+
+        if not owner:
+            return future.result()
+
+        context = None
+        try:
+            try:
+                fresh = self._refresh()
+                error = None
+            except Exception as e:
+                fresh, error = None, e
+
+            with self._lock:
+                if error is None:
+                    self._context = fresh
+                    self._expires_at = self._next_close(int(now * 1000))
+                    self.stats['refreshes'] += 1
+                else:
+                    self.stats['errors'] += 1
+                    logger.error(f"Error actualizando contexto BTC: {error}")
+                    if self._context is None:
+                        self._context = calculate_btc_context(np.array([]))
+                    self._expires_at = now + ERROR_RETRY_SECONDS
+                context = self._context
+            return context
+        finally:
+            with self._lock:
+                self._refreshing = None
+            if context is None:
+                future.set_exception(RuntimeError("Descarga del contexto BTC interrumpida"))
+            else:
+                future.set_result(context)
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+
+# Instancia global
+_btc_context_provider = None
+
+
+def get_btc_context_provider() -> BTCContextProvider:
+    """Obtiene el proveedor global de contexto BTC"""
+    global _btc_context_provider
+    if _btc_context_provider is None:
+        _btc_context_provider = BTCContextProvider()
+    return _btc_context_provider
@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from collections import deque
 import time
 
+import indicator_kernels as kernels
+
 class CorrelationMonitor:
     def __init__(self):
         self.btc_prices = deque(maxlen=100)  # Store last 100 prices
@@ -71,32 +73,8 @@ class CorrelationMonitor:
         return correlation
     
     def calculate_rsi(self, prices, period=14):
-        """Calculate RSI for given price series"""
-        if len(prices) < period + 1:
-            return 50  # Neutral if not enough data
-        
-        prices_list = list(prices)[-(period+1):]
-        gains = []
-        losses = []
-        
-        for i in range(1, len(prices_list)):
-            diff = prices_list[i] - prices_list[i-1]
-            if diff > 0:
-                gains.append(diff)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(diff))
-        
-        avg_gain = np.mean(gains) if gains else 0
-        avg_loss = np.mean(losses) if losses else 0
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calculate RSI for given price series (50 if not enough data)"""
+        return kernels.rsi_last(prices, period)
     
     def detect_divergence(self):
         """Detect BTC/SOL divergence patterns"""
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+===========================================
+PLANIFICADOR POR CIERRE DE VELA
+===========================================
+
+Sustituye los bucles "while True: ... sleep(N)" por trabajos que se
+disparan justo al cerrar cada vela de su timeframe (más un pequeño
+margen para que Binance publique la vela cerrada):
+
+- Registro único de trabajos por (nombre, símbolo, timeframe); todos los
+  workers y monitores se suscriben al mismo planificador
+- Un solo temporizador por timeframe, alineado con los cierres de Binance
+  (UTC; las velas semanales abren el lunes)
+- Jitter aleatorio configurable por trabajo para no lanzar todas las
+  peticiones en el mismo milisegundo
+- Si la ejecución anterior de un trabajo sigue en curso, el cierre se
+  salta en lugar de acumular ejecuciones
+- run_job() es el bucle principal de los workers y monitores: registra
+  el trabajo, lanza un primer ciclo y espera hasta que se dé de baja
+- wait_for_close() para bucles secuenciales: si ya hubo un cierre desde
+  la última ejecución vuelve inmediatamente, así no se pierde ninguno
+- Solo depende de la biblioteca estándar (cabe en las imágenes ligeras)
+
+Así solo se calcula cuando hay una vela nueva y la latencia de una señal
+es la del cierre más el cálculo, no hasta un intervalo completo.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from timeframes import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Margen tras el cierre antes de disparar (segundos)
+DEFAULT_CLOSE_DELAY = float(os.getenv('CANDLE_CLOSE_DELAY', '1.0'))
+
+# Retardo aleatorio adicional por trabajo, entre 0 y este valor (segundos)
+DEFAULT_JITTER = float(os.getenv('CANDLE_JITTER', '0.5'))
+
+# Las velas semanales de Binance abren el lunes; el epoch cayó en jueves
+_ALIGN_OFFSET_MS: Dict[str, int] = {'1w': 4 * 86_400_000}
+
+
+@dataclass(frozen=True)
+class CandleClose:
+    """Evento de cierre de vela que recibe cada trabajo"""
+    timeframe: str
+    close_time: int  # ms; apertura de la vela siguiente
+    symbol: Optional[str] = None
+
+
+# callback(evento) -> awaitable
+JobCallback = Callable[[CandleClose], Awaitable]
+
+
+@dataclass
+class CandleJob:
+    """Trabajo registrado para un (símbolo, timeframe)"""
+    name: str
+    timeframe: str
+    callback: JobCallback
+    symbol: Optional[str] = None
+    jitter: Optional[float] = None
+    runs: int = 0
+    skipped: int = 0
+    errors: int = 0
+    last_close: Optional[int] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    finished: Optional[asyncio.Event] = field(default=None, repr=False)
+
+    @property
+    def key(self) -> Tuple[str, Optional[str], str]:
+        return (self.name, self.symbol, self.timeframe)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+def last_close_time(timeframe: str, now_ms: int) -> int:
+    """Último cierre de vela (ms) en o antes de now_ms"""
+    period = interval_to_ms(timeframe)
+    offset = _ALIGN_OFFSET_MS.get(timeframe, 0)
+    return (now_ms - offset) // period * period + offset
+
+
+def next_close_time(timeframe: str, now_ms: int) -> int:
+    """Próximo cierre de vela (ms) estrictamente posterior a now_ms"""
+    return last_close_time(timeframe, now_ms) + interval_to_ms(timeframe)
+
+
+def timeframe_for_seconds(seconds: float) -> str:
+    """Timeframe más largo que no supera el intervalo dado (mínimo 1m)"""
+    timeframe = '1m'
+    for candidate in ('1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d'):
+        if interval_to_ms(candidate) <= seconds * 1000:
+            timeframe = candidate
+    return timeframe
+
+
+def scan_timeframe_from_env(default: str = '1m') -> str:
+    """
+    Timeframe de escaneo de los workers
+
+    SIGNAL_SCAN_TIMEFRAME tiene prioridad; si solo está el antiguo
+    SIGNAL_SCAN_INTERVAL (segundos) se traduce al timeframe equivalente.
+    """
+    timeframe = os.getenv('SIGNAL_SCAN_TIMEFRAME')
+    if timeframe:
+        interval_to_ms(timeframe)  # valida el timeframe
+        return timeframe
+    interval = os.getenv('SIGNAL_SCAN_INTERVAL')
+    if interval:
+        return timeframe_for_seconds(float(interval))
+    return default
+
+
+class CandleCloseScheduler:
+    """Registro de trabajos disparados en cada cierre de vela"""
+
+    def __init__(self, close_delay: float = DEFAULT_CLOSE_DELAY,
+                 jitter: float = DEFAULT_JITTER,
+                 clock: Callable[[], float] = time.time):
+        self.close_delay = close_delay
+        self.jitter = jitter
+        self._clock = clock
+
+        self._jobs: Dict[Tuple[str, Optional[str], str], CandleJob] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.stats = {'closes': 0, 'runs': 0, 'skipped': 0, 'errors': 0}
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000)
+
+    async def wait_for_close(self, timeframe: str, after: Optional[int] = None) -> int:
+        """
+        Espera al próximo cierre de vela del timeframe
+
+        Args:
+            after: último cierre ya procesado; si desde entonces ya cerró
+                otra vela se devuelve la más reciente sin esperar
+
+        Returns:
+            Hora de cierre (ms) de la vela
+        """
+        delay_ms = int(self.close_delay * 1000)
+        # Un cierre cuenta cuando ha pasado el margen de publicación
+        latest = last_close_time(timeframe, self._now_ms() - delay_ms)
+        if after is not None and latest > after:
+            return latest
+
+        target = next_close_time(timeframe, max(latest, after or latest))
+        while True:
+            remaining = (target + delay_ms - self._now_ms()) / 1000
+            if remaining <= 0:
+                return target
+            await asyncio.sleep(remaining)
+
+    def add_job(self, name: str, timeframe: str, callback: JobCallback,
+                symbol: Optional[str] = None, jitter: Optional[float] = None) -> CandleJob:
+        """
+        Registra (o reemplaza) un trabajo para cada cierre del timeframe
+
+        Args:
+            name: nombre del suscriptor (p. ej. el worker)
+            symbol: símbolo del trabajo; None para trabajos de todo el mercado
+            jitter: retardo aleatorio máximo; por defecto el del planificador
+        """
+        interval_to_ms(timeframe)  # valida el timeframe
+        job = CandleJob(name=name, timeframe=timeframe, callback=callback,
+                        symbol=symbol, jitter=jitter)
+        previous = self._jobs.get(job.key)
+        if previous is not None:
+            job.task = previous.task
+            self._finish(previous)
+        self._jobs[job.key] = job
+        if self._loop is not None:
+            self._ensure_timer(timeframe)
+        return job
+
+    def remove_job(self, name: str, timeframe: Optional[str] = None,
+                   symbol: Optional[str] = None) -> int:
+        """Da de baja los trabajos de un suscriptor (opcionalmente filtrados)"""
+        keys = [key for key in self._jobs
+                if key[0] == name and (timeframe is None or key[2] == timeframe)
+                and (symbol is None or key[1] == symbol)]
+        for key in keys:
+            self._finish(self._jobs.pop(key))
+        return len(keys)
+
+    @staticmethod
+    def _finish(job: CandleJob):
+        if job.finished is not None:
+            job.finished.set()
+
+    async def run_job(self, name: str, timeframe: str, callback: JobCallback,
+                      symbol: Optional[str] = None, jitter: Optional[float] = None,
+                      run_now: bool = True) -> CandleJob:
+        """
+        Registra el trabajo y espera hasta que se dé de baja (remove_job o stop)
+
+        Args:
+            run_now: lanzar un primer ciclo sin esperar al próximo cierre
+
+        Si la tarea que espera se cancela, el trabajo se da de baja y su
+        ejecución en curso se cancela (salvo que otro add_job lo reemplazara).
+        """
+        job = self.add_job(name, timeframe, callback, symbol=symbol, jitter=jitter)
+        job.finished = asyncio.Event()
+        await self.start()
+        if run_now:
+            self._fire(job, last_close_time(timeframe, self._now_ms()))
+        try:
+            await job.finished.wait()
+        finally:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+                if job.running:
+                    job.task.cancel()
+        return job
+
+    def get_jobs(self, timeframe: Optional[str] = None) -> List[CandleJob]:
+        return [job for job in self._jobs.values()
+                if timeframe is None or job.timeframe == timeframe]
+
+    async def start(self):
+        """Arranca los temporizadores en el loop actual"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._timers.clear()  # los de un loop anterior ya no corren
+        for timeframe in {job.timeframe for job in self._jobs.values()}:
+            self._ensure_timer(timeframe)
+
+    async def stop(self):
+        """Detiene los temporizadores y cancela las ejecuciones en curso"""
+        tasks = list(self._timers.values())
+        tasks += [job.task for job in self._jobs.values() if job.running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timers.clear()
+        self._loop = None
+        for job in self._jobs.values():
+            self._finish(job)
+
+    def _ensure_timer(self, timeframe: str):
+        timer = self._timers.get(timeframe)
+        if timer is None or timer.done():
+            self._timers[timeframe] = self._loop.create_task(self._timer(timeframe))
+
+    async def _timer(self, timeframe: str):
+        """Un temporizador por timeframe; termina cuando no quedan trabajos"""
+        last_close = None
+        while self.get_jobs(timeframe):
+            last_close = await self.wait_for_close(timeframe, last_close)
+            self.stats['closes'] += 1
+            for job in self.get_jobs(timeframe):
+                self._fire(job, last_close)
+        self._timers.pop(timeframe, None)
+
+    def _fire(self, job: CandleJob, close_time: int):
+        if job.running:
+            job.skipped += 1
+            self.stats['skipped'] += 1
+            logger.warning(f"⏭️ {job.name} {job.symbol or ''} {job.timeframe}: "
+                           f"ejecución anterior en curso, se salta el cierre")
+            return
+        event = CandleClose(timeframe=job.timeframe, close_time=close_time, symbol=job.symbol)
+        job.task = asyncio.create_task(self._run_job(job, event))
+
+    async def _run_job(self, job: CandleJob, event: CandleClose):
+        jitter = self.jitter if job.jitter is None else job.jitter
+        if jitter > 0:
+            await asyncio.sleep(random.uniform(0, jitter))
+        try:
+            await job.callback(event)
+            job.runs += 1
+            job.last_close = event.close_time
+            self.stats['runs'] += 1
+        except Exception as e:
+            job.errors += 1
+            self.stats['errors'] += 1
+            logger.error(f"Error en trabajo {job.name} ({job.symbol or '-'} {job.timeframe}): {e}")
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['jobs'] = len(self._jobs)
+        stats['timeframes'] = sorted(self._timers)
+        return stats
+
+
+# Instancia global
+_candle_scheduler = None
+
+
+def get_candle_scheduler() -> CandleCloseScheduler:
+    """Obtiene el planificador global de cierres de vela"""
+    global _candle_scheduler
+    if _candle_scheduler is None:
+        _candle_scheduler = CandleCloseScheduler()
+    return _candle_scheduler
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+===========================================
+CONTENEDOR COLUMNAR DE VELAS
+===========================================
+
+Candles guarda un bloque de velas como siete arrays NumPy contiguos
+(open_time/close_time int64, OHLCV float64) en un objeto con __slots__,
+en lugar de un DataFrame de 12 columnas object convertido con
+pd.to_numeric y recortado después:
+
+- from_json() parsea la respuesta de /api/v3/klines directamente desde
+  los bytes (np.fromstring en C, sin crear un objeto Python por campo)
+- from_klines() acepta la lista ya decodificada
+- Slicing y tail() devuelven vistas, no copias
+- to_frame() construye el DataFrame OHLCV solo si alguien lo pide y
+  sin copiar los arrays
+"""
+
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Campos de cada kline de Binance (spot y futuros)
+KLINE_FIELDS = 12
+
+# Columnas conservadas (mismo orden y tipos que kline_store.COLUMNS)
+CANDLE_COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time')
+_INT_COLUMNS = frozenset(('open_time', 'close_time'))
+
+# Caracteres que sobran para leer el JSON como una lista plana de números
+_JSON_NOISE = b'[]"'
+
+
+class Candles:
+    """Velas OHLCV en arrays columnares contiguos"""
+
+    __slots__ = CANDLE_COLUMNS + ('symbol', 'interval')
+
+    def __init__(self, open_time: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                 close_time: np.ndarray, symbol: Optional[str] = None,
+                 interval: Optional[str] = None):
+        self.open_time = open_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.close_time = close_time
+        self.symbol = symbol
+        self.interval = interval
+
+    # ===========================================
+    # CONSTRUCCIÓN
+    # ===========================================
+
+    @classmethod
+    def empty(cls, symbol: Optional[str] = None, interval: Optional[str] = None) -> 'Candles':
+        return cls.from_columns({name: () for name in CANDLE_COLUMNS}, symbol, interval)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], symbol: Optional[str] = None,
+                     interval: Optional[str] = None) -> 'Candles':
+        """Envuelve arrays por columna (sin copiar si ya tienen el tipo correcto)"""
+        return cls(*(np.asarray(columns[name], dtype=np.int64 if name in _INT_COLUMNS else np.float64)
+                     for name in CANDLE_COLUMNS),
+                   symbol=symbol, interval=interval)
+
+    @classmethod
+    def _from_matrix(cls, matrix: np.ndarray, symbol: Optional[str],
+                     interval: Optional[str]) -> 'Candles':
+        """Copia las 7 columnas útiles de una matriz (n, 12) a arrays contiguos"""
+        columns = {}
+        for i, name in enumerate(CANDLE_COLUMNS):
+            dtype = np.int64 if name in _INT_COLUMNS else np.float64
+            columns[name] = np.ascontiguousarray(matrix[:, i], dtype=dtype)
+        return cls.from_columns(columns, symbol, interval)
+
+    @classmethod
+    def from_json(cls, payload: Union[bytes, str], symbol: Optional[str] = None,
+                  interval: Optional[str] = None) -> 'Candles':
+        """
+        Parsea el cuerpo de /api/v3/klines sin pasar por json.loads
+
+        Raises:
+            ValueError: si el cuerpo no es una lista de klines
+        """
+        if isinstance(payload, str):
+            payload = payload.encode()
+        flat = np.fromstring(payload.translate(None, _JSON_NOISE), sep=',') \
+            if payload.strip() not in (b'', b'[]') else np.empty(0)
+        if flat.size % KLINE_FIELDS:
+            raise ValueError(f"Respuesta de klines inválida ({flat.size} valores)")
+        return cls._from_matrix(flat.reshape(-1, KLINE_FIELDS), symbol, interval)
+
+    @classmethod
+    def from_klines(cls, klines: Sequence[Sequence], symbol: Optional[str] = None,
+                    interval: Optional[str] = None) -> 'Candles':
+        """Desde la lista de klines ya decodificada (strings o números)"""
+        if not len(klines):
+            return cls.empty(symbol, interval)
+        matrix = np.array([kline[:len(CANDLE_COLUMNS)] for kline in klines], dtype=np.float64)
+        return cls._from_matrix(matrix, symbol, interval)
+
+    # ===========================================
+    # ACCESO
+    # ===========================================
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def __getitem__(self, key):
+        """candles['close'] -> columna; candles[-100:] -> Candles (vistas)"""
+        if isinstance(key, str):
+            if key not in CANDLE_COLUMNS:
+                raise KeyError(key)
+            return getattr(self, key)
+        if not isinstance(key, slice):
+            raise TypeError("Candles solo admite nombres de columna o slices")
+        return Candles(*(getattr(self, name)[key] for name in CANDLE_COLUMNS),
+                       symbol=self.symbol, interval=self.interval)
+
+    def __repr__(self) -> str:
+        return f"Candles({self.symbol or '?'} {self.interval or '?'}, {len(self)} velas)"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in CANDLE_COLUMNS)
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return float(self.close[-1]) if len(self) else None
+
+    def tail(self, n: int) -> 'Candles':
+        return self[-n:] if n else self[:0]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Dict {columna: array} (formato de kline_store)"""
+        return {name: getattr(self, name) for name in CANDLE_COLUMNS}
+
+    def copy(self) -> 'Candles':
+        return Candles(*(getattr(self, name).copy() for name in CANDLE_COLUMNS),
+                       symbol=self.symbol, interval=self.interval)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame OHLCV indexado por timestamp (formato de get_klines)
+
+        Comparte memoria con los arrays: para vistas de un buffer que se
+        sigue escribiendo, llamar antes a copy().
+        """
+        df = pd.DataFrame({
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }, index=pd.to_datetime(self.open_time, unit='ms'), copy=False)
+        df.index.name = 'timestamp'
+        if self.symbol:
+            df.attrs['symbol'] = self.symbol
+        if self.interval:
+            df.attrs['timeframe'] = self.interval
+        return df
@@ -4,13 +4,12 @@ Backtest Completo - Todos los 6 pares con sus estrategias específicas
 BTC, ETH, SOL, BNB, ADA, DOGE
 """
 
-import asyncio
-import httpx
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import json
 
+from parallel_backtest import ParallelBacktestRunner, futures_kline_store, make_jobs, parse_workers
+
 # Configuración completa de todos los pares
 PAIR_CONFIG = {
     'BTCUSDT': {
@@ -61,48 +60,6 @@ class CompletePairBacktest:
         self.max_drawdown = 0
         self.peak_capital = capital
         
-    async def fetch_historical_data(self, symbol: str, interval: str, days: int = 90):
-        """Obtiene datos históricos con reintentos"""
-        
-        end_time = int(datetime.now().timestamp() * 1000)
-        start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-        
-        all_data = []
-        current_start = start_time
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            while current_start < end_time:
-                try:
-                    response = await client.get(
-                        'https://fapi.binance.com/fapi/v1/klines',
-                        params={
-                            'symbol': symbol,
-                            'interval': interval,
-                            'startTime': current_start,
-                            'endTime': end_time,
-                            'limit': 1500
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if not data:
-                            break
-                        all_data.extend(data)
-                        current_start = data[-1][0] + 1
-                    else:
-                        print(f"Error {response.status_code} fetching {symbol} {interval}")
-                        break
-                        
-                except Exception as e:
-                    print(f"Exception fetching {symbol} {interval}: {e}")
-                    break
-                
-                # Pequeña pausa para no sobrecargar API
-                await asyncio.sleep(0.1)
-        
-        return all_data
-    
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calcula todos los indicadores"""
         
@@ -465,7 +422,23 @@ class CompletePairBacktest:
             'by_strategy': strategy_stats
         }
 
-async def main():
+def strategy_for(symbol: str) -> str:
+    """Estrategia principal del par (según su configuración 1h)"""
+    config = PAIR_CONFIG[symbol]['1h']
+    return "TREND_FOLLOWING" if config.get('use_trend_following') else \
+           "MEAN_REVERSION" if config.get('use_mean_reversion') else \
+           "MOMENTUM" if config.get('use_momentum') else \
+           "RANGE_TRADING" if config.get('use_range_trading') else "UNKNOWN"
+
+def run_pair_job(job, df: pd.DataFrame):
+    """Trabajo de ParallelBacktestRunner: backtest independiente de un par y timeframe"""
+    if len(df) <= 100:
+        return None
+    backtest = CompletePairBacktest()
+    backtest.run_backtest(df.reset_index(), job.symbol, job.timeframe)
+    return backtest.get_statistics()
+
+def main(workers: int = 1):
     """Backtest completo de todos los 6 pares"""
     
     print("="*80)
@@ -479,52 +452,37 @@ async def main():
     symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'ADAUSDT', 'DOGEUSDT']
     intervals = ['15m', '1h', '4h']
     
+    # Velas sincronizadas una vez en este proceso; cada trabajo en su propio proceso
+    runner = ParallelBacktestRunner(run_pair_job, store=futures_kline_store(), workers=workers)
+    results = runner.run(make_jobs(symbols, intervals), days=90)
+    
     all_results = []
     
-    for symbol in symbols:
-        strategy_name = "TREND_FOLLOWING" if PAIR_CONFIG[symbol]['1h'].get('use_trend_following') else \
-                      "MEAN_REVERSION" if PAIR_CONFIG[symbol]['1h'].get('use_mean_reversion') else \
-                      "MOMENTUM" if PAIR_CONFIG[symbol]['1h'].get('use_momentum') else \
-                      "RANGE_TRADING" if PAIR_CONFIG[symbol]['1h'].get('use_range_trading') else "UNKNOWN"
+    for result in results:
+        symbol, interval = result.job.symbol, result.job.timeframe
+        strategy_name = strategy_for(symbol)
         
-        print(f"\n🔸 {symbol} - Estrategia: {strategy_name}")
-        print("-" * 60)
+        if interval == intervals[0]:
+            print(f"\n🔸 {symbol} - Estrategia: {strategy_name}")
+            print("-" * 60)
         
-        for interval in intervals:
-            print(f"Fetching {symbol} {interval} data...")
-            
-            backtest = CompletePairBacktest()
-            data = await backtest.fetch_historical_data(symbol, interval, 90)
+        stats = result.result
+        if stats:
+            print(f"  {interval}: {stats['total_trades']} trades, {stats['win_rate']:.1f}% WR, {stats['total_return']:.2f}% return")
             
-            if data and len(data) > 100:
-                df = pd.DataFrame(data, columns=[
-                    'timestamp', 'open', 'high', 'low', 'close', 
-                    'volume', 'close_time', 'quote_volume', 'trades',
-                    'taker_buy_volume', 'taker_buy_quote', 'ignore'
-                ])
-                
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = df[col].astype(float)
-                
-                backtest.run_backtest(df, symbol, interval)
-                stats = backtest.get_statistics()
-                
-                print(f"  {interval}: {stats['total_trades']} trades, {stats['win_rate']:.1f}% WR, {stats['total_return']:.2f}% return")
-                
-                all_results.append({
-                    'symbol': symbol,
-                    'interval': interval,
-                    'strategy': strategy_name,
-                    **stats
-                })
-            else:
-                print(f"  {interval}: No data or insufficient data")
-                all_results.append({
-                    'symbol': symbol, 'interval': interval, 'strategy': strategy_name,
-                    'total_trades': 0, 'win_rate': 0, 'total_return': 0,
-                    'final_capital': INITIAL_CAPITAL, 'max_drawdown': 0
-                })
+            all_results.append({
+                'symbol': symbol,
+                'interval': interval,
+                'strategy': strategy_name,
+                **stats
+            })
+        else:
+            print(f"  {interval}: No data or insufficient data")
+            all_results.append({
+                'symbol': symbol, 'interval': interval, 'strategy': strategy_name,
+                'total_trades': 0, 'win_rate': 0, 'total_return': 0,
+                'final_capital': INITIAL_CAPITAL, 'max_drawdown': 0
+            })
     
     # Análisis final
     print("\n" + "="*80)
@@ -566,4 +524,4 @@ async def main():
     print(f"\n✅ Resultados completos guardados en complete_pair_backtest_results.csv")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main(parse_workers("Backtest completo de los 6 pares"))
\ No newline at end of file
@@ -5,14 +5,28 @@ Reemplaza indicadores tradicionales con métricas crypto-nativas
 """
 
 import asyncio
-import httpx
+import json
+import time
+from http_client_pool import get_httpx_client
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from binance_rate_limiter import get_request_coalescer
+from local_order_book import get_local_depth
+from order_book_depth import DepthSnapshot
+
 logger = logging.getLogger(__name__)
 
+# Velas mínimas por descarga: hasta 100 el peso de /klines es el mismo, así
+# las peticiones más cortas del mismo símbolo/intervalo salen de la caché
+KLINES_FETCH_LIMIT = 100
+
+# Símbolos analizados a la vez en get_comprehensive_momentum_batch
+# (cada uno lanza 2 descargas de velas y 1 de order book)
+MOMENTUM_BATCH_CONCURRENCY = 10
+
 class CryptoMomentumDetector:
     """Detector de momentum específico para crypto usando volumen y aceleración de precio"""
     
@@ -21,23 +35,51 @@ class CryptoMomentumDetector:
         self.volume_threshold = 2.0  # 200% spike threshold
         self.price_acceleration_threshold = 0.02  # 2% acceleration
         self.cache_duration = 60  # Cache for 60 seconds
+        # (symbol, interval) -> (expira en monotonic, velas descargadas, klines)
         self.cache = {}
+        self.coalescer = get_request_coalescer()
+        self.cache_stats = {'hits': 0, 'misses': 0}
         
     async def get_klines(self, symbol: str, interval: str = "15m", limit: int = 100) -> List:
-        """Obtener velas de Binance"""
+        """
+        Obtener velas de Binance
+
+        Cacheadas cache_duration segundos por símbolo/intervalo; las
+        descargas simultáneas del mismo par comparten una sola petición.
+        """
+        key = (symbol, interval)
+        cached = self.cache.get(key)
+        if cached is not None:
+            expires_at, fetched, klines = cached
+            if time.monotonic() < expires_at and limit <= fetched:
+                self.cache_stats['hits'] += 1
+                return klines[-limit:]
+
+        self.cache_stats['misses'] += 1
+        fetch_limit = max(limit, KLINES_FETCH_LIMIT)
+        klines = await self.coalescer.call_async(
+            ('momentum_klines', self.binance_api, symbol, interval, fetch_limit),
+            lambda: self._fetch_klines(symbol, interval, fetch_limit)
+        )
+        if klines:
+            self.cache[key] = (time.monotonic() + self.cache_duration, fetch_limit, klines)
+        return klines[-limit:]
+
+    async def _fetch_klines(self, symbol: str, interval: str, limit: int) -> List:
+        """Descarga velas sin caché ([] si falla)"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.binance_api}/klines",
-                    params={
-                        "symbol": symbol,
-                        "interval": interval,
-                        "limit": limit
-                    },
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    return response.json()
+            client = get_httpx_client()
+            response = await client.get(
+                f"{self.binance_api}/klines",
+                params={
+                    "symbol": symbol,
+                    "interval": interval,
+                    "limit": limit
+                },
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                return response.json()
         except Exception as e:
             logger.error(f"Error getting klines for {symbol}: {e}")
         return []
@@ -144,7 +186,10 @@ class CryptoMomentumDetector:
         Más preciso que RSI para crypto
         """
         try:
-            async with httpx.AsyncClient() as client:
+            # Libro local (diff-depth) si está al día; si no, snapshot REST
+            depth = get_local_depth(symbol, 20)
+            if depth is None:
+                client = get_httpx_client()
                 response = await client.get(
                     f"{self.binance_api}/depth",
                     params={"symbol": symbol, "limit": 100},
@@ -152,48 +197,47 @@ class CryptoMomentumDetector:
                 )
                 if response.status_code != 200:
                     return {"imbalance": 0, "signal": "NEUTRAL", "buy_pressure": 50}
+                depth = DepthSnapshot.from_depth(response.json(), symbol).top(20)
                 
-                data = response.json()
-                
-                # Calculate bid/ask volumes
-                bid_volume = sum(float(bid[1]) * float(bid[0]) for bid in data['bids'][:20])
-                ask_volume = sum(float(ask[1]) * float(ask[0]) for ask in data['asks'][:20])
+            # Calculate bid/ask volumes
+            bid_volume = depth.total_notional('bids')
+            ask_volume = depth.total_notional('asks')
                 
-                # Calculate imbalance
-                total_volume = bid_volume + ask_volume
-                if total_volume > 0:
-                    buy_pressure = (bid_volume / total_volume) * 100
-                    imbalance = (bid_volume - ask_volume) / total_volume
-                else:
-                    buy_pressure = 50
-                    imbalance = 0
+            # Calculate imbalance
+            total_volume = bid_volume + ask_volume
+            if total_volume > 0:
+                buy_pressure = (bid_volume / total_volume) * 100
+                imbalance = (bid_volume - ask_volume) / total_volume
+            else:
+                buy_pressure = 50
+                imbalance = 0
                 
-                # Generate signal
-                if buy_pressure > 65:
-                    signal = "STRONG_BUY_PRESSURE"
-                    strength = min(95, 50 + buy_pressure - 50)
-                elif buy_pressure > 55:
-                    signal = "BUY_PRESSURE"
-                    strength = 70
-                elif buy_pressure < 35:
-                    signal = "STRONG_SELL_PRESSURE"
-                    strength = min(95, 50 + (50 - buy_pressure))
-                elif buy_pressure < 45:
-                    signal = "SELL_PRESSURE"
-                    strength = 70
-                else:
-                    signal = "NEUTRAL"
-                    strength = 50
+            # Generate signal
+            if buy_pressure > 65:
+                signal = "STRONG_BUY_PRESSURE"
+                strength = min(95, 50 + buy_pressure - 50)
+            elif buy_pressure > 55:
+                signal = "BUY_PRESSURE"
+                strength = 70
+            elif buy_pressure < 35:
+                signal = "STRONG_SELL_PRESSURE"
+                strength = min(95, 50 + (50 - buy_pressure))
+            elif buy_pressure < 45:
+                signal = "SELL_PRESSURE"
+                strength = 70
+            else:
+                signal = "NEUTRAL"
+                strength = 50
                 
-                return {
-                    "imbalance": imbalance,
-                    "buy_pressure": buy_pressure,
-                    "sell_pressure": 100 - buy_pressure,
-                    "bid_volume": bid_volume,
-                    "ask_volume": ask_volume,
-                    "signal": signal,
-                    "strength": strength
-                }
+            return {
+                "imbalance": imbalance,
+                "buy_pressure": buy_pressure,
+                "sell_pressure": 100 - buy_pressure,
+                "bid_volume": bid_volume,
+                "ask_volume": ask_volume,
+                "signal": signal,
+                "strength": strength
+            }
                 
         except Exception as e:
             logger.error(f"Error getting order book for {symbol}: {e}")
@@ -209,40 +253,24 @@ class CryptoMomentumDetector:
             # Para futuros perpetuos, el símbolo termina en USDT pero necesitamos agregarlo
             futures_symbol = symbol
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://fapi.binance.com/fapi/v1/fundingRate",
-                    params={"symbol": futures_symbol, "limit": 1},
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if data:
-                        funding_rate = float(data[0]['fundingRate']) * 100  # Convert to percentage
-                        
-                        # Generate signal based on funding rate
-                        if funding_rate < 0:
-                            signal = "BEARISH_SENTIMENT"
-                            strength = 65
-                        elif funding_rate < 0.05:
-                            signal = "HEALTHY_MARKET"
-                            strength = 75
-                        elif funding_rate < 0.1:
-                            signal = "WARMING_UP"
-                            strength = 60
-                        else:
-                            signal = "OVERHEATED"
-                            strength = 80
-                        
-                        return {
-                            "funding_rate": funding_rate,
-                            "signal": signal,
-                            "strength": strength,
-                            "market_health": "HEALTHY" if funding_rate < 0.05 else "OVERHEATED" if funding_rate > 0.1 else "NORMAL"
-                        }
+            client = get_httpx_client()
+            response = await client.get(
+                "https://fapi.binance.com/fapi/v1/fundingRate",
+                params={"symbol": futures_symbol, "limit": 1},
+                timeout=5.0
+            )
+            if response.status_code == 200:
+                data = response.json()
+                if data:
+                    funding_rate = float(data[0]['fundingRate']) * 100  # Convert to percentage
+                    return self._classify_funding(funding_rate)
         except Exception as e:
             logger.debug(f"Funding rate not available for {symbol}: {e}")
         
+        return self._unknown_funding()
+
+    @staticmethod
+    def _unknown_funding() -> Dict:
         return {
             "funding_rate": 0.05,
             "signal": "NEUTRAL",
@@ -250,6 +278,65 @@ class CryptoMomentumDetector:
             "market_health": "UNKNOWN"
         }
     
+    @staticmethod
+    def _classify_funding(funding_rate: float) -> Dict:
+        """Señal a partir del funding rate (en %)"""
+        if funding_rate < 0:
+            signal = "BEARISH_SENTIMENT"
+            strength = 65
+        elif funding_rate < 0.05:
+            signal = "HEALTHY_MARKET"
+            strength = 75
+        elif funding_rate < 0.1:
+            signal = "WARMING_UP"
+            strength = 60
+        else:
+            signal = "OVERHEATED"
+            strength = 80
+
+        return {
+            "funding_rate": funding_rate,
+            "signal": signal,
+            "strength": strength,
+            "market_health": "HEALTHY" if funding_rate < 0.05 else "OVERHEATED" if funding_rate > 0.1 else "NORMAL"
+        }
+
+    async def get_funding_rates(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Funding rate de varios símbolos con una sola petición (premiumIndex)
+
+        Los símbolos sin perpetuo no aparecen en el resultado.
+        """
+        wanted = set(symbols)
+        try:
+            client = get_httpx_client()
+            response = await client.get("https://fapi.binance.com/fapi/v1/premiumIndex", timeout=5.0)
+            if response.status_code == 200:
+                return {
+                    item['symbol']: self._classify_funding(float(item['lastFundingRate']) * 100)
+                    for item in response.json()
+                    if item.get('symbol') in wanted
+                }
+        except Exception as e:
+            logger.debug(f"Funding rates not available: {e}")
+        return {}
+
+    async def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Último precio de varios símbolos con una sola petición"""
+        symbols = list(dict.fromkeys(symbols))
+        try:
+            client = get_httpx_client()
+            response = await client.get(
+                f"{self.binance_api}/ticker/price",
+                params={"symbols": json.dumps(symbols, separators=(',', ':'))},
+                timeout=5.0
+            )
+            if response.status_code == 200:
+                return {item['symbol']: float(item['price']) for item in response.json()}
+        except Exception as e:
+            logger.error(f"Error getting prices: {e}")
+        return {}
+
     async def get_comprehensive_momentum(self, symbol: str) -> Dict:
         """
         Análisis completo de momentum crypto-nativo
@@ -262,12 +349,50 @@ class CryptoMomentumDetector:
             self.get_order_book_imbalance(symbol),
             self.get_funding_rate(symbol)
         )
-        
-        vroc_data = results[0]
-        acceleration_data = results[1]
-        orderbook_data = results[2]
-        funding_data = results[3]
-        
+        return self._combine_momentum(symbol, *results)
+
+    async def get_comprehensive_momentum_batch(self, symbols: Iterable[str],
+                                               max_concurrency: int = MOMENTUM_BATCH_CONCURRENCY
+                                               ) -> Dict[str, Dict]:
+        """
+        get_comprehensive_momentum para todo un universo de símbolos
+
+        Precios y funding rates llegan en una petición cada uno para todos
+        los símbolos; velas y order book se piden por símbolo, como mucho
+        max_concurrency símbolos a la vez. Cada resultado incluye además
+        "price" (None si no se obtuvo); los símbolos cuyo análisis falla
+        no aparecen en el resultado.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        prices, funding = await asyncio.gather(self.get_prices(symbols),
+                                               self.get_funding_rates(symbols))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze(symbol: str) -> Dict:
+            async with semaphore:
+                vroc_data, acceleration_data, orderbook_data = await asyncio.gather(
+                    self.calculate_volume_roc(symbol),
+                    self.calculate_price_acceleration(symbol),
+                    self.get_order_book_imbalance(symbol)
+                )
+            momentum = self._combine_momentum(symbol, vroc_data, acceleration_data, orderbook_data,
+                                              funding.get(symbol) or self._unknown_funding())
+            momentum["price"] = prices.get(symbol)
+            return momentum
+
+        results = await asyncio.gather(*(analyze(symbol) for symbol in symbols),
+                                       return_exceptions=True)
+        batch = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error analizando momentum de {symbol}: {result}")
+            else:
+                batch[symbol] = result
+        return batch
+
+    def _combine_momentum(self, symbol: str, vroc_data: Dict, acceleration_data: Dict,
+                          orderbook_data: Dict, funding_data: Dict) -> Dict:
+        """Señal final ponderada a partir de los cuatro indicadores"""
         # Calculate weighted signal strength
         weights = {
             "volume": 0.35,  # Volume is king in crypto
@@ -356,11 +481,14 @@ class CryptoMomentumDetector:
             }
         }
     
-    async def should_enter_position(self, symbol: str) -> Dict:
+    async def should_enter_position(self, symbol: str, momentum: Optional[Dict] = None) -> Dict:
         """
         Simple y claro: ¿Deberíamos entrar en posición?
+
+        momentum: análisis ya calculado (evita repetirlo)
         """
-        momentum = await self.get_comprehensive_momentum(symbol)
+        if momentum is None:
+            momentum = await self.get_comprehensive_momentum(symbol)
         
         # Entry conditions (as specified in requirements)
         volume_spike = momentum["indicators"]["volume_roc"]["spike"]
@@ -387,11 +515,15 @@ class CryptoMomentumDetector:
             "momentum_data": momentum
         }
     
-    async def should_exit_position(self, symbol: str, entry_price: float) -> Dict:
+    async def should_exit_position(self, symbol: str, entry_price: float,
+                                   momentum: Optional[Dict] = None) -> Dict:
         """
         Simple y claro: ¿Deberíamos salir de la posición?
+
+        momentum: análisis ya calculado (evita repetirlo)
         """
-        momentum = await self.get_comprehensive_momentum(symbol)
+        if momentum is None:
+            momentum = await self.get_comprehensive_momentum(symbol)
         klines = await self.get_klines(symbol, "15m", 10)
         
         if klines:
@@ -10,6 +10,7 @@ import sqlite3
 import json
 import os
 from datetime import datetime
+from typing import Dict
 import logging
 import sys
 
@@ -20,6 +21,9 @@ from trading_api.crypto_momentum_detector import CryptoMomentumDetector
 from trading_api.correlation_analyzer import CorrelationAnalyzer
 from trading_api.market_regime_detector import MarketRegimeDetector
 from trading_api.nakamoto_philosopher import NakamotoPhilosopher
+from scan_scheduler import SymbolScanScheduler
+from candle_scheduler import get_candle_scheduler, scan_timeframe_from_env
+from local_order_book import start_order_book_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,16 +32,23 @@ logger = logging.getLogger(__name__)
 class CryptoNativeSignalWorker:
     """Worker que genera señales usando indicadores crypto-nativos"""
     
+    JOB_NAME = 'crypto_native_signal_worker'
+    
     def __init__(self):
         self.running = False
-        self.scan_interval = int(os.getenv('SIGNAL_SCAN_INTERVAL', '60'))
+        self.scan_timeframe = scan_timeframe_from_env()
+        self.scan_count = 0
         self.db_path = os.getenv('DATABASE_PATH', '/app/data/trading_bot.db')
         
         # Initialize crypto-native components
         self.momentum_detector = CryptoMomentumDetector()
         self.correlation_analyzer = CorrelationAnalyzer()
         self.market_regime = MarketRegimeDetector()
-        self.nakamoto = NakamotoPhilosopher()
+        # Nakamoto shares the detector (and its kline cache)
+        self.nakamoto = NakamotoPhilosopher(momentum_detector=self.momentum_detector)
+        
+        # Concurrent per-symbol analysis
+        self.scanner = SymbolScanScheduler()
         
         # Symbols to monitor
         self.symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "XRPUSDT", "DOGEUSDT"]
@@ -49,10 +60,12 @@ class CryptoNativeSignalWorker:
         except:
             return sqlite3.connect(':memory:')
     
-    async def generate_crypto_native_signal(self, symbol: str) -> dict:
+    async def generate_crypto_native_signal(self, symbol: str, momentum: dict = None) -> dict:
         """
         Generate signal using crypto-native indicators
         No RSI, MACD, or Bollinger Bands!
+        
+        momentum: precomputed analysis from get_comprehensive_momentum_batch
         """
         try:
             # 1. Check market regime first (macro filter)
@@ -62,15 +75,16 @@ class CryptoNativeSignalWorker:
                 return None
             
             # 2. Get comprehensive momentum analysis
-            momentum = await self.momentum_detector.get_comprehensive_momentum(symbol)
+            if momentum is None:
+                momentum = await self.momentum_detector.get_comprehensive_momentum(symbol)
             
             # 3. Check if entry conditions are met
-            entry_check = await self.momentum_detector.should_enter_position(symbol)
+            entry_check = await self.momentum_detector.should_enter_position(symbol, momentum)
             
             # 4. Get Nakamoto's analysis
             # Get current price from momentum data
-            current_price = await self._get_current_price(symbol)
-            nakamoto_analysis = await self.nakamoto.analyze(symbol, current_price)
+            current_price = momentum.get('price') or await self._get_current_price(symbol)
+            nakamoto_analysis = await self.nakamoto.analyze(symbol, current_price, momentum)
             
             # 5. Check sector rotation
             money_flow = await self.correlation_analyzer.get_money_flow_map()
@@ -106,7 +120,7 @@ class CryptoNativeSignalWorker:
             elif momentum['final_signal'] == "SELL" or nakamoto_analysis['action'] == "SELL":
                 # Simulate entry at -2% for exit check
                 exit_check = await self.momentum_detector.should_exit_position(
-                    symbol, current_price * 1.02
+                    symbol, current_price * 1.02, momentum
                 )
                 
                 if exit_check['action'] == "SELL":
@@ -267,24 +281,29 @@ class CryptoNativeSignalWorker:
         # Prioritize symbols based on sector rotation
         prioritized_symbols = self._prioritize_symbols(money_flow)
         
-        # Scan prioritized symbols
-        for symbol in prioritized_symbols:
-            try:
-                logger.info(f"\n🎯 Analyzing {symbol}...")
-                
-                signal = await self.generate_crypto_native_signal(symbol)
-                
-                if signal and signal['confidence'] >= 65:
-                    self.save_signal(signal)
-                    signals_generated += 1
-                    
-                    # Limit signals per scan
-                    if signals_generated >= 3:
-                        logger.info("📊 Signal limit reached for this scan")
-                        break
-                        
-            except Exception as e:
-                logger.error(f"Error analyzing {symbol}: {e}")
+        # Momentum for the whole universe at once (shared tickers/funding, cached klines);
+        # symbols missing from the batch are analyzed one by one in the signal step
+        try:
+            momentum_by_symbol = await self.momentum_detector.get_comprehensive_momentum_batch(
+                prioritized_symbols
+            )
+        except Exception as e:
+            logger.error(f"Batch momentum analysis failed: {e}")
+            momentum_by_symbol = {}
+        
+        # Analyze the whole universe concurrently, best signals first
+        signals = await self.scanner.scan(
+            prioritized_symbols,
+            lambda symbol: self.generate_crypto_native_signal(symbol, momentum_by_symbol.get(symbol))
+        )
+        
+        # Limit signals per scan (keeps the highest-confidence ones)
+        accepted, _ = self.scanner.select(signals, min_confidence=65, max_signals=3)
+        for signal in accepted:
+            self.save_signal(signal)
+            signals_generated += 1
+        if len(accepted) == 3:
+            logger.info("📊 Signal limit reached for this scan")
         
         if signals_generated > 0:
             logger.info(f"\n✅ Generated {signals_generated} crypto-native signals")
@@ -314,7 +333,7 @@ class CryptoNativeSignalWorker:
             if symbol not in prioritized:
                 prioritized.append(symbol)
         
-        return prioritized[:5]  # Limit to top 5
+        return prioritized
     
     async def start(self):
         """Start the crypto-native signal worker"""
@@ -339,33 +358,29 @@ class CryptoNativeSignalWorker:
         """)
         
         logger.info(f"⚙️ Configuration:")
-        logger.info(f"   • Scan interval: {self.scan_interval} seconds")
+        logger.info(f"   • Scan on every {self.scan_timeframe} candle close")
         logger.info(f"   • Symbols: {', '.join(self.symbols)}")
         logger.info(f"   • Database: {self.db_path}")
         
-        scan_count = 0
-        while self.running:
-            try:
-                scan_count += 1
-                logger.info(f"\n🔄 Scan #{scan_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Scan markets with crypto-native indicators
-                await self.scan_markets()
-                
-                # Wait before next scan
-                logger.info(f"⏰ Next scan in {self.scan_interval} seconds...")
-                await asyncio.sleep(self.scan_interval)
-                
-            except KeyboardInterrupt:
-                logger.info("\n⛔ Worker stopped by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in signal worker: {e}")
-                await asyncio.sleep(60)
+        if os.getenv('ORDER_BOOK_STREAM_ENABLED', 'true').lower() == 'true':
+            # Order flow imbalance from in-memory books instead of a /depth call per scan
+            await start_order_book_manager(self.symbols)
+        
+        # One scan now and one per candle close (jittered, never overlapping)
+        await get_candle_scheduler().run_job(self.JOB_NAME, self.scan_timeframe, self._scan_job)
+    
+    async def _scan_job(self, close):
+        """Scheduler job: one scan per candle close"""
+        self.scan_count += 1
+        logger.info(f"\n🔄 Scan #{self.scan_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # Scan markets with crypto-native indicators (a failure is logged; the next close retries)
+        await self.scan_markets()
     
     def stop(self):
         """Stop the worker"""
         self.running = False
+        get_candle_scheduler().remove_job(self.JOB_NAME)
         logger.info("Crypto-Native Signal Worker stopped")
 
 async def main():
@@ -258,18 +258,14 @@ class DailyTradingManager:
     async def _fetch_market_data(self) -> Dict:
         """Obtiene datos de mercado actualizados"""
         
-        market_data = {}
-        
-        for symbol in self.trading_config['symbols']:
-            try:
-                # Obtener múltiples timeframes
-                data = self.binance.get_multiple_timeframes(symbol)
-                market_data[symbol] = data
-                
-            except Exception as e:
-                logger.error(f"Error obteniendo datos de {symbol}: {e}")
-        
-        return market_data
+        try:
+            # Todos los símbolos y timeframes en paralelo
+            return await self.binance.get_market_snapshot(
+                self.trading_config['symbols'], ['1h', '4h', '1d']
+            )
+        except Exception as e:
+            logger.error(f"Error obteniendo datos de mercado: {e}")
+            return {}
     
     async def _philosophical_analysis(self, market_data: Dict) -> List:
         """Análisis con todos los filósofos"""
@@ -288,7 +284,7 @@ class DailyTradingManager:
                         
                         # Analizar con los filósofos del proyecto
                         signals = self.philosophy_system.analyze_with_philosophers(
-                            df, symbol, project['philosophers']
+                            df, symbol, project['philosophers'], timeframe='1h'
                         )
                         
                         for signal in signals:
@@ -73,6 +73,8 @@ class ConnectionPool:
     def __init__(self, config: DatabaseConfig):
         self.config = config
         self._lock = threading.RLock()
+        # Signalled whenever a checked-out connection is released
+        self._available = threading.Condition(self._lock)
         self._connections: List[Any] = []
         self._used_connections: Dict[int, Any] = {}
         self._connection_stats = {
@@ -80,7 +82,9 @@ class ConnectionPool:
             'destroyed': 0,
             'acquired': 0,
             'released': 0,
-            'errors': 0
+            'errors': 0,
+            'waits': 0,
+            'timeouts': 0
         }
         
         # Initialize pool
@@ -153,32 +157,56 @@ class ConnectionPool:
         conn.autocommit = False  # Ensure transactions work properly
         return conn
     
-    def acquire(self) -> Any:
-        """Acquire connection from pool"""
-        with self._lock:
-            if self._connections:
-                conn = self._connections.pop()
-                self._used_connections[id(conn)] = conn
-                self._connection_stats['acquired'] += 1
-                return conn
-            
-            # Pool empty, try to create new connection if under limit
-            if len(self._used_connections) < self.config.max_connections:
-                conn = self._create_connection()
-                if conn:
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Acquire connection from pool.
+
+        When max_connections are checked out, blocks until one is released
+        or timeout seconds elapse (defaults to config.connection_timeout).
+        """
+        if timeout is None:
+            timeout = self.config.connection_timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        
+        with self._available:
+            while True:
+                if self._connections:
+                    conn = self._connections.pop()
+                    self._used_connections[id(conn)] = conn
+                    self._connection_stats['acquired'] += 1
+                    return conn
+                
+                # Pool empty, try to create new connection if under limit
+                if len(self._used_connections) < self.config.max_connections:
+                    conn = self._create_connection()
+                    if not conn:
+                        raise DatabaseError(
+                            message="Failed to create database connection",
+                            context={'used_connections': len(self._used_connections)}
+                        )
                     self._used_connections[id(conn)] = conn
                     self._connection_stats['created'] += 1
                     self._connection_stats['acquired'] += 1
                     return conn
-            
-            raise DatabaseError(
-                message="Connection pool exhausted",
-                context={
-                    'pool_size': len(self._connections),
-                    'used_connections': len(self._used_connections),
-                    'max_connections': self.config.max_connections
-                }
-            )
+                
+                # At the limit: wait for a release
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._connection_stats['timeouts'] += 1
+                    raise DatabaseError(
+                        message="Connection pool exhausted",
+                        context={
+                            'pool_size': len(self._connections),
+                            'used_connections': len(self._used_connections),
+                            'max_connections': self.config.max_connections,
+                            'timeout': timeout
+                        }
+                    )
+                if not waited:
+                    waited = True
+                    self._connection_stats['waits'] += 1
+                self._available.wait(remaining)
     
     def release(self, conn: Any, is_error: bool = False):
         """Release connection back to pool"""
@@ -191,6 +219,7 @@ class ConnectionPool:
             
             del self._used_connections[conn_id]
             self._connection_stats['released'] += 1
+            self._available.notify()
             
             if is_error:
                 # Close problematic connection
@@ -241,6 +270,7 @@ class ConnectionPool:
                 except Exception:
                     pass
             self._used_connections.clear()
+            self._available.notify_all()
 
 # Transaction Manager
 # ==================
@@ -16,6 +16,8 @@ from enum import Enum
 import logging
 from collections import defaultdict
 
+import indicator_kernels as kernels
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -221,61 +223,20 @@ class DaytradingPipeline:
     
     def calculate_ema(self, prices: List[float], period: int) -> float:
         """Calcula EMA"""
-        if len(prices) < period:
-            return prices[-1] if prices else 0
-        
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        
-        for price in prices[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
+        return kernels.ema_last(prices, period)
     
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
         """Calcula RSI"""
-        if len(prices) < period + 1:
-            return 50
-        
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return kernels.rsi_last(prices, period)
     
     def calculate_vwap(self, prices: List[float], volumes: List[float]) -> float:
         """Calcula VWAP"""
-        if not prices or not volumes:
-            return 0
-        
-        cumulative_pv = sum(p * v for p, v in zip(prices, volumes))
-        cumulative_volume = sum(volumes)
-        
-        return cumulative_pv / cumulative_volume if cumulative_volume > 0 else prices[-1]
+        return kernels.vwap(prices, volumes)
     
     def calculate_atr(self, highs: List[float], lows: List[float], 
                      closes: List[float], period: int = 14) -> float:
         """Calcula ATR (Average True Range)"""
-        if len(highs) < period + 1:
-            return 0
-        
-        true_ranges = []
-        for i in range(1, len(highs)):
-            high_low = highs[i] - lows[i]
-            high_close = abs(highs[i] - closes[i-1])
-            low_close = abs(lows[i] - closes[i-1])
-            true_ranges.append(max(high_low, high_close, low_close))
-        
-        return np.mean(true_ranges[-period:]) if true_ranges else 0
+        return kernels.atr_last(highs, lows, closes, period)
     
     async def screen_pairs(self) -> List[TradingPair]:
         """Escanea y filtra los mejores pares para trading"""
@@ -22,6 +22,9 @@ from rich.align import Align
 from rich.text import Text
 
 from binance_integration import BinanceConnector
+from kline_store import KlineStore
+from trade_simulator import simulate_exits
+from parallel_backtest import ParallelBacktestRunner, make_jobs, merge_results, parse_workers
 from enhanced_signal_detector import EnhancedPatternDetector
 from multi_timeframe_signal_detector import TRADING_PAIRS, TIMEFRAMES, PatternStage
 from trading_config import RSI_CONFIG, get_rsi_levels
@@ -55,9 +58,18 @@ class BacktestTrade:
 class EnhancedBacktester:
     """Backtester para sistema enriquecido con métricas dinámicas"""
     
-    def __init__(self, initial_capital: float = 10000):
-        self.connector = BinanceConnector(testnet=False)
+    def __init__(self, initial_capital: float = 10000, offline: bool = False,
+                 vectorized: bool = True):
+        # Velas desde disco; offline=True no toca la red (fixtures sembrados,
+        # workers de run_parallel) y no crea conector
+        self.connector = None if offline else BinanceConnector(testnet=False)
+        api = self.connector.optimized_api if self.connector is not None else None
+        self.kline_store = KlineStore(api=api, offline=offline)
+        if self.connector is not None:
+            self.connector.kline_store = self.kline_store
         self.detector = EnhancedPatternDetector()
+        # Detección de patrones en una pasada sobre toda la serie (False = ventana a ventana)
+        self.vectorized = vectorized
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
         self.trades = []
@@ -86,108 +98,113 @@ class EnhancedBacktester:
     
     def simulate_trade(self, signal, future_data: pd.DataFrame) -> BacktestTrade:
         """Simula una operación con los datos futuros"""
-        
-        entry_price = signal.entry_price
-        stop_loss = signal.stop_loss
-        take_profit_1 = signal.take_profit_1
-        take_profit_2 = signal.take_profit_2
-        leverage = signal.recommended_leverage
-        
-        # Determinar tipo de posición
-        is_long = entry_price > stop_loss
-        
-        # Variables de resultado
-        exit_price = entry_price
-        exit_reason = "TIME"
-        result = "BREAKEVEN"
-        
-        # Simular cada vela futura
-        for idx, row in future_data.iterrows():
-            high = row['high']
-            low = row['low']
-            close = row['close']
-            
-            if is_long:
-                # Check stop loss
-                if low <= stop_loss:
-                    exit_price = stop_loss
-                    exit_reason = "SL"
-                    result = "LOSS"
-                    break
-                
-                # Check take profits
-                if high >= take_profit_2:
-                    exit_price = take_profit_2
-                    exit_reason = "TP2"
-                    result = "WIN"
-                    break
-                elif high >= take_profit_1:
-                    exit_price = take_profit_1
-                    exit_reason = "TP1"
-                    result = "WIN"
-                    break
-            else:  # SHORT
-                # Check stop loss
-                if high >= stop_loss:
-                    exit_price = stop_loss
-                    exit_reason = "SL"
-                    result = "LOSS"
-                    break
-                
-                # Check take profits
-                if low <= take_profit_2:
-                    exit_price = take_profit_2
-                    exit_reason = "TP2"
-                    result = "WIN"
-                    break
-                elif low <= take_profit_1:
-                    exit_price = take_profit_1
-                    exit_reason = "TP1"
-                    result = "WIN"
-                    break
-        
-        # Si no se alcanzó SL ni TP, cerrar al último precio
-        if exit_reason == "TIME":
-            exit_price = future_data.iloc[-1]['close']
-            # Determinar si fue ganancia o pérdida
-            if is_long:
-                result = "WIN" if exit_price > entry_price else "LOSS"
-            else:
-                result = "WIN" if exit_price < entry_price else "LOSS"
-        
-        # Calcular PnL
-        if is_long:
-            pnl_percent = ((exit_price - entry_price) / entry_price) * 100
-        else:
-            pnl_percent = ((entry_price - exit_price) / entry_price) * 100
-        
-        pnl_with_leverage = pnl_percent * leverage
-        
-        # Crear registro de trade
-        trade = BacktestTrade(
-            symbol=signal.symbol,
-            entry_date=signal.current_timestamp,
-            exit_date=future_data.index[-1] if hasattr(future_data.index[-1], 'to_pydatetime') else datetime.now(),
-            entry_price=entry_price,
-            exit_price=exit_price,
-            stop_loss=stop_loss,
-            take_profit_1=take_profit_1,
-            take_profit_2=take_profit_2,
-            position_type="LONG" if is_long else "SHORT",
-            leverage=leverage,
-            risk_reward_ratio=signal.dynamic_rr_ratio,
-            result=result,
-            pnl_percent=pnl_percent,
-            pnl_with_leverage=pnl_with_leverage,
-            exit_reason=exit_reason,
-            timeframe=signal.timeframe,
-            pattern_type=signal.pattern_type.value,
-            confidence=signal.confidence,
-            atr_percentage=signal.market_conditions.get('atr_percentage', 0),
-            volatility_percentile=signal.volatility_percentile
+        return self.simulate_trades([(signal, 0)], future_data, len(future_data))[0]
+    
+    def simulate_trades(self, entries: List[Tuple], df: pd.DataFrame, horizon: int = 50) -> List[BacktestTrade]:
+        """
+        Simula muchas operaciones a la vez con el motor vectorizado
+        
+        Args:
+            entries: Lista de (señal, índice de la primera vela futura en df)
+            df: Serie OHLC completa
+            horizon: Velas futuras evaluadas por operación
+        """
+        
+        if not entries:
+            return []
+        
+        signals = [signal for signal, _ in entries]
+        starts = np.array([start for _, start in entries], dtype=np.int64)
+        entry_prices = np.array([s.entry_price for s in signals], dtype=float)
+        stop_losses = np.array([s.stop_loss for s in signals], dtype=float)
+        is_long = entry_prices > stop_losses
+        
+        exits = simulate_exits(
+            df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+            starts, is_long, stop_losses,
+            np.array([[s.take_profit_1, s.take_profit_2] for s in signals], dtype=float),
+            max_bars=horizon
         )
-        
-        return trade
+        pnl_percents = exits.pnl_percent(entry_prices, is_long)
+        reasons = exits.reasons()
+        
+        trades = []
+        for n, signal in enumerate(signals):
+            exit_reason = reasons[n]
+            if exit_reason == "SL":
+                result = "LOSS"
+            elif exit_reason == "TIME":
+                # Si no se alcanzó SL ni TP, se cerró al último precio
+                result = "WIN" if pnl_percents[n] > 0 else "LOSS"
+            else:
+                result = "WIN"
+            
+            # Fecha de cierre: fin de la ventana evaluada
+            last_bar = min(starts[n] + horizon, len(df)) - 1
+            exit_date = df.index[last_bar]
+            
+            trades.append(BacktestTrade(
+                symbol=signal.symbol,
+                entry_date=signal.current_timestamp,
+                exit_date=exit_date if hasattr(exit_date, 'to_pydatetime') else datetime.now(),
+                entry_price=signal.entry_price,
+                exit_price=float(exits.exit_price[n]),
+                stop_loss=signal.stop_loss,
+                take_profit_1=signal.take_profit_1,
+                take_profit_2=signal.take_profit_2,
+                position_type="LONG" if is_long[n] else "SHORT",
+                leverage=signal.recommended_leverage,
+                risk_reward_ratio=signal.dynamic_rr_ratio,
+                result=result,
+                pnl_percent=float(pnl_percents[n]),
+                pnl_with_leverage=float(pnl_percents[n]) * signal.recommended_leverage,
+                exit_reason=exit_reason,
+                timeframe=signal.timeframe,
+                pattern_type=signal.pattern_type.value,
+                confidence=signal.confidence,
+                atr_percentage=signal.market_conditions.get('atr_percentage', 0),
+                volatility_percentile=signal.volatility_percentile
+            ))
+        
+        return trades
+    
+    def backtest_frame(self, df: pd.DataFrame, symbol: str, timeframe: str,
+                       window_size: int = 100, step_size: int = 10, horizon: int = 50,
+                       min_confidence: float = 65) -> List[BacktestTrade]:
+        """Detecta señales a lo largo de df y simula sus operaciones"""
+        
+        entries = []
+        
+        if self.vectorized:
+            # Una sola pasada: la ventana df.iloc[i-window_size:i] termina en la vela i-1
+            ends = np.arange(window_size, len(df) - horizon, step_size) - 1
+            detected = self.detector.detect_and_enhance_series(
+                df, symbol, timeframe, window_size=window_size, bars=ends,
+                stages=[PatternStage.CONFIRMED], min_confidence=min_confidence
+            )
+            for bar, signal in detected:
+                i = bar + 1
+                if min(horizon, len(df) - i) > 5:  # Necesitamos al menos 5 velas futuras
+                    entries.append((signal, i))
+            return self.simulate_trades(entries, df, horizon)
+        
+        for i in range(window_size, len(df) - horizon, step_size):
+            # Ventana de datos para análisis
+            window_data = df.iloc[i-window_size:i].copy()
+            
+            # Detectar patrones
+            signals = self.detector.detect_and_enhance_patterns(
+                window_data, symbol, timeframe
+            )
+            
+            # Filtrar solo señales confirmadas con buena confianza
+            for signal in signals:
+                if signal.stage == PatternStage.CONFIRMED and signal.confidence >= min_confidence:
+                    if min(horizon, len(df) - i) > 5:  # Necesitamos al menos 5 velas futuras
+                        entries.append((signal, i))
+        
+        # Simular todas las operaciones del timeframe de una vez
+        return self.simulate_trades(entries, df, horizon)
     
     async def backtest_symbol(self, symbol: str, days: int = 360) -> List[BacktestTrade]:
         """Ejecuta backtesting para un símbolo"""
@@ -197,45 +214,13 @@ class EnhancedBacktester:
         # Obtener datos históricos para el período completo
         for timeframe in TIMEFRAMES.keys():
             try:
-                # Calcular límite de velas necesarias
-                if timeframe == '5m':
-                    limit = min(days * 288, 1000)  # 288 velas de 5m por día
-                elif timeframe == '15m':
-                    limit = min(days * 96, 1000)   # 96 velas de 15m por día
-                elif timeframe == '1h':
-                    limit = min(days * 24, 1000)   # 24 velas de 1h por día
-                else:  # 4h
-                    limit = min(days * 6, 1000)    # 6 velas de 4h por día
-                
-                # Obtener datos
-                df = self.connector.get_historical_data(symbol, timeframe, limit=limit)
+                # Obtener el período completo desde el almacén local (sin tope de 1000 velas)
+                df = self.kline_store.get_range(symbol, timeframe, days=days)
                 
                 if df.empty or len(df) < 100:
                     continue
                 
-                # Detectar señales a lo largo del período
-                window_size = 100  # Ventana de análisis
-                step_size = 10     # Avanzar de a 10 velas
-                
-                for i in range(window_size, len(df) - 50, step_size):
-                    # Ventana de datos para análisis
-                    window_data = df.iloc[i-window_size:i].copy()
-                    
-                    # Detectar patrones
-                    signals = self.detector.detect_and_enhance_patterns(
-                        window_data, symbol, timeframe
-                    )
-                    
-                    # Filtrar solo señales confirmadas con buena confianza
-                    for signal in signals:
-                        if signal.stage == PatternStage.CONFIRMED and signal.confidence >= 65:
-                            # Obtener datos futuros para simulación
-                            future_data = df.iloc[i:min(i+50, len(df))].copy()
-                            
-                            if len(future_data) > 5:  # Necesitamos al menos 5 velas futuras
-                                # Simular trade
-                                trade = self.simulate_trade(signal, future_data)
-                                symbol_trades.append(trade)
+                symbol_trades.extend(self.backtest_frame(df, symbol, timeframe))
                 
             except Exception as e:
                 console.print(f"[red]Error en {symbol} {timeframe}: {e}[/red]")
@@ -243,8 +228,31 @@ class EnhancedBacktester:
         
         return symbol_trades
     
-    async def run_backtest(self, days: int = 360):
-        """Ejecuta el backtesting completo"""
+    def run_parallel(self, days: int = 360, workers: int = None,
+                     param_sets: List[Dict] = None) -> Dict[tuple, List[BacktestTrade]]:
+        """
+        Backtest de todos los pares en paralelo (un proceso por trabajo
+        símbolo x timeframe x parámetros) sobre las velas en disco
+        
+        Returns:
+            Trades por set de parámetros, en orden determinista
+        """
+        
+        jobs = make_jobs(TRADING_PAIRS, TIMEFRAMES.keys(), param_sets)
+        runner = ParallelBacktestRunner(
+            run_backtest_job, store=self.kline_store, workers=workers,
+            initializer=_init_backtest_worker, initargs=(self.initial_capital,)
+        )
+        
+        results = runner.run(jobs, days)
+        for result in results:
+            if result.error:
+                console.print(f"[red]Error en {result.job.symbol} {result.job.timeframe}: {result.error}[/red]")
+        
+        return merge_results(results)
+    
+    async def run_backtest(self, days: int = 360, workers: int = 1):
+        """Ejecuta el backtesting completo (workers > 1 reparte entre procesos)"""
         
         console.print(Panel(
             f"[bold cyan]🚀 BACKTESTING SISTEMA ENRIQUECIDO[/bold cyan]\n"
@@ -257,6 +265,12 @@ class EnhancedBacktester:
         
         all_trades = []
         
+        if workers > 1:
+            merged = await asyncio.to_thread(self.run_parallel, days, workers)
+            self.trades = merged.get((), [])
+            self.calculate_statistics()
+            return self.trades
+        
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -534,13 +548,29 @@ class EnhancedBacktester:
         
         console.print(f"\n📁 Resultados exportados a: [green]{filename}[/green]")
 
-async def main():
+# Backtester por proceso para ParallelBacktestRunner
+_worker_backtester = None
+
+def _init_backtest_worker(initial_capital: float = 10000):
+    """Crea un backtester offline por proceso (solo lee velas de disco)"""
+    global _worker_backtester
+    _worker_backtester = EnhancedBacktester(initial_capital=initial_capital, offline=True)
+
+def run_backtest_job(job, df: pd.DataFrame) -> List[BacktestTrade]:
+    """Trabajo de ParallelBacktestRunner: un símbolo y timeframe"""
+    if _worker_backtester is None:
+        _init_backtest_worker()
+    if df.empty or len(df) < 100:
+        return []
+    return _worker_backtester.backtest_frame(df, job.symbol, job.timeframe, **job.param_dict)
+
+async def main(workers: int = 1):
     """Función principal"""
     
     backtester = EnhancedBacktester(initial_capital=10000)
     
-    # Ejecutar backtesting
-    await backtester.run_backtest(days=360)
+    # Ejecutar backtesting (workers > 1: un proceso por símbolo x timeframe)
+    await backtester.run_backtest(days=360, workers=workers)
     
     # Mostrar resultados
     backtester.display_results()
@@ -549,4 +579,4 @@ async def main():
     backtester.export_results()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_workers("Backtesting de 360 días del sistema enriquecido")))
\ No newline at end of file
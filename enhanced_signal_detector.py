@@ -15,6 +15,7 @@ from multi_timeframe_signal_detector import (
     Signal, PatternType, PatternStage,
     PatternDetector
 )
+from series_pattern_detector import SeriesPatternDetector
 from trading_config import RSI_CONFIG, get_rsi_levels, is_rsi_overbought, is_rsi_oversold
 
 @dataclass
@@ -307,4 +308,35 @@ class EnhancedPatternDetector(PatternDetector):
                 print(f"Error mejorando señal: {e}")
                 continue
         
-        return enhanced_signals
\ No newline at end of file
+        return enhanced_signals
+    
+    def detect_and_enhance_series(self, df: pd.DataFrame, symbol: str, timeframe: str,
+                                  window_size: int = 100, bars: Optional[List[int]] = None,
+                                  stages: Optional[List[PatternStage]] = None,
+                                  min_confidence: float = 0) -> List[Tuple[int, EnhancedSignal]]:
+        """
+        Detecta patrones en toda la serie de una pasada y mejora las señales
+        
+        Equivale a llamar detect_and_enhance_patterns sobre cada ventana
+        df.iloc[t-window_size+1:t+1], pero sin copiar ventanas: los
+        indicadores se calculan una vez y solo las señales que pasan el
+        filtro (stages, min_confidence) se mejoran con su ventana.
+        
+        Returns:
+            Lista de (índice de la última vela de la ventana, señal mejorada)
+        """
+        
+        enhanced_signals = []
+        for bar, signal in SeriesPatternDetector(self).detect_all(df, symbol, timeframe, bars):
+            if stages is not None and signal.stage not in stages:
+                continue
+            if signal.confidence < min_confidence:
+                continue
+            try:
+                window = df.iloc[max(0, bar - window_size + 1):bar + 1]
+                enhanced_signals.append((bar, self.enhance_signal(signal, window, symbol, timeframe)))
+            except Exception as e:
+                print(f"Error mejorando señal: {e}")
+                continue
+        
+        return enhanced_signals
@@ -15,6 +15,7 @@ import asyncio
 import json
 import sqlite3
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import pandas as pd
@@ -47,9 +48,19 @@ from philosophers import PhilosophicalTradingSystem
 from philosophers_extended import register_extended_philosophers
 from binance_integration import BinanceConnector, MultiProjectManager
 from database import db  # Importar la instancia de base de datos
+from write_behind_queue import get_write_behind_writer
+from candle_scheduler import get_candle_scheduler
+from market_stream import start_market_stream, stop_market_stream
 from auth_manager import auth_manager  # Importar gestor de autenticación
 # import yfinance as yf  # Reemplazado por Binance API
 
+# Timeframe de las velas con las que opera el TradingManager (también es la
+# clave de caché de indicadores de los filósofos)
+MARKET_TIMEFRAME = '1m'
+
+# Stops, take profits y actualizaciones a clientes no esperan al cierre de vela
+POSITION_UPDATE_SECONDS = 10
+
 # ===========================================
 # FUNCIONES DE AUTENTICACIÓN
 # ===========================================
@@ -166,6 +177,8 @@ class TradingManager:
         
         # Trading task
         self.trading_task = None
+        # El ciclo de señales y el de posiciones modifican self.positions
+        self.positions_lock = asyncio.Lock()
         
         # Paper Trading Bot
         self.paper_bot = None
@@ -344,50 +357,69 @@ class TradingManager:
         })
     
     async def trading_loop(self):
-        """Loop principal de trading"""
+        """
+        Loop principal de trading
+
+        Señales: un ciclo ahora y otro por cada cierre de vela de 1m.
+        Posiciones: cada POSITION_UPDATE_SECONDS, para que stop loss y
+        take profit no esperen al siguiente cierre de vela.
+        """
+        # Trabajo del planificador compartido: jitter y sin ciclos solapados;
+        # stop_bot cancela esta tarea y con ella se da de baja el trabajo
+        await asyncio.gather(
+            get_candle_scheduler().run_job('trading_manager', MARKET_TIMEFRAME, self.trading_cycle),
+            self.position_loop()
+        )
+    
+    async def trading_cycle(self, close=None):
+        """Un ciclo de señales (datos, análisis, ejecución)"""
+        if self.bot_status != BotStatus.RUNNING:
+            return
+        try:
+            # 1. Obtener datos de mercado
+            market_data = await self.fetch_market_data()
+            
+            # 2. Análisis filosófico
+            signals = await self.analyze_with_philosophers(market_data)
+            
+            # 3. Ejecutar señales con consenso
+            if signals:
+                async with self.positions_lock:
+                    await self.execute_signals(signals)
+            
+        except Exception as e:
+            # El siguiente cierre de vela vuelve a intentarlo
+            await self.add_alert("ERROR", f"Error en trading loop: {str(e)}")
+    
+    async def position_loop(self):
+        """Actualiza posiciones (stops/TP) y envía updates con su propia cadencia"""
         while self.bot_status == BotStatus.RUNNING:
             try:
-                # 1. Obtener datos de mercado
-                market_data = await self.fetch_market_data()
-                
-                # 2. Análisis filosófico
-                signals = await self.analyze_with_philosophers(market_data)
-                
-                # 3. Ejecutar señales con consenso
-                if signals:
-                    await self.execute_signals(signals)
-                
-                # 4. Actualizar posiciones
-                await self.update_positions()
-                
-                # 5. Enviar actualizaciones
+                async with self.positions_lock:
+                    await self.update_positions()
                 await self.send_updates()
                 
-                # Esperar próximo ciclo (1 minuto en producción, 10 segundos en demo)
-                await asyncio.sleep(10)
-                
             except Exception as e:
-                await self.add_alert("ERROR", f"Error en trading loop: {str(e)}")
-                await asyncio.sleep(60)
+                await self.add_alert("ERROR", f"Error actualizando posiciones: {str(e)}")
+            
+            await asyncio.sleep(POSITION_UPDATE_SECONDS)
     
     async def fetch_market_data(self) -> Dict:
         """Obtiene datos de mercado desde Binance"""
         market_data = {}
         
+        # Todos los símbolos a la vez sin bloquear el event loop
+        snapshot = await self.binance.get_market_snapshot(self.config.symbols, [MARKET_TIMEFRAME], 100)
+        
         for symbol in self.config.symbols:
-            try:
-                # Usar Binance Connector que ya tenemos
-                df = self.binance.get_historical_data(symbol, '1m', 100)
-                
-                if df is not None and not df.empty:
-                    # Los datos de Binance ya vienen normalizados
-                    market_data[symbol] = df
-                    print(f"✅ Datos obtenidos para {symbol}: {len(df)} velas")
-                else:
-                    print(f"⚠️ Sin datos para {symbol}")
-                    
-            except Exception as e:
-                print(f"❌ Error obteniendo datos de {symbol}: {e}")
+            df = snapshot.get(symbol, {}).get(MARKET_TIMEFRAME)
+            
+            if df is not None and not df.empty:
+                # Los datos de Binance ya vienen normalizados
+                market_data[symbol] = df
+                print(f"✅ Datos obtenidos para {symbol}: {len(df)} velas")
+            else:
+                print(f"⚠️ Sin datos para {symbol}")
         
         return market_data
     
@@ -399,7 +431,7 @@ class TradingManager:
             if df is not None and not df.empty:
                 # Análisis con cada filósofo
                 signals = self.philosophy_system.analyze_with_philosophers(
-                    df, symbol, self.config.philosophers
+                    df, symbol, self.config.philosophers, timeframe=MARKET_TIMEFRAME
                 )
                 
                 # Buscar consenso
@@ -770,6 +802,9 @@ class TradingManager:
     async def get_high_quality_signals(self) -> List[Dict]:
         """Obtiene señales de alta calidad (+70% confianza) - Lógica compartida con /api/signals/all"""
         high_quality_signals = []
+        # Escrituras acumuladas del ciclo: una transacción al final en lugar de una por evento
+        pending_signals = []
+        pending_traces = []
         symbols = ["SOLUSDT", "XRPUSDT", "ADAUSDT", "DOGEUSDT", "AVAXUSDT", "LINKUSDT", "DOTUSDT", "PEPEUSDT"]
         
         for symbol in symbols:
@@ -916,10 +951,10 @@ class TradingManager:
                             
                             # Guardar señal en base de datos
                             try:
-                                db.save_signal(signal)
+                                pending_signals.append(signal)
                                 
                                 # Agregar trazabilidad
-                                db.save_signal_trace(
+                                pending_traces.append((
                                     signal['id'],
                                     'SIGNAL_GENERATED',
                                     {
@@ -929,7 +964,7 @@ class TradingManager:
                                         'volume_ratio': signal['volume_ratio']
                                     },
                                     signal['philosopher']
-                                )
+                                ))
                                 
                                 # Análisis BI automático
                                 from signal_analytics import signal_analyzer
@@ -940,12 +975,12 @@ class TradingManager:
                                 else:
                                     print(f"⚠️ Señal de baja calidad filtrada: {signal['symbol']} - Score: {analysis.quality_score if analysis else 0:.1f}")
                                     # Guardar trace de filtrado
-                                    db.save_signal_trace(
+                                    pending_traces.append((
                                         signal['id'],
                                         'SIGNAL_FILTERED',
                                         {'reason': 'Low quality score', 'score': analysis.quality_score if analysis else 0},
                                         signal['philosopher']
-                                    )
+                                    ))
                                     
                             except Exception as save_error:
                                 print(f"Error saving signal to database: {save_error}")
@@ -954,6 +989,11 @@ class TradingManager:
                 print(f"Error analyzing {symbol}: {e}")
                 continue
         
+        db.save_signals_bulk(pending_signals)
+        writer = get_write_behind_writer()
+        for trace in pending_traces:
+            await writer.put('signal_trace', trace)
+        
         # Ordenar por confianza (mayor a menor)
         high_quality_signals.sort(key=lambda x: x['confidence'], reverse=True)
         return high_quality_signals[:5]  # Top 5
@@ -1202,6 +1242,10 @@ async def lifespan(app: FastAPI):
     """Maneja el ciclo de vida de la aplicación"""
     # Startup
     print("🚀 Starting Signal Haven Desk API...")
+    await get_write_behind_writer().start()
+    if os.getenv('MARKET_STREAM_ENABLED', 'true').lower() == 'true':
+        # Velas y precios por WebSocket en lugar de sondear REST
+        await start_market_stream(trading_manager.config.symbols, [MARKET_TIMEFRAME])
     
     yield
     
@@ -1209,6 +1253,13 @@ async def lifespan(app: FastAPI):
     print("🛑 Shutting down...")
     if trading_manager.trading_task:
         trading_manager.trading_task.cancel()
+    await stop_market_stream()
+    from market_data_gateway import get_market_data_gateway
+    await get_market_data_gateway().close()
+    from http_client_pool import get_http_client_registry
+    await get_http_client_registry().close()
+    # Escribir trazas y análisis pendientes antes de salir
+    await get_write_behind_writer().stop()
 
 # ===========================================
 # FASTAPI APP
@@ -1612,7 +1663,7 @@ async def get_symbol_data(symbol: str):
         current_price = trading_manager.binance.get_current_price(symbol)
         
         # Obtener datos históricos recientes
-        df = trading_manager.binance.get_historical_data(symbol, '1m', 100)
+        df = trading_manager.binance.get_historical_data(symbol, MARKET_TIMEFRAME, 100)
         
         if df is not None and not df.empty:
             # Calcular cambios de precio
@@ -1628,7 +1679,7 @@ async def get_symbol_data(symbol: str):
             # Si no hay señales recientes, analizar con filósofos
             if not recent_db_signals or len(recent_db_signals) < 3:
                 signals = trading_manager.philosophy_system.analyze_with_philosophers(
-                    df, symbol, trading_manager.config.philosophers
+                    df, symbol, trading_manager.config.philosophers, timeframe=MARKET_TIMEFRAME
                 )
             else:
                 # Usar las señales de la base de datos
@@ -2382,7 +2433,7 @@ async def get_symbol_signals(symbol: str):
                 
                 for signal in signals:
                     # Guardar traza de señal generada
-                    db.save_signal_trace(
+                    get_write_behind_writer().submit_signal_trace(
                         signal['id'],
                         'SIGNAL_GENERATED',
                         {
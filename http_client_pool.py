@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+===========================================
+CLIENTES HTTP ASÍNCRONOS COMPARTIDOS
+===========================================
+
+Registro de clientes HTTP persistentes para todo el proceso: una sesión
+aiohttp y un httpx.AsyncClient por nombre y event loop, con keep-alive,
+límite de conexiones por host y HTTP/2 en httpx si el paquete h2 está
+instalado. Así las peticiones reutilizan conexiones TCP/TLS en lugar de
+pagar el handshake cada vez.
+
+Los clientes pertenecen al event loop en el que se crearon; desde otro
+loop se crea otro. close() los cierra al apagar la aplicación.
+
+aiohttp y httpx se importan al crear el primer cliente de cada tipo: un
+módulo que solo use uno de los dos no necesita tener instalado el otro.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (habilita HTTP/2 en httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Límites por defecto de cada cliente
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 20
+DEFAULT_KEEPALIVE_SECONDS = 30.0
+DEFAULT_TIMEOUT = 10.0
+
+
+class HTTPClientRegistry:
+    """Clientes aiohttp/httpx compartidos por nombre y event loop"""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+                 keepalive: float = DEFAULT_KEEPALIVE_SECONDS,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive = keepalive
+        self.timeout = timeout
+
+        self._aiohttp: Dict[Tuple[asyncio.AbstractEventLoop, str], 'aiohttp.ClientSession'] = {}
+        self._httpx: Dict[Tuple[asyncio.AbstractEventLoop, str], 'httpx.AsyncClient'] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {'aiohttp_sessions': 0, 'httpx_clients': 0}
+
+    def _forget_closed_loops(self):
+        """Descarta clientes de loops ya cerrados (no se pueden cerrar desde otro loop)"""
+        for clients in (self._aiohttp, self._httpx):
+            for key in [key for key in clients if key[0].is_closed()]:
+                del clients[key]
+
+    def aiohttp_session(self, name: str = 'default') -> 'aiohttp.ClientSession':
+        """Sesión aiohttp compartida del loop actual"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        key = (loop, name)
+        with self._lock:
+            session = self._aiohttp.get(key)
+            if session is None or session.closed:
+                self._forget_closed_loops()
+                session = aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    connector=aiohttp.TCPConnector(
+                        limit=self.max_connections,
+                        limit_per_host=self.max_connections_per_host,
+                        keepalive_timeout=self.keepalive,
+                        ttl_dns_cache=300
+                    )
+                )
+                self._aiohttp[key] = session
+                self.stats['aiohttp_sessions'] += 1
+            return session
+
+    def httpx_client(self, name: str = 'default') -> 'httpx.AsyncClient':
+        """Cliente httpx compartido del loop actual (HTTP/2 si hay h2)"""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        key = (loop, name)
+        with self._lock:
+            client = self._httpx.get(key)
+            if client is None or client.is_closed:
+                self._forget_closed_loops()
+                client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    timeout=self.timeout,
+                    # httpx no limita por host: el límite total hace de tope
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections_per_host,
+                        keepalive_expiry=self.keepalive
+                    )
+                )
+                self._httpx[key] = client
+                self.stats['httpx_clients'] += 1
+            return client
+
+    async def close(self):
+        """Cierra los clientes del loop actual y descarta los de loops cerrados"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sessions = [s for (l, _), s in self._aiohttp.items() if l is loop]
+            clients = [c for (l, _), c in self._httpx.items() if l is loop]
+            for clients_by_key in (self._aiohttp, self._httpx):
+                for key in [key for key in clients_by_key if key[0] is loop or key[0].is_closed()]:
+                    del clients_by_key[key]
+
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+        for client in clients:
+            if not client.is_closed:
+                await client.aclose()
+        if sessions or clients:
+            logger.info(f"Clientes HTTP cerrados: {len(sessions)} aiohttp, {len(clients)} httpx")
+
+
+# Instancia global
+_http_client_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """Obtiene el registro global de clientes HTTP"""
+    global _http_client_registry
+    if _http_client_registry is None:
+        with _registry_lock:
+            if _http_client_registry is None:
+                _http_client_registry = HTTPClientRegistry()
+    return _http_client_registry
+
+
+def get_aiohttp_session(name: str = 'default') -> 'aiohttp.ClientSession':
+    """Atajo: sesión aiohttp compartida del loop actual"""
+    return get_http_client_registry().aiohttp_session(name)
+
+
+def get_httpx_client(name: str = 'default') -> 'httpx.AsyncClient':
+    """Atajo: cliente httpx compartido del loop actual"""
+    return get_http_client_registry().httpx_client(name)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+===========================================
+MOTOR DE INDICADORES COMPARTIDO
+===========================================
+
+Calcula una sola vez el marco de indicadores universales (RSI, MACD,
+Bollinger, ATR, volumen) por cada juego de velas y lo comparte entre
+todos los filósofos. La clave es (símbolo, timeframe, timestamp de la
+última vela): mientras no cierre una vela nueva, todos los consumidores
+reciben el mismo marco ya calculado.
+"""
+
+import threading
+import logging
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columnas que produce add_indicators (mismo contrato que
+# PhilosopherTrader.calculate_indicators)
+INDICATOR_COLUMNS = (
+    'RSI', 'EMA_12', 'EMA_26', 'MACD', 'MACD_Signal',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'ATR',
+    'Volume_SMA', 'Volume_Ratio'
+)
+
+# Marca en df.attrs para reconocer un marco ya calculado
+_READY_ATTR = 'indicators_ready'
+
+
+def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Añade los indicadores universales a df (in-place) y lo devuelve"""
+
+    close = df['close']
+    high = df['high']
+    low = df['low']
+
+    # RSI (media simple de 14 periodos)
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df['RSI'] = 100 - (100 / (1 + rs))
+
+    # MACD
+    df['EMA_12'] = close.ewm(span=12).mean()
+    df['EMA_26'] = close.ewm(span=26).mean()
+    df['MACD'] = df['EMA_12'] - df['EMA_26']
+    df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+
+    # Bollinger Bands
+    bb_window = close.rolling(20)
+    df['BB_Middle'] = bb_window.mean()
+    bb_std = bb_window.std()
+    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
+    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+
+    # ATR (true range vectorizado, sin concat; fmax ignora el NaN de la 1ª vela)
+    prev_close = close.shift()
+    true_range = np.fmax.reduce([
+        (high - low).to_numpy(dtype=float),
+        (high - prev_close).abs().to_numpy(dtype=float),
+        (low - prev_close).abs().to_numpy(dtype=float),
+    ])
+    df['ATR'] = pd.Series(true_range, index=df.index).rolling(14).mean()
+
+    # Volume Profile
+    df['Volume_SMA'] = df['volume'].rolling(20).mean()
+    df['Volume_Ratio'] = df['volume'] / df['Volume_SMA']
+
+    df.attrs[_READY_ATTR] = True
+    return df
+
+
+def has_indicators(df: pd.DataFrame) -> bool:
+    """True si df ya trae el marco de indicadores calculado"""
+    return bool(df.attrs.get(_READY_ATTR)) and all(c in df.columns for c in INDICATOR_COLUMNS)
+
+
+def last_candle_timestamp(df: pd.DataFrame) -> Hashable:
+    """Timestamp de la última vela (columna timestamp/open_time o índice)"""
+    for column in ('timestamp', 'open_time'):
+        if column in df.columns:
+            return df[column].iloc[-1]
+    return df.index[-1]
+
+
+class IndicatorEngine:
+    """
+    Caché de marcos de indicadores por (símbolo, timeframe).
+
+    Guarda solo el último marco de cada par, así que la memoria queda
+    acotada por el universo de símbolos. El marco devuelto es compartido:
+    los consumidores deben tratarlo como solo lectura (ver shared_view).
+    """
+
+    def __init__(self):
+        self._frames: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> Tuple[Any, ...]:
+        # El último cierre cubre la vela en formación, que conserva su timestamp
+        return (last_candle_timestamp(df), len(df), float(df['close'].iloc[-1]))
+
+    def get_frame(self, df: pd.DataFrame, symbol: str, timeframe: str = '1h') -> pd.DataFrame:
+        """Devuelve el marco de indicadores para este juego de velas"""
+
+        if df is None or df.empty:
+            return df
+
+        key = (symbol, timeframe)
+        fingerprint = self._fingerprint(df)
+
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self.hits += 1
+                return cached[1]
+
+        # Calcular fuera del lock: otros símbolos no esperan
+        frame = add_indicators(df.copy())
+
+        with self._lock:
+            self._frames[key] = (fingerprint, frame)
+            self.misses += 1
+
+        return frame
+
+    @staticmethod
+    def shared_view(frame: pd.DataFrame) -> pd.DataFrame:
+        """Vista superficial: columnas nuevas no contaminan el marco compartido"""
+        view = frame.copy(deep=False)
+        view.attrs = dict(frame.attrs)
+        return view
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Descarta marcos cacheados (de un símbolo o todos)"""
+        with self._lock:
+            if symbol is None:
+                self._frames.clear()
+            else:
+                for key in [k for k in self._frames if k[0] == symbol]:
+                    del self._frames[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Estadísticas de uso del caché"""
+        with self._lock:
+            return {'entries': len(self._frames), 'hits': self.hits, 'misses': self.misses}
+
+
+# Instancia global compartida
+_global_engine = None
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """Obtiene la instancia global del motor de indicadores"""
+    global _global_engine
+    if _global_engine is None:
+        _global_engine = IndicatorEngine()
+    return _global_engine
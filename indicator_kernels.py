@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+===========================================
+KERNELS NUMPY DE INDICADORES
+===========================================
+
+Implementaciones vectorizadas, sobre arrays float64 contiguos, de los
+indicadores que varios módulos calculaban con bucles Python sobre listas
+(RSI, EMA, MACD, Bollinger, ATR, VWAP, OBV, VPT, MFI, estocástico, DX).
+
+Cada kernel reproduce exactamente el contrato de la implementación que
+sustituye, incluidos los valores por defecto con datos insuficientes
+(RSI 50 con menos de period + 1 precios, ATR 0, etc.), de modo que los
+métodos existentes pueden delegar aquí sin cambiar sus resultados.
+
+- ema() calcula la recursión completa por bloques: dentro de cada bloque
+  es un producto matriz-vector con pesos decay**k, solo el enlace entre
+  bloques queda en Python (n / 64 iteraciones)
+- ema_last() es un único producto escalar con los pesos de cada precio
+- Los escalares se devuelven como float de Python
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+
+# Tamaño de bloque de ema(): con period >= 2 el peso más pequeño dentro
+# del bloque es (1/3)**64 ~ 1e-31, sin underflow ni pérdida de precisión
+EMA_BLOCK = 64
+
+# Columnas OHLCV de las klines en formato dict
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def as_array(values: Iterable[float]) -> np.ndarray:
+    """Array float64 contiguo (sin copiar si ya lo es)"""
+    if isinstance(values, np.ndarray):
+        return np.ascontiguousarray(values, dtype=np.float64)
+    if not isinstance(values, Sequence):
+        values = list(values)  # deque, generadores...
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def kline_columns(klines: Sequence[Dict], fields: Sequence[str] = OHLCV_FIELDS) -> Dict[str, np.ndarray]:
+    """{campo: array} desde klines en formato dict (campos ausentes = 0)"""
+    if not len(klines):
+        return {name: np.empty(0) for name in fields}
+    matrix = np.array([[k.get(name, 0) for name in fields] for k in klines], dtype=np.float64)
+    return {name: np.ascontiguousarray(matrix[:, i]) for i, name in enumerate(fields)}
+
+
+# ===========================================
+# MEDIAS EXPONENCIALES
+# ===========================================
+
+@lru_cache(maxsize=32)
+def _ema_block_weights(period: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pesos de un bloque: out = carry * decay**(k+1) + W @ x"""
+    alpha = 2 / (period + 1)
+    decay = 1 - alpha
+    k = np.arange(size)
+    lag = k[:, None] - k[None, :]
+    weights = np.where(lag >= 0, alpha * decay ** np.maximum(lag, 0), 0.0)
+    carry = decay ** (k + 1)
+    weights.setflags(write=False)
+    carry.setflags(write=False)
+    return weights, carry
+
+
+def ema(values: Iterable[float], period: int) -> np.ndarray:
+    """
+    Serie EMA sembrada con el primer valor (pandas ewm(span=period, adjust=False))
+
+    Returns:
+        Array de la misma longitud que values
+    """
+    x = as_array(values)
+    n = len(x)
+    out = np.empty(n)
+    if not n:
+        return out
+    out[0] = x[0]
+    if n == 1:
+        return out
+
+    weights, carry = _ema_block_weights(period, min(EMA_BLOCK, n - 1))
+    previous = x[0]
+    for start in range(1, n, len(carry)):
+        block = x[start:start + len(carry)]
+        m = len(block)
+        out[start:start + m] = carry[:m] * previous + weights[:m, :m] @ block
+        previous = out[start + m - 1]
+    return out
+
+
+def ema_last(values: Iterable[float], period: int) -> float:
+    """
+    Último valor de la EMA sembrada con el primer precio
+
+    Con menos de period valores devuelve el último (0 si no hay ninguno)
+    """
+    x = as_array(values)
+    n = len(x)
+    if n < period:
+        return float(x[-1]) if n else 0.0
+    alpha = 2 / (period + 1)
+    decay = 1 - alpha
+    # Peso del precio i: alpha * decay**(n-1-i); la semilla conserva decay**(n-1)
+    weights = alpha * decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights[0] = decay ** (n - 1)
+    return float(weights @ x)
+
+
+# ===========================================
+# OSCILADORES SOBRE PRECIOS
+# ===========================================
+
+def rsi_last(prices: Iterable[float], period: int = 14) -> float:
+    """RSI simple (media de ganancias/pérdidas de los últimos period cambios)"""
+    x = as_array(prices)
+    if len(x) < period + 1:
+        return 50.0
+    deltas = np.diff(x[-(period + 1):])
+    avg_gain = deltas[deltas > 0].sum() / period
+    avg_loss = -deltas[deltas < 0].sum() / period
+    if avg_loss == 0:
+        return 100.0
+    return float(100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def macd(prices: Iterable[float], fast: int = 12, slow: int = 26,
+         signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Series (macd, señal, histograma) con EMAs sembradas en el primer precio"""
+    x = as_array(prices)
+    line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger_last(prices: Iterable[float], period: int = 20,
+                   width: float = 2.0) -> Tuple[float, float, float]:
+    """(superior, media, inferior) de las últimas period velas (desviación poblacional)"""
+    x = as_array(prices)
+    if len(x) < period:
+        last = float(x[-1])
+        return last, last, last
+    window = x[-period:]
+    middle = window.mean()
+    std = window.std()
+    return float(middle + width * std), float(middle), float(middle - width * std)
+
+
+# ===========================================
+# RANGO Y VOLUMEN
+# ===========================================
+
+def true_range(highs: Iterable[float], lows: Iterable[float],
+               closes: Iterable[float]) -> np.ndarray:
+    """True range desde la segunda vela (longitud n - 1)"""
+    h, l, c = as_array(highs), as_array(lows), as_array(closes)
+    previous = c[:-1]
+    return np.maximum(h[1:] - l[1:], np.maximum(np.abs(h[1:] - previous),
+                                                np.abs(l[1:] - previous)))
+
+
+def atr_last(highs: Iterable[float], lows: Iterable[float], closes: Iterable[float],
+             period: int = 14) -> float:
+    """Media simple del true range de las últimas period velas (0 si faltan datos)"""
+    h = as_array(highs)
+    if len(h) < period + 1:
+        return 0.0
+    return float(true_range(h, lows, closes)[-period:].mean())
+
+
+def vwap(prices: Iterable[float], volumes: Iterable[float]) -> float:
+    """Precio medio ponderado por volumen de toda la serie"""
+    p, v = as_array(prices), as_array(volumes)
+    if not len(p) or not len(v):
+        return 0.0
+    n = min(len(p), len(v))
+    total_volume = v.sum()
+    return float(p[:n] @ v[:n] / total_volume) if total_volume > 0 else float(p[-1])
+
+
+def obv(closes: Iterable[float], volumes: Iterable[float]) -> np.ndarray:
+    """On-Balance Volume acumulado, empezando en 0"""
+    c, v = as_array(closes), as_array(volumes)
+    out = np.zeros(len(c))
+    if len(c) > 1:
+        np.cumsum(np.sign(np.diff(c)) * v[1:len(c)], out=out[1:])
+    return out
+
+
+def vpt(closes: Iterable[float], volumes: Iterable[float]) -> float:
+    """Volume-Price Trend total (cambios relativos ponderados por volumen)"""
+    c, v = as_array(closes), as_array(volumes)
+    if len(c) < 2:
+        return 0.0
+    previous = c[:-1]
+    change = np.divide(np.diff(c), previous, out=np.zeros(len(previous)), where=previous > 0)
+    return float(change @ v[1:len(c)])
+
+
+def mfi_last(highs: Iterable[float], lows: Iterable[float], closes: Iterable[float],
+             volumes: Iterable[float], period: int = 14) -> float:
+    """Money Flow Index de los últimos period cambios del precio típico"""
+    c = as_array(closes)
+    if len(c) < period + 1:
+        return 50.0
+    typical = (as_array(highs) + as_array(lows) + c) / 3
+    flows = (typical * as_array(volumes))[-period:]
+    rising = (typical[1:] > typical[:-1])[-period:]
+    positive = flows[rising].sum()
+    negative = flows[~rising].sum()
+    if negative == 0:
+        return 100.0
+    return float(100 - 100 / (1 + positive / negative))
+
+
+# ===========================================
+# MOMENTUM Y TENDENCIA
+# ===========================================
+
+def stochastic_last(highs: Iterable[float], lows: Iterable[float], closes: Iterable[float],
+                    period: int = 14) -> Tuple[float, float]:
+    """%K de la última vela (se devuelve también como %D, sin suavizar)"""
+    h = as_array(highs)
+    if len(h) < period:
+        return 50.0, 50.0
+    highest = h[-period:].max()
+    lowest = as_array(lows)[-period:].min()
+    if highest == lowest:
+        return 50.0, 50.0
+    k = float((as_array(closes)[-1] - lowest) / (highest - lowest) * 100)
+    return k, k
+
+
+def dx_last(highs: Iterable[float], lows: Iterable[float], closes: Iterable[float],
+            period: int = 14) -> float:
+    """DX de las últimas period velas (ADX simplificado, sin suavizado de Wilder)"""
+    h, l = as_array(highs), as_array(lows)
+    if len(h) < period + 1:
+        return 0.0
+    up = np.diff(h)
+    down = -np.diff(l)
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)[-period:]
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)[-period:]
+    atr = true_range(h, l, closes)[-period:].mean()
+    if atr <= 0:
+        return 0.0
+    plus_di = plus_dm.mean() / atr * 100
+    minus_di = minus_dm.mean() / atr * 100
+    if plus_di + minus_di == 0:
+        return 0.0
+    return float(abs(plus_di - minus_di) / (plus_di + minus_di) * 100)
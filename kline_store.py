@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+===========================================
+ALMACÉN LOCAL DE KLINES
+===========================================
+
+Almacén columnar en disco por (símbolo, intervalo):
+
+    data/klines/BTCUSDT/1h/open_time.bin
+    data/klines/BTCUSDT/1h/open.bin
+    ...
+
+Cada columna es un array binario (int64/float64) de solo anexado que se
+lee con np.memmap, así que cargar un año de velas cuesta milisegundos.
+sync() pagina /api/v3/klines con startTime/endTime la primera vez y
+después solo descarga la cola que falta (y rellena huecos internos).
+Solo se guardan velas cerradas; la vela en formación se añade en memoria.
+
+meta.json guarda, por serie, la primera vela que ofrece el exchange
+(listado del símbolo) y los huecos que el exchange no pudo rellenar
+(caídas), para no volver a pedirlos en cada sync().
+
+Sin API (offline=True o api=None) el almacén funciona solo con lo que
+haya en disco, p. ej. sembrado con import_klines() desde un fixture.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Duraciones de vela: viven en timeframes (sin numpy) y se reexportan aquí
+from timeframes import INTERVAL_MS, interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.getenv('KLINE_STORE_DIR', os.path.join('data', 'klines'))
+
+# Columnas persistidas y su tipo
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),
+)
+
+MAX_KLINES_PER_REQUEST = 1000
+
+# fetch(symbol, interval, limit, start_time, end_time) -> lista de klines crudas
+KlineFetcher = Callable[[str, str, int, Optional[int], Optional[int]], List[list]]
+
+
+def klines_to_columns(klines: Sequence[Sequence]) -> Dict[str, np.ndarray]:
+    """Convierte klines crudas de Binance (listas) en arrays por columna"""
+    count = len(klines)
+    columns = {name: np.empty(count, dtype=dtype) for name, dtype in COLUMNS}
+    for i, kline in enumerate(klines):
+        columns['open_time'][i] = int(kline[0])
+        columns['open'][i] = float(kline[1])
+        columns['high'][i] = float(kline[2])
+        columns['low'][i] = float(kline[3])
+        columns['close'][i] = float(kline[4])
+        columns['volume'][i] = float(kline[5])
+        columns['close_time'][i] = int(kline[6])
+    return columns
+
+
+def columns_to_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """DataFrame OHLCV indexado por timestamp (mismo formato que get_klines)"""
+    df = pd.DataFrame({
+        'open': columns['open'],
+        'high': columns['high'],
+        'low': columns['low'],
+        'close': columns['close'],
+        'volume': columns['volume'],
+    }, index=pd.to_datetime(columns['open_time'], unit='ms'))
+    df.index.name = 'timestamp'
+    return df
+
+
+class KlineStore:
+    """Almacén columnar de klines con sincronización incremental"""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, api=None,
+                 fetcher: Optional[KlineFetcher] = None, offline: bool = False):
+        """
+        Args:
+            root: Directorio base del almacén
+            api: Cliente con get_klines_raw (p. ej. OptimizedBinanceAPI)
+            fetcher: Función de descarga alternativa (tests, otros exchanges)
+            offline: No descargar nunca; usar solo lo que haya en disco
+        """
+        self.root = root
+        if fetcher is None and api is not None:
+            fetcher = api.get_klines_raw
+        self.fetcher = fetcher
+        self.offline = offline or fetcher is None
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ===========================================
+    # RUTAS Y BLOQUEOS
+    # ===========================================
+
+    @staticmethod
+    def _clean_symbol(symbol: str) -> str:
+        return symbol.replace('/', '').upper()
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, self._clean_symbol(symbol), interval)
+
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self._series_dir(symbol, interval), 'meta.json')
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        key = (self._clean_symbol(symbol), interval)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    # ===========================================
+    # LECTURA
+    # ===========================================
+
+    def _read_columns(self, symbol: str, interval: str) -> Dict[str, np.ndarray]:
+        """Columnas mapeadas en memoria (solo lectura)"""
+        directory = self._series_dir(symbol, interval)
+        raw = {}
+        for name, dtype in COLUMNS:
+            path = os.path.join(directory, f'{name}.bin')
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+            raw[name] = np.memmap(path, dtype=dtype, mode='r')
+
+        # Una escritura interrumpida puede dejar columnas de distinta longitud
+        count = min(len(column) for column in raw.values())
+        return {name: column[:count] for name, column in raw.items()}
+
+    def count(self, symbol: str, interval: str) -> int:
+        """Número de velas almacenadas"""
+        return len(self._read_columns(symbol, interval)['open_time'])
+
+    def time_range(self, symbol: str, interval: str) -> Optional[Tuple[int, int]]:
+        """(primer open_time, último open_time) almacenados, o None"""
+        open_time = self._read_columns(symbol, interval)['open_time']
+        if len(open_time) == 0:
+            return None
+        return int(open_time[0]), int(open_time[-1])
+
+    def load(self, symbol: str, interval: str, start_time: Optional[int] = None,
+             end_time: Optional[int] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Lee velas del disco sin tocar la red
+
+        Args:
+            start_time: open_time mínimo en ms (inclusive)
+            end_time: open_time máximo en ms (inclusive)
+            limit: Quedarse con las últimas N velas del rango
+        """
+        columns = self._read_columns(symbol, interval)
+        open_time = columns['open_time']
+
+        lo = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side='left'))
+        hi = len(open_time) if end_time is None else int(np.searchsorted(open_time, end_time, side='right'))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+
+        df = columns_to_frame({name: np.array(column[lo:hi]) for name, column in columns.items()})
+        df.attrs['symbol'] = self._clean_symbol(symbol)
+        df.attrs['timeframe'] = interval
+        return df
+
+    # ===========================================
+    # ESCRITURA
+    # ===========================================
+
+    def _append_columns(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]):
+        directory = self._series_dir(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+
+        # Recortar columnas desalineadas por una escritura interrumpida
+        count = len(self._read_columns(symbol, interval)['open_time'])
+        for name, dtype in COLUMNS:
+            path = os.path.join(directory, f'{name}.bin')
+            size = count * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+
+        for name, dtype in COLUMNS:
+            with open(os.path.join(directory, f'{name}.bin'), 'ab') as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+    def _rewrite_columns(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]):
+        """Reescribe la serie completa de forma atómica (solo al rellenar huecos)"""
+        directory = self._series_dir(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+        for name, dtype in COLUMNS:
+            path = os.path.join(directory, f'{name}.bin')
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            os.replace(tmp_path, path)
+
+    def _merge(self, symbol: str, interval: str, new: Dict[str, np.ndarray]) -> int:
+        """Incorpora velas nuevas; anexa si van al final, si no reescribe ordenado"""
+        if len(new['open_time']) == 0:
+            return 0
+
+        order = np.argsort(new['open_time'], kind='stable')
+        new = {name: column[order] for name, column in new.items()}
+        existing = self._read_columns(symbol, interval)
+        existing_times = existing['open_time']
+
+        if len(existing_times) == 0 or new['open_time'][0] > existing_times[-1]:
+            # Caso normal: la cola nueva va al final (solo anexado)
+            _, unique_idx = np.unique(new['open_time'], return_index=True)
+            new = {name: column[unique_idx] for name, column in new.items()}
+            self._append_columns(symbol, interval, new)
+            return len(unique_idx)
+
+        # Cabeza o huecos: fusionar y reescribir. np.unique se queda con la
+        # primera aparición, así que lo recién descargado tiene prioridad
+        all_times = np.concatenate([new['open_time'], existing_times])
+        _, unique_idx = np.unique(all_times, return_index=True)
+        merged = {name: np.concatenate([new[name], np.asarray(existing[name])])[unique_idx]
+                  for name, _ in COLUMNS}
+        added = len(unique_idx) - len(existing_times)
+        del existing, existing_times  # liberar memmaps antes de reemplazar los archivos
+        self._rewrite_columns(symbol, interval, merged)
+        return added
+
+    def import_klines(self, symbol: str, interval: str, klines: Sequence[Sequence]) -> int:
+        """Importa klines crudas (p. ej. un fixture JSON) al almacén"""
+        with self._lock(symbol, interval):
+            return self._merge(symbol, interval, klines_to_columns(klines))
+
+    def import_file(self, symbol: str, interval: str, path: str) -> int:
+        """Importa un archivo JSON con la respuesta cruda de /api/v3/klines"""
+        with open(path) as f:
+            return self.import_klines(symbol, interval, json.load(f))
+
+    # ===========================================
+    # METADATOS
+    # ===========================================
+
+    def _read_meta(self, symbol: str, interval: str) -> Dict:
+        """{'listed_from': ms o None, 'unfillable': [[inicio, fin], ...]}"""
+        meta = {'listed_from': None, 'unfillable': []}
+        try:
+            with open(self._meta_path(symbol, interval)) as f:
+                meta.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"meta.json ilegible para {symbol} {interval}: {e}")
+        return meta
+
+    def _write_meta(self, symbol: str, interval: str, meta: Dict):
+        path = self._meta_path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _is_unfillable(meta: Dict, gap: Tuple[int, int]) -> bool:
+        return any(start <= gap[0] and gap[1] <= end for start, end in meta['unfillable'])
+
+    # ===========================================
+    # SINCRONIZACIÓN
+    # ===========================================
+
+    def _fetch_range(self, symbol: str, interval: str, start_time: int,
+                     end_time: int) -> List[list]:
+        """Pagina /api/v3/klines de 1000 en 1000 entre start_time y end_time"""
+        step = interval_to_ms(interval)
+        klines: List[list] = []
+        cursor = start_time
+        while cursor <= end_time:
+            page = self.fetcher(self._clean_symbol(symbol), interval, MAX_KLINES_PER_REQUEST,
+                                cursor, end_time)
+            if not page:
+                break
+            klines.extend(page)
+            last_open = int(page[-1][0])
+            if len(page) < MAX_KLINES_PER_REQUEST or last_open >= end_time:
+                break
+            cursor = last_open + step
+        return klines
+
+    def find_gaps(self, symbol: str, interval: str,
+                  include_unfillable: bool = False) -> List[Tuple[int, int]]:
+        """
+        Rangos (inicio, fin) de open_time que faltan dentro de la serie
+
+        Args:
+            include_unfillable: Incluir huecos que el exchange ya devolvió vacíos
+        """
+        open_time = self._read_columns(symbol, interval)['open_time']
+        if len(open_time) < 2:
+            return []
+        step = interval_to_ms(interval)
+        jumps = np.flatnonzero(np.diff(open_time) > step)
+        gaps = [(int(open_time[i]) + step, int(open_time[i + 1]) - step) for i in jumps]
+        if include_unfillable:
+            return gaps
+        meta = self._read_meta(symbol, interval)
+        return [gap for gap in gaps if not self._is_unfillable(meta, gap)]
+
+    def sync(self, symbol: str, interval: str, start_time: Optional[int] = None,
+             end_time: Optional[int] = None, fill_gaps: bool = True) -> int:
+        """
+        Descarga solo lo que falta en disco
+
+        Args:
+            start_time: Inicio deseado en ms (si es anterior a lo guardado se completa la cabeza)
+            end_time: Fin deseado en ms (por defecto, ahora)
+            fill_gaps: Rellenar huecos internos detectados
+
+        Returns:
+            Número de velas nuevas guardadas
+        """
+        if self.offline:
+            return 0
+
+        step = interval_to_ms(interval)
+        now_ms = int(time.time() * 1000)
+        end_time = now_ms if end_time is None else min(end_time, now_ms)
+
+        with self._lock(symbol, interval):
+            stored = self.time_range(symbol, interval)
+            meta = self._read_meta(symbol, interval)
+            meta_changed = False
+            listed_from = meta['listed_from']
+            if start_time is not None and listed_from is not None:
+                # Antes del listado no hay nada que pedir
+                start_time = max(start_time, listed_from)
+
+            # (inicio, fin, tipo): 'head' puede revelar el listado, 'gap' puede ser irrellenable
+            ranges: List[Tuple[int, int, str]] = []
+            if stored is None:
+                if start_time is None:
+                    start_time = end_time - step * MAX_KLINES_PER_REQUEST
+                ranges.append((start_time, end_time, 'head'))
+            else:
+                first, last = stored
+                if start_time is not None and start_time < first:
+                    ranges.append((start_time, first - step, 'head'))
+                if fill_gaps:
+                    ranges.extend((*gap, 'gap') for gap in self.find_gaps(symbol, interval))
+                ranges.append((last + step, end_time, 'tail'))
+
+            added = 0
+            for range_start, range_end, kind in ranges:
+                if range_start > range_end:
+                    continue
+                try:
+                    klines = self._fetch_range(symbol, interval, range_start, range_end)
+                except Exception as e:
+                    logger.error(f"Error sincronizando {symbol} {interval}: {e}")
+                    break
+                # Solo velas cerradas: la serie en disco nunca se reescribe por una vela viva
+                closed = [k for k in klines if int(k[6]) < now_ms]
+                added += self._merge(symbol, interval, klines_to_columns(closed))
+
+                if kind == 'head':
+                    # El exchange empieza a servir en el listado: lo anterior no existe
+                    earliest = int(klines[0][0]) if klines else (stored[0] if stored else None)
+                    if earliest is not None and earliest - range_start >= step:
+                        meta['listed_from'] = earliest
+                        meta_changed = True
+                elif kind == 'gap':
+                    expected = (range_end - range_start) // step + 1
+                    received = sum(1 for k in closed if range_start <= int(k[0]) <= range_end)
+                    if received < expected:
+                        # Caída del exchange: lo que siga faltando dentro no se volverá a pedir
+                        meta['unfillable'].append([range_start, range_end])
+                        meta_changed = True
+
+            if meta_changed:
+                self._write_meta(symbol, interval, meta)
+
+        if added:
+            logger.info(f"💾 {self._clean_symbol(symbol)} {interval}: {added} velas nuevas en disco")
+        return added
+
+    def get_range(self, symbol: str, interval: str, start_time: Optional[int] = None,
+                  end_time: Optional[int] = None, days: Optional[int] = None) -> pd.DataFrame:
+        """Sincroniza (si hay red) y devuelve el rango desde disco"""
+        if days is not None and start_time is None:
+            reference = end_time if end_time is not None else int(time.time() * 1000)
+            start_time = reference - days * 86_400_000
+        self.sync(symbol, interval, start_time, end_time)
+        return self.load(symbol, interval, start_time, end_time)
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> pd.DataFrame:
+        """
+        Últimas `limit` velas para arranque en vivo: histórico desde disco
+        más la vela en formación descargada (sin persistir)
+        """
+        start_time = int(time.time() * 1000) - interval_to_ms(interval) * (limit + 1)
+        history = self.get_range(symbol, interval, start_time=start_time).iloc[-limit:]
+        if self.offline:
+            return history
+
+        try:
+            live = self.fetcher(self._clean_symbol(symbol), interval, 2, None, None)
+        except Exception as e:
+            logger.warning(f"No se pudo obtener la vela en formación de {symbol} {interval}: {e}")
+            return history
+
+        live_frame = columns_to_frame(klines_to_columns(live))
+        live_frame = live_frame[~live_frame.index.isin(history.index)]
+        if live_frame.empty:
+            return history
+        combined = pd.concat([history, live_frame]).iloc[-limit:]
+        combined.attrs = dict(history.attrs)
+        return combined
+
+
+# Instancia global compartida
+_global_store = None
+
+
+def get_kline_store(api=None) -> KlineStore:
+    """Obtiene el almacén global (la primera llamada puede fijar la API)"""
+    global _global_store
+    if _global_store is None:
+        _global_store = KlineStore(api=api)
+    elif api is not None and _global_store.fetcher is None:
+        _global_store.fetcher = api.get_klines_raw
+        _global_store.offline = False
+    return _global_store
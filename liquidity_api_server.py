@@ -9,10 +9,15 @@ from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 import httpx
 import json
+import os
 from datetime import datetime
+import numpy as np
 import uvicorn
 from typing import Dict, List
 
+from local_order_book import get_local_depth, start_order_book_manager, stop_order_book_manager
+from order_book_depth import DepthSnapshot, price_bands
+
 app = FastAPI()
 
 # Enable CORS for the UI
@@ -65,67 +70,30 @@ class LiquidityAnalyzer:
                 "volume_24h": float(ticker_data.get("volume", 0))
             }
     
-    def analyze_liquidity_zones(self, order_book: Dict, current_price: float):
+    # Zone bands relative to the current price
+    SUPPORT_BANDS = [(0.99, 0.985), (0.98, 0.97), (0.96, 0.95)]       # -1% to -1.5%, -2% to -3%, -4% to -5%
+    RESISTANCE_BANDS = [(1.01, 1.015), (1.02, 1.03), (1.04, 1.05)]   # +1% to +1.5%, +2% to +3%, +4% to +5%
+
+    def _zones(self, depth: DepthSnapshot, side: str, bands, current_price: float) -> List[Dict]:
+        """Sum the notional of every band with one searchsorted per edge"""
+        low, high = price_bands(current_price, bands)
+        sums = depth.band_sums(side, low, high)
+        zones = []
+        for i in np.flatnonzero(sums["notional"] > 0):
+            mid = float(low[i] + high[i]) / 2
+            zones.append({
+                "price": mid,
+                "liquidity": float(sums["notional"][i]),
+                "orders": int(sums["orders"][i]),
+                "distance": ((mid - current_price) / current_price) * 100
+            })
+        return zones
+
+    def analyze_liquidity_zones(self, order_book, current_price: float):
         """Analyze liquidity concentration zones"""
-        bids = order_book.get("bids", [])
-        asks = order_book.get("asks", [])
-        
-        # Support zones (bids)
-        support_zones = []
-        price_ranges = [
-            (current_price * 0.99, current_price * 0.985),  # -1% to -1.5%
-            (current_price * 0.98, current_price * 0.97),   # -2% to -3%
-            (current_price * 0.96, current_price * 0.95),   # -4% to -5%
-        ]
-        
-        for range_min, range_max in price_ranges:
-            zone_liquidity = 0
-            zone_orders = 0
-            
-            for bid in bids:
-                price = float(bid[0])
-                quantity = float(bid[1])
-                
-                if range_min <= price <= range_max:
-                    zone_liquidity += price * quantity
-                    zone_orders += 1
-            
-            if zone_liquidity > 0:
-                support_zones.append({
-                    "price": (range_min + range_max) / 2,
-                    "liquidity": zone_liquidity,
-                    "orders": zone_orders,
-                    "distance": ((((range_min + range_max) / 2) - current_price) / current_price) * 100
-                })
-        
-        # Resistance zones (asks)
-        resistance_zones = []
-        price_ranges = [
-            (current_price * 1.01, current_price * 1.015),  # +1% to +1.5%
-            (current_price * 1.02, current_price * 1.03),   # +2% to +3%
-            (current_price * 1.04, current_price * 1.05),   # +4% to +5%
-        ]
-        
-        for range_min, range_max in price_ranges:
-            zone_liquidity = 0
-            zone_orders = 0
-            
-            for ask in asks:
-                price = float(ask[0])
-                quantity = float(ask[1])
-                
-                if range_min <= price <= range_max:
-                    zone_liquidity += price * quantity
-                    zone_orders += 1
-            
-            if zone_liquidity > 0:
-                resistance_zones.append({
-                    "price": (range_min + range_max) / 2,
-                    "liquidity": zone_liquidity,
-                    "orders": zone_orders,
-                    "distance": ((((range_min + range_max) / 2) - current_price) / current_price) * 100
-                })
-        
+        depth = order_book if isinstance(order_book, DepthSnapshot) else DepthSnapshot.from_depth(order_book)
+        support_zones = self._zones(depth, "bids", self.SUPPORT_BANDS, current_price)
+        resistance_zones = self._zones(depth, "asks", self.RESISTANCE_BANDS, current_price)
         return support_zones, resistance_zones
     
     def calculate_liquidation_zones(self, current_price: float):
@@ -200,29 +168,28 @@ class LiquidityAnalyzer:
     
     async def analyze_symbol(self, symbol: str):
         """Complete analysis for a symbol"""
-        # Get market data
-        ticker_data = await self.get_ticker(symbol)
-        order_book = await self.get_order_book(symbol)
+        # Get market data (the book comes from the local replica when it is in sync)
+        depth = get_local_depth(symbol, 500)
+        if depth is None:
+            ticker_data, order_book = await asyncio.gather(self.get_ticker(symbol), self.get_order_book(symbol))
+            # Parse the book once for every calculation below
+            depth = DepthSnapshot.from_depth(order_book, symbol) if order_book else None
+        else:
+            ticker_data = await self.get_ticker(symbol)
         
-        if not ticker_data or not order_book:
+        if not ticker_data or not depth:
             return None
         
         current_price = ticker_data["price"]
         
         # Analyze liquidity zones
-        support_zones, resistance_zones = self.analyze_liquidity_zones(order_book, current_price)
+        support_zones, resistance_zones = self.analyze_liquidity_zones(depth, current_price)
         
         # Calculate liquidation zones
         liquidations = self.calculate_liquidation_zones(current_price)
         
         # Calculate imbalance
-        total_bid_value = sum(float(bid[0]) * float(bid[1]) for bid in order_book.get("bids", []))
-        total_ask_value = sum(float(ask[0]) * float(ask[1]) for ask in order_book.get("asks", []))
-        
-        if total_bid_value + total_ask_value > 0:
-            imbalance = ((total_bid_value - total_ask_value) / (total_bid_value + total_ask_value)) * 100
-        else:
-            imbalance = 0
+        imbalance = depth.imbalance(notional=True)
         
         # Detect signal
         signal = self.detect_signal(ticker_data, support_zones, resistance_zones, imbalance)
@@ -243,6 +210,18 @@ class LiquidityAnalyzer:
 
 analyzer = LiquidityAnalyzer()
 
+DEFAULT_SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+
+@app.on_event("startup")
+async def start_local_order_books():
+    """Keep the default symbols' books in memory instead of polling /depth"""
+    if os.getenv("ORDER_BOOK_STREAM_ENABLED", "true").lower() == "true":
+        await start_order_book_manager(DEFAULT_SYMBOLS)
+
+@app.on_event("shutdown")
+async def stop_local_order_books():
+    await stop_order_book_manager()
+
 @app.get("/")
 async def root():
     return {"status": "Liquidity API Server Running"}
@@ -256,41 +235,30 @@ async def get_multi_liquidity(symbols: str = "BTCUSDT,ETHUSDT,SOLUSDT,BNBUSDT"):
     else:
         symbol_list = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
     
-    results = []
-    
-    for symbol in symbol_list:
+    async def analyze(symbol: str) -> Dict:
         try:
             data = await analyzer.analyze_symbol(symbol)
             if data:
-                results.append(data)
-            else:
-                # Add placeholder if analysis fails
-                results.append({
-                    "symbol": symbol, 
-                    "price": 0, 
-                    "change24h": 0, 
-                    "liquidityZones": {"support": [], "resistance": []}, 
-                    "liquidations": {"longs": [], "shorts": []}, 
-                    "signal": None, 
-                    "imbalance": 0,
-                    "timestamp": datetime.now().isoformat()
-                })
+                return data
         except Exception as e:
             print(f"Error analyzing {symbol}: {e}")
-            # Add placeholder on error
-            results.append({
-                "symbol": symbol, 
-                "price": 0, 
-                "change24h": 0, 
-                "liquidityZones": {"support": [], "resistance": []}, 
-                "liquidations": {"longs": [], "shorts": []}, 
-                "signal": None, 
-                "imbalance": 0,
-                "timestamp": datetime.now().isoformat()
-            })
+        # Add placeholder if analysis fails
+        return {
+            "symbol": symbol, 
+            "price": 0, 
+            "change24h": 0, 
+            "liquidityZones": {"support": [], "resistance": []}, 
+            "liquidations": {"longs": [], "shorts": []}, 
+            "signal": None, 
+            "imbalance": 0,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    # All symbols at once: the slowest request sets the latency, not the sum
+    results = await asyncio.gather(*(analyze(symbol) for symbol in symbol_list))
     
     # Always return an array
-    return results if results else []
+    return list(results)
 
 @app.get("/api/liquidity/{symbol}")
 async def get_liquidity(symbol: str):
@@ -308,8 +276,8 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             # Send updates every 5 seconds
-            for symbol in symbols:
-                data = await analyzer.analyze_symbol(symbol)
+            updates = await asyncio.gather(*(analyzer.analyze_symbol(symbol) for symbol in symbols))
+            for data in updates:
                 if data:
                     await websocket.send_json(data)
             
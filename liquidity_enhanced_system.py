@@ -15,6 +15,10 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import json
 import logging
+import os
+
+from local_order_book import get_local_depth, start_order_book_manager, stop_order_book_manager
+from order_book_depth import DepthAnalyzer, DepthSnapshot
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,8 +37,8 @@ INITIAL_CAPITAL = 220.0
 MAX_RISK_PER_TRADE = 0.02
 DEFAULT_LEVERAGE = 3
 
-class LiquidityAnalyzer:
-    """Analiza liquidez y órdenes grandes"""
+class LiquidityAnalyzer(DepthAnalyzer):
+    """Analiza liquidez y órdenes grandes (el análisis del libro vive en DepthAnalyzer)"""
     
     def __init__(self):
         self.binance_api = "https://fapi.binance.com/fapi/v1"
@@ -44,174 +48,28 @@ class LiquidityAnalyzer:
         """Analiza profundidad del order book para detectar órdenes grandes"""
         
         try:
-            async with httpx.AsyncClient() as client:
-                # Obtener order book profundo (500 niveles)
-                depth_response = await client.get(
-                    f"{self.spot_api}/depth",
-                    params={"symbol": symbol, "limit": 500}
-                )
-                
-                if depth_response.status_code != 200:
-                    return {"error": "No depth data"}
-                
-                depth_data = depth_response.json()
-                
-                # Analizar bids y asks
-                bids = [[float(price), float(qty)] for price, qty in depth_data["bids"][:100]]
-                asks = [[float(price), float(qty)] for price, qty in depth_data["asks"][:100]]
-                
-                # Detectar órdenes grandes (block orders)
-                current_price = (bids[0][0] + asks[0][0]) / 2
-                large_orders = self._detect_large_orders(bids, asks, current_price)
-                
-                # Calcular imbalance
-                total_bid_volume = sum([bid[1] for bid in bids[:20]])
-                total_ask_volume = sum([ask[1] for ask in asks[:20]])
-                imbalance = (total_bid_volume - total_ask_volume) / (total_bid_volume + total_ask_volume) * 100
-                
-                # Calcular spreads en diferentes niveles
-                spread_1 = ((asks[0][0] - bids[0][0]) / current_price) * 100
-                spread_10 = ((asks[9][0] - bids[9][0]) / current_price) * 100 if len(bids) > 9 and len(asks) > 9 else spread_1
-                
-                return {
-                    "current_price": current_price,
-                    "imbalance": imbalance,
-                    "spread_bps": spread_1 * 100,  # basis points
-                    "spread_10_level": spread_10 * 100,
-                    "large_orders": large_orders,
-                    "liquidity_score": self._calculate_liquidity_score(bids, asks, current_price),
-                    "support_levels": self._find_support_resistance(bids, current_price, "support"),
-                    "resistance_levels": self._find_support_resistance(asks, current_price, "resistance"),
-                    "timestamp": datetime.now().isoformat()
-                }
+            # Libro local (diff-depth) si está al día: sin petición REST de peso 25
+            depth = get_local_depth(symbol, 100)
+            if depth is None:
+                async with httpx.AsyncClient() as client:
+                    # Obtener order book profundo (500 niveles)
+                    depth_response = await client.get(
+                        f"{self.spot_api}/depth",
+                        params={"symbol": symbol, "limit": 500}
+                    )
+                    
+                    if depth_response.status_code != 200:
+                        return {"error": "No depth data"}
+                    
+                    # Parsear el libro una sola vez a arrays (n, 2) y analizar los 100 mejores niveles
+                    depth = DepthSnapshot.from_depth(depth_response.json(), symbol).top(100)
+            
+            return self.analyze_depth(depth)
                 
         except Exception as e:
             logger.error(f"Error getting order book depth for {symbol}: {e}")
             return {"error": str(e)}
     
-    def _detect_large_orders(self, bids: List, asks: List, current_price: float) -> Dict:
-        """Detecta órdenes grandes (block orders) que pueden mover el precio"""
-        
-        large_orders = {
-            "large_bids": [],
-            "large_asks": [],
-            "total_large_bid_volume": 0,
-            "total_large_ask_volume": 0,
-            "whale_activity": False
-        }
-        
-        # Calcular volumen promedio para detectar órdenes anómalas
-        all_bid_volumes = [bid[1] for bid in bids[:50]]
-        all_ask_volumes = [ask[1] for ask in asks[:50]]
-        
-        avg_bid_volume = np.mean(all_bid_volumes)
-        avg_ask_volume = np.mean(all_ask_volumes)
-        
-        # Umbral para considerar una orden como "grande" (3x el promedio)
-        large_bid_threshold = avg_bid_volume * 3
-        large_ask_threshold = avg_ask_volume * 3
-        
-        # Detectar órdenes grandes en bids
-        for bid in bids[:50]:
-            price, volume = bid
-            if volume > large_bid_threshold:
-                distance_pct = ((current_price - price) / current_price) * 100
-                large_orders["large_bids"].append({
-                    "price": price,
-                    "volume": volume,
-                    "distance_pct": distance_pct,
-                    "usd_value": price * volume
-                })
-                large_orders["total_large_bid_volume"] += volume
-        
-        # Detectar órdenes grandes en asks
-        for ask in asks[:50]:
-            price, volume = ask
-            if volume > large_ask_threshold:
-                distance_pct = ((price - current_price) / current_price) * 100
-                large_orders["large_asks"].append({
-                    "price": price,
-                    "volume": volume,
-                    "distance_pct": distance_pct,
-                    "usd_value": price * volume
-                })
-                large_orders["total_large_ask_volume"] += volume
-        
-        # Determinar actividad whale
-        total_large_volume = large_orders["total_large_bid_volume"] + large_orders["total_large_ask_volume"]
-        large_orders["whale_activity"] = bool(total_large_volume > (avg_bid_volume + avg_ask_volume) * 10)
-        
-        return large_orders
-    
-    def _calculate_liquidity_score(self, bids: List, asks: List, current_price: float) -> Dict:
-        """Calcula score de liquidez en diferentes niveles de precio"""
-        
-        # Calcular liquidez en diferentes porcentajes del precio actual
-        levels = [0.5, 1.0, 2.0, 5.0]  # 0.5%, 1%, 2%, 5% del precio
-        
-        liquidity_at_levels = {}
-        
-        for level_pct in levels:
-            level_range = current_price * (level_pct / 100)
-            
-            # Liquidez por debajo del precio actual (bids)
-            bid_liquidity = sum([
-                bid[1] for bid in bids 
-                if bid[0] >= (current_price - level_range)
-            ])
-            
-            # Liquidez por encima del precio actual (asks)
-            ask_liquidity = sum([
-                ask[1] for ask in asks 
-                if ask[0] <= (current_price + level_range)
-            ])
-            
-            liquidity_at_levels[f"{level_pct}%"] = {
-                "bid_liquidity": bid_liquidity,
-                "ask_liquidity": ask_liquidity,
-                "total_liquidity": bid_liquidity + ask_liquidity,
-                "imbalance": (bid_liquidity - ask_liquidity) / (bid_liquidity + ask_liquidity + 0.00001) * 100
-            }
-        
-        return liquidity_at_levels
-    
-    def _find_support_resistance(self, orders: List, current_price: float, order_type: str) -> List:
-        """Encuentra niveles de soporte/resistencia basados en concentración de órdenes"""
-        
-        # Agrupar órdenes por niveles de precio similares
-        price_levels = {}
-        
-        for order in orders[:30]:
-            price, volume = order
-            # Redondear precio a niveles significativos
-            if current_price > 1000:
-                level = round(price, -1)  # Redondear a decenas
-            elif current_price > 100:
-                level = round(price, 0)   # Redondear a unidades
-            else:
-                level = round(price, 2)   # Redondear a centavos
-            
-            if level not in price_levels:
-                price_levels[level] = 0
-            price_levels[level] += volume
-        
-        # Encontrar los niveles con más volumen
-        sorted_levels = sorted(price_levels.items(), key=lambda x: x[1], reverse=True)
-        
-        # Devolver top 5 niveles con su distancia del precio actual
-        levels = []
-        for level, volume in sorted_levels[:5]:
-            distance_pct = abs(level - current_price) / current_price * 100
-            
-            levels.append({
-                "price": level,
-                "volume": volume,
-                "distance_pct": distance_pct,
-                "strength": "HIGH" if volume > np.mean(list(price_levels.values())) * 2 else "MEDIUM"
-            })
-        
-        return levels
-    
     async def get_liquidation_data(self, symbol: str) -> Dict:
         """Obtiene datos de liquidaciones de futuros"""
         
@@ -727,6 +585,16 @@ app.add_middleware(
 
 signal_generator = LiquidityEnhancedSignalGenerator()
 
+@app.on_event("startup")
+async def start_local_order_books():
+    """Réplica local de los libros de las configuraciones ganadoras"""
+    if os.getenv('ORDER_BOOK_STREAM_ENABLED', 'true').lower() == 'true':
+        await start_order_book_manager(WINNING_CONFIGS)
+
+@app.on_event("shutdown")
+async def stop_local_order_books():
+    await stop_order_book_manager()
+
 @app.get("/api/signals")
 async def get_enhanced_signals():
     """Obtiene señales mejoradas con análisis de liquidez"""
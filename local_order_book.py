@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+===========================================
+RÉPLICA LOCAL DEL ORDER BOOK (DIFF-DEPTH)
+===========================================
+
+Mantiene en memoria el libro de cada símbolo a partir de un único
+snapshot REST y del stream <símbolo>@depth@100ms, siguiendo el
+procedimiento de Binance:
+
+1. Abrir el socket y guardar los eventos depthUpdate recibidos
+2. Pedir /api/v3/depth y descartar los eventos con u <= lastUpdateId
+3. El primer evento aplicado debe cumplir U <= lastUpdateId + 1 <= u
+4. Cada evento siguiente debe empezar en U == u anterior + 1 (o traer
+   pu == u anterior en futuros); si no, hay un hueco y se resincroniza
+5. Cantidad 0 elimina el nivel
+
+Los consumidores de liquidez (liquidity_api_server,
+liquidity_enhanced_system, CryptoMomentumDetector, ScalpingBot,
+SwingTradingSystem) leen el libro de memoria en lugar de pedir un
+/depth de peso 25-50 en cada análisis:
+
+- Cada lado es un array NumPy [precio, cantidad] ordenado de mejor a
+  peor precio que se actualiza en sitio con cada diff (searchsorted; solo
+  las altas y bajas de niveles desplazan el array)
+- Las sumas acumuladas por lado se recalculan solo desde el primer nivel
+  tocado desde el último snapshot
+- snapshot() envuelve esos arrays en un DepthSnapshot sin copiarlos
+  (copia al escribir), así que profundidad a una distancia e imbalance
+  son searchsorted O(log n) sobre sus sumas acumuladas
+- Con el socket caído o el libro sin sincronizar no se devuelve nada y
+  el llamador vuelve a REST
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from binance_api_optimized import BinanceConfig
+from market_stream import DEFAULT_RECONNECT_DELAY, MAX_RECONNECT_DELAY, normalize_symbol
+from order_book_depth import DepthSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Niveles del snapshot inicial (weight 50)
+DEFAULT_DEPTH_LIMIT = 1000
+
+# Frecuencia del stream de diferencias ('100ms' o '1000ms')
+DEFAULT_UPDATE_SPEED = '100ms'
+
+# Eventos guardados por símbolo mientras se espera el snapshot
+MAX_BUFFERED_EVENTS = 1000
+
+# fetch(símbolo, limit) -> respuesta de /api/v3/depth
+SnapshotFetcher = Callable[[str, int], Awaitable[Dict]]
+
+
+class SequenceGapError(Exception):
+    """Un evento depthUpdate no continúa la secuencia del libro"""
+
+
+class BookSide:
+    """Un lado del libro: array [precio, cantidad] de mejor a peor precio"""
+
+    def __init__(self, descending: bool):
+        # Claves ascendentes para searchsorted: -precio en bids, precio en asks
+        self.sign = -1.0 if descending else 1.0
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def clear(self):
+        self.levels = np.empty((0, 2))
+        self._keys = np.empty(0)
+        self._cum_quantity = np.zeros(1)
+        self._cum_notional = np.zeros(1)
+        self._dirty_from: Optional[int] = None  # primer nivel con sumas obsoletas
+        self._shared = False  # levels expuesto en un snapshot: copiar antes de escribir
+
+    def apply(self, updates: Iterable):
+        """Aplica niveles [precio, cantidad]; cantidad 0 elimina el nivel"""
+        latest = {float(price): float(quantity) for price, quantity in updates}
+        if not latest:
+            return
+        prices = np.fromiter(latest.keys(), dtype=np.float64, count=len(latest))
+        quantities = np.fromiter(latest.values(), dtype=np.float64, count=len(latest))
+        keys = self.sign * prices
+
+        position = np.searchsorted(self._keys, keys)
+        found = position < len(self._keys)
+        found[found] = self._keys[position[found]] == keys[found]
+        remove = found & (quantities == 0)
+        update = found & ~remove
+        insert = ~found & (quantities > 0)
+
+        touched = position[found | insert]
+        if not len(touched):
+            return  # solo bajas de niveles inexistentes
+
+        if update.any():
+            if self._shared:
+                self.levels = self.levels.copy()
+                self._shared = False
+            self.levels[position[update], 1] = quantities[update]
+
+        if remove.any() or insert.any():
+            keys_left = np.delete(self._keys, position[remove])
+            levels_left = np.delete(self.levels, position[remove], axis=0)
+            order = np.argsort(keys[insert])
+            new_keys = keys[insert][order]
+            at = np.searchsorted(keys_left, new_keys)
+            self._keys = np.insert(keys_left, at, new_keys)
+            self.levels = np.insert(levels_left, at, np.column_stack(
+                (prices[insert][order], quantities[insert][order])), axis=0)
+            self._shared = False  # arrays nuevos
+
+        start = int(touched.min())
+        self._dirty_from = start if self._dirty_from is None else min(self._dirty_from, start)
+
+    def cumulative(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(cantidad acumulada, nocional acumulado) con un 0 inicial"""
+        start = self._dirty_from
+        if start is not None:
+            # Los niveles anteriores al primero tocado conservan sus sumas
+            head_quantity = self._cum_quantity[:start + 1]
+            head_notional = self._cum_notional[:start + 1]
+            tail = self.levels[start:]
+            self._cum_quantity = np.concatenate(
+                (head_quantity, head_quantity[-1] + np.cumsum(tail[:, 1])))
+            self._cum_notional = np.concatenate(
+                (head_notional, head_notional[-1] + np.cumsum(tail[:, 0] * tail[:, 1])))
+            self._dirty_from = None
+        return self._cum_quantity, self._cum_notional
+
+    def share(self) -> np.ndarray:
+        """levels para un snapshot; la siguiente escritura trabajará sobre una copia"""
+        self._shared = True
+        return self.levels
+
+
+class LocalOrderBook:
+    """Libro de un símbolo mantenido con eventos depthUpdate"""
+
+    def __init__(self, symbol: str):
+        self.symbol = normalize_symbol(symbol)
+        self._bids = BookSide(descending=True)
+        self._asks = BookSide(descending=False)
+
+        self.last_update_id: Optional[int] = None
+        self.synced = False
+        self.updated_at = 0.0  # time.monotonic() del último cambio
+        self._first_event = True
+        self._version = 0
+        self._snapshot: Optional[DepthSnapshot] = None
+        self._snapshot_version = -1
+
+    def __len__(self) -> int:
+        return len(self._bids) + len(self._asks)
+
+    def reset(self):
+        """Vacía el libro y lo marca como no sincronizado"""
+        self._bids.clear()
+        self._asks.clear()
+        self.last_update_id = None
+        self.synced = False
+        self._first_event = True
+        self._changed()
+
+    def _changed(self):
+        self._version += 1
+        self.updated_at = time.monotonic()
+
+    def _apply_levels(self, bids: Iterable, asks: Iterable):
+        self._bids.apply(bids)
+        self._asks.apply(asks)
+
+    def load_snapshot(self, depth: Dict):
+        """Carga un snapshot de /api/v3/depth; los eventos siguientes deben encadenar con él"""
+        self.reset()
+        self._apply_levels(depth.get('bids', ()), depth.get('asks', ()))
+        self.last_update_id = int(depth['lastUpdateId'])
+        self.synced = True
+
+    def apply_diff(self, event: Dict) -> bool:
+        """
+        Aplica un evento depthUpdate
+
+        Returns:
+            False si el evento es anterior al libro (se ignora)
+
+        Raises:
+            SequenceGapError: si falta algún evento entre el libro y este
+        """
+        if self.last_update_id is None:
+            raise SequenceGapError(f"{self.symbol}: libro sin snapshot")
+        first_id, final_id = int(event['U']), int(event['u'])
+        if final_id <= self.last_update_id:
+            return False
+
+        expected = self.last_update_id + 1
+        if self._first_event:
+            if not first_id <= expected <= final_id:
+                raise SequenceGapError(
+                    f"{self.symbol}: primer evento {first_id}-{final_id} no cubre {expected}")
+        elif 'pu' in event:
+            if int(event['pu']) != self.last_update_id:
+                raise SequenceGapError(
+                    f"{self.symbol}: pu={event['pu']}, esperado {self.last_update_id}")
+        elif first_id != expected:
+            raise SequenceGapError(f"{self.symbol}: U={first_id}, esperado {expected}")
+
+        self._apply_levels(event.get('b', ()), event.get('a', ()))
+        self.last_update_id = final_id
+        self._first_event = False
+        self._changed()
+        return True
+
+    # ===========================================
+    # LECTURA
+    # ===========================================
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return float(self._bids.levels[0, 0]) if len(self._bids) else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return float(self._asks.levels[0, 0]) if len(self._asks) else None
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        if not len(self._bids) or not len(self._asks):
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    def top_of_book(self) -> Optional[Dict]:
+        """Mejor bid/ask con sus cantidades"""
+        if not len(self._bids) or not len(self._asks):
+            return None
+        (bid, bid_qty), (ask, ask_qty) = self._bids.levels[0].tolist(), self._asks.levels[0].tolist()
+        return {'bid': bid, 'bid_qty': bid_qty, 'ask': ask, 'ask_qty': ask_qty,
+                'last_update_id': self.last_update_id}
+
+    def snapshot(self, levels: Optional[int] = None) -> DepthSnapshot:
+        """
+        Libro como DepthSnapshot (primeros levels niveles por lado)
+
+        Se crea solo si el libro cambió desde la última llamada, sobre los
+        arrays de cada lado (sin copiarlos ni reconstruirlos) y con las sumas
+        acumuladas recalculadas desde el primer nivel tocado; las consultas
+        sobre él (depth_within, imbalance, band_sums) son búsquedas binarias.
+        """
+        if self._snapshot is None or self._snapshot_version != self._version:
+            cumulative = {'bids': self._bids.cumulative(), 'asks': self._asks.cumulative()}
+            self._snapshot = DepthSnapshot(self._bids.share(), self._asks.share(), self.symbol,
+                                           self.last_update_id, cumulative)
+            self._snapshot_version = self._version
+        return self._snapshot if levels is None else self._snapshot.top(levels)
+
+    def depth_within(self, pct) -> Dict:
+        """Cantidad acumulada por lado a menos de pct % del precio medio"""
+        return self.snapshot().depth_within(pct)
+
+    def imbalance(self, levels: Optional[int] = None, notional: bool = False) -> float:
+        return self.snapshot().imbalance(levels, notional)
+
+
+class OrderBookManager:
+    """Réplicas locales de varios libros alimentadas por un stream combinado"""
+
+    def __init__(self, symbols: Iterable[str], depth_limit: int = DEFAULT_DEPTH_LIMIT,
+                 update_speed: str = DEFAULT_UPDATE_SPEED,
+                 base_url: str = BinanceConfig.stream_base,
+                 fetcher: Optional[SnapshotFetcher] = None,
+                 reconnect_delay: float = DEFAULT_RECONNECT_DELAY):
+        self.symbols = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+        self.depth_limit = depth_limit
+        self.update_speed = update_speed
+        self.base_url = base_url.rstrip('/')
+        self._fetcher = fetcher
+        self.reconnect_delay = reconnect_delay
+
+        self.books: Dict[str, LocalOrderBook] = {symbol: LocalOrderBook(symbol) for symbol in self.symbols}
+        # Eventos recibidos mientras el libro espera su snapshot
+        self._pending: Dict[str, List[Dict]] = {symbol: [] for symbol in self.symbols}
+        self._resyncs: Dict[str, asyncio.Task] = {}
+
+        self.connected = False
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._ws = None
+
+        self.stats = {'messages': 0, 'diffs_applied': 0, 'stale': 0, 'buffered': 0,
+                      'gaps': 0, 'snapshots': 0, 'connections': 0, 'reconnects': 0,
+                      'errors': 0}
+
+    # ===========================================
+    # CONEXIÓN
+    # ===========================================
+
+    def stream_names(self) -> List[str]:
+        suffix = '' if self.update_speed == '1000ms' else f"@{self.update_speed}"
+        return [f"{symbol.lower()}@depth{suffix}" for symbol in self.symbols]
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/stream?streams={'/'.join(self.stream_names())}"
+
+    async def start(self):
+        """Arranca la réplica en segundo plano en el loop actual"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📚 Réplica local de order book iniciada: {', '.join(self.symbols)}")
+
+    async def stop(self):
+        """Cierra el socket y cancela las resincronizaciones en curso"""
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
+        tasks = list(self._resyncs.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._resyncs.clear()
+        self._task = None
+        self.connected = False
+
+    async def _run(self):
+        import websockets
+
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                async with websockets.connect(self.url, ping_interval=20,
+                                              max_size=2 ** 22) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    self.stats['connections'] += 1
+                    delay = self.reconnect_delay
+                    # Tras (re)conectar ningún libro es fiable hasta un snapshot nuevo
+                    for symbol in self.symbols:
+                        self._invalidate(symbol)
+                    async for message in ws:
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning(f"⚠️ Stream de order book desconectado: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            if self._running:
+                self.stats['reconnects'] += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    # ===========================================
+    # SINCRONIZACIÓN
+    # ===========================================
+
+    def _invalidate(self, symbol: str):
+        """Descarta el libro y programa un snapshot nuevo"""
+        self.books[symbol].reset()
+        self._pending[symbol].clear()
+        task = self._resyncs.get(symbol)
+        if task is None or task.done():
+            self._resyncs[symbol] = asyncio.create_task(self.resync(symbol))
+
+    async def resync(self, symbol: str):
+        """Carga un snapshot REST y aplica los eventos guardados mientras llegaba"""
+        fetcher = self._fetcher
+        if fetcher is None:
+            from market_data_gateway import get_market_data_gateway
+            fetcher = get_market_data_gateway().get_depth_raw
+
+        book = self.books[symbol]
+        delay = self.reconnect_delay
+        while self._running and not book.synced:
+            try:
+                depth = await fetcher(symbol, self.depth_limit)
+                self.stats['snapshots'] += 1
+                book.load_snapshot(depth)
+                pending, self._pending[symbol] = self._pending[symbol], []
+                for i, event in enumerate(pending):
+                    self._apply(book, event)
+                    if not book.synced:
+                        # Hueco: el resto espera al próximo snapshot
+                        self._pending[symbol].extend(pending[i + 1:])
+                        break
+                if book.synced:
+                    logger.info(f"📚 {symbol} sincronizado en lastUpdateId {book.last_update_id}")
+                    return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error sincronizando order book de {symbol}: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _apply(self, book: LocalOrderBook, event: Dict) -> bool:
+        """Aplica un evento al libro sincronizado; ante un hueco lo invalida"""
+        try:
+            if book.apply_diff(event):
+                self.stats['diffs_applied'] += 1
+                return True
+            self.stats['stale'] += 1
+            return False
+        except SequenceGapError as e:
+            self.stats['gaps'] += 1
+            logger.warning(f"⚠️ Hueco en el order book: {e}; resincronizando")
+            book.reset()
+            # El evento actual puede encadenar con el próximo snapshot
+            self._pending[book.symbol] = [event]
+            task = self._resyncs.get(book.symbol)
+            if self._running and (task is None or task.done()):
+                self._resyncs[book.symbol] = asyncio.create_task(self.resync(book.symbol))
+            return False
+
+    def handle_message(self, message) -> bool:
+        """Aplica un mensaje del stream combinado (str/bytes o dict ya decodificado)"""
+        self.stats['messages'] += 1
+        try:
+            if isinstance(message, (str, bytes)):
+                message = json.loads(message)
+            data = message.get('data', message)
+            if data.get('e') != 'depthUpdate':
+                return False
+            book = self.books.get(data['s'])
+            if book is None:
+                return False
+
+            if not book.synced:
+                pending = self._pending[book.symbol]
+                pending.append(data)
+                del pending[:-MAX_BUFFERED_EVENTS]
+                self.stats['buffered'] += 1
+                return False
+            return self._apply(book, data)
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Mensaje de order book inválido: {e}")
+            return False
+
+    # ===========================================
+    # LECTURA
+    # ===========================================
+
+    def get_book(self, symbol: str) -> Optional[LocalOrderBook]:
+        """Libro al día del símbolo, o None si no se sigue o no está sincronizado"""
+        book = self.books.get(normalize_symbol(symbol))
+        if book is None or not self.connected or not book.synced:
+            return None
+        return book
+
+    def get_depth(self, symbol: str, levels: Optional[int] = None) -> Optional[DepthSnapshot]:
+        """Primeros levels niveles como DepthSnapshot, o None si hay que usar REST"""
+        book = self.get_book(symbol)
+        if book is None:
+            return None
+        depth = book.snapshot(levels)
+        return depth if depth else None
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['connected'] = self.connected
+        stats['synced'] = sorted(symbol for symbol, book in self.books.items() if book.synced)
+        return stats
+
+
+# Instancia global (solo existe si alguien arrancó la réplica)
+_order_book_manager: Optional[OrderBookManager] = None
+
+
+def get_order_book_manager() -> Optional[OrderBookManager]:
+    """Réplica global en marcha, o None si no se arrancó"""
+    return _order_book_manager
+
+
+def get_local_depth(symbol: str, levels: Optional[int] = None) -> Optional[DepthSnapshot]:
+    """Atajo: libro local del símbolo, o None si hay que pedir /depth por REST"""
+    manager = _order_book_manager
+    return manager.get_depth(symbol, levels) if manager is not None else None
+
+
+async def start_order_book_manager(symbols: Iterable[str], **kwargs) -> OrderBookManager:
+    """Crea y arranca la réplica global (reemplaza a la anterior si la había)"""
+    global _order_book_manager
+    if _order_book_manager is not None:
+        await _order_book_manager.stop()
+    _order_book_manager = OrderBookManager(symbols, **kwargs)
+    await _order_book_manager.start()
+    return _order_book_manager
+
+
+async def stop_order_book_manager():
+    """Detiene la réplica global"""
+    global _order_book_manager
+    if _order_book_manager is not None:
+        await _order_book_manager.stop()
+        _order_book_manager = None
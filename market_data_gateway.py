@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+===========================================
+GATEWAY ASÍNCRONO DE DATOS DE MERCADO
+===========================================
+
+Cliente aiohttp para /api/v3/klines (y snapshots de /api/v3/depth) que
+nunca bloquea el event loop.
+Todas las combinaciones símbolo x timeframe de un ciclo se piden a la
+vez, acotadas por un semáforo, así que la latencia del ciclo depende
+de la petición más lenta y no de la suma de todas. Si el stream de
+mercado (market_stream) sigue el par, las velas salen de memoria.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import pandas as pd
+
+from binance_api_optimized import BinanceConfig
+from binance_rate_limiter import get_rate_limiter, get_request_coalescer
+from candles import Candles
+from market_stream import get_market_stream
+
+logger = logging.getLogger(__name__)
+
+# Peticiones simultáneas por defecto (el peso de /klines es 2 por petición)
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class AsyncMarketDataGateway:
+    """Descarga concurrente de klines con concurrencia acotada"""
+
+    def __init__(self, base_url: str = BinanceConfig.data_api_base,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: float = BinanceConfig.request_timeout):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+        # La sesión y el semáforo pertenecen a un event loop concreto
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Presupuesto de peso y peticiones en vuelo compartidos con los clientes síncronos
+        self.rate_limiter = get_rate_limiter()
+        self.coalescer = get_request_coalescer()
+
+        self.stats = {'requests': 0, 'errors': 0, 'stream_hits': 0}
+
+    def _retire_session(self):
+        """
+        Cierra la sesión de un loop anterior en su propio loop
+
+        Si ese loop sigue corriendo (en otro hilo) el cierre se programa
+        allí; si está detenido se ejecuta en un hilo auxiliar. Un loop ya
+        cerrado no puede cerrar sus transportes: solo se suelta la sesión.
+        """
+        session, loop = self._session, self._loop
+        self._session = None
+        if session is None or session.closed or loop is None:
+            return
+        if loop.is_closed():
+            logger.debug("Sesión aiohttp de un loop ya cerrado descartada sin cerrar")
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            closer = threading.Thread(target=loop.run_until_complete, args=(session.close(),),
+                                      name='gateway-session-close', daemon=True)
+            closer.start()
+            closer.join(timeout=5)
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """Sesión del loop actual (se recrea si cambió el loop o se cerró)"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._retire_session()
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def get_klines_raw(self, symbol: str, interval: str, limit: int = 500,
+                             start_time: Optional[int] = None,
+                             end_time: Optional[int] = None) -> List[list]:
+        """
+        Klines sin procesar (mismo contrato que OptimizedBinanceAPI.get_klines_raw)
+
+        Lanza aiohttp.ClientError si la petición falla.
+        """
+        session = self._ensure_session()
+        params = {
+            'symbol': symbol.replace('/', ''),
+            'interval': interval,
+            'limit': min(limit, BinanceConfig.max_klines_limit)
+        }
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        async def fetch():
+            async with self._semaphore:
+                await self.rate_limiter.acquire_async(2)  # Weight = 2 por request
+                self.stats['requests'] += 1
+                async with session.get(f"{self.base_url}/api/v3/klines", params=params) as response:
+                    self.rate_limiter.update_from_headers(response.headers, response.status)
+                    response.raise_for_status()
+                    return await response.json()
+
+        key = ('klines', self.base_url, params['symbol'], interval, params['limit'], start_time, end_time)
+        return await self.coalescer.call_async(key, fetch)
+
+    async def get_candles(self, symbol: str, interval: str, limit: int = 500) -> Candles:
+        """
+        Klines como Candles, parseadas directamente desde los bytes
+
+        Lanza aiohttp.ClientError si la petición falla.
+        """
+        session = self._ensure_session()
+        params = {
+            'symbol': symbol.replace('/', ''),
+            'interval': interval,
+            'limit': min(limit, BinanceConfig.max_klines_limit)
+        }
+
+        async def fetch():
+            async with self._semaphore:
+                await self.rate_limiter.acquire_async(2)  # Weight = 2 por request
+                self.stats['requests'] += 1
+                async with session.get(f"{self.base_url}/api/v3/klines", params=params) as response:
+                    self.rate_limiter.update_from_headers(response.headers, response.status)
+                    response.raise_for_status()
+                    return await response.read()
+
+        key = ('klines_body', self.base_url, params['symbol'], interval, params['limit'])
+        return Candles.from_json(await self.coalescer.call_async(key, fetch), symbol, interval)
+
+    async def get_depth_raw(self, symbol: str, limit: int = 1000) -> Dict:
+        """
+        Snapshot de /api/v3/depth sin procesar (con lastUpdateId)
+
+        Lanza aiohttp.ClientError si la petición falla.
+        """
+        session = self._ensure_session()
+        limit = min(limit, BinanceConfig.max_depth_limit)
+        params = {'symbol': symbol.replace('/', ''), 'limit': limit}
+
+        # Weight según documentación
+        if limit <= 100:
+            weight = 5
+        elif limit <= 500:
+            weight = 25
+        elif limit <= 1000:
+            weight = 50
+        else:
+            weight = 250
+
+        async def fetch():
+            async with self._semaphore:
+                await self.rate_limiter.acquire_async(weight)
+                self.stats['requests'] += 1
+                async with session.get(f"{self.base_url}/api/v3/depth", params=params) as response:
+                    self.rate_limiter.update_from_headers(response.headers, response.status)
+                    response.raise_for_status()
+                    return await response.json()
+
+        key = ('depth', self.base_url, params['symbol'], limit)
+        return await self.coalescer.call_async(key, fetch)
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 500) -> pd.DataFrame:
+        """Klines como DataFrame OHLCV (vacío si falla); del stream si está al día"""
+        stream = get_market_stream()
+        if stream is not None:
+            df = stream.get_klines(symbol, interval, limit)
+            if not df.empty:
+                self.stats['stream_hits'] += 1
+                return df
+        try:
+            candles = await self.get_candles(symbol, interval, limit)
+            return candles.to_frame()
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error obteniendo klines {symbol} {interval}: {e}")
+            return pd.DataFrame()
+
+    async def fetch_many(self, pairs: Iterable[Tuple[str, str]],
+                         limit: int = 500) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Descarga todos los (símbolo, timeframe) a la vez
+
+        Returns:
+            Dict {(símbolo, timeframe): DataFrame}; los fallos quedan vacíos
+        """
+        pairs = list(dict.fromkeys(pairs))
+        frames = await asyncio.gather(*(self.get_klines(symbol, tf, limit) for symbol, tf in pairs))
+        return dict(zip(pairs, frames))
+
+    async def close(self):
+        """Cierra la sesión HTTP (en su propio loop si se creó en otro)"""
+        if self._loop is not asyncio.get_running_loop():
+            self._retire_session()
+            return
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Instancia global
+_market_data_gateway = None
+
+
+def get_market_data_gateway() -> AsyncMarketDataGateway:
+    """Obtiene la instancia global del gateway"""
+    global _market_data_gateway
+    if _market_data_gateway is None:
+        _market_data_gateway = AsyncMarketDataGateway()
+    return _market_data_gateway
@@ -5,18 +5,43 @@ Filtros de mercado para evitar operar en condiciones adversas
 """
 
 import asyncio
-import httpx
 import json
+import os
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 import logging
 
+from binance_rate_limiter import get_request_coalescer
+from http_client_pool import get_httpx_client
+from ttl_cache import StaleWhileRevalidateCache
+
 logger = logging.getLogger(__name__)
 
+# Segundos durante los que cada indicador se considera fresco: cambian en
+# escalas de horas (Fear & Greed se publica una vez al día)
+DEFAULT_TTLS = {
+    'btc_dominance': 3600,
+    'fear_greed': 3600,
+    'market_cap': 900,
+    'stablecoin_flow': 1800,
+    'btc_stability': 60,
+}
+
+# Un valor más viejo que esto no se sirve ni siquiera como stale
+MAX_STALE = 24 * 3600
+
+# La estabilidad de BTC es un filtro intradía: un valor de horas atrás no
+# dice nada de si BTC se está desplomando ahora
+BTC_STABILITY_MAX_STALE = 5 * 60
+
+# Últimos valores conocidos para arrancar en frío sin esperar a las APIs
+CACHE_FILE = os.getenv('MARKET_REGIME_CACHE_FILE', os.path.join('data', 'market_regime_cache.json'))
+
 class MarketRegimeDetector:
     """Detecta el régimen del mercado crypto y aplica filtros macro"""
     
-    def __init__(self):
+    def __init__(self, ttls: Optional[Dict[str, float]] = None,
+                 cache: Optional[StaleWhileRevalidateCache] = None):
         self.binance_api = "https://api.binance.com/api/v3"
         self.coingecko_api = "https://api.coingecko.com/api/v3"
         
@@ -25,45 +50,38 @@ class MarketRegimeDetector:
         self.fear_greed_bullish = 60       # Above = Bullish sentiment
         self.fear_greed_bearish = 30       # Below = Bearish sentiment
         
-        # Cache for expensive API calls
-        self.cache = {}
-        self.cache_duration = 300  # 5 minutes
+        # Cache for expensive API calls: stale-while-revalidate, shared by all detectors
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.cache = cache if cache is not None else get_macro_cache()
+        self.coalescer = get_request_coalescer()
+    
+    async def _get_json(self, url: str, params: Optional[Dict] = None, timeout: float = 10.0):
+        """GET con el cliente compartido; lanza si la respuesta no es 200"""
+        client = get_httpx_client()
+        response = await client.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _get_coingecko_global(self) -> Dict:
+        """/global de CoinGecko (dominancia y market cap comparten una sola petición)"""
+        url = f"{self.coingecko_api}/global"
+        data = await self.coalescer.call_async(('coingecko_global', url), lambda: self._get_json(url))
+        return data['data']
         
     async def get_btc_dominance(self) -> float:
         """
         Obtener dominancia de Bitcoin
         <55% = Temporada de altcoins favorable
         """
-        cache_key = "btc_dominance"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            if (datetime.now() - cached_data['timestamp']).seconds < self.cache_duration:
-                return cached_data['value']
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.coingecko_api}/global",
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    btc_dominance = data['data']['market_cap_percentage']['btc']
-                    
-                    # Cache the result
-                    self.cache[cache_key] = {
-                        'value': btc_dominance,
-                        'timestamp': datetime.now()
-                    }
-                    
-                    return btc_dominance
-        except Exception as e:
-            logger.error(f"Error getting BTC dominance: {e}")
-        
-        # Default fallback
-        return 45.0  # Assume neutral dominance
+        return await self.cache.get(
+            'btc_dominance', self._fetch_btc_dominance, self.ttls['btc_dominance'],
+            fallback=45.0,  # Assume neutral dominance
+            max_stale=MAX_STALE
+        )
+    
+    async def _fetch_btc_dominance(self) -> float:
+        data = await self._get_coingecko_global()
+        return data['market_cap_percentage']['btc']
     
     async def get_fear_greed_index(self) -> Dict:
         """
@@ -71,83 +89,41 @@ class MarketRegimeDetector:
         >60 = Momentum alcista
         <30 = Miedo extremo
         """
-        cache_key = "fear_greed"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            if (datetime.now() - cached_data['timestamp']).seconds < self.cache_duration:
-                return cached_data['value']
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://api.alternative.me/fng/",
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    fear_greed = {
-                        'value': int(data['data'][0]['value']),
-                        'classification': data['data'][0]['value_classification']
-                    }
-                    
-                    # Cache the result
-                    self.cache[cache_key] = {
-                        'value': fear_greed,
-                        'timestamp': datetime.now()
-                    }
-                    
-                    return fear_greed
-        except Exception as e:
-            logger.error(f"Error getting Fear & Greed index: {e}")
-        
-        # Default fallback
-        return {'value': 50, 'classification': 'Neutral'}
+        return await self.cache.get(
+            'fear_greed', self._fetch_fear_greed_index, self.ttls['fear_greed'],
+            fallback={'value': 50, 'classification': 'Neutral'},
+            max_stale=MAX_STALE
+        )
+    
+    async def _fetch_fear_greed_index(self) -> Dict:
+        data = await self._get_json("https://api.alternative.me/fng/")
+        return {
+            'value': int(data['data'][0]['value']),
+            'classification': data['data'][0]['value_classification']
+        }
     
     async def get_total_market_cap(self) -> Dict:
         """
         Obtener capitalización total del mercado crypto
         Detectar si está creciendo o decreciendo
         """
-        cache_key = "market_cap"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            if (datetime.now() - cached_data['timestamp']).seconds < self.cache_duration:
-                return cached_data['value']
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.coingecko_api}/global",
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    data = response.json()['data']
-                    market_cap = {
-                        'total_market_cap': data['total_market_cap']['usd'],
-                        'total_volume': data['total_volume']['usd'],
-                        'market_cap_change_24h': data['market_cap_change_percentage_24h_usd'],
-                        'trending': "UP" if data['market_cap_change_percentage_24h_usd'] > 0 else "DOWN"
-                    }
-                    
-                    # Cache the result
-                    self.cache[cache_key] = {
-                        'value': market_cap,
-                        'timestamp': datetime.now()
-                    }
-                    
-                    return market_cap
-        except Exception as e:
-            logger.error(f"Error getting market cap: {e}")
-        
-        # Default fallback
+        return await self.cache.get(
+            'market_cap', self._fetch_total_market_cap, self.ttls['market_cap'],
+            fallback={
+                'total_market_cap': 2_000_000_000_000,  # $2T
+                'market_cap_change_24h': 0,
+                'trending': "NEUTRAL"
+            },
+            max_stale=MAX_STALE
+        )
+    
+    async def _fetch_total_market_cap(self) -> Dict:
+        data = await self._get_coingecko_global()
         return {
-            'total_market_cap': 2_000_000_000_000,  # $2T
-            'market_cap_change_24h': 0,
-            'trending': "NEUTRAL"
+            'total_market_cap': data['total_market_cap']['usd'],
+            'total_volume': data['total_volume']['usd'],
+            'market_cap_change_24h': data['market_cap_change_percentage_24h_usd'],
+            'trending': "UP" if data['market_cap_change_percentage_24h_usd'] > 0 else "DOWN"
         }
     
     async def get_stablecoin_flow(self) -> Dict:
@@ -155,44 +131,39 @@ class MarketRegimeDetector:
         Detectar flujo de stablecoins (USDT, USDC)
         Market cap creciendo = Entrada de dinero nuevo
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                # Get USDT market cap
-                response = await client.get(
-                    f"{self.coingecko_api}/coins/tether",
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    usdt_cap = data['market_data']['market_cap']['usd']
-                    usdt_change = data['market_data']['market_cap_change_percentage_24h']
-                    
-                    # Determine flow direction
-                    if usdt_change > 0.5:
-                        flow = "INFLOW"
-                        signal = "BULLISH"
-                    elif usdt_change < -0.5:
-                        flow = "OUTFLOW"
-                        signal = "BEARISH"
-                    else:
-                        flow = "NEUTRAL"
-                        signal = "NEUTRAL"
-                    
-                    return {
-                        'usdt_market_cap': usdt_cap,
-                        'usdt_change_24h': usdt_change,
-                        'flow_direction': flow,
-                        'signal': signal
-                    }
-        except Exception as e:
-            logger.error(f"Error getting stablecoin flow: {e}")
+        return await self.cache.get(
+            'stablecoin_flow', self._fetch_stablecoin_flow, self.ttls['stablecoin_flow'],
+            fallback={
+                'usdt_market_cap': 100_000_000_000,  # $100B
+                'usdt_change_24h': 0,
+                'flow_direction': "NEUTRAL",
+                'signal': "NEUTRAL"
+            },
+            max_stale=MAX_STALE
+        )
+    
+    async def _fetch_stablecoin_flow(self) -> Dict:
+        # Get USDT market cap
+        data = await self._get_json(f"{self.coingecko_api}/coins/tether")
+        usdt_cap = data['market_data']['market_cap']['usd']
+        usdt_change = data['market_data']['market_cap_change_percentage_24h']
+        
+        # Determine flow direction
+        if usdt_change > 0.5:
+            flow = "INFLOW"
+            signal = "BULLISH"
+        elif usdt_change < -0.5:
+            flow = "OUTFLOW"
+            signal = "BEARISH"
+        else:
+            flow = "NEUTRAL"
+            signal = "NEUTRAL"
         
         return {
-            'usdt_market_cap': 100_000_000_000,  # $100B
-            'usdt_change_24h': 0,
-            'flow_direction': "NEUTRAL",
-            'signal': "NEUTRAL"
+            'usdt_market_cap': usdt_cap,
+            'usdt_change_24h': usdt_change,
+            'flow_direction': flow,
+            'signal': signal
         }
     
     async def detect_market_regime(self) -> Dict:
@@ -270,11 +241,15 @@ class MarketRegimeDetector:
             'timestamp': datetime.now().isoformat()
         }
     
-    async def should_trade(self, aggressive: bool = False) -> Dict:
+    async def should_trade(self, aggressive: bool = False, regime: Optional[Dict] = None) -> Dict:
         """
         Determinar si las condiciones macro son favorables para operar
+        
+        Args:
+            regime: resultado de detect_market_regime si el llamador ya lo tiene
         """
-        regime = await self.detect_market_regime()
+        if regime is None:
+            regime = await self.detect_market_regime()
         
         # Define trading conditions based on regime
         if regime['regime'] == "BULL_MARKET":
@@ -361,7 +336,7 @@ class MarketRegimeDetector:
         Used for pre-trade checks
         """
         regime = await self.detect_market_regime()
-        trading_decision = await self.should_trade(aggressive=False)
+        trading_decision = await self.should_trade(aggressive=False, regime=regime)
         
         # Create simple filter checks
         all_filters = {
@@ -389,23 +364,32 @@ class MarketRegimeDetector:
         Check if BTC is stable (not dumping)
         BTC volatility affects entire market
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.binance_api}/ticker/24hr",
-                    params={"symbol": "BTCUSDT"},
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    change_24h = float(data['priceChangePercent'])
-                    
-                    # BTC is stable if not dropping more than 3%
-                    return change_24h > -3.0
-        except Exception as e:
-            logger.error(f"Error checking BTC stability: {e}")
+        return await self.cache.get(
+            'btc_stability', self._fetch_btc_stability, self.ttls['btc_stability'],
+            fallback=True,  # Assume stable if can't check
+            max_stale=BTC_STABILITY_MAX_STALE
+        )
+    
+    async def _fetch_btc_stability(self) -> bool:
+        data = await self._get_json(
+            f"{self.binance_api}/ticker/24hr",
+            params={"symbol": "BTCUSDT"},
+            timeout=5.0
+        )
+        change_24h = float(data['priceChangePercent'])
         
-        return True  # Assume stable if can't check
+        # BTC is stable if not dropping more than 3%
+        return change_24h > -3.0
+
+# Instancia global de la caché macro (compartida por todos los detectores)
+_macro_cache = None
+
+def get_macro_cache() -> StaleWhileRevalidateCache:
+    """Obtiene la caché global de indicadores macro"""
+    global _macro_cache
+    if _macro_cache is None:
+        _macro_cache = StaleWhileRevalidateCache(path=CACHE_FILE)
+    return _macro_cache
 
 # Testing
 async def test_market_regime():
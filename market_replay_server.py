@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+===========================================
+SERVIDOR LOCAL DE REPLAY DEL STREAM DE BINANCE
+===========================================
+
+Servidor WebSocket que imita el endpoint de streams combinados de Binance
+(/stream?streams=a/b/c) y reproduce eventos grabados o sintéticos. Sirve
+para probar BinanceMarketStream sin red y para repetir sesiones de
+mercado a partir del almacén local de klines.
+
+Cada cliente recibe, en orden, los eventos de los streams que pidió; la
+conexión queda abierta al terminar (como el exchange) hasta stop().
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+def kline_event(symbol: str, interval: str, kline: Sequence, closed: bool = True) -> Dict:
+    """Evento combinado <símbolo>@kline_<intervalo> a partir de una kline REST"""
+    symbol = symbol.upper()
+    return {
+        'stream': f"{symbol.lower()}@kline_{interval}",
+        'data': {
+            'e': 'kline',
+            'E': int(kline[6]) if closed else int(kline[0]),
+            's': symbol,
+            'k': {
+                't': int(kline[0]),
+                'T': int(kline[6]),
+                's': symbol,
+                'i': interval,
+                'o': str(kline[1]),
+                'h': str(kline[2]),
+                'l': str(kline[3]),
+                'c': str(kline[4]),
+                'v': str(kline[5]),
+                'x': closed,
+            },
+        },
+    }
+
+
+def book_ticker_event(symbol: str, bid: float, bid_qty: float, ask: float, ask_qty: float,
+                      update_id: int = 0) -> Dict:
+    """Evento combinado <símbolo>@bookTicker"""
+    symbol = symbol.upper()
+    return {
+        'stream': f"{symbol.lower()}@bookTicker",
+        'data': {'u': update_id, 's': symbol, 'b': str(bid), 'B': str(bid_qty),
+                 'a': str(ask), 'A': str(ask_qty)},
+    }
+
+
+def depth_update_event(symbol: str, first_update_id: int, final_update_id: int,
+                       bids: Iterable[Sequence] = (), asks: Iterable[Sequence] = (),
+                       event_time: Optional[int] = None) -> Dict:
+    """Evento combinado <símbolo>@depth@100ms (cantidad 0 elimina el nivel)"""
+    symbol = symbol.upper()
+    return {
+        'stream': f"{symbol.lower()}@depth@100ms",
+        'data': {
+            'e': 'depthUpdate',
+            'E': event_time if event_time is not None else int(time.time() * 1000),
+            's': symbol,
+            'U': first_update_id,
+            'u': final_update_id,
+            'b': [[str(price), str(qty)] for price, qty in bids],
+            'a': [[str(price), str(qty)] for price, qty in asks],
+        },
+    }
+
+
+class MarketReplayServer:
+    """Reproduce eventos del stream combinado en un puerto local"""
+
+    def __init__(self, events: Iterable[Dict] = (), delay: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            events: eventos combinados ({'stream': ..., 'data': ...}) en orden
+            delay: pausa entre eventos (segundos)
+        """
+        self.events: List[Dict] = list(events)
+        self.delay = delay
+        self.host = host
+        self.port = port
+        self._server = None
+        self.stats = {'connections': 0, 'sent': 0}
+
+    def add_klines(self, symbol: str, interval: str, klines: Iterable[Sequence],
+                   last_open: bool = False):
+        """Añade klines REST como eventos (la última en formación si last_open)"""
+        klines = list(klines)
+        for i, kline in enumerate(klines):
+            closed = not (last_open and i == len(klines) - 1)
+            self.events.append(kline_event(symbol, interval, kline, closed))
+
+    def add_book_ticker(self, symbol: str, bid: float, bid_qty: float, ask: float, ask_qty: float):
+        self.events.append(book_ticker_event(symbol, bid, bid_qty, ask, ask_qty,
+                                             update_id=len(self.events)))
+
+    def add_depth_update(self, symbol: str, first_update_id: int, final_update_id: int,
+                         bids: Iterable[Sequence] = (), asks: Iterable[Sequence] = ()):
+        self.events.append(depth_update_event(symbol, first_update_id, final_update_id, bids, asks))
+
+    @property
+    def url(self) -> str:
+        """Base para BinanceMarketStream(base_url=...)"""
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Servidor de replay escuchando en {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, websocket, path: Optional[str] = None):
+        path = path or websocket.path
+        query = parse_qs(urlparse(path).query)
+        streams = set(query.get('streams', [''])[0].split('/'))
+        self.stats['connections'] += 1
+
+        for event in self.events:
+            if event['stream'] not in streams:
+                continue
+            await websocket.send(json.dumps(event))
+            self.stats['sent'] += 1
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+        # Mantener la conexión abierta como el exchange
+        await websocket.wait_closed()
+
+
+def synthetic_klines(count: int, start_price: float = 100.0, interval_ms: int = 60_000,
+                     start_time: Optional[int] = None) -> List[list]:
+    """Klines REST deterministas para tests y demos"""
+    start_time = start_time if start_time is not None else \
+        (int(time.time() * 1000) // interval_ms - count) * interval_ms
+    klines = []
+    price = start_price
+    for i in range(count):
+        open_price = price
+        price = open_price * (1.001 if i % 3 else 0.999)
+        open_time = start_time + i * interval_ms
+        klines.append([open_time, open_price, max(open_price, price) * 1.0005,
+                       min(open_price, price) * 0.9995, price, 10.0 + i,
+                       open_time + interval_ms - 1])
+    return klines
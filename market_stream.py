@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+===========================================
+STREAM DE MERCADO EN TIEMPO REAL (WEBSOCKET)
+===========================================
+
+Consume los streams combinados de Binance (<símbolo>@kline_<intervalo> y
+<símbolo>@bookTicker) y mantiene en memoria un buffer circular NumPy de
+tamaño fijo por (símbolo, intervalo), en lugar de sondear la API REST:
+
+- Cada columna (open_time, open, ..., close_time) vive en un array de
+  2 x capacidad escrito por duplicado, así que las últimas N velas son
+  siempre un slice contiguo: los consumidores reciben vistas sin copia
+  (de solo lectura) en lugar de DataFrames nuevos
+- La vela en formación se sobrescribe en su sitio con cada evento; al
+  cerrarse la siguiente se añade detrás
+- Al conectar (y tras cada reconexión) se rellena el buffer con una sola
+  petición REST por par para cubrir el hueco; después todo llega por el
+  socket y la antigüedad del precio baja a menos de un segundo
+- Si el socket está caído los datos se consideran obsoletos y los
+  consumidores vuelven a REST
+
+Las escrituras ocurren en el event loop del stream; las vistas devueltas
+reflejan las escrituras posteriores, así que quien necesite una foto
+estable debe copiarla.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from binance_api_optimized import BinanceConfig
+from candles import Candles
+from kline_store import COLUMNS, interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Velas por (símbolo, intervalo); coincide con el máximo de /klines
+DEFAULT_CAPACITY = BinanceConfig.max_klines_limit
+
+# Antigüedad máxima de un precio para darlo por bueno (segundos)
+DEFAULT_MAX_PRICE_AGE = 5.0
+
+# Reconexión con backoff exponencial (segundos)
+DEFAULT_RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+_COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+# fetch(símbolo, intervalo, limit) -> klines crudas de /api/v3/klines
+BackfillFetcher = Callable[[str, str, int], Awaitable[List[list]]]
+
+
+def normalize_symbol(symbol: str) -> str:
+    """'BTC/USDT' -> 'BTCUSDT'"""
+    return symbol.replace('/', '').upper()
+
+
+class CandleRingBuffer:
+    """Buffer circular columnar de velas con vistas contiguas sin copia"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self._head = 0  # posición de la próxima vela nueva
+        self._size = 0
+        self.last_closed = False
+        self.updated_at = 0.0  # time.monotonic() de la última escritura
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        if not self._size:
+            return None
+        return int(self._columns['open_time'][(self._head - 1) % self.capacity])
+
+    @property
+    def last_close(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self._columns['close'][(self._head - 1) % self.capacity])
+
+    def _write(self, slot: int, row: Sequence):
+        mirror = slot + self.capacity
+        for name, value in zip(_COLUMN_NAMES, row):
+            column = self._columns[name]
+            column[slot] = value
+            column[mirror] = value
+
+    def update(self, row: Sequence, closed: bool) -> bool:
+        """
+        Aplica una vela (open_time, open, high, low, close, volume, close_time)
+
+        Returns:
+            False si la vela es más antigua que la última (se ignora)
+        """
+        last_open_time = self.last_open_time
+        open_time = int(row[0])
+        if last_open_time is not None and open_time < last_open_time:
+            return False
+
+        if open_time == last_open_time:
+            self._write((self._head - 1) % self.capacity, row)
+        else:
+            self._write(self._head, row)
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+        self.last_closed = closed
+        self.updated_at = time.monotonic()
+        return True
+
+    def seed(self, columns: Dict[str, np.ndarray], last_closed: bool):
+        """
+        Carga velas en bloque (p. ej. de REST) fusionándolas con las actuales
+
+        Las velas recibidas sustituyen a las existentes en su rango de
+        open_time; se conservan las anteriores (hasta llenar la capacidad)
+        y las posteriores, que llegaron por el socket durante la descarga.
+        """
+        count = len(columns['open_time'])
+        if not count:
+            return
+        current = self.view()
+        before = current['open_time'] < columns['open_time'][0]
+        after = current['open_time'] > columns['open_time'][-1]
+        if after.any():
+            last_closed = self.last_closed
+        merged = {name: np.concatenate([current[name][before], np.asarray(columns[name]),
+                                        current[name][after]])[-self.capacity:]
+                  for name in _COLUMN_NAMES}
+
+        size = len(merged['open_time'])
+        for name in _COLUMN_NAMES:
+            column = self._columns[name]
+            column[:size] = merged[name]
+            column[self.capacity:self.capacity + size] = merged[name]
+        self._size = size
+        self._head = size % self.capacity
+        self.last_closed = last_closed
+        self.updated_at = time.monotonic()
+
+    def view(self, n: Optional[int] = None, closed_only: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Últimas n velas (todas si n es None) como vistas de solo lectura
+
+        Args:
+            closed_only: excluir la vela en formación
+        """
+        end = self._head + self.capacity
+        size = self._size
+        if closed_only and size and not self.last_closed:
+            end -= 1
+            size -= 1
+        n = size if n is None else max(0, min(n, size))
+
+        views = {}
+        for name in _COLUMN_NAMES:
+            view = self._columns[name][end - n:end]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+
+class BinanceMarketStream:
+    """Ingesta de klines y bookTicker por WebSocket hacia buffers en memoria"""
+
+    def __init__(self, symbols: Iterable[str], intervals: Iterable[str] = ('1m',),
+                 capacity: int = DEFAULT_CAPACITY, book_ticker: bool = True,
+                 base_url: str = BinanceConfig.stream_base, backfill: bool = True,
+                 fetcher: Optional[BackfillFetcher] = None,
+                 reconnect_delay: float = DEFAULT_RECONNECT_DELAY):
+        self.symbols = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+        self.intervals = list(dict.fromkeys(intervals))
+        for interval in self.intervals:
+            interval_to_ms(interval)  # valida el intervalo
+        self.capacity = capacity
+        self.book_ticker = book_ticker
+        self.base_url = base_url.rstrip('/')
+        self.backfill_enabled = backfill
+        self._fetcher = fetcher
+        self.reconnect_delay = reconnect_delay
+
+        self.buffers: Dict[Tuple[str, str], CandleRingBuffer] = {
+            (symbol, interval): CandleRingBuffer(capacity)
+            for symbol in self.symbols for interval in self.intervals
+        }
+        # símbolo -> (bid, bid_qty, ask, ask_qty, time.monotonic())
+        self.book_tickers: Dict[str, Tuple[float, float, float, float, float]] = {}
+
+        self.connected = False
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._ws = None
+        # Pares con el histórico REST ya fusionado en la conexión actual
+        self._synced: Set[Tuple[str, str]] = set()
+
+        self.stats = {'messages': 0, 'kline_updates': 0, 'book_updates': 0,
+                      'ignored': 0, 'connections': 0, 'reconnects': 0,
+                      'backfills': 0, 'errors': 0}
+
+    # ===========================================
+    # CONEXIÓN
+    # ===========================================
+
+    def stream_names(self) -> List[str]:
+        names = [f"{symbol.lower()}@kline_{interval}"
+                 for symbol in self.symbols for interval in self.intervals]
+        if self.book_ticker:
+            names += [f"{symbol.lower()}@bookTicker" for symbol in self.symbols]
+        return names
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/stream?streams={'/'.join(self.stream_names())}"
+
+    async def start(self):
+        """Arranca la ingesta en segundo plano en el loop actual"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📡 Stream de mercado iniciado: {len(self.symbols)} símbolos, "
+                    f"intervalos {', '.join(self.intervals)}")
+
+    async def stop(self):
+        """Cierra el socket y detiene la ingesta"""
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
+        backfill_task = self._cancel_backfill()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if backfill_task is not None:
+            await asyncio.gather(backfill_task, return_exceptions=True)
+        self.connected = False
+
+    def _cancel_backfill(self) -> Optional[asyncio.Task]:
+        """Cancela el backfill en curso (la conexión a la que pertenecía terminó)"""
+        task, self._backfill_task = self._backfill_task, None
+        if task is not None and not task.done():
+            task.cancel()
+        return task
+
+    async def _run(self):
+        import websockets
+
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                async with websockets.connect(self.url, ping_interval=20,
+                                              max_size=2 ** 22) as ws:
+                    self._ws = ws
+                    self._synced.clear()
+                    self.connected = True
+                    self.stats['connections'] += 1
+                    delay = self.reconnect_delay
+                    if self.backfill_enabled:
+                        # Cubrir el hueco sin bloquear la lectura del socket;
+                        # hasta que termine, has_klines sigue siendo False
+                        self._backfill_task = asyncio.create_task(self.backfill())
+                    else:
+                        self._synced.update(self.buffers)
+                    async for message in ws:
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning(f"⚠️ Stream de mercado desconectado: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+                self._synced.clear()
+                self._cancel_backfill()
+
+            if self._running:
+                self.stats['reconnects'] += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def backfill(self):
+        """
+        Rellena todos los buffers con una petición REST por (símbolo, intervalo)
+
+        Solo los pares rellenados sin error pasan a servir velas (has_klines).
+        """
+        fetcher = self._fetcher
+        if fetcher is None:
+            from market_data_gateway import get_market_data_gateway
+            fetcher = get_market_data_gateway().get_klines_raw
+
+        pairs = list(self.buffers)
+        results = await asyncio.gather(
+            *(fetcher(symbol, interval, self.capacity) for symbol, interval in pairs),
+            return_exceptions=True
+        )
+        now_ms = int(time.time() * 1000)
+        for (symbol, interval), klines in zip(pairs, results):
+            if isinstance(klines, Exception):
+                logger.error(f"Error rellenando {symbol} {interval}: {klines}")
+                continue
+            if klines:
+                self.buffers[(symbol, interval)].seed(Candles.from_klines(klines).columns(),
+                                                      last_closed=int(klines[-1][6]) < now_ms)
+            self._synced.add((symbol, interval))
+        self.stats['backfills'] += 1
+
+    # ===========================================
+    # INGESTA
+    # ===========================================
+
+    def handle_message(self, message) -> bool:
+        """Aplica un mensaje del stream combinado (str/bytes o dict ya decodificado)"""
+        self.stats['messages'] += 1
+        try:
+            if isinstance(message, (str, bytes)):
+                message = json.loads(message)
+            data = message.get('data', message)
+
+            if data.get('e') == 'kline':
+                k = data['k']
+                buffer = self.buffers.get((k['s'], k['i']))
+                if buffer is not None and buffer.update(
+                        (k['t'], float(k['o']), float(k['h']), float(k['l']),
+                         float(k['c']), float(k['v']), k['T']), closed=k['x']):
+                    self.stats['kline_updates'] += 1
+                    return True
+
+            elif 'b' in data and 'a' in data and 's' in data:
+                # bookTicker no lleva campo 'e'
+                self.book_tickers[data['s']] = (float(data['b']), float(data['B']),
+                                                float(data['a']), float(data['A']),
+                                                time.monotonic())
+                self.stats['book_updates'] += 1
+                return True
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Mensaje de stream inválido: {e}")
+            return False
+
+        self.stats['ignored'] += 1
+        return False
+
+    # ===========================================
+    # LECTURA
+    # ===========================================
+
+    def get_candles(self, symbol: str, interval: str, n: Optional[int] = None,
+                    closed_only: bool = False) -> Optional[Candles]:
+        """Últimas n velas como Candles sobre vistas sin copia, o None si no se sigue el par"""
+        buffer = self.buffers.get((normalize_symbol(symbol), interval))
+        if buffer is None:
+            return None
+        return Candles.from_columns(buffer.view(n, closed_only), symbol, interval)
+
+    def has_klines(self, symbol: str, interval: str, limit: int) -> bool:
+        """
+        Hay al menos limit velas al día: socket conectado y, tras cada
+        (re)conexión, el backfill del par ya terminado (sin huecos)
+        """
+        key = (normalize_symbol(symbol), interval)
+        buffer = self.buffers.get(key)
+        return (self.connected and key in self._synced and
+                buffer is not None and len(buffer) >= limit)
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> pd.DataFrame:
+        """
+        Velas como DataFrame OHLCV (mismo formato que la API REST)
+
+        Vacío si el par no se sigue, el socket está caído o no hay
+        suficientes velas; en ese caso el llamador debe usar REST.
+        """
+        if not self.has_klines(symbol, interval, limit):
+            return pd.DataFrame()
+        # Copia: el buffer se sigue escribiendo por debajo de las vistas
+        return self.get_candles(symbol, interval, limit).copy().to_frame()
+
+    def get_price(self, symbol: str, max_age: float = DEFAULT_MAX_PRICE_AGE) -> Optional[float]:
+        """
+        Último precio si tiene menos de max_age segundos
+
+        Usa el cierre de la vela en formación (último trade) y, si no es
+        reciente, el punto medio del bookTicker.
+        """
+        if not self.connected:
+            return None
+        symbol = normalize_symbol(symbol)
+        now = time.monotonic()
+
+        freshest = None
+        for interval in self.intervals:
+            buffer = self.buffers.get((symbol, interval))
+            if buffer is not None and len(buffer) and \
+                    (freshest is None or buffer.updated_at > freshest.updated_at):
+                freshest = buffer
+        if freshest is not None and now - freshest.updated_at <= max_age:
+            return freshest.last_close
+
+        book = self.book_tickers.get(symbol)
+        if book is not None and now - book[4] <= max_age:
+            return (book[0] + book[2]) / 2
+        return None
+
+    def get_book_ticker(self, symbol: str) -> Optional[Dict]:
+        """Mejor bid/ask actual del símbolo"""
+        book = self.book_tickers.get(normalize_symbol(symbol))
+        if book is None:
+            return None
+        bid, bid_qty, ask, ask_qty, updated_at = book
+        return {'bid': bid, 'bid_qty': bid_qty, 'ask': ask, 'ask_qty': ask_qty,
+                'age': time.monotonic() - updated_at}
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['connected'] = self.connected
+        stats['pairs'] = len(self.buffers)
+        return stats
+
+
+# Instancia global (solo existe si alguien arrancó el stream)
+_market_stream: Optional[BinanceMarketStream] = None
+
+
+def get_market_stream() -> Optional[BinanceMarketStream]:
+    """Stream global en marcha, o None si no se arrancó"""
+    return _market_stream
+
+
+async def start_market_stream(symbols: Iterable[str], intervals: Iterable[str] = ('1m',),
+                              **kwargs) -> BinanceMarketStream:
+    """Crea y arranca el stream global (reemplaza al anterior si lo había)"""
+    global _market_stream
+    if _market_stream is not None:
+        await _market_stream.stop()
+    _market_stream = BinanceMarketStream(symbols, intervals, **kwargs)
+    await _market_stream.start()
+    return _market_stream
+
+
+async def stop_market_stream():
+    """Detiene el stream global"""
+    global _market_stream
+    if _market_stream is not None:
+        await _market_stream.stop()
+        _market_stream = None
@@ -11,6 +11,7 @@ import pandas as pd
 import numpy as np
 from binance_integration import BinanceConnector
 from enhanced_trading_config import get_enhanced_config
+from streaming_indicators import get_streaming_store
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ class MultiTimeframeAnalyzer:
     def __init__(self):
         self.connector = BinanceConnector(use_optimized=True)
         self.config = get_enhanced_config()
+        self.indicator_store = get_streaming_store()  # RSI/MACD/ATR incrementales
         
         # Timeframes para análisis completo
         self.timeframes = {
@@ -43,7 +45,7 @@ class MultiTimeframeAnalyzer:
             # Análisis técnico por timeframe
             tf_analysis = {}
             for tf_name, data in timeframe_data.items():
-                tf_analysis[tf_name] = self.analyze_timeframe(data, tf_name)
+                tf_analysis[tf_name] = self.analyze_timeframe(data, tf_name, symbol)
             
             # Consolidar análisis
             consolidated = self.consolidate_analysis(tf_analysis, symbol)
@@ -80,19 +82,25 @@ class MultiTimeframeAnalyzer:
         
         return results
     
-    def analyze_timeframe(self, data: pd.DataFrame, tf_name: str) -> Dict:
+    def analyze_timeframe(self, data: pd.DataFrame, tf_name: str, symbol: Optional[str] = None) -> Dict:
         """Análisis técnico de un timeframe específico"""
         if data.empty:
             return {}
         
         try:
+            # Con símbolo conocido, los indicadores avanzan solo con las velas nuevas
+            latest = {}
+            if symbol:
+                timeframe = self.timeframes.get(tf_name, tf_name)
+                latest = self.indicator_store.sync(symbol, timeframe, data)
+            
             analysis = {
                 'timeframe': tf_name,
                 'trend': self.detect_trend(data),
-                'momentum': self.analyze_momentum(data),
+                'momentum': self.analyze_momentum(data, latest),
                 'support_resistance': self.find_support_resistance(data),
                 'volume_analysis': self.analyze_volume(data),
-                'volatility': self.calculate_volatility(data),
+                'volatility': self.calculate_volatility(data, latest),
                 'signals': self.generate_tf_signals(data)
             }
             
@@ -136,17 +144,23 @@ class MultiTimeframeAnalyzer:
             logger.error(f"Error detectando tendencia: {e}")
             return {'direction': 'NEUTRAL', 'strength': 50}
     
-    def analyze_momentum(self, data: pd.DataFrame) -> Dict:
+    def analyze_momentum(self, data: pd.DataFrame, latest: Optional[Dict] = None) -> Dict:
         """Análisis de momentum con RSI y MACD"""
         try:
-            # RSI
-            rsi = self.calculate_rsi(data['close'])
-            current_rsi = rsi.iloc[-1]
-            
-            # MACD
-            macd_line, signal_line, histogram = self.calculate_macd(data['close'])
-            macd_current = macd_line.iloc[-1]
-            signal_current = signal_line.iloc[-1]
+            if latest:
+                # Valores del estado incremental
+                current_rsi = latest['RSI']
+                macd_current = latest['MACD']
+                signal_current = latest['MACD_Signal']
+            else:
+                # RSI
+                rsi = self.calculate_rsi(data['close'])
+                current_rsi = rsi.iloc[-1]
+                
+                # MACD
+                macd_line, signal_line, histogram = self.calculate_macd(data['close'])
+                macd_current = macd_line.iloc[-1]
+                signal_current = signal_line.iloc[-1]
             
             # Evaluación de momentum
             if current_rsi > 70:
@@ -227,12 +241,15 @@ class MultiTimeframeAnalyzer:
             logger.error(f"Error analizando volumen: {e}")
             return {'volume_score': 50}
     
-    def calculate_volatility(self, data: pd.DataFrame) -> Dict:
+    def calculate_volatility(self, data: pd.DataFrame, latest: Optional[Dict] = None) -> Dict:
         """Calcula métricas de volatilidad"""
         try:
             # ATR (Average True Range)
-            atr = self.calculate_atr(data)
-            current_atr = atr.iloc[-1]
+            if latest:
+                current_atr = latest['ATR']
+            else:
+                atr = self.calculate_atr(data)
+                current_atr = atr.iloc[-1]
             
             # Volatilidad basada en retornos
             returns = data['close'].pct_change()
@@ -28,12 +28,12 @@ class NakamotoPhilosopher:
     - "Los indicadores tradicionales son para mercados tradicionales"
     """
     
-    def __init__(self):
+    def __init__(self, momentum_detector: CryptoMomentumDetector = None):
         self.name = "Nakamoto"
         self.style = "CRYPTO_NATIVE"
         
         # Initialize crypto-native analyzers
-        self.momentum_detector = CryptoMomentumDetector()
+        self.momentum_detector = momentum_detector or CryptoMomentumDetector()
         self.correlation_analyzer = CorrelationAnalyzer()
         self.market_regime = MarketRegimeDetector()
         
@@ -46,9 +46,11 @@ class NakamotoPhilosopher:
             "Funding rates reveal true sentiment"
         ]
     
-    async def analyze(self, symbol: str, current_price: float) -> Dict:
+    async def analyze(self, symbol: str, current_price: float, momentum: Dict = None) -> Dict:
         """
         Análisis crypto-nativo completo
+        
+        momentum: análisis de momentum ya calculado (evita repetirlo)
         """
         # 1. Check macro conditions first
         market_filters = await self.market_regime.get_market_filters()
@@ -67,7 +69,8 @@ class NakamotoPhilosopher:
             }
         
         # 2. Get comprehensive momentum analysis
-        momentum = await self.momentum_detector.get_comprehensive_momentum(symbol)
+        if momentum is None:
+            momentum = await self.momentum_detector.get_comprehensive_momentum(symbol)
         
         # 3. Check rotation and correlation
         money_flow = await self.correlation_analyzer.get_money_flow_map()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+===========================================
+SNAPSHOT VECTORIZADO DEL ORDER BOOK
+===========================================
+
+DepthSnapshot convierte la respuesta de /depth (hasta 5000 niveles de
+strings) una sola vez en dos arrays float64 de forma (n, 2):
+
+    bids: [[precio, cantidad], ...] de mayor a menor precio
+    asks: [[precio, cantidad], ...] de menor a mayor precio
+
+Con las sumas acumuladas de cantidad y nocional por lado, cualquier
+banda de precios se resuelve con dos searchsorted y una resta, en lugar
+de recorrer todo el libro con float() por cada banda. Así los endpoints
+de liquidez multi-símbolo pueden pedir libros más profundos y más a menudo.
+
+DepthAnalyzer resume un DepthSnapshot (órdenes grandes, liquidez por
+distancia, soportes/resistencias) sin dependencias de FastAPI, para que
+los bots lo usen sin importar los módulos que definen la app.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SIDES = ('bids', 'asks')
+
+
+def _levels(levels) -> np.ndarray:
+    """[[precio, cantidad], ...] (strings o números) -> array (n, 2)"""
+    if isinstance(levels, np.ndarray):
+        return np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+    if not len(levels):
+        return np.empty((0, 2))
+    # Algunas respuestas (futuros) traen campos extra por nivel
+    return np.array([level[:2] for level in levels], dtype=np.float64)
+
+
+class DepthSnapshot:
+    """Libro de órdenes como arrays NumPy con sumas acumuladas"""
+
+    __slots__ = ('symbol', 'last_update_id', 'bids', 'asks', '_cumulative')
+
+    def __init__(self, bids, asks, symbol: Optional[str] = None,
+                 last_update_id: Optional[int] = None,
+                 cumulative: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None):
+        """
+        Args:
+            cumulative: Sumas acumuladas ya calculadas por lado (ver _cumsums),
+                p. ej. mantenidas de forma incremental por LocalOrderBook
+        """
+        self.symbol = symbol
+        self.last_update_id = last_update_id
+        self.bids = _levels(bids)
+        self.asks = _levels(asks)
+        self._cumulative: Dict[str, Tuple[np.ndarray, np.ndarray]] = dict(cumulative or {})
+
+    @classmethod
+    def from_depth(cls, depth: Dict, symbol: Optional[str] = None) -> 'DepthSnapshot':
+        """Desde la respuesta de /depth ya decodificada"""
+        return cls(depth.get('bids', ()), depth.get('asks', ()), symbol,
+                   depth.get('lastUpdateId'))
+
+    @classmethod
+    def from_json(cls, payload: Union[bytes, str], symbol: Optional[str] = None) -> 'DepthSnapshot':
+        return cls.from_depth(json.loads(payload), symbol)
+
+    # ===========================================
+    # PRECIOS BÁSICOS
+    # ===========================================
+
+    def __bool__(self) -> bool:
+        return len(self.bids) > 0 and len(self.asks) > 0
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bids[0, 0])
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.asks[0, 0])
+
+    @property
+    def mid_price(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    def top(self, levels: int) -> 'DepthSnapshot':
+        """Los primeros niveles de cada lado (vistas, sin copia)"""
+        return DepthSnapshot(self.bids[:levels], self.asks[:levels], self.symbol,
+                             self.last_update_id)
+
+    def side(self, side: str) -> np.ndarray:
+        if side not in SIDES:
+            raise ValueError(f"Lado inválido: {side}")
+        return getattr(self, side)
+
+    # ===========================================
+    # SUMAS POR BANDA
+    # ===========================================
+
+    def _cumsums(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(cantidad acumulada, nocional acumulado) con un 0 inicial"""
+        cumulative = self._cumulative.get(side)
+        if cumulative is None:
+            levels = self.side(side)
+            zero = np.zeros(1)
+            cumulative = (np.concatenate([zero, np.cumsum(levels[:, 1])]),
+                          np.concatenate([zero, np.cumsum(levels[:, 0] * levels[:, 1])]))
+            self._cumulative[side] = cumulative
+        return cumulative
+
+    def _band_index(self, side: str, low, high) -> Tuple[np.ndarray, np.ndarray]:
+        """Rango [start, end) de niveles con low <= precio <= high"""
+        prices = self.side(side)[:, 0]
+        low = np.asarray(low, dtype=np.float64)
+        high = np.asarray(high, dtype=np.float64)
+        if side == 'asks':
+            return (np.searchsorted(prices, low, side='left'),
+                    np.searchsorted(prices, high, side='right'))
+        # Bids descendentes: buscar sobre los precios negados (ascendentes)
+        negated = -prices
+        return (np.searchsorted(negated, -high, side='left'),
+                np.searchsorted(negated, -low, side='right'))
+
+    def band_sums(self, side: str, low, high) -> Dict[str, np.ndarray]:
+        """
+        Liquidez entre low y high (inclusive) para una o varias bandas
+
+        Returns:
+            Dict con 'quantity', 'notional' y 'orders' (arrays si las bandas
+            son arrays, escalares 0-d si son números)
+        """
+        start, end = self._band_index(side, low, high)
+        end = np.maximum(start, end)
+        cum_quantity, cum_notional = self._cumsums(side)
+        return {
+            'quantity': cum_quantity[end] - cum_quantity[start],
+            'notional': cum_notional[end] - cum_notional[start],
+            'orders': end - start,
+        }
+
+    def depth_within(self, pct, reference: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Cantidad acumulada a menos de pct % del precio de referencia
+
+        Returns:
+            Dict con 'bid_quantity' y 'ask_quantity' (por cada pct)
+        """
+        reference = self.mid_price if reference is None else reference
+        offset = reference * np.asarray(pct, dtype=np.float64) / 100
+        cum_bids, _ = self._cumsums('bids')
+        cum_asks, _ = self._cumsums('asks')
+        bid_end = np.searchsorted(-self.bids[:, 0], -(reference - offset), side='right')
+        ask_end = np.searchsorted(self.asks[:, 0], reference + offset, side='right')
+        return {'bid_quantity': cum_bids[bid_end], 'ask_quantity': cum_asks[ask_end]}
+
+    def total_notional(self, side: str) -> float:
+        return float(self._cumsums(side)[1][-1])
+
+    def imbalance(self, levels: Optional[int] = None, notional: bool = False) -> float:
+        """(bids - asks) / (bids + asks) * 100 sobre los primeros niveles"""
+        column = 1 if notional else 0
+        bid_end = len(self.bids) if levels is None else min(levels, len(self.bids))
+        ask_end = len(self.asks) if levels is None else min(levels, len(self.asks))
+        bid_total = self._cumsums('bids')[column][bid_end]
+        ask_total = self._cumsums('asks')[column][ask_end]
+        total = bid_total + ask_total
+        return float((bid_total - ask_total) / total * 100) if total > 0 else 0.0
+
+    # ===========================================
+    # ÓRDENES GRANDES Y NIVELES
+    # ===========================================
+
+    def large_orders(self, side: str, levels: int = 50,
+                     multiplier: float = 3.0) -> Tuple[np.ndarray, float]:
+        """
+        Niveles con cantidad > multiplier x la media de los primeros levels
+
+        Returns:
+            (array (k, 2) de [precio, cantidad], cantidad media)
+        """
+        book = self.side(side)[:levels]
+        if not len(book):
+            return book, 0.0
+        average = float(book[:, 1].mean())
+        return book[book[:, 1] > average * multiplier], average
+
+    def price_levels(self, side: str, levels: int, decimals: int,
+                     top: int = 5) -> List[Tuple[float, float]]:
+        """
+        Agrupa los primeros niveles por precio redondeado
+
+        Returns:
+            [(nivel, cantidad total)] de mayor a menor cantidad; los empates
+            mantienen el orden de aparición en el libro
+        """
+        book = self.side(side)[:levels]
+        if not len(book):
+            return []
+        rounded = np.round(book[:, 0], decimals)
+        unique, first_index, inverse = np.unique(rounded, return_index=True, return_inverse=True)
+        volumes = np.bincount(inverse, weights=book[:, 1])
+        order = np.lexsort((first_index, -volumes))[:top]
+        return [(float(unique[i]), float(volumes[i])) for i in order]
+
+    def grouped_volumes(self, side: str, levels: int, decimals: int) -> np.ndarray:
+        """Cantidad total de cada nivel redondeado (para medias)"""
+        book = self.side(side)[:levels]
+        if not len(book):
+            return np.empty(0)
+        _, inverse = np.unique(np.round(book[:, 0], decimals), return_inverse=True)
+        return np.bincount(inverse, weights=book[:, 1])
+
+
+def price_bands(reference: float, bounds: Sequence[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Bandas relativas [(1.01, 1.015), ...] -> arrays (low, high) absolutos"""
+    factors = np.asarray(bounds, dtype=np.float64) * reference
+    return factors.min(axis=1), factors.max(axis=1)
+
+
+class DepthAnalyzer:
+    """Análisis de liquidez de un libro (REST o réplica local)"""
+
+    def analyze_depth(self, depth: DepthSnapshot) -> Dict:
+        """Análisis completo de un libro (REST o réplica local)"""
+        bids, asks = depth.bids, depth.asks
+
+        # Detectar órdenes grandes (block orders)
+        current_price = depth.mid_price
+        large_orders = self._detect_large_orders(depth, current_price)
+
+        # Calcular imbalance
+        imbalance = depth.imbalance(levels=20)
+
+        # Calcular spreads en diferentes niveles
+        spread_1 = ((asks[0, 0] - bids[0, 0]) / current_price) * 100
+        spread_10 = ((asks[9, 0] - bids[9, 0]) / current_price) * 100 if len(bids) > 9 and len(asks) > 9 else spread_1
+
+        return {
+            "current_price": current_price,
+            "imbalance": imbalance,
+            "spread_bps": float(spread_1) * 100,  # basis points
+            "spread_10_level": float(spread_10) * 100,
+            "large_orders": large_orders,
+            "liquidity_score": self._calculate_liquidity_score(depth, current_price),
+            "support_levels": self._find_support_resistance(depth, current_price, "support"),
+            "resistance_levels": self._find_support_resistance(depth, current_price, "resistance"),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _detect_large_orders(self, depth: DepthSnapshot, current_price: float) -> Dict:
+        """Detecta órdenes grandes (block orders) que pueden mover el precio"""
+
+        # Umbral para considerar una orden como "grande" (3x el promedio de los 50 mejores niveles)
+        large_bids, avg_bid_volume = depth.large_orders("bids", levels=50, multiplier=3)
+        large_asks, avg_ask_volume = depth.large_orders("asks", levels=50, multiplier=3)
+
+        def describe(orders: np.ndarray, distance: np.ndarray) -> List[Dict]:
+            return [
+                {"price": price, "volume": volume, "distance_pct": distance_pct, "usd_value": price * volume}
+                for (price, volume), distance_pct in zip(orders.tolist(), distance.tolist())
+            ]
+
+        large_orders = {
+            "large_bids": describe(large_bids, (current_price - large_bids[:, 0]) / current_price * 100),
+            "large_asks": describe(large_asks, (large_asks[:, 0] - current_price) / current_price * 100),
+            "total_large_bid_volume": float(large_bids[:, 1].sum()),
+            "total_large_ask_volume": float(large_asks[:, 1].sum()),
+        }
+
+        # Determinar actividad whale
+        total_large_volume = large_orders["total_large_bid_volume"] + large_orders["total_large_ask_volume"]
+        large_orders["whale_activity"] = bool(total_large_volume > (avg_bid_volume + avg_ask_volume) * 10)
+
+        return large_orders
+
+    def _calculate_liquidity_score(self, depth: DepthSnapshot, current_price: float) -> Dict:
+        """Calcula score de liquidez en diferentes niveles de precio"""
+
+        # Calcular liquidez en diferentes porcentajes del precio actual
+        levels = [0.5, 1.0, 2.0, 5.0]  # 0.5%, 1%, 2%, 5% del precio
+
+        # Cantidad acumulada de bids por encima y asks por debajo de cada umbral
+        within = depth.depth_within(levels, reference=current_price)
+
+        liquidity_at_levels = {}
+
+        for level_pct, bid_liquidity, ask_liquidity in zip(levels, within["bid_quantity"].tolist(),
+                                                           within["ask_quantity"].tolist()):
+            liquidity_at_levels[f"{level_pct}%"] = {
+                "bid_liquidity": bid_liquidity,
+                "ask_liquidity": ask_liquidity,
+                "total_liquidity": bid_liquidity + ask_liquidity,
+                "imbalance": (bid_liquidity - ask_liquidity) / (bid_liquidity + ask_liquidity + 0.00001) * 100
+            }
+
+        return liquidity_at_levels
+
+    def _find_support_resistance(self, depth: DepthSnapshot, current_price: float, order_type: str) -> List:
+        """Encuentra niveles de soporte/resistencia basados en concentración de órdenes"""
+
+        side = "bids" if order_type == "support" else "asks"
+
+        # Redondear precio a niveles significativos
+        if current_price > 1000:
+            decimals = -1  # Redondear a decenas
+        elif current_price > 100:
+            decimals = 0   # Redondear a unidades
+        else:
+            decimals = 2   # Redondear a centavos
+
+        # Agrupar los 30 mejores niveles por precio redondeado
+        grouped = depth.grouped_volumes(side, 30, decimals)
+        strong_volume = grouped.mean() * 2 if len(grouped) else 0.0
+
+        # Devolver top 5 niveles con su distancia del precio actual
+        levels = []
+        for level, volume in depth.price_levels(side, 30, decimals, top=5):
+            distance_pct = abs(level - current_price) / current_price * 100
+
+            levels.append({
+                "price": level,
+                "volume": volume,
+                "distance_pct": distance_pct,
+                "strength": "HIGH" if volume > strong_volume else "MEDIUM"
+            })
+
+        return levels
+
+
+# Instancia global
+_depth_analyzer = None
+
+
+def get_depth_analyzer() -> DepthAnalyzer:
+    """Obtiene el analizador de libros global"""
+    global _depth_analyzer
+    if _depth_analyzer is None:
+        _depth_analyzer = DepthAnalyzer()
+    return _depth_analyzer
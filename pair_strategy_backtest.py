@@ -4,13 +4,12 @@ Backtest del Sistema Optimizado por Par
 Prueba estrategias específicas: Trend Following, Mean Reversion, Momentum, Range Trading
 """
 
-import asyncio
-import httpx
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import json
 
+from parallel_backtest import ParallelBacktestRunner, futures_kline_store, make_jobs, parse_workers
+
 # Misma configuración que pair_optimized_system.py
 PAIR_CONFIG = {
     'BTCUSDT': {
@@ -46,44 +45,6 @@ class PairStrategyBacktest:
         self.max_drawdown = 0
         self.peak_capital = capital
         
-    async def fetch_historical_data(self, symbol: str, interval: str, days: int = 90):
-        """Obtiene datos históricos"""
-        
-        end_time = int(datetime.now().timestamp() * 1000)
-        start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-        
-        all_data = []
-        current_start = start_time
-        
-        async with httpx.AsyncClient() as client:
-            while current_start < end_time:
-                try:
-                    response = await client.get(
-                        'https://fapi.binance.com/fapi/v1/klines',
-                        params={
-                            'symbol': symbol,
-                            'interval': interval,
-                            'startTime': current_start,
-                            'endTime': end_time,
-                            'limit': 1500
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if not data:
-                            break
-                        all_data.extend(data)
-                        current_start = data[-1][0] + 1
-                    else:
-                        break
-                        
-                except Exception as e:
-                    print(f"Error fetching data for {symbol}: {e}")
-                    break
-        
-        return all_data
-    
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calcula todos los indicadores para todas las estrategias"""
         
@@ -485,7 +446,15 @@ class PairStrategyBacktest:
             'avg_confidence': np.mean([t['confidence'] for t in self.trades]) if self.trades else 0
         }
 
-async def main():
+def run_pair_job(job, df: pd.DataFrame):
+    """Trabajo de ParallelBacktestRunner: backtest independiente de un par y timeframe"""
+    if df.empty:
+        return None
+    backtest = PairStrategyBacktest()
+    backtest.run_backtest(df.reset_index(), job.symbol, job.timeframe)
+    return backtest.get_statistics()
+
+def main(workers: int = 1):
     """Ejecuta backtests por estrategia específica"""
     
     print("="*70)
@@ -504,65 +473,49 @@ async def main():
     
     all_results = []
     
-    for symbol in symbols:
-        print(f"\n📊 {symbol}:")
-        print("-" * 50)
-        
-        for interval in intervals:
-            backtest = PairStrategyBacktest()
+    # Velas sincronizadas una vez en este proceso; cada trabajo en su propio proceso
+    runner = ParallelBacktestRunner(run_pair_job, store=futures_kline_store(), workers=workers)
+    results = runner.run(make_jobs(symbols, intervals), days=90)
+    
+    for result in results:
+        symbol, interval = result.job.symbol, result.job.timeframe
+        if interval == intervals[0]:
+            print(f"\n📊 {symbol}:")
+            print("-" * 50)
+        
+        stats = result.result
+        if stats:
+            # Obtener estrategia principal del par
+            config = PAIR_CONFIG[symbol][interval]
+            strategy_name = "TREND_FOLLOWING" if config.get('use_trend_following') else \
+                          "MEAN_REVERSION" if config.get('use_mean_reversion') else \
+                          "MOMENTUM" if config.get('use_momentum') else "STANDARD"
             
-            # Obtener datos
-            data = await backtest.fetch_historical_data(symbol, interval, 90)
+            print(f"\n  {interval} - Estrategia: {strategy_name}")
+            print(f"    Trades: {stats['total_trades']}")
+            print(f"    Win Rate: {stats['win_rate']:.1f}%")
+            print(f"    Return: {stats['total_return']:.2f}%")
+            print(f"    Max DD: {stats['max_drawdown']:.2f}%")
+            print(f"    Final Capital: ${stats['final_capital']:.2f}")
             
-            if data:
-                # Convertir a DataFrame
-                df = pd.DataFrame(data, columns=[
-                    'timestamp', 'open', 'high', 'low', 'close', 
-                    'volume', 'close_time', 'quote_volume', 'trades',
-                    'taker_buy_volume', 'taker_buy_quote', 'ignore'
-                ])
-                
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = df[col].astype(float)
-                
-                # Ejecutar backtest
-                backtest.run_backtest(df, symbol, interval)
-                
-                # Obtener estadísticas
-                stats = backtest.get_statistics()
-                
-                # Obtener estrategia principal del par
-                config = PAIR_CONFIG[symbol][interval]
-                strategy_name = "TREND_FOLLOWING" if config.get('use_trend_following') else \
-                              "MEAN_REVERSION" if config.get('use_mean_reversion') else \
-                              "MOMENTUM" if config.get('use_momentum') else "STANDARD"
-                
-                print(f"\n  {interval} - Estrategia: {strategy_name}")
-                print(f"    Trades: {stats['total_trades']}")
-                print(f"    Win Rate: {stats['win_rate']:.1f}%")
-                print(f"    Return: {stats['total_return']:.2f}%")
-                print(f"    Max DD: {stats['max_drawdown']:.2f}%")
-                print(f"    Final Capital: ${stats['final_capital']:.2f}")
-                
-                # Detalles por estrategia
-                if stats['by_strategy']:
-                    for strat_name, strat_stats in stats['by_strategy'].items():
-                        print(f"      {strat_name}: {strat_stats['total']} trades, {strat_stats['win_rate']:.1f}% WR")
-                
-                # Detalles por salida
-                if stats['by_exit_reason']:
-                    print(f"    Salidas:")
-                    for reason, reason_stats in stats['by_exit_reason'].items():
-                        wr = (reason_stats['wins'] / reason_stats['count'] * 100) if reason_stats['count'] > 0 else 0
-                        print(f"      • {reason}: {reason_stats['count']} ({wr:.0f}% win)")
-                
-                all_results.append({
-                    'symbol': symbol,
-                    'interval': interval,
-                    'strategy': strategy_name,
-                    **stats
-                })
+            # Detalles por estrategia
+            if stats['by_strategy']:
+                for strat_name, strat_stats in stats['by_strategy'].items():
+                    print(f"      {strat_name}: {strat_stats['total']} trades, {strat_stats['win_rate']:.1f}% WR")
+            
+            # Detalles por salida
+            if stats['by_exit_reason']:
+                print(f"    Salidas:")
+                for reason, reason_stats in stats['by_exit_reason'].items():
+                    wr = (reason_stats['wins'] / reason_stats['count'] * 100) if reason_stats['count'] > 0 else 0
+                    print(f"      • {reason}: {reason_stats['count']} ({wr:.0f}% win)")
+            
+            all_results.append({
+                'symbol': symbol,
+                'interval': interval,
+                'strategy': strategy_name,
+                **stats
+            })
     
     # Resumen por estrategia
     print("\n" + "="*70)
@@ -597,4 +550,4 @@ async def main():
     print(f"\n✅ Resultados guardados en pair_strategy_backtest_results.csv")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main(parse_workers("Backtest por estrategia específica de cada par"))
\ No newline at end of file
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+===========================================
+BACKTESTING PARALELO MULTI-SÍMBOLO
+===========================================
+
+Reparte trabajos (símbolo, timeframe, set de parámetros) entre procesos
+con ProcessPoolExecutor. El proceso principal sincroniza primero el
+almacén local de klines; los workers solo leen de disco (sin red) y
+devuelven sus resultados, que se fusionan en el orden en que se crearon
+los trabajos (el mismo que el bucle secuencial, p. ej. TRADING_PAIRS x
+timeframes) para que el resultado no dependa de qué worker termine antes.
+
+Los backtests por par (futuros USDT-M) usan un almacén propio en
+FUTURES_STORE_DIR alimentado por fetch_futures_klines.
+"""
+
+import argparse
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import requests
+
+from kline_store import DEFAULT_STORE_DIR, KlineStore
+
+logger = logging.getLogger(__name__)
+
+# Klines de futuros USDT-M, en un directorio aparte del almacén spot
+FUTURES_STORE_DIR = os.path.join(DEFAULT_STORE_DIR, 'futures')
+FUTURES_KLINES_URL = 'https://fapi.binance.com/fapi/v1/klines'
+
+# job_fn(job, df) -> resultado picklable (lista de trades, dict de estadísticas...)
+JobFunction = Callable[['BacktestJob', pd.DataFrame], Any]
+
+
+@dataclass(frozen=True)
+class BacktestJob:
+    """Un trabajo de backtesting: símbolo, timeframe y parámetros"""
+    symbol: str
+    timeframe: str
+    params: Tuple[Tuple[str, Any], ...] = ()
+
+    @property
+    def param_dict(self) -> Dict[str, Any]:
+        return dict(self.params)
+
+
+@dataclass
+class JobResult:
+    """Resultado de un trabajo (error contiene el mensaje si falló)"""
+    job: BacktestJob
+    result: Any = None
+    error: Optional[str] = None
+    candles: int = 0
+    elapsed: float = 0.0
+
+
+def make_jobs(symbols: Iterable[str], timeframes: Iterable[str],
+              param_sets: Optional[Sequence[Dict[str, Any]]] = None) -> List[BacktestJob]:
+    """Producto cartesiano símbolos x timeframes x sets de parámetros"""
+    param_sets = param_sets or [{}]
+    return [
+        BacktestJob(symbol, timeframe, tuple(sorted(params.items())))
+        for symbol, timeframe, params in product(symbols, timeframes, param_sets)
+    ]
+
+
+def fetch_futures_klines(symbol: str, interval: str, limit: int,
+                         start_time: Optional[int] = None,
+                         end_time: Optional[int] = None) -> List[list]:
+    """KlineFetcher sobre /fapi/v1/klines (mismo formato que /api/v3/klines)"""
+    params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+    if start_time is not None:
+        params['startTime'] = start_time
+    if end_time is not None:
+        params['endTime'] = end_time
+    response = requests.get(FUTURES_KLINES_URL, params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def futures_kline_store(offline: bool = False) -> KlineStore:
+    """Almacén de klines de futuros USDT-M"""
+    return KlineStore(root=FUTURES_STORE_DIR, fetcher=fetch_futures_klines, offline=offline)
+
+
+def parse_workers(description: str) -> int:
+    """Lee --workers de la línea de comandos (0 = un proceso por núcleo)"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Procesos para el backtest (1 = secuencial, 0 = todos los núcleos)')
+    workers = parser.parse_args().workers
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def _run_job(job_fn: JobFunction, store_root: str, start_time: int,
+             end_time: int, job: BacktestJob) -> JobResult:
+    """Ejecuta un trabajo dentro de un worker leyendo las velas de disco"""
+    started = time.perf_counter()
+    try:
+        store = KlineStore(root=store_root, offline=True)
+        df = store.load(job.symbol, job.timeframe, start_time, end_time)
+        result = job_fn(job, df)
+        return JobResult(job, result, candles=len(df), elapsed=time.perf_counter() - started)
+    except Exception as e:
+        return JobResult(job, error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - started)
+
+
+class ParallelBacktestRunner:
+    """Ejecuta trabajos de backtesting en paralelo sobre velas en disco"""
+
+    def __init__(self, job_fn: JobFunction, store: Optional[KlineStore] = None,
+                 workers: Optional[int] = None, initializer: Optional[Callable] = None,
+                 initargs: tuple = ()):
+        """
+        Args:
+            job_fn: Función de nivel de módulo (debe poder serializarse)
+            store: Almacén de klines usado para sincronizar antes de repartir
+            workers: Procesos (None = núcleos disponibles, 1 = sin pool)
+            initializer: Inicializador por proceso (p. ej. crear el backtester una vez)
+        """
+        self.job_fn = job_fn
+        self.store = store or KlineStore(root=DEFAULT_STORE_DIR, offline=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.initializer = initializer
+        self.initargs = initargs
+
+    def prefetch(self, jobs: Sequence[BacktestJob], start_time: int, end_time: int,
+                 threads: int = 4):
+        """Sincroniza cada (símbolo, timeframe) una sola vez antes de repartir"""
+        if self.store.offline:
+            return
+        series = sorted({(job.symbol, job.timeframe) for job in jobs})
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda key: self.store.sync(key[0], key[1], start_time, end_time), series))
+
+    def run(self, jobs: Sequence[BacktestJob], days: int = 360,
+            end_time: Optional[int] = None) -> List[JobResult]:
+        """
+        Ejecuta todos los trabajos y devuelve los resultados en el orden
+        de jobs (sin duplicados), con cualquier número de workers
+        """
+        end_time = end_time if end_time is not None else int(time.time() * 1000)
+        start_time = end_time - days * 86_400_000
+        self.prefetch(jobs, start_time, end_time)
+
+        jobs = list(dict.fromkeys(jobs))
+        args = (self.job_fn, self.store.root, start_time, end_time)
+
+        if self.workers <= 1:
+            if self.initializer:
+                self.initializer(*self.initargs)
+            results = [_run_job(*args, job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer,
+                                     initargs=self.initargs) as pool:
+                futures = [pool.submit(_run_job, *args, job) for job in jobs]
+                results = [future.result() for future in futures]
+
+        for result in results:
+            if result.error:
+                logger.error(f"Backtest {result.job.symbol} {result.job.timeframe} falló: {result.error}")
+
+        return results
+
+
+def merge_results(results: Sequence[JobResult]) -> Dict[Tuple[Tuple[str, Any], ...], List[Any]]:
+    """
+    Concatena resultados tipo lista por set de parámetros, en el orden
+    de los trabajos (el de run)
+    """
+    merged: Dict[Tuple[Tuple[str, Any], ...], List[Any]] = {}
+    for result in results:
+        bucket = merged.setdefault(result.job.params, [])
+        if result.result:
+            bucket.extend(result.result)
+    return merged
@@ -26,6 +26,8 @@ import json
 import logging
 from abc import ABC, abstractmethod
 
+from indicator_engine import IndicatorEngine, add_indicators, get_indicator_engine, has_indicators
+
 # Configuración de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -156,37 +158,11 @@ class PhilosopherTrader(ABC):
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calcula indicadores técnicos universales"""
         
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        df['EMA_12'] = df['close'].ewm(span=12).mean()
-        df['EMA_26'] = df['close'].ewm(span=26).mean()
-        df['MACD'] = df['EMA_12'] - df['EMA_26']
-        df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
-        
-        # Bollinger Bands
-        df['BB_Middle'] = df['close'].rolling(20).mean()
-        bb_std = df['close'].rolling(20).std()
-        df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-        df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
-        
-        # ATR
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        df['ATR'] = ranges.max(axis=1).rolling(14).mean()
-        
-        # Volume Profile
-        df['Volume_SMA'] = df['volume'].rolling(20).mean()
-        df['Volume_Ratio'] = df['volume'] / df['Volume_SMA']
-        
-        return df
+        # Marco ya calculado por el motor compartido: no recalcular
+        if has_indicators(df):
+            return df
+        
+        return add_indicators(df)
 
 # ===========================================
 # SÓCRATES: El Cuestionador (Ranging Markets)
@@ -719,6 +695,7 @@ class PhilosophicalTradingSystem:
             'CONFUCIO': Confucio()
         }
         
+        self.indicator_engine = get_indicator_engine()  # Indicadores compartidos
         self.active_projects = {}  # Proyectos activos
         self.historical_signals = []  # Histórico de señales
         self.performance_metrics = {}  # Métricas de performance
@@ -748,15 +725,18 @@ class PhilosophicalTradingSystem:
         return project
     
     def analyze_with_philosophers(self, df: pd.DataFrame, symbol: str, 
-                                 philosophers: List[str]) -> List[PhilosophicalSignal]:
+                                 philosophers: List[str], timeframe: str = '1h') -> List[PhilosophicalSignal]:
         """Analiza con múltiples filósofos"""
         
         signals = []
         
+        # Indicadores calculados una sola vez para todos los filósofos
+        frame = self.indicator_engine.get_frame(df, symbol, timeframe)
+        
         for philosopher_name in philosophers:
             if philosopher_name in self.philosophers:
                 philosopher = self.philosophers[philosopher_name]
-                signal = philosopher.generate_signal(df, symbol)
+                signal = philosopher.generate_signal(IndicatorEngine.shared_view(frame), symbol)
                 
                 if signal:
                     signals.append(signal)
@@ -817,7 +797,8 @@ class PhilosophicalTradingSystem:
         for symbol in project.symbols:
             if symbol in market_data:
                 df = market_data[symbol]
-                signals = self.analyze_with_philosophers(df, symbol, project.philosophers)
+                signals = self.analyze_with_philosophers(df, symbol, project.philosophers,
+                                                         project.timeframe)
                 
                 if signals:
                     # Buscar consenso
@@ -18,6 +18,8 @@ from collections import defaultdict
 import hashlib
 import hmac
 
+import indicator_kernels as kernels
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -49,6 +51,13 @@ class MarketData:
     timestamp: datetime
     klines: List[Dict] = field(default_factory=list)
     order_book: Dict = field(default_factory=dict)
+    _columns: Optional[Dict[str, np.ndarray]] = field(default=None, init=False, repr=False, compare=False)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """OHLCV de las klines como arrays float64 (se convierten una sola vez)"""
+        if self._columns is None:
+            self._columns = kernels.kline_columns(self.klines)
+        return self._columns
     
 @dataclass
 class TradingSignal:
@@ -74,14 +83,11 @@ class TechnicalAnalyzer:
         if not data.klines:
             return {"signal": "NEUTRAL", "confidence": 0}
         
-        closes = [float(k.get('close', 0)) for k in data.klines]
-        highs = [float(k.get('high', 0)) for k in data.klines]
-        lows = [float(k.get('low', 0)) for k in data.klines]
-        volumes = [float(k.get('volume', 0)) for k in data.klines]
+        closes = data.columns()['close']
         
         # Indicadores
-        sma_20 = np.mean(closes[-20:]) if len(closes) >= 20 else closes[-1]
-        sma_50 = np.mean(closes[-50:]) if len(closes) >= 50 else closes[-1]
+        sma_20 = closes[-20:].mean() if len(closes) >= 20 else closes[-1]
+        sma_50 = closes[-50:].mean() if len(closes) >= 50 else closes[-1]
         
         # RSI
         rsi = self._calculate_rsi(closes)
@@ -115,49 +121,21 @@ class TechnicalAnalyzer:
             }
         }
     
-    def _calculate_rsi(self, prices: List[float], period: int = 14) -> float:
+    def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
         """Calcula RSI"""
-        if len(prices) < period + 1:
-            return 50
-            
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-        
-        if avg_loss == 0:
-            return 100
-            
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return kernels.rsi_last(prices, period)
     
-    def _calculate_macd(self, prices: List[float]) -> Tuple[float, float, float]:
+    def _calculate_macd(self, prices: np.ndarray) -> Tuple[float, float, float]:
         """Calcula MACD"""
         if len(prices) < 26:
             return 0, 0, 0
             
-        exp1 = pd.Series(prices).ewm(span=12, adjust=False).mean()
-        exp2 = pd.Series(prices).ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
-        histogram = macd - signal
-        
-        return macd.iloc[-1], signal.iloc[-1], histogram.iloc[-1]
+        macd, signal, histogram = kernels.macd(prices, 12, 26, 9)
+        return float(macd[-1]), float(signal[-1]), float(histogram[-1])
     
-    def _calculate_bollinger_bands(self, prices: List[float], period: int = 20) -> Tuple[float, float, float]:
+    def _calculate_bollinger_bands(self, prices: np.ndarray, period: int = 20) -> Tuple[float, float, float]:
         """Calcula Bollinger Bands"""
-        if len(prices) < period:
-            return prices[-1], prices[-1], prices[-1]
-            
-        sma = np.mean(prices[-period:])
-        std = np.std(prices[-period:])
-        
-        upper = sma + (2 * std)
-        lower = sma - (2 * std)
-        
-        return upper, sma, lower
+        return kernels.bollinger_last(prices, period)
 
 class VolumeAnalyzer:
     """Módulo de análisis de volumen"""
@@ -167,23 +145,24 @@ class VolumeAnalyzer:
         if not data.klines or len(data.klines) < 20:
             return {"signal": "NEUTRAL", "confidence": 0}
         
-        volumes = [float(k.get('volume', 0)) for k in data.klines]
-        closes = [float(k.get('close', 0)) for k in data.klines]
+        columns = data.columns()
+        volumes = columns['volume']
+        closes = columns['close']
         
         # Volume Rate of Change
         current_vol = volumes[-1]
-        avg_vol = np.mean(volumes[-20:])
+        avg_vol = volumes[-20:].mean()
         vroc = (current_vol / avg_vol) if avg_vol > 0 else 1
         
         # On-Balance Volume trend
         obv = self._calculate_obv(closes, volumes)
-        obv_trend = "UP" if obv[-1] > np.mean(obv[-10:]) else "DOWN"
+        obv_trend = "UP" if obv[-1] > obv[-10:].mean() else "DOWN"
         
         # Volume-Price Trend
         vpt = self._calculate_vpt(closes, volumes)
         
         # Money Flow Index
-        mfi = self._calculate_mfi(data.klines)
+        mfi = self._calculate_mfi(columns)
         
         # Señal
         score = 0
@@ -215,56 +194,18 @@ class VolumeAnalyzer:
             }
         }
     
-    def _calculate_obv(self, closes: List[float], volumes: List[float]) -> List[float]:
+    def _calculate_obv(self, closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
         """Calcula On-Balance Volume"""
-        obv = [0]
-        for i in range(1, len(closes)):
-            if closes[i] > closes[i-1]:
-                obv.append(obv[-1] + volumes[i])
-            elif closes[i] < closes[i-1]:
-                obv.append(obv[-1] - volumes[i])
-            else:
-                obv.append(obv[-1])
-        return obv
+        return kernels.obv(closes, volumes)
     
-    def _calculate_vpt(self, closes: List[float], volumes: List[float]) -> float:
+    def _calculate_vpt(self, closes: np.ndarray, volumes: np.ndarray) -> float:
         """Calcula Volume-Price Trend"""
-        if len(closes) < 2:
-            return 0
-            
-        vpt = 0
-        for i in range(1, len(closes)):
-            price_change = (closes[i] - closes[i-1]) / closes[i-1] if closes[i-1] > 0 else 0
-            vpt += volumes[i] * price_change
-        return vpt
+        return kernels.vpt(closes, volumes)
     
-    def _calculate_mfi(self, klines: List[Dict], period: int = 14) -> float:
+    def _calculate_mfi(self, columns: Dict[str, np.ndarray], period: int = 14) -> float:
         """Calcula Money Flow Index"""
-        if len(klines) < period + 1:
-            return 50
-            
-        typical_prices = [(float(k['high']) + float(k['low']) + float(k['close'])) / 3 for k in klines]
-        raw_money_flows = [typical_prices[i] * float(klines[i]['volume']) for i in range(len(klines))]
-        
-        positive_flows = []
-        negative_flows = []
-        
-        for i in range(1, len(typical_prices)):
-            if typical_prices[i] > typical_prices[i-1]:
-                positive_flows.append(raw_money_flows[i])
-                negative_flows.append(0)
-            else:
-                positive_flows.append(0)
-                negative_flows.append(raw_money_flows[i])
-        
-        positive_mf = sum(positive_flows[-period:])
-        negative_mf = sum(negative_flows[-period:])
-        
-        if negative_mf == 0:
-            return 100
-            
-        mfi = 100 - (100 / (1 + positive_mf / negative_mf))
-        return mfi
+        return kernels.mfi_last(columns['high'], columns['low'], columns['close'],
+                                columns['volume'], period)
 
 class MomentumAnalyzer:
     """Módulo de análisis de momentum"""
@@ -274,7 +215,8 @@ class MomentumAnalyzer:
         if not data.klines or len(data.klines) < 20:
             return {"signal": "NEUTRAL", "confidence": 0}
         
-        closes = [float(k.get('close', 0)) for k in data.klines]
+        columns = data.columns()
+        closes = columns['close']
         
         # Rate of Change
         roc_5 = self._calculate_roc(closes, 5)
@@ -285,10 +227,10 @@ class MomentumAnalyzer:
         momentum = self._calculate_momentum(closes)
         
         # Stochastic
-        stoch_k, stoch_d = self._calculate_stochastic(data.klines)
+        stoch_k, stoch_d = self._calculate_stochastic(columns)
         
         # ADX para fuerza de tendencia
-        adx = self._calculate_adx(data.klines)
+        adx = self._calculate_adx(columns)
         
         # Señal
         score = 0
@@ -319,84 +261,25 @@ class MomentumAnalyzer:
             }
         }
     
-    def _calculate_roc(self, prices: List[float], period: int) -> float:
+    def _calculate_roc(self, prices: np.ndarray, period: int) -> float:
         """Calcula Rate of Change"""
         if len(prices) < period + 1:
             return 0
-        return ((prices[-1] - prices[-period-1]) / prices[-period-1]) * 100
+        return float((prices[-1] - prices[-period-1]) / prices[-period-1] * 100)
     
-    def _calculate_momentum(self, prices: List[float], period: int = 10) -> float:
+    def _calculate_momentum(self, prices: np.ndarray, period: int = 10) -> float:
         """Calcula Momentum"""
         if len(prices) < period + 1:
             return 100
-        return (prices[-1] / prices[-period-1]) * 100
+        return float(prices[-1] / prices[-period-1] * 100)
     
-    def _calculate_stochastic(self, klines: List[Dict], period: int = 14) -> Tuple[float, float]:
-        """Calcula Stochastic Oscillator"""
-        if len(klines) < period:
-            return 50, 50
-            
-        highs = [float(k['high']) for k in klines[-period:]]
-        lows = [float(k['low']) for k in klines[-period:]]
-        close = float(klines[-1]['close'])
-        
-        highest = max(highs)
-        lowest = min(lows)
-        
-        if highest == lowest:
-            return 50, 50
-            
-        k = ((close - lowest) / (highest - lowest)) * 100
-        
-        # D es el SMA de K de 3 períodos
-        return k, k  # Simplificado
+    def _calculate_stochastic(self, columns: Dict[str, np.ndarray], period: int = 14) -> Tuple[float, float]:
+        """Calcula Stochastic Oscillator (D = K, simplificado)"""
+        return kernels.stochastic_last(columns['high'], columns['low'], columns['close'], period)
     
-    def _calculate_adx(self, klines: List[Dict], period: int = 14) -> float:
-        """Calcula Average Directional Index"""
-        if len(klines) < period + 1:
-            return 0
-            
-        # Cálculo simplificado de ADX
-        highs = [float(k['high']) for k in klines]
-        lows = [float(k['low']) for k in klines]
-        closes = [float(k['close']) for k in klines]
-        
-        plus_dm = []
-        minus_dm = []
-        tr = []
-        
-        for i in range(1, len(klines)):
-            high_diff = highs[i] - highs[i-1]
-            low_diff = lows[i-1] - lows[i]
-            
-            if high_diff > low_diff and high_diff > 0:
-                plus_dm.append(high_diff)
-            else:
-                plus_dm.append(0)
-                
-            if low_diff > high_diff and low_diff > 0:
-                minus_dm.append(low_diff)
-            else:
-                minus_dm.append(0)
-                
-            tr.append(max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i-1]),
-                abs(lows[i] - closes[i-1])
-            ))
-        
-        if not tr:
-            return 0
-            
-        atr = np.mean(tr[-period:])
-        plus_di = (np.mean(plus_dm[-period:]) / atr * 100) if atr > 0 else 0
-        minus_di = (np.mean(minus_dm[-period:]) / atr * 100) if atr > 0 else 0
-        
-        if plus_di + minus_di == 0:
-            return 0
-            
-        dx = abs(plus_di - minus_di) / (plus_di + minus_di) * 100
-        return dx
+    def _calculate_adx(self, columns: Dict[str, np.ndarray], period: int = 14) -> float:
+        """Calcula Average Directional Index (DX simplificado del último periodo)"""
+        return kernels.dx_last(columns['high'], columns['low'], columns['close'], period)
 
 class ProfessionalTradingSystem:
     """Sistema de Trading Profesional Multi-Estrategia"""
@@ -537,7 +420,7 @@ class ProfessionalTradingSystem:
             return None
         
         # Calcular niveles
-        atr = self._calculate_atr(market_data.klines)
+        atr = self._calculate_atr(market_data.columns())
         
         if action == "BUY":
             entry = market_data.price
@@ -578,25 +461,9 @@ class ProfessionalTradingSystem:
             }
         )
     
-    def _calculate_atr(self, klines: List[Dict], period: int = 14) -> float:
+    def _calculate_atr(self, columns: Dict[str, np.ndarray], period: int = 14) -> float:
         """Calcula Average True Range"""
-        if len(klines) < period + 1:
-            return 0
-        
-        true_ranges = []
-        for i in range(1, len(klines)):
-            high = klines[i]['high']
-            low = klines[i]['low']
-            prev_close = klines[i-1]['close']
-            
-            tr = max(
-                high - low,
-                abs(high - prev_close),
-                abs(low - prev_close)
-            )
-            true_ranges.append(tr)
-        
-        return np.mean(true_ranges[-period:]) if true_ranges else 0
+        return kernels.atr_last(columns['high'], columns['low'], columns['close'], period)
     
     async def save_signal_to_db(self, signal: TradingSignal):
         """Guarda señal en base de datos"""
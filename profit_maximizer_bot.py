@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 import sqlite3
 import threading
 
+import indicator_kernels as kernels
+
 class ProfitMaximizerBot:
     def __init__(self):
         self.db_path = 'trading_bot.db'
@@ -103,68 +105,26 @@ class ProfitMaximizerBot:
     
     def calculate_rsi(self, prices, period=14):
         """Calcula RSI"""
-        if len(prices) < period + 1:
-            return 50
-            
-        gains = []
-        losses = []
-        
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100
-            
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return kernels.rsi_last(prices, period)
     
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
         """Calcula MACD"""
         if len(prices) < slow:
             return 0, 0
             
-        # EMA rápida
-        ema_fast = self.calculate_ema(prices, fast)
-        # EMA lenta  
-        ema_slow = self.calculate_ema(prices, slow)
-        
-        # MACD line
-        macd = ema_fast - ema_slow
+        # Series EMA completas en una pasada (antes se recalculaban por cada vela)
+        macd_series = kernels.ema(prices, fast) - kernels.ema(prices, slow)
+        macd = float(macd_series[-1])
         
-        # Signal line (EMA del MACD)
-        macd_values = []
-        for i in range(slow, len(prices)):
-            ema_f = self.calculate_ema(prices[:i+1], fast)
-            ema_s = self.calculate_ema(prices[:i+1], slow)
-            macd_values.append(ema_f - ema_s)
-            
-        signal_line = self.calculate_ema(macd_values, signal) if len(macd_values) > signal else macd
+        # Signal line (EMA del MACD desde la vela slow)
+        macd_values = macd_series[slow:]
+        signal_line = kernels.ema_last(macd_values, signal) if len(macd_values) > signal else macd
         
         return macd, signal_line
     
     def calculate_ema(self, prices, period):
         """Calcula EMA"""
-        if len(prices) < period:
-            return prices[-1] if prices else 0
-            
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        
-        for price in prices[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-            
-        return ema
+        return kernels.ema_last(prices, period)
     
     def execute_trade(self, signal):
         """Ejecuta una operación basada en la señal"""
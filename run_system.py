@@ -6,6 +6,7 @@ Ejecutor principal para operación 24/7
 
 import asyncio
 import aiohttp
+from http_client_pool import get_http_client_registry, get_aiohttp_session
 import subprocess
 import signal
 import sys
@@ -163,27 +164,26 @@ if stats['total_alerts_24h'] > 0:
                         logger.warning(f"  ❌ {name}: Inactivo")
                 
                 # Verificar APIs
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    try:
-                        async with session.get('http://localhost:8000/api/signals/BTCUSDT', timeout=5) as resp:
-                            if resp.status == 200:
-                                data = await resp.json()
-                                logger.info(f"  ✅ API: Respondiendo (BTCUSDT: {data['consensus']['action']})")
-                            else:
-                                logger.warning(f"  ⚠️ API: Status {resp.status}")
-                    except (asyncio.TimeoutError, aiohttp.ClientError) as e:
-                        handle_api_error(NetworkError(
-                            message="API health check failed",
-                            context={'endpoint': 'http://localhost:8000/api/signals/BTCUSDT'}
-                        ))
-                        logger.warning("  ⚠️ API: No responde")
-                    except Exception as e:
-                        handle_api_error(e, {
-                            'operation': 'api_health_check',
-                            'endpoint': 'http://localhost:8000/api/signals/BTCUSDT'
-                        })
-                        logger.warning("  ⚠️ API: Error inesperado")
+                session = get_aiohttp_session()
+                try:
+                    async with session.get('http://localhost:8000/api/signals/BTCUSDT', timeout=5) as resp:
+                        if resp.status == 200:
+                            data = await resp.json()
+                            logger.info(f"  ✅ API: Respondiendo (BTCUSDT: {data['consensus']['action']})")
+                        else:
+                            logger.warning(f"  ⚠️ API: Status {resp.status}")
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    handle_api_error(NetworkError(
+                        message="API health check failed",
+                        context={'endpoint': 'http://localhost:8000/api/signals/BTCUSDT'}
+                    ))
+                    logger.warning("  ⚠️ API: No responde")
+                except Exception as e:
+                    handle_api_error(e, {
+                        'operation': 'api_health_check',
+                        'endpoint': 'http://localhost:8000/api/signals/BTCUSDT'
+                    })
+                    logger.warning("  ⚠️ API: Error inesperado")
                 
                 # Verificar espacio en disco
                 import shutil
@@ -240,6 +240,9 @@ if stats['total_alerts_24h'] > 0:
                     logger.warning(f"Forzando terminación de {name}")
                     process.kill()
         
+        # Cerrar conexiones HTTP compartidas
+        await get_http_client_registry().close()
+        
         logger.info("✅ Sistema detenido correctamente")
 
 def signal_handler(signum, frame):
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List
 import json
 
+from trade_simulator import EXIT_SL, EXIT_TIME, simulate_exits
+
 class ScalpingBacktester:
     """
     Backtest scalping strategies with historical data
@@ -267,6 +269,21 @@ class ScalpingBacktester:
         
         return opportunities
     
+    def resolve_exits(self, opportunities: List[Dict], df_1m: pd.DataFrame, max_candles: int = 500):
+        """
+        Find the first SL/TP touch for all opportunities in one vectorized pass
+        """
+        entry_idx = df_1m.index.get_indexer([opp['timestamp'] for opp in opportunities], method='nearest')
+        
+        return simulate_exits(
+            df_1m['high'].to_numpy(), df_1m['low'].to_numpy(), df_1m['close'].to_numpy(),
+            start_index=entry_idx + 1,
+            is_long=np.array([opp['direction'] == "LONG" for opp in opportunities], dtype=bool),
+            stop_loss=np.array([opp['stop_loss'] for opp in opportunities], dtype=float),
+            take_profits=np.array([opp['take_profit'] for opp in opportunities], dtype=float),
+            max_bars=max_candles - 1
+        )
+    
     def backtest_trades(self, opportunities: List[Dict], df_1m: pd.DataFrame) -> Dict:
         """
         Simulate trades and calculate results
@@ -274,7 +291,10 @@ class ScalpingBacktester:
         self.capital = self.initial_capital
         self.trades = []
         
-        for opp in opportunities:
+        # Resolve every exit at once (max 500 candles after entry)
+        exits = self.resolve_exits(opportunities, df_1m)
+        
+        for n, opp in enumerate(opportunities):
             # Skip if not enough capital
             if self.capital < 10:
                 break
@@ -284,42 +304,18 @@ class ScalpingBacktester:
             risk_pct = opp['risk_pct'] / 100
             position_value = (risk_amount / risk_pct) * self.leverage
             
-            # Simulate trade execution
-            entry_idx = df_1m.index.get_indexer([opp['timestamp']], method='nearest')[0]
-            
-            # Find exit
-            exit_price = None
-            exit_reason = None
-            exit_idx = None
-            
-            for j in range(entry_idx + 1, min(entry_idx + 500, len(df_1m))):  # Max 500 candles
-                if opp['direction'] == "LONG":
-                    if df_1m.iloc[j]['low'] <= opp['stop_loss']:
-                        exit_price = opp['stop_loss']
-                        exit_reason = "STOP_LOSS"
-                        exit_idx = j
-                        break
-                    elif df_1m.iloc[j]['high'] >= opp['take_profit']:
-                        exit_price = opp['take_profit']
-                        exit_reason = "TAKE_PROFIT"
-                        exit_idx = j
-                        break
-                else:  # SHORT
-                    if df_1m.iloc[j]['high'] >= opp['stop_loss']:
-                        exit_price = opp['stop_loss']
-                        exit_reason = "STOP_LOSS"
-                        exit_idx = j
-                        break
-                    elif df_1m.iloc[j]['low'] <= opp['take_profit']:
-                        exit_price = opp['take_profit']
-                        exit_reason = "TAKE_PROFIT"
-                        exit_idx = j
-                        break
-            
             # If no exit, skip
-            if not exit_price:
+            if exits.exit_code[n] == EXIT_TIME:
                 continue
             
+            exit_idx = int(exits.exit_index[n])
+            if exits.exit_code[n] == EXIT_SL:
+                exit_price = opp['stop_loss']
+                exit_reason = "STOP_LOSS"
+            else:
+                exit_price = opp['take_profit']
+                exit_reason = "TAKE_PROFIT"
+            
             # Calculate P&L
             if opp['direction'] == "LONG":
                 gross_pnl_pct = ((exit_price - opp['entry_price']) / opp['entry_price'])
@@ -13,6 +13,9 @@ from typing import Dict, List, Optional, Tuple
 import json
 import logging
 
+from local_order_book import get_local_depth
+from order_book_depth import get_depth_analyzer
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -124,6 +127,11 @@ class ScalpingBot:
         """
         Get order book analysis for entry/exit optimization
         """
+        # Local order book replica when this process keeps one in sync
+        depth = get_local_depth(symbol, 100)
+        if depth is not None:
+            return self._edge_from_analysis(get_depth_analyzer().analyze_depth(depth))
+        
         async with httpx.AsyncClient() as client:
             try:
                 # Get liquidity data
@@ -131,23 +139,25 @@ class ScalpingBot:
                 
                 if response.status_code == 200:
                     data = response.json()
-                    ob_analysis = data.get("order_book_analysis", {})
-                    
-                    return {
-                        "imbalance": ob_analysis.get("imbalance", 0),
-                        "whale_activity": ob_analysis.get("large_orders", {}).get("whale_activity", False),
-                        "bid_liquidity": ob_analysis.get("liquidity_score", {}).get("0.5%", {}).get("bid_liquidity", 0),
-                        "ask_liquidity": ob_analysis.get("liquidity_score", {}).get("0.5%", {}).get("ask_liquidity", 0),
-                        "spread_bps": ob_analysis.get("spread_bps", 0),
-                        "support_levels": ob_analysis.get("support_levels", []),
-                        "resistance_levels": ob_analysis.get("resistance_levels", [])
-                    }
+                    return self._edge_from_analysis(data.get("order_book_analysis", {}))
                     
             except Exception as e:
                 logger.error(f"Error getting order book data: {e}")
                 
         return {}
     
+    def _edge_from_analysis(self, ob: Dict) -> Dict:
+        """Fields used for entries from an order book analysis"""
+        return {
+            "imbalance": ob.get("imbalance", 0),
+            "whale_activity": ob.get("large_orders", {}).get("whale_activity", False),
+            "bid_liquidity": ob.get("liquidity_score", {}).get("0.5%", {}).get("bid_liquidity", 0),
+            "ask_liquidity": ob.get("liquidity_score", {}).get("0.5%", {}).get("ask_liquidity", 0),
+            "spread_bps": ob.get("spread_bps", 0),
+            "support_levels": ob.get("support_levels", []),
+            "resistance_levels": ob.get("resistance_levels", [])
+        }
+    
     def identify_trend(self, df_15m: pd.DataFrame) -> str:
         """
         Identify overall trend from 15m timeframe
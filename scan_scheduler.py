@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+===========================================
+ESCANEO CONCURRENTE DE SÍMBOLOS
+===========================================
+
+Analiza todo el universo de símbolos en paralelo con un límite de
+concurrencia (para no saturar la API ni el event loop) y timeout por
+símbolo. Las señales se ordenan por confianza y el límite de "N señales
+por escaneo" se aplica después, sobre las mejores, en lugar de cortar
+el recorrido en los primeros símbolos.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Análisis simultáneos por defecto (configurable con SIGNAL_SCAN_CONCURRENCY)
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('SIGNAL_SCAN_CONCURRENCY', '10'))
+
+# Marca de símbolo fallido (un análisis puede devolver None legítimamente)
+_FAILED = object()
+
+
+class SymbolScanScheduler:
+    """Ejecuta un análisis por símbolo con concurrencia acotada"""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 symbol_timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.symbol_timeout = symbol_timeout
+        self.stats = {'scans': 0, 'symbols': 0, 'errors': 0, 'timeouts': 0,
+                      'last_scan_seconds': 0.0}
+
+    async def run(self, symbols: Iterable[str],
+                  fn: Callable[[str], Awaitable]) -> Dict[str, object]:
+        """
+        fn(símbolo) para todos los símbolos, como mucho max_concurrency a la vez
+
+        Returns:
+            Dict {símbolo: resultado}; los símbolos que fallan o exceden
+            el timeout no aparecen
+        """
+        symbols = list(dict.fromkeys(symbols))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def guarded(symbol: str):
+            async with semaphore:
+                try:
+                    if self.symbol_timeout:
+                        return await asyncio.wait_for(fn(symbol), self.symbol_timeout)
+                    return await fn(symbol)
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    logger.warning(f"⏱️ {symbol}: análisis excedió {self.symbol_timeout}s")
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Error analizando {symbol}: {e}")
+                return _FAILED
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(guarded(symbol) for symbol in symbols))
+        self.stats['scans'] += 1
+        self.stats['symbols'] += len(symbols)
+        self.stats['last_scan_seconds'] = time.perf_counter() - started
+
+        return {symbol: result for symbol, result in zip(symbols, results) if result is not _FAILED}
+
+    async def scan(self, symbols: Iterable[str],
+                   analyze: Callable[[str], Awaitable[Optional[dict]]]) -> List[dict]:
+        """Señales de todos los símbolos (sin None), de mayor a menor confianza"""
+        results = await self.run(symbols, analyze)
+        signals = [signal for signal in results.values() if signal]
+        signals.sort(key=lambda signal: signal.get('confidence', 0), reverse=True)
+        return signals
+
+    @staticmethod
+    def select(signals: List[dict], min_confidence: float,
+               max_signals: Optional[int] = None) -> Tuple[List[dict], List[dict]]:
+        """
+        Aplica el umbral de confianza y el límite por escaneo
+
+        Returns:
+            (aceptadas, descartadas); ambas conservan el orden recibido
+        """
+        accepted, rejected = [], []
+        for signal in signals:
+            if signal.get('confidence', 0) >= min_confidence and \
+                    (max_signals is None or len(accepted) < max_signals):
+                accepted.append(signal)
+            else:
+                rejected.append(signal)
+        return accepted, rejected
+
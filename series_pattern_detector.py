@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+===========================================
+DETECCIÓN DE PATRONES EN UNA SOLA PASADA
+===========================================
+
+Evalúa los detect_* de PatternDetector sobre toda la serie a la vez:
+los indicadores se calculan una única vez y cada patrón se resuelve con
+operaciones vectorizadas, emitiendo (índice de vela, señal).
+
+La señal emitida en la vela t es la misma que devolvería
+detect_all_patterns(df.iloc[t-window+1:t+1]) para cualquier ventana de
+50 velas o más: los detectores miran como mucho 50 velas atrás y sus
+indicadores (RSI, soporte/resistencia, volumen) son medias móviles
+simples que no dependen del inicio de la ventana.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from multi_timeframe_signal_detector import PatternDetector, PatternStage, PatternType, Signal
+
+logger = logging.getLogger(__name__)
+
+# Velas mínimas de la ventana por patrón (mismas comprobaciones len(df) de los detect_*)
+MIN_BARS = {
+    'double': 50,
+    'triangle': 30,
+    'levels': 20,
+    'hammer': 3,
+    'engulfing': 2,
+}
+
+# Lookback de extremos locales en doble suelo/techo: lows[i] == min(lows[i-5:i+5])
+_EXTREMUM_SPAN = 5
+
+
+def _last_true_index(mask: np.ndarray) -> np.ndarray:
+    """Para cada posición, último índice <= posición donde mask es True (-1 si no hay)"""
+    idx = np.where(mask, np.arange(len(mask)), -1)
+    return np.maximum.accumulate(idx) if len(idx) else idx
+
+
+class SeriesPatternDetector:
+    """Versión vectorizada de PatternDetector.detect_all_patterns sobre toda la serie"""
+
+    def __init__(self, detector: Optional[PatternDetector] = None):
+        self.detector = detector or PatternDetector()
+
+    def detect_all(self, df: pd.DataFrame, symbol: str, timeframe: str,
+                   bars: Optional[Sequence[int]] = None) -> List[Tuple[int, Signal]]:
+        """
+        Detecta patrones en todas las velas (o solo en bars)
+
+        Args:
+            df: Serie OHLCV completa (no se modifica)
+            bars: Índices de las velas a evaluar (None = todas)
+
+        Returns:
+            Lista de (índice de vela, señal) ordenada por vela, con las
+            señales de una misma vela en el orden de detect_all_patterns
+        """
+        n = len(df)
+        if n == 0:
+            return []
+
+        data = self.detector.calculate_indicators(df[['open', 'high', 'low', 'close', 'volume']].copy())
+        selected = np.zeros(n, dtype=bool)
+        if bars is None:
+            selected[:] = True
+        else:
+            bars = np.asarray(bars, dtype=np.int64)
+            selected[bars[(bars >= 0) & (bars < n)]] = True
+
+        arrays = {col: data[col].to_numpy(dtype=float) for col in data.columns}
+
+        scanners = [
+            self.scan_double_bottom,
+            self.scan_double_top,
+            self.scan_support_bounce,
+            self.scan_resistance_rejection,
+            self.scan_breakout,
+            self.scan_breakdown,
+            self.scan_hammer,
+            self.scan_engulfing,
+            self.scan_triangle,
+        ]
+
+        found = []
+        for order, scanner in enumerate(scanners):
+            for bar, signal in scanner(arrays, selected, symbol, timeframe):
+                if signal.confidence >= self.detector.min_confidence:
+                    found.append((bar, order, signal))
+
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [(bar, signal) for bar, _, signal in found]
+
+    # ------------------------------------------------------------------
+    # Reversión: doble suelo / doble techo
+    # ------------------------------------------------------------------
+
+    def _double_pattern(self, values: np.ndarray, selected: np.ndarray, bottom: bool):
+        """
+        Últimos dos extremos locales de las 50 velas previas a cada vela
+
+        Returns:
+            (bars, first, second, between): índices absolutos de los dos
+            extremos y el máximo (suelo) o mínimo (techo) entre ambos
+        """
+        n = len(values)
+        span = _EXTREMUM_SPAN
+        empty = (np.array([], dtype=np.int64),) * 3 + (np.array([]),)
+        if n < 2 * span:
+            return empty
+
+        # Extremo en a: values[a] es el mínimo/máximo de values[a-5:a+5]
+        windows = sliding_window_view(values, 2 * span)
+        rolling = windows.min(axis=1) if bottom else windows.max(axis=1)
+        is_extremum = np.zeros(n, dtype=bool)
+        is_extremum[span:n - span + 1] = values[span:n - span + 1] == rolling[:n - 2 * span + 1]
+
+        extrema = np.flatnonzero(is_extremum)
+        if len(extrema) < 2:
+            return empty
+
+        # En la ventana que termina en t los extremos válidos están en [t-44, t-5]
+        last_extremum = _last_true_index(is_extremum)
+        window = MIN_BARS['double']
+        bars = np.flatnonzero(selected & (np.arange(n) >= window - 1))
+        second = last_extremum[bars - span]
+        has_second = second > 0
+        first = np.full(len(bars), -1, dtype=np.int64)
+        first[has_second] = last_extremum[second[has_second] - 1]
+        valid = (first >= bars - (window - 1) + span) & (first >= 0)
+
+        bars, first, second = bars[valid], first[valid], second[valid]
+
+        # Máximo/mínimo entre extremos consecutivos: un reduceat por pareja
+        reducer = np.minimum if not bottom else np.maximum
+        between_pairs = reducer.reduceat(values, extrema)
+        between = between_pairs[np.searchsorted(extrema, first)]
+        return bars, first, second, between
+
+    def scan_double_bottom(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                           symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Doble suelo (detect_double_bottom) en cada vela"""
+        lows, close = arrays['low'], arrays['close']
+        bars, first, second, peak = self._double_pattern(lows, selected, bottom=True)
+        bottom1, bottom2 = lows[first], lows[second]
+
+        ok = (np.abs(bottom1 - bottom2) / bottom1 < 0.01) & (peak > bottom1 * 1.02)
+        signals = []
+        for k in np.flatnonzero(ok):
+            bar = int(bars[k])
+            # El segundo suelo nunca es la última vela de la ventana (índice <= t-5)
+            if close[bar] > peak[k]:
+                stage, confidence = PatternStage.CONFIRMED, 85
+            else:
+                stage, confidence = PatternStage.NEARLY_COMPLETE, 70
+            now = datetime.now()
+            signals.append((bar, Signal(
+                id=f"{symbol}_{timeframe}_DB_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.DOUBLE_BOTTOM,
+                stage=stage,
+                confidence=confidence,
+                entry_price=peak[k],
+                stop_loss=min(bottom1[k], bottom2[k]) * 0.98,
+                take_profit_1=peak[k] * 1.05,
+                take_profit_2=peak[k] * 1.10,
+                risk_reward_ratio=2.0,
+                formation_start=now - timedelta(hours=int(first[k] - bar + MIN_BARS['double'] - 1)),
+                current_timestamp=now,
+                notes={
+                    'bottom1': bottom1[k],
+                    'bottom2': bottom2[k],
+                    'neckline': peak[k]
+                }
+            )))
+        return signals
+
+    def scan_double_top(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                        symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Doble techo (detect_double_top) en cada vela"""
+        highs, close = arrays['high'], arrays['close']
+        bars, first, second, valley = self._double_pattern(highs, selected, bottom=False)
+        top1, top2 = highs[first], highs[second]
+
+        ok = (np.abs(top1 - top2) / top1 < 0.01) & (valley < top1 * 0.98)
+        signals = []
+        for k in np.flatnonzero(ok):
+            bar = int(bars[k])
+            if close[bar] < valley[k]:
+                stage, confidence = PatternStage.CONFIRMED, 85
+            else:
+                stage, confidence = PatternStage.NEARLY_COMPLETE, 70
+            now = datetime.now()
+            signals.append((bar, Signal(
+                id=f"{symbol}_{timeframe}_DT_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.DOUBLE_TOP,
+                stage=stage,
+                confidence=confidence,
+                entry_price=valley[k],
+                stop_loss=max(top1[k], top2[k]) * 1.02,
+                take_profit_1=valley[k] * 0.95,
+                take_profit_2=valley[k] * 0.90,
+                risk_reward_ratio=2.0,
+                formation_start=now - timedelta(hours=int(first[k] - bar + MIN_BARS['double'] - 1)),
+                current_timestamp=now,
+                notes={
+                    'top1': top1[k],
+                    'top2': top2[k],
+                    'neckline': valley[k]
+                }
+            )))
+        return signals
+
+    # ------------------------------------------------------------------
+    # Soportes y resistencias
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _level_bars(selected: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        ready = np.arange(len(selected)) >= MIN_BARS['levels'] - 1
+        return np.flatnonzero(selected & ready & mask)
+
+    def scan_support_bounce(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                            symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Rebote en soporte (detect_support_bounce) en cada vela"""
+        close, low = arrays['close'], arrays['low']
+        support, volume_ratio = arrays['support'], arrays['volume_ratio']
+
+        touch = (low <= support * 1.005) & (close > low * 1.002)
+        volume_increase = volume_ratio > 1.2
+        forming = close < support * 1.01
+        confirmed = close > support * 1.02
+
+        signals = []
+        for bar in self._level_bars(selected, touch):
+            vol = bool(volume_increase[bar])
+            if forming[bar]:
+                stage, confidence = PatternStage.FORMING, 55 if vol else 45
+            elif confirmed[bar]:
+                stage, confidence = PatternStage.CONFIRMED, 80 if vol else 70
+            else:
+                stage, confidence = PatternStage.NEARLY_COMPLETE, 65 if vol else 55
+            level = float(support[bar])
+            now = datetime.now()
+            signals.append((int(bar), Signal(
+                id=f"{symbol}_{timeframe}_SUP_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.SUPPORT_BOUNCE,
+                stage=stage,
+                confidence=confidence,
+                entry_price=level * 1.005,
+                stop_loss=level * 0.98,
+                take_profit_1=level * 1.03,
+                take_profit_2=level * 1.05,
+                risk_reward_ratio=1.5,
+                formation_start=now,
+                current_timestamp=now,
+                notes={
+                    'support_level': level,
+                    'bounce_strength': (close[bar] - low[bar]) / low[bar] * 100,
+                    'volume_increase': vol
+                }
+            )))
+        return signals
+
+    def scan_resistance_rejection(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                                  symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Rechazo en resistencia (detect_resistance_rejection) en cada vela"""
+        close, high = arrays['close'], arrays['high']
+        resistance, volume_ratio = arrays['resistance'], arrays['volume_ratio']
+
+        touch = (high >= resistance * 0.995) & (close < high * 0.998)
+        volume_increase = volume_ratio > 1.2
+        forming = close > resistance * 0.99
+        confirmed = close < resistance * 0.98
+
+        signals = []
+        for bar in self._level_bars(selected, touch):
+            vol = bool(volume_increase[bar])
+            if forming[bar]:
+                stage, confidence = PatternStage.FORMING, 55 if vol else 45
+            elif confirmed[bar]:
+                stage, confidence = PatternStage.CONFIRMED, 80 if vol else 70
+            else:
+                stage, confidence = PatternStage.NEARLY_COMPLETE, 65 if vol else 55
+            level = float(resistance[bar])
+            now = datetime.now()
+            signals.append((int(bar), Signal(
+                id=f"{symbol}_{timeframe}_RES_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.RESISTANCE_REJECT,
+                stage=stage,
+                confidence=confidence,
+                entry_price=level * 0.995,
+                stop_loss=level * 1.02,
+                take_profit_1=level * 0.97,
+                take_profit_2=level * 0.95,
+                risk_reward_ratio=1.5,
+                formation_start=now,
+                current_timestamp=now,
+                notes={
+                    'resistance_level': level,
+                    'rejection_strength': (high[bar] - close[bar]) / high[bar] * 100,
+                    'volume_increase': vol
+                }
+            )))
+        return signals
+
+    def scan_breakout(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                      symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Ruptura alcista (detect_breakout) en cada vela"""
+        close, resistance, volume_ratio = arrays['close'], arrays['resistance'], arrays['volume_ratio']
+
+        signals = []
+        for bar in self._level_bars(selected, close > resistance * 1.005):
+            level, ratio = float(resistance[bar]), float(volume_ratio[bar])
+            if not ratio > 1.5:
+                stage, confidence = PatternStage.POTENTIAL, 50
+            elif close[bar] > level * 1.01:
+                stage, confidence = PatternStage.CONFIRMED, 85
+            else:
+                stage, confidence = PatternStage.FORMING, 70
+            now = datetime.now()
+            signals.append((int(bar), Signal(
+                id=f"{symbol}_{timeframe}_BRK_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.BREAKOUT,
+                stage=stage,
+                confidence=confidence,
+                entry_price=level * 1.005,
+                stop_loss=level * 0.98,
+                take_profit_1=level * 1.03,
+                take_profit_2=level * 1.05,
+                risk_reward_ratio=2.0,
+                formation_start=now,
+                current_timestamp=now,
+                notes={
+                    'breakout_level': level,
+                    'volume_ratio': ratio,
+                    'breakout_strength': (close[bar] - level) / level * 100
+                }
+            )))
+        return signals
+
+    def scan_breakdown(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                       symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Ruptura bajista (detect_breakdown) en cada vela"""
+        close, support, volume_ratio = arrays['close'], arrays['support'], arrays['volume_ratio']
+
+        signals = []
+        for bar in self._level_bars(selected, close < support * 0.995):
+            level, ratio = float(support[bar]), float(volume_ratio[bar])
+            if not ratio > 1.5:
+                stage, confidence = PatternStage.POTENTIAL, 50
+            elif close[bar] < level * 0.99:
+                stage, confidence = PatternStage.CONFIRMED, 85
+            else:
+                stage, confidence = PatternStage.FORMING, 70
+            now = datetime.now()
+            signals.append((int(bar), Signal(
+                id=f"{symbol}_{timeframe}_BRD_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.BREAKDOWN,
+                stage=stage,
+                confidence=confidence,
+                entry_price=level * 0.995,
+                stop_loss=level * 1.02,
+                take_profit_1=level * 0.97,
+                take_profit_2=level * 0.95,
+                risk_reward_ratio=2.0,
+                formation_start=now,
+                current_timestamp=now,
+                notes={
+                    'breakdown_level': level,
+                    'volume_ratio': ratio,
+                    'breakdown_strength': (level - close[bar]) / level * 100
+                }
+            )))
+        return signals
+
+    # ------------------------------------------------------------------
+    # Patrones de velas
+    # ------------------------------------------------------------------
+
+    def scan_hammer(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                    symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Martillo (detect_hammer) en cada vela"""
+        open_, high, low, close = arrays['open'], arrays['high'], arrays['low'], arrays['close']
+        rsi = arrays['rsi']
+
+        bullish = close > open_
+        body = np.abs(close - open_)
+        lower_shadow = np.where(bullish, open_, close) - low
+        upper_shadow = high - np.where(bullish, close, open_)
+        prev_bearish = np.zeros(len(close), dtype=bool)
+        prev_bearish[1:] = close[:-1] < open_[:-1]
+
+        is_hammer = (lower_shadow > body * 2) & (upper_shadow < body * 0.5) & prev_bearish
+        ready = np.arange(len(close)) >= MIN_BARS['hammer'] - 1
+
+        signals = []
+        for bar in np.flatnonzero(selected & ready & is_hammer):
+            price = float(close[bar])
+            now = datetime.now()
+            signals.append((int(bar), Signal(
+                id=f"{symbol}_{timeframe}_HAM_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.HAMMER,
+                stage=PatternStage.FORMING,
+                confidence=65 if rsi[bar] < 40 else 55,
+                entry_price=price,
+                stop_loss=low[bar] * 0.99,
+                take_profit_1=price * 1.02,
+                take_profit_2=price * 1.04,
+                risk_reward_ratio=1.5,
+                formation_start=now,
+                current_timestamp=now,
+                notes={
+                    'body_size': body[bar],
+                    'lower_shadow': lower_shadow[bar],
+                    'upper_shadow': upper_shadow[bar]
+                }
+            )))
+        return signals
+
+    def scan_engulfing(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                       symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Envolvente alcista/bajista (detect_engulfing) en cada vela"""
+        open_, high, low, close = arrays['open'], arrays['high'], arrays['low'], arrays['close']
+        volume_ratio = arrays['volume_ratio']
+
+        n = len(close)
+        prev_open, prev_close = np.full(n, np.nan), np.full(n, np.nan)
+        prev_open[1:], prev_close[1:] = open_[:-1], close[:-1]
+
+        bull = (prev_close < prev_open) & (close > open_) & (open_ < prev_close) & (close > prev_open)
+        bear = (prev_close > prev_open) & (close < open_) & (open_ > prev_close) & (close < prev_open)
+        ready = np.arange(n) >= MIN_BARS['engulfing'] - 1
+
+        signals = []
+        for bar in np.flatnonzero(selected & ready & (bull | bear)):
+            is_bull = bool(bull[bar])
+            price = float(close[bar])
+            volume_confirmation = bool(volume_ratio[bar] > 1.3)
+            if is_bull:
+                sl = min(low[bar], low[bar - 1]) * 0.99
+                tp1, tp2 = price * 1.02, price * 1.04
+            else:
+                sl = max(high[bar], high[bar - 1]) * 1.01
+                tp1, tp2 = price * 0.98, price * 0.96
+            now = datetime.now()
+            signals.append((int(bar), Signal(
+                id=f"{symbol}_{timeframe}_ENG_{now.timestamp()}",
+                symbol=symbol,
+                timeframe=timeframe,
+                pattern_type=PatternType.ENGULFING_BULL if is_bull else PatternType.ENGULFING_BEAR,
+                stage=PatternStage.FORMING,
+                confidence=70 if volume_confirmation else 60,
+                entry_price=price,
+                stop_loss=sl,
+                take_profit_1=tp1,
+                take_profit_2=tp2,
+                risk_reward_ratio=1.5,
+                formation_start=now,
+                current_timestamp=now,
+                notes={
+                    'engulfing_type': 'bullish' if is_bull else 'bearish',
+                    'volume_confirmation': volume_confirmation
+                }
+            )))
+        return signals
+
+    # ------------------------------------------------------------------
+    # Triángulos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _rolling_slope(values: np.ndarray, window: int) -> np.ndarray:
+        """Pendiente de la recta de mínimos cuadrados de las últimas window velas"""
+        slope = np.full(len(values), np.nan)
+        if len(values) < window:
+            return slope
+        x = np.arange(window, dtype=float)
+        x -= x.mean()
+        slope[window - 1:] = sliding_window_view(values, window) @ x / (x @ x)
+        return slope
+
+    def scan_triangle(self, arrays: Dict[str, np.ndarray], selected: np.ndarray,
+                      symbol: str, timeframe: str) -> List[Tuple[int, Signal]]:
+        """Triángulo ascendente/descendente (detect_triangle) en cada vela"""
+        high, low = arrays['high'], arrays['low']
+        window = MIN_BARS['triangle']
+        high_slope = self._rolling_slope(high, window)
+        low_slope = self._rolling_slope(low, window)
+
+        ascending = (np.abs(high_slope) < 0.001) & (low_slope > 0.001)
+        descending = ~ascending & (np.abs(low_slope) < 0.001) & (high_slope < -0.001)
+
+        signals = []
+        for bar in np.flatnonzero(selected & (ascending | descending)):
+            now = datetime.now()
+            if ascending[bar]:
+                level = high[bar]
+                signal = Signal(
+                    id=f"{symbol}_{timeframe}_TRI_ASC_{now.timestamp()}",
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    pattern_type=PatternType.TRIANGLE_ASC,
+                    stage=PatternStage.FORMING,
+                    confidence=65,
+                    entry_price=level * 1.005,
+                    stop_loss=low[bar] * 0.99,
+                    take_profit_1=level * 1.03,
+                    take_profit_2=level * 1.05,
+                    risk_reward_ratio=2.0,
+                    formation_start=now - timedelta(hours=30),
+                    current_timestamp=now,
+                    notes={
+                        'apex': level,
+                        'pattern': 'ascending_triangle'
+                    }
+                )
+            else:
+                level = low[bar]
+                signal = Signal(
+                    id=f"{symbol}_{timeframe}_TRI_DESC_{now.timestamp()}",
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    pattern_type=PatternType.TRIANGLE_DESC,
+                    stage=PatternStage.FORMING,
+                    confidence=65,
+                    entry_price=level * 0.995,
+                    stop_loss=high[bar] * 1.01,
+                    take_profit_1=level * 0.97,
+                    take_profit_2=level * 0.95,
+                    risk_reward_ratio=2.0,
+                    formation_start=now - timedelta(hours=30),
+                    current_timestamp=now,
+                    notes={
+                        'apex': level,
+                        'pattern': 'descending_triangle'
+                    }
+                )
+            signals.append((int(bar), signal))
+        return signals
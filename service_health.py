@@ -5,7 +5,7 @@ Verificador de estado de todos los servicios del sistema
 """
 
 import asyncio
-import aiohttp
+from http_client_pool import get_aiohttp_session
 import psutil
 import socket
 from datetime import datetime
@@ -64,14 +64,14 @@ class ServiceHealthChecker:
             if 'binance.com' in url:
                 timeout = 2
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=timeout, ssl=False) as response:
-                    return {
-                        'status': 'online',
-                        'response_time': 0,  # Podríamos medir esto
-                        'status_code': response.status,
-                        'healthy': response.status == 200
-                    }
+            session = get_aiohttp_session()
+            async with session.get(url, timeout=timeout, ssl=False) as response:
+                return {
+                    'status': 'online',
+                    'response_time': 0,  # Podríamos medir esto
+                    'status_code': response.status,
+                    'healthy': response.status == 200
+                }
         except asyncio.TimeoutError:
             # Si es Binance y hay timeout, no es crítico
             if 'binance.com' in url:
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
 from database import db
+from write_behind_queue import get_write_behind_writer
 import json
 
 logging.basicConfig(level=logging.INFO)
@@ -553,8 +554,8 @@ class SignalAnalyzer:
                 'analyzed_at': datetime.now().isoformat()
             }
             
-            # Guardar en tabla de análisis
-            db.save_signal_analysis(analysis_data)
+            # Guardar en tabla de análisis (diferido si el writer está en marcha)
+            get_write_behind_writer().submit_signal_analysis(analysis_data)
             logger.info(f"Analysis saved for signal {analysis.signal_id} - Score: {analysis.quality_score:.1f}")
             
         except Exception as e:
@@ -114,7 +114,7 @@ class TelegramNotification(NotificationChannel):
             return
             
         try:
-            import aiohttp
+            from http_client_pool import get_aiohttp_session
             
             # Agregar emojis según el nivel
             emojis = {
@@ -134,10 +134,10 @@ class TelegramNotification(NotificationChannel):
                 "parse_mode": "HTML"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=data) as response:
-                    if response.status != 200:
-                        logger.error(f"Error enviando a Telegram: {await response.text()}")
+            session = get_aiohttp_session()
+            async with session.post(url, json=data) as response:
+                if response.status != 200:
+                    logger.error(f"Error enviando a Telegram: {await response.text()}")
         except Exception as e:
             logger.error(f"Error en Telegram: {e}")
 
@@ -49,6 +49,10 @@ class SignalValidationPipeline:
         from market_analyzer import get_market_analyzer
         self.market_analyzer = get_market_analyzer()
         
+        # Contexto BTC compartido (un conector, una descarga por vela cerrada)
+        from btc_context import get_btc_context_provider
+        self.btc_context = get_btc_context_provider()
+        
         # Configurar pesos de cada filtro
         self.filter_weights = {
             'market_condition': 0.25,  # Condición general del mercado
@@ -268,28 +272,7 @@ class SignalValidationPipeline:
     
     def calculate_btc_trend(self) -> str:
         """Calcular tendencia actual de BTC"""
-        try:
-            from binance_integration import BinanceConnector
-            connector = BinanceConnector(testnet=True)
-            df = connector.get_historical_data('BTCUSDT', timeframe='1h', limit=24)
-            
-            if not df.empty:
-                sma_short = df['close'].tail(6).mean()
-                sma_long = df['close'].tail(24).mean()
-                
-                if sma_short > sma_long * 1.01:
-                    return 'UP'
-                elif sma_short < sma_long * 0.99:
-                    return 'DOWN'
-            
-            return 'LATERAL'
-        except Exception as e:
-            handle_calculation_error(e, {
-                'operation': 'detect_trend',
-                'prices_length': len(prices) if prices else 0,
-                'function': 'detect_trend'
-            })
-            return 'LATERAL'
+        return self.btc_context.get_context().trend
     
     def validate_signal(self, 
                        signal: Dict[str, Any],
@@ -304,8 +287,41 @@ class SignalValidationPipeline:
             signal['symbol'], prices, high, low, volume
         )
         
-        # Obtener tendencia de BTC
+        return self._evaluate(signal, market_analysis, self.calculate_btc_trend())
+    
+    def validate_signals(self,
+                         signals: List[Dict[str, Any]],
+                         market_data: Dict[str, Dict[str, List[float]]]) -> List[SignalEvaluation]:
+        """
+        Validar muchas señales contra un mismo snapshot de mercado
+        
+        Args:
+            signals: Señales a validar (cada una con 'symbol' y 'action')
+            market_data: {símbolo: {'prices', 'high', 'low', 'volume'}}
+            
+        Returns:
+            Evaluaciones en el mismo orden que signals
+        """
+        
+        # Contexto BTC una sola vez y condición de mercado una vez por símbolo
         btc_trend = self.calculate_btc_trend()
+        analyses = {}
+        
+        evaluations = []
+        for signal in signals:
+            symbol = signal['symbol']
+            if symbol not in analyses:
+                data = market_data.get(symbol, {})
+                analyses[symbol] = self.market_analyzer.analyze_market_condition(
+                    symbol, data.get('prices', []), data.get('high', []),
+                    data.get('low', []), data.get('volume', [])
+                )
+            evaluations.append(self._evaluate(signal, analyses[symbol], btc_trend))
+        
+        return evaluations
+    
+    def _evaluate(self, signal: Dict[str, Any], market_analysis: Dict, btc_trend: str) -> SignalEvaluation:
+        """Aplica los filtros a una señal con el análisis de mercado ya hecho"""
         
         # Ejecutar todos los filtros
         filters_results = {}
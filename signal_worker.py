@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 SIGNAL WORKER - Generador de Señales Automático
-Proceso independiente que genera señales cada 30 segundos
+Proceso independiente que genera señales en cada cierre de vela
 Funciona con o sin API keys
 """
 
@@ -17,6 +17,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from smart_trading_system import get_trading_system, SignalGenerator
 from websocket_manager import get_websocket_manager, broadcast_signal_update
+from candle_scheduler import get_candle_scheduler, scan_timeframe_from_env
 
 # Configurar logging
 logging.basicConfig(
@@ -28,16 +29,19 @@ logger = logging.getLogger(__name__)
 class SignalWorker:
     """Worker que genera señales continuamente"""
     
+    JOB_NAME = 'signal_worker'
+    
     def __init__(self):
         self.system = get_trading_system()
         self.signal_generator = SignalGenerator()
         self.ws_manager = get_websocket_manager()
         self.running = False
-        self.scan_interval = int(os.getenv('SIGNAL_SCAN_INTERVAL', '30'))
+        self.scan_timeframe = scan_timeframe_from_env()
+        self.scan_count = 0
         
         logger.info(f"📡 Signal Worker initialized")
         logger.info(f"   Mode: {self.system.mode}")
-        logger.info(f"   Scan interval: {self.scan_interval} seconds")
+        logger.info(f"   Scan on every {self.scan_timeframe} candle close")
     
     async def start(self):
         """Iniciar el worker"""
@@ -47,39 +51,31 @@ class SignalWorker:
         # Iniciar el sistema de trading
         self.system.start()
         
-        scan_count = 0
-        while self.running:
-            try:
-                scan_count += 1
-                logger.info(f"\n{'='*50}")
-                logger.info(f"🔍 Scan #{scan_count} - {datetime.now().strftime('%H:%M:%S')}")
-                
-                # Generar señales
-                signals = await self.signal_generator.scan_markets()
-                
-                if signals:
-                    logger.info(f"📊 Found {len(signals)} signals")
-                    
-                    # Procesar las mejores señales
-                    best_signals = sorted(signals, key=lambda x: x.confidence, reverse=True)[:5]
-                    
-                    for signal in best_signals:
-                        await self.process_signal(signal)
-                else:
-                    logger.info("No signals found this scan")
-                
-                # Actualizar estadísticas
-                await self.update_statistics()
-                
-                # Esperar antes del siguiente escaneo
-                await asyncio.sleep(self.scan_interval)
-                
-            except KeyboardInterrupt:
-                logger.info("⛔ Worker stopped by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in signal worker: {e}")
-                await asyncio.sleep(60)
+        # Un escaneo ahora y otro en cada cierre de vela (con jitter y sin solaparse)
+        await get_candle_scheduler().run_job(self.JOB_NAME, self.scan_timeframe, self._scan_job)
+    
+    async def _scan_job(self, close):
+        """Trabajo del planificador: un escaneo por cierre de vela"""
+        self.scan_count += 1
+        logger.info(f"\n{'='*50}")
+        logger.info(f"🔍 Scan #{self.scan_count} - {datetime.now().strftime('%H:%M:%S')}")
+        
+        # Generar señales
+        signals = await self.signal_generator.scan_markets()
+        
+        if signals:
+            logger.info(f"📊 Found {len(signals)} signals")
+            
+            # Procesar las mejores señales
+            best_signals = sorted(signals, key=lambda x: x.confidence, reverse=True)[:5]
+            
+            for signal in best_signals:
+                await self.process_signal(signal)
+        else:
+            logger.info("No signals found this scan")
+        
+        # Actualizar estadísticas
+        await self.update_statistics()
     
     async def process_signal(self, signal):
         """Procesar una señal"""
@@ -192,6 +188,7 @@ class SignalWorker:
     def stop(self):
         """Detener el worker"""
         self.running = False
+        get_candle_scheduler().remove_job(self.JOB_NAME)
         self.system.stop()
         logger.info("Signal Worker stopped")
 
@@ -216,7 +213,7 @@ if __name__ == "__main__":
 ║  Generador automático de señales de trading             ║
 ║  • Escanea 5 criptomonedas principales                  ║
 ║  • Analiza con 8 estrategias filosóficas                ║
-║  • Genera señales cada 30 segundos                      ║
+║  • Genera señales en cada cierre de vela                ║
 ║  • Funciona SIN API keys (modo demo)                    ║
 ║                                                          ║
 ║  Presiona Ctrl+C para detener                           ║
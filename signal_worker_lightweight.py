@@ -13,6 +13,9 @@ from datetime import datetime
 import logging
 import httpx
 
+from scan_scheduler import SymbolScanScheduler
+from candle_scheduler import get_candle_scheduler, scan_timeframe_from_env
+
 # Configurar logging minimalista
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,13 +23,17 @@ logger = logging.getLogger(__name__)
 class LightweightSignalWorker:
     """Worker optimizado para generar señales con bajo consumo de memoria"""
     
+    JOB_NAME = 'lightweight_signal_worker'
+    
     def __init__(self):
         self.running = False
-        self.scan_interval = int(os.getenv('SIGNAL_SCAN_INTERVAL', '60'))  # 60 segundos por defecto
+        self.scan_timeframe = scan_timeframe_from_env()  # cierre de vela de 1m por defecto
+        self.scan_count = 0
         self.db_path = os.getenv('DATABASE_PATH', '/Users/ja/saby/trading_api/trading_bot.db')
         self.philosophers = ["Socrates", "Aristoteles", "Nietzsche", "Confucio", "Platon", "Kant", "Descartes", "Sun Tzu"]
         self.symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT"]
         self.price_cache = {}  # Cache de precios para evitar múltiples llamadas
+        self.scanner = SymbolScanScheduler()
         
     def get_db_connection(self):
         """Obtener conexión a la base de datos"""
@@ -178,25 +185,24 @@ class LightweightSignalWorker:
         """Escanear mercados y generar señales"""
         signals_generated = 0
         
-        # Primero actualizar cache de precios para todos los símbolos
+        # Primero actualizar cache de precios para todos los símbolos (en paralelo)
         logger.info("📊 Updating price cache...")
-        for symbol in self.symbols:
-            await self.get_real_price(symbol)
+        await self.scanner.run(self.symbols, self.get_real_price)
         
-        for symbol in self.symbols:
+        async def analyze(symbol: str):
             # Probabilidad de generar señal (30%)
             if random.random() < 0.3:
-                signal = await self.generate_signal(symbol)
-                
-                # Solo guardar señales con alta confianza
-                if signal['confidence'] >= 60:
-                    self.save_signal(signal)
-                    signals_generated += 1
-                    logger.info(f"💰 Real price for {symbol}: ${signal['entry_price']:.2f}")
-                    
-                    # Limitar a 3 señales por escaneo
-                    if signals_generated >= 3:
-                        break
+                return await self.generate_signal(symbol)
+            return None
+        
+        signals = await self.scanner.scan(self.symbols, analyze)
+        
+        # Solo guardar señales con alta confianza, limitado a 3 por escaneo (las mejores)
+        accepted, _ = self.scanner.select(signals, min_confidence=60, max_signals=3)
+        for signal in accepted:
+            self.save_signal(signal)
+            signals_generated += 1
+            logger.info(f"💰 Real price for {signal['symbol']}: ${signal['entry_price']:.2f}")
         
         if signals_generated > 0:
             logger.info(f"📊 Generated {signals_generated} signals")
@@ -207,31 +213,24 @@ class LightweightSignalWorker:
         """Iniciar el worker"""
         self.running = True
         logger.info("🚀 Lightweight Signal Worker started")
-        logger.info(f"   Scan interval: {self.scan_interval} seconds")
+        logger.info(f"   Scan on every {self.scan_timeframe} candle close")
         logger.info(f"   Symbols: {', '.join(self.symbols)}")
         
-        scan_count = 0
-        while self.running:
-            try:
-                scan_count += 1
-                logger.info(f"🔍 Scan #{scan_count} - {datetime.now().strftime('%H:%M:%S')}")
-                
-                # Escanear mercados
-                await self.scan_markets()
-                
-                # Esperar antes del siguiente escaneo
-                await asyncio.sleep(self.scan_interval)
-                
-            except KeyboardInterrupt:
-                logger.info("⛔ Worker stopped by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in signal worker: {e}")
-                await asyncio.sleep(60)
+        # Un escaneo ahora y otro en cada cierre de vela (con jitter y sin solaparse)
+        await get_candle_scheduler().run_job(self.JOB_NAME, self.scan_timeframe, self._scan_job)
+    
+    async def _scan_job(self, close):
+        """Trabajo del planificador: un escaneo por cierre de vela"""
+        self.scan_count += 1
+        logger.info(f"🔍 Scan #{self.scan_count} - {datetime.now().strftime('%H:%M:%S')}")
+        
+        # Escanear mercados (un fallo se registra y el siguiente cierre vuelve a intentarlo)
+        await self.scan_markets()
     
     def stop(self):
         """Detener el worker"""
         self.running = False
+        get_candle_scheduler().remove_job(self.JOB_NAME)
         logger.info("Signal Worker stopped")
 
 async def main():
@@ -15,6 +15,8 @@ import httpx
 import sys
 sys.path.append('/app')
 from philosophers_market_analysis import PhilosophersCouncil
+from scan_scheduler import SymbolScanScheduler
+from candle_scheduler import get_candle_scheduler, scan_timeframe_from_env
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,13 +25,17 @@ logger = logging.getLogger(__name__)
 class ProfessionalSignalWorker:
     """Worker profesional que genera señales basadas en análisis técnico real"""
     
+    JOB_NAME = 'professional_signal_worker'
+    
     def __init__(self):
         self.running = False
-        self.scan_interval = int(os.getenv('SIGNAL_SCAN_INTERVAL', '60'))
+        self.scan_timeframe = scan_timeframe_from_env()
+        self.scan_count = 0
         self.db_path = os.getenv('DATABASE_PATH', '/app/data/trading_bot.db')
         self.symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "XRPUSDT", "DOGEUSDT"]
         self.council = PhilosophersCouncil()
         self.price_cache = {}
+        self.scanner = SymbolScanScheduler()
         
     def get_db_connection(self):
         """Obtener conexión a la base de datos"""
@@ -215,34 +221,34 @@ class ProfessionalSignalWorker:
         logger.info("🔍 INICIANDO ANÁLISIS PROFESIONAL DE MERCADOS")
         logger.info("=" * 60)
         
-        # Actualizar cache de precios
+        # Actualizar cache de precios (todos los símbolos a la vez)
         logger.info("📊 Actualizando precios en tiempo real...")
-        for symbol in self.symbols:
-            await self.get_real_price(symbol)
+        await self.scanner.run(self.symbols, self.get_real_price)
+        
+        async def analyze(symbol: str):
+            # Generar probabilidad basada en volatilidad del mercado
+            analysis_probability = 0.4  # 40% de probabilidad de generar señal
+            if random.random() < analysis_probability:
+                logger.info(f"\n🎯 Analizando {symbol}...")
+                return await self.generate_professional_signal(symbol)
+            return None
         
-        # Analizar cada símbolo
-        for symbol in self.symbols:
-            try:
-                # Generar probabilidad basada en volatilidad del mercado
-                analysis_probability = 0.4  # 40% de probabilidad de generar señal
-                
-                if random.random() < analysis_probability:
-                    logger.info(f"\n🎯 Analizando {symbol}...")
-                    signal = await self.generate_professional_signal(symbol)
-                    
-                    if signal and signal['confidence'] >= 65:
-                        self.save_signal(signal)
-                        signals_generated += 1
-                        
-                        # Limitar señales por escaneo
-                        if signals_generated >= 3:
-                            logger.info("📊 Límite de señales alcanzado para este escaneo")
-                            break
-                    elif signal:
-                        logger.info(f"⏸️ Señal de {symbol} descartada (confianza: {signal['confidence']:.1f}%)")
-                        
-            except Exception as e:
-                logger.error(f"Error analizando {symbol}: {e}")
+        # Analizar todos los símbolos en paralelo, mejores señales primero
+        signals = await self.scanner.scan(self.symbols, analyze)
+        
+        # Limitar señales por escaneo (se quedan las de mayor confianza)
+        accepted, rejected = self.scanner.select(signals, min_confidence=65, max_signals=3)
+        for signal in accepted:
+            self.save_signal(signal)
+            signals_generated += 1
+        if len(accepted) == 3:
+            logger.info("📊 Límite de señales alcanzado para este escaneo")
+        for signal in rejected:
+            if signal['confidence'] < 65:
+                reason = f"confianza {signal['confidence']:.1f}% < 65%"
+            else:
+                reason = f"límite de 3 señales por escaneo (confianza {signal['confidence']:.1f}%)"
+            logger.info(f"⏸️ Señal de {signal['symbol']} descartada: {reason}")
         
         if signals_generated > 0:
             logger.info(f"\n✅ Generadas {signals_generated} señales profesionales")
@@ -277,33 +283,25 @@ class ProfessionalSignalWorker:
         """)
         
         logger.info(f"⚙️ Configuración:")
-        logger.info(f"   • Intervalo de escaneo: {self.scan_interval} segundos")
+        logger.info(f"   • Escaneo en cada cierre de vela de {self.scan_timeframe}")
         logger.info(f"   • Símbolos: {', '.join(self.symbols)}")
         logger.info(f"   • Base de datos: {self.db_path}")
         
-        scan_count = 0
-        while self.running:
-            try:
-                scan_count += 1
-                logger.info(f"\n🔄 Escaneo #{scan_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Escanear mercados
-                await self.scan_markets()
-                
-                # Esperar antes del siguiente escaneo
-                logger.info(f"⏰ Próximo escaneo en {self.scan_interval} segundos...")
-                await asyncio.sleep(self.scan_interval)
-                
-            except KeyboardInterrupt:
-                logger.info("\n⛔ Worker detenido por el usuario")
-                break
-            except Exception as e:
-                logger.error(f"Error en signal worker: {e}")
-                await asyncio.sleep(60)
+        # Un escaneo ahora y otro en cada cierre de vela (con jitter y sin solaparse)
+        await get_candle_scheduler().run_job(self.JOB_NAME, self.scan_timeframe, self._scan_job)
+    
+    async def _scan_job(self, close):
+        """Trabajo del planificador: un escaneo por cierre de vela"""
+        self.scan_count += 1
+        logger.info(f"\n🔄 Escaneo #{self.scan_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # Escanear mercados (un fallo se registra y el siguiente cierre vuelve a intentarlo)
+        await self.scan_markets()
     
     def stop(self):
         """Detener el worker"""
         self.running = False
+        get_candle_scheduler().remove_job(self.JOB_NAME)
         logger.info("Signal Worker detenido")
 
 async def main():
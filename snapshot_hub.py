@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+===========================================
+SNAPSHOTS COMPARTIDOS POR CLAVE
+===========================================
+
+Un productor en segundo plano por clave (p. ej. símbolo) recalcula el
+análisis una vez por intervalo y lo publica como snapshot compartido.
+Los endpoints REST leen el último snapshot y los WebSockets se suscriben
+a sus cambios, así que el coste (descargas de klines, indicadores,
+serialización JSON) no crece con el número de clientes conectados.
+
+- Los productores arrancan bajo demanda y se paran solos tras
+  idle_timeout segundos sin lecturas ni suscriptores (y olvidan la clave)
+- Una lectura sin snapshot, o con uno más viejo que interval (productor
+  parado o atrasado), espera al siguiente cálculo; lecturas simultáneas
+  comparten ese mismo cálculo
+- Si un cálculo falla se conserva el snapshot anterior mientras tenga
+  menos de max_age segundos; después se publica el error
+- Con keys solo se aceptan esas claves (KeyError para el resto)
+- Cada snapshot se serializa a JSON una sola vez para todos los sockets
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 10.0  # segundos entre cálculos
+DEFAULT_IDLE_TIMEOUT = 60.0  # segundos sin demanda antes de parar el productor
+MAX_AGE_INTERVALS = 6  # max_age por defecto, en intervalos
+
+
+class Snapshot:
+    """Resultado publicado de un cálculo"""
+
+    __slots__ = ('key', 'data', 'version', 'error', 'updated_at', '_json')
+
+    def __init__(self, key: str, data, version: int, error: Optional[str] = None):
+        self.key = key
+        self.data = data
+        self.version = version
+        self.error = error
+        self.updated_at = time.monotonic()
+        self._json: Optional[str] = None
+
+    @property
+    def json(self) -> str:
+        """JSON del snapshot, serializado una sola vez"""
+        if self._json is None:
+            self._json = json.dumps(self.data, default=str)
+        return self._json
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.updated_at
+
+
+class SnapshotHub:
+    """Productores por clave que publican snapshots compartidos"""
+
+    def __init__(self, compute: Callable[[str], Awaitable], interval: float = DEFAULT_INTERVAL,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT, max_age: Optional[float] = None,
+                 keys: Optional[Iterable[str]] = None):
+        """
+        Args:
+            max_age: edad máxima de un snapshot servido tras cálculos fallidos
+            keys: claves admitidas (None = cualquiera)
+        """
+        self.compute = compute
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age if max_age is not None else interval * MAX_AGE_INTERVALS
+        self.keys = frozenset(keys) if keys is not None else None
+
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._attempts: Dict[str, int] = {}
+        self._producers: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, int] = {}
+        self._last_demand: Dict[str, float] = {}
+        self._changed: Optional[asyncio.Condition] = None
+        self._version = 0
+
+        self.stats = {'computes': 0, 'errors': 0, 'reads': 0, 'stale_reads': 0,
+                      'producers_started': 0}
+
+    def _condition(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _check_key(self, key: str):
+        if self.keys is not None and key not in self.keys:
+            raise KeyError(key)
+
+    def _demand(self, key: str) -> bool:
+        """Registra demanda de la clave; True si hubo que (re)arrancar su productor"""
+        self._last_demand[key] = time.monotonic()
+        producer = self._producers.get(key)
+        if producer is None or producer.done():
+            self._producers[key] = asyncio.create_task(self._produce(key))
+            self.stats['producers_started'] += 1
+            return True
+        return False
+
+    def _idle(self, key: str) -> bool:
+        return not self._subscribers.get(key) and \
+            time.monotonic() - self._last_demand.get(key, 0) > self.idle_timeout
+
+    async def _produce(self, key: str):
+        """Recalcula la clave cada intervalo mientras haya demanda"""
+        condition = self._condition()
+        while True:
+            started = time.monotonic()
+            data, error = None, None
+            try:
+                data = await self.compute(key)
+                self.stats['computes'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                error = str(e)
+                logger.error(f"Error calculando snapshot de {key}: {e}")
+
+            # Cada intento despierta a quien espera un cálculo, aunque haya fallado
+            async with condition:
+                previous = self._snapshots.get(key)
+                if error is None:
+                    self._version += 1
+                    self._snapshots[key] = Snapshot(key, data, self._version)
+                elif previous is None or previous.error or previous.age > self.max_age:
+                    self._version += 1
+                    self._snapshots[key] = Snapshot(key, {'symbol': key, 'error': error},
+                                                    self._version, error=error)
+                self._attempts[key] = self._attempts.get(key, 0) + 1
+                condition.notify_all()
+
+            if self._idle(key):
+                break
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        self._producers.pop(key, None)
+        # Sin demanda la clave se olvida: la siguiente lectura espera un cálculo nuevo
+        self._snapshots.pop(key, None)
+        self._attempts.pop(key, None)
+        self._last_demand.pop(key, None)
+        if not self._subscribers.get(key):
+            self._subscribers.pop(key, None)
+
+    async def get(self, key: str) -> Snapshot:
+        """
+        Snapshot vigente de la clave
+
+        Si no hay ninguno, o el que hay tiene más de interval segundos,
+        espera al siguiente cálculo (si falla, se sirve el anterior
+        mientras no supere max_age).
+
+        Raises:
+            KeyError: si la clave no está entre las admitidas
+        """
+        self._check_key(key)
+        self.stats['reads'] += 1
+        attempts = self._attempts.get(key, 0)
+        restarted = self._demand(key)
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or restarted or snapshot.age > self.interval:
+            self.stats['stale_reads'] += snapshot is not None
+            condition = self._condition()
+            async with condition:
+                await condition.wait_for(lambda: self._attempts.get(key, 0) > attempts
+                                         and key in self._snapshots)
+            snapshot = self._snapshots[key]
+        return snapshot
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Snapshot]:
+        keys = list(dict.fromkeys(keys))
+        snapshots = await asyncio.gather(*(self.get(key) for key in keys))
+        return dict(zip(keys, snapshots))
+
+    async def subscribe(self, keys: Iterable[str]) -> AsyncIterator[Tuple[str, Snapshot]]:
+        """
+        Itera (clave, snapshot) con el estado actual y después con cada cambio
+
+        Un suscriptor lento no frena a los productores: si se pierde
+        varias versiones recibe solo la más reciente.
+        """
+        keys = list(dict.fromkeys(keys))
+        for key in keys:
+            self._check_key(key)
+        seen: Dict[str, int] = {}
+        condition = self._condition()
+
+        def pending():
+            return [key for key in keys
+                    if key in self._snapshots and self._snapshots[key].version != seen.get(key)]
+
+        for key in keys:
+            self._subscribers[key] = self._subscribers.get(key, 0) + 1
+            self._demand(key)
+        try:
+            while True:
+                async with condition:
+                    await condition.wait_for(pending)
+                    ready = [self._snapshots[key] for key in pending()]
+                for snapshot in ready:
+                    seen[snapshot.key] = snapshot.version
+                    yield snapshot.key, snapshot
+                for key in keys:
+                    self._demand(key)  # relanza productores que hubieran terminado
+        finally:
+            for key in keys:
+                self._subscribers[key] -= 1
+                self._last_demand[key] = time.monotonic()
+
+    async def stop(self):
+        """Detiene todos los productores"""
+        tasks = list(self._producers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._producers.clear()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['producers'] = sorted(self._producers)
+        stats['subscribers'] = sum(self._subscribers.values())
+        return stats
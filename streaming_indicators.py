@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+===========================================
+INDICADORES INCREMENTALES (STREAMING)
+===========================================
+
+Estado de indicadores que avanza O(1) por vela cerrada en lugar de
+recalcular ventanas completas de 500 velas en cada tick:
+
+- RSI (media simple como calculate_indicators, o suavizado de Wilder)
+- EMA / MACD (misma ponderación que pandas ewm(span, adjust=True))
+- ATR (media del true range)
+- Bollinger Bands y SMA de volumen mediante sumas acumuladas
+
+El estado se siembra con el histórico y después solo recibe velas nuevas.
+Los valores producidos coinciden con los de PhilosopherTrader.calculate_indicators
+y MultiTimeframeAnalyzer.calculate_rsi/macd/atr sobre la última fila.
+"""
+
+import math
+import threading
+import logging
+from collections import deque
+from typing import Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class RollingWindow:
+    """Ventana deslizante con suma y suma de cuadrados (media y desviación O(1))"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    def update(self, value: float):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        # Resincronizar periódicamente para evitar deriva de coma flotante
+        self._updates += 1
+        if self._updates >= self.size * 50:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+            self._updates = 0
+
+    def _sums_with(self, value: float) -> Tuple[int, float, float]:
+        count = len(self.values)
+        total, total_sq = self.total, self.total_sq
+        if count == self.size:
+            old = self.values[0]
+            total -= old
+            total_sq -= old * old
+        else:
+            count += 1
+        return count, total + value, total_sq + value * value
+
+    def mean(self, value: Optional[float] = None) -> float:
+        """Media de la ventana (o de la ventana si se añadiera value)"""
+        if value is None:
+            count, total = len(self.values), self.total
+        else:
+            count, total, _ = self._sums_with(value)
+        return total / count if count == self.size else NAN
+
+    def std(self, value: Optional[float] = None) -> float:
+        """Desviación estándar muestral (ddof=1, igual que pandas rolling.std)"""
+        if value is None:
+            count, total, total_sq = len(self.values), self.total, self.total_sq
+        else:
+            count, total, total_sq = self._sums_with(value)
+        if count != self.size or count < 2:
+            return NAN
+        variance = (total_sq - total * total / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class StreamingEMA:
+    """EMA con la ponderación de pandas ewm(span=n, adjust=True)"""
+
+    def __init__(self, span: int):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def update(self, value: float) -> float:
+        self.numerator = self.numerator * self.decay + value
+        self.denominator = self.denominator * self.decay + 1.0
+        return self.numerator / self.denominator
+
+    def peek(self, value: float) -> float:
+        return ((self.numerator * self.decay + value) /
+                (self.denominator * self.decay + 1.0))
+
+    @property
+    def value(self) -> float:
+        return self.numerator / self.denominator if self.denominator else NAN
+
+
+class StreamingRSI:
+    """
+    RSI incremental.
+
+    smoothing='sma' replica la media móvil simple usada en todo el repo;
+    smoothing='wilder' usa el suavizado clásico (avg*(n-1) + x) / n.
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = 'sma'):
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Suavizado RSI no soportado: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self.prev_close: Optional[float] = None
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.avg_gain = NAN
+        self.avg_loss = NAN
+
+    def _delta(self, close: float) -> Tuple[float, float]:
+        # La primera vela cuenta como delta 0 (igual que delta.where(...))
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    def _averages(self, gain: float, loss: float) -> Tuple[float, float]:
+        if self.smoothing == 'sma':
+            return self.gains.mean(gain), self.losses.mean(loss)
+        if math.isnan(self.avg_gain):
+            # Semilla de Wilder: media simple del primer periodo completo
+            return self.gains.mean(gain), self.losses.mean(loss)
+        n = self.period
+        return ((self.avg_gain * (n - 1) + gain) / n,
+                (self.avg_loss * (n - 1) + loss) / n)
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return NAN
+        if avg_loss == 0:
+            return NAN if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def update(self, close: float) -> float:
+        gain, loss = self._delta(close)
+        self.avg_gain, self.avg_loss = self._averages(gain, loss)
+        self.gains.update(gain)
+        self.losses.update(loss)
+        self.prev_close = close
+        return self._rsi(self.avg_gain, self.avg_loss)
+
+    def peek(self, close: float) -> float:
+        return self._rsi(*self._averages(*self._delta(close)))
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.avg_gain, self.avg_loss)
+
+
+class IndicatorState:
+    """
+    Estado completo de indicadores de un (símbolo, timeframe).
+
+    update() incorpora una vela cerrada; peek() evalúa una vela en
+    formación sin modificar el estado. Ambos devuelven un dict con las
+    mismas claves que el marco de indicator_engine.
+    """
+
+    def __init__(self, rsi_period: int = 14, rsi_smoothing: str = 'sma',
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 bb_period: int = 20, bb_std: float = 2.0,
+                 atr_period: int = 14, volume_period: int = 20):
+        self.rsi = StreamingRSI(rsi_period, rsi_smoothing)
+        self.ema_fast = StreamingEMA(macd_fast)
+        self.ema_slow = StreamingEMA(macd_slow)
+        self.macd_signal = StreamingEMA(macd_signal)
+        self.bb = RollingWindow(bb_period)
+        self.bb_std = bb_std
+        self.true_range = RollingWindow(atr_period)
+        self.volume = RollingWindow(volume_period)
+        self.prev_close: Optional[float] = None
+        self.candles = 0
+        self.values: Dict[str, float] = {}
+
+    def _true_range(self, high: float, low: float) -> float:
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def _snapshot(self, close: float, volume: float, rsi: float, ema_fast: float,
+                  ema_slow: float, signal: float, bb_middle: float, bb_dev: float,
+                  atr: float, volume_sma: float) -> Dict[str, float]:
+        macd = ema_fast - ema_slow
+        return {
+            'close': close,
+            'RSI': rsi,
+            'EMA_12': ema_fast,
+            'EMA_26': ema_slow,
+            'MACD': macd,
+            'MACD_Signal': signal,
+            'MACD_Histogram': macd - signal,
+            'BB_Middle': bb_middle,
+            'BB_Upper': bb_middle + bb_dev * self.bb_std,
+            'BB_Lower': bb_middle - bb_dev * self.bb_std,
+            'ATR': atr,
+            'Volume_SMA': volume_sma,
+            'Volume_Ratio': volume / volume_sma if volume_sma else NAN,
+        }
+
+    def update(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Incorpora una vela cerrada (O(1))"""
+        true_range = self._true_range(high, low)
+        rsi = self.rsi.update(close)
+        ema_fast = self.ema_fast.update(close)
+        ema_slow = self.ema_slow.update(close)
+        signal = self.macd_signal.update(ema_fast - ema_slow)
+        self.bb.update(close)
+        self.true_range.update(true_range)
+        self.volume.update(volume)
+        self.prev_close = close
+        self.candles += 1
+
+        self.values = self._snapshot(
+            close, volume, rsi, ema_fast, ema_slow, signal,
+            self.bb.mean(), self.bb.std(), self.true_range.mean(), self.volume.mean()
+        )
+        return self.values
+
+    def peek(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Valores si la vela en formación cerrara ahora (no modifica el estado)"""
+        ema_fast = self.ema_fast.peek(close)
+        ema_slow = self.ema_slow.peek(close)
+        return self._snapshot(
+            close, volume, self.rsi.peek(close), ema_fast, ema_slow,
+            self.macd_signal.peek(ema_fast - ema_slow),
+            self.bb.mean(close), self.bb.std(close),
+            self.true_range.mean(self._true_range(high, low)), self.volume.mean(volume)
+        )
+
+    def seed(self, df: pd.DataFrame) -> 'IndicatorState':
+        """Siembra el estado con velas históricas"""
+        for high, low, close, volume in zip(df['high'].to_numpy(dtype=float),
+                                            df['low'].to_numpy(dtype=float),
+                                            df['close'].to_numpy(dtype=float),
+                                            df['volume'].to_numpy(dtype=float)):
+            self.update(high, low, close, volume)
+        return self
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, **kwargs) -> 'IndicatorState':
+        """Crea un estado ya sembrado con el histórico de df"""
+        return cls(**kwargs).seed(df)
+
+
+class StreamingIndicatorStore:
+    """
+    Estados incrementales por (símbolo, timeframe).
+
+    sync() recibe el mismo DataFrame de velas que antes se recalculaba
+    entero: solo incorpora las velas cerradas que aún no había visto y
+    evalúa la última (en formación) con peek(). Si el histórico no
+    encaja (hueco o velas reescritas) vuelve a sembrar el estado.
+    """
+
+    def __init__(self, **state_kwargs):
+        self.state_kwargs = state_kwargs
+        self._states: Dict[Tuple[str, str], Tuple[IndicatorState, Hashable]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _candle_stamps(df: pd.DataFrame) -> Optional[pd.Index]:
+        # Sin timestamps reales (RangeIndex) no se puede saber qué velas son nuevas
+        if 'timestamp' in df.columns:
+            return pd.Index(df['timestamp'])
+        if isinstance(df.index, pd.DatetimeIndex):
+            return df.index
+        return None
+
+    def sync(self, symbol: str, timeframe: str, df: pd.DataFrame) -> Dict[str, float]:
+        """Avanza el estado con las velas nuevas y devuelve los valores actuales"""
+        if df is None or len(df) < 2:
+            return {}
+
+        key = (symbol, timeframe)
+        closed = df.iloc[:-1]
+        stamps = self._candle_stamps(closed)
+
+        with self._lock:
+            entry = self._states.get(key)
+            state = None
+            if entry is not None and stamps is not None and entry[1] in stamps:
+                position = stamps.get_loc(entry[1])
+                if isinstance(position, int):
+                    state = entry[0]
+                    state.seed(closed.iloc[position + 1:])
+
+            if state is None:
+                state = IndicatorState.from_history(closed, **self.state_kwargs)
+
+            self._states[key] = (state, stamps[-1] if stamps is not None else None)
+
+            last = df.iloc[-1]
+            return state.peek(float(last['high']), float(last['low']),
+                              float(last['close']), float(last['volume']))
+
+    def get_state(self, symbol: str, timeframe: str) -> Optional[IndicatorState]:
+        """Estado actual (solo velas cerradas) o None"""
+        entry = self._states.get((symbol, timeframe))
+        return entry[0] if entry else None
+
+    def reset(self, symbol: Optional[str] = None):
+        """Descarta estados (de un símbolo o todos)"""
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                for key in [k for k in self._states if k[0] == symbol]:
+                    del self._states[key]
+
+
+# Instancia global compartida
+_global_store = None
+
+
+def get_streaming_store() -> StreamingIndicatorStore:
+    """Obtiene la instancia global de estados incrementales"""
+    global _global_store
+    if _global_store is None:
+        _global_store = StreamingIndicatorStore()
+    return _global_store
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 import time
 import os
 from swing_trading_system import SwingTradingSystem
+from local_order_book import start_order_book_manager
 
 class SwingMonitorAlerts:
     """
@@ -128,6 +129,9 @@ class SwingMonitorAlerts:
         """Main monitoring loop"""
         print("🚀 Starting Swing Trading Monitor...")
         print("📡 Connecting to markets...")
+        if os.getenv('ORDER_BOOK_STREAM_ENABLED', 'true').lower() == 'true':
+            # Order books kept in memory from the diff-depth stream
+            await start_order_book_manager(self.symbols)
         await asyncio.sleep(2)
         
         scan_count = 0
@@ -13,6 +13,9 @@ from typing import Dict, List, Optional, Tuple
 import json
 import logging
 
+from local_order_book import get_local_depth
+from order_book_depth import get_depth_analyzer
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -257,29 +260,36 @@ class SwingTradingSystem:
         """
         Get liquidity analysis for better entries
         """
+        # Local order book replica when this process keeps one in sync
+        depth = get_local_depth(symbol, 100)
+        if depth is not None:
+            return self._edge_from_analysis(get_depth_analyzer().analyze_depth(depth))
+        
         async with httpx.AsyncClient() as client:
             try:
                 response = await client.get(f"{self.liquidity_api}/{symbol}")
                 
                 if response.status_code == 200:
                     data = response.json()
-                    ob = data.get("order_book_analysis", {})
-                    
-                    return {
-                        "imbalance": ob.get("imbalance", 0),
-                        "whale_activity": ob.get("large_orders", {}).get("whale_activity", False),
-                        "spread_bps": ob.get("spread_bps", 0),
-                        "bid_liquidity": ob.get("liquidity_score", {}).get("0.5%", {}).get("bid_liquidity", 0),
-                        "ask_liquidity": ob.get("liquidity_score", {}).get("0.5%", {}).get("ask_liquidity", 0),
-                        "support_levels": ob.get("support_levels", []),
-                        "resistance_levels": ob.get("resistance_levels", [])
-                    }
+                    return self._edge_from_analysis(data.get("order_book_analysis", {}))
                     
             except Exception as e:
                 logger.error(f"Error getting liquidity: {e}")
                 
         return {}
     
+    def _edge_from_analysis(self, ob: Dict) -> Dict:
+        """Fields used for entries from an order book analysis"""
+        return {
+            "imbalance": ob.get("imbalance", 0),
+            "whale_activity": ob.get("large_orders", {}).get("whale_activity", False),
+            "spread_bps": ob.get("spread_bps", 0),
+            "bid_liquidity": ob.get("liquidity_score", {}).get("0.5%", {}).get("bid_liquidity", 0),
+            "ask_liquidity": ob.get("liquidity_score", {}).get("0.5%", {}).get("ask_liquidity", 0),
+            "support_levels": ob.get("support_levels", []),
+            "resistance_levels": ob.get("resistance_levels", [])
+        }
+    
     def identify_swing_setup(self, structure: Dict, liquidity: Dict) -> Optional[str]:
         """
         Identify swing trading setup
@@ -2,14 +2,29 @@
 """
 SYSTEM STATS - BotphIA
 Contador de estadísticas del sistema de trading
+
+Los incrementos solo tocan contadores en memoria; el fichero JSON se
+escribe de forma atómica (temporal + rename) cada flush_interval segundos
+o al acumular dirty_threshold incrementos. Con per_thread=True cada hilo
+cuenta en su propio buffer sin locks. Al escribir se suman los deltas
+pendientes sobre lo que haya en disco, así varios procesos (worker de
+señales y API) pueden compartir el mismo fichero sin pisarse.
 """
 
+import atexit
 import json
+import tempfile
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List, Optional
 import os
 
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
 # Import error handling system
 try:
     from error_handler import handle_data_error, CorruptedDataError
@@ -19,14 +34,123 @@ except ImportError:
         print(f"Data Error: {error}")
     class CorruptedDataError(Exception): pass
 
+class _Counters:
+    """Contadores acumulados de un hilo (solo los modifica su dueño)"""
+    
+    __slots__ = ('analyses', 'signals', 'high_quality', 'data_points',
+                 'philosopher_analyses', 'philosopher_signals', 'symbol_analyses',
+                 'philosopher_active', 'symbol_active', 'updated')
+    
+    COUNTS = ('analyses', 'signals', 'high_quality', 'data_points')
+    KEYED_COUNTS = ('philosopher_analyses', 'philosopher_signals', 'symbol_analyses')
+    TIMESTAMPS = ('philosopher_active', 'symbol_active')  # epoch; se combinan con max
+    
+    def __init__(self):
+        for name in self.COUNTS:
+            setattr(self, name, 0)
+        for name in self.KEYED_COUNTS + self.TIMESTAMPS:
+            setattr(self, name, {})
+        self.updated = 0.0
+    
+    def take_delta(self, seen: '_Counters') -> '_Counters':
+        """Diferencia respecto a seen (que pasa a ser el estado actual)"""
+        delta = _Counters()
+        for name in self.COUNTS:
+            value = getattr(self, name)
+            setattr(delta, name, value - getattr(seen, name))
+            setattr(seen, name, value)
+        for name in self.KEYED_COUNTS:
+            current = dict(getattr(self, name))
+            previous = getattr(seen, name)
+            setattr(delta, name, {key: value - previous.get(key, 0)
+                                  for key, value in current.items()
+                                  if value != previous.get(key, 0)})
+            setattr(seen, name, current)
+        for name in self.TIMESTAMPS:
+            setattr(delta, name, dict(getattr(self, name)))
+        delta.updated = self.updated
+        return delta
+    
+    def add(self, other: '_Counters'):
+        for name in self.COUNTS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in self.KEYED_COUNTS:
+            target = getattr(self, name)
+            for key, value in getattr(other, name).items():
+                target[key] = target.get(key, 0) + value
+        for name in self.TIMESTAMPS:
+            target = getattr(self, name)
+            for key, value in getattr(other, name).items():
+                target[key] = max(target.get(key, 0.0), value)
+        self.updated = max(self.updated, other.updated)
+    
+    def is_empty(self) -> bool:
+        return not any(getattr(self, name) for name in self.COUNTS)
+
+
+def _count_analysis(counters: _Counters, symbol: str, philosopher: str, data_points: int):
+    now = time.time()
+    counters.analyses += 1
+    if data_points > 0:
+        counters.data_points += data_points
+    if philosopher:
+        name = philosopher.lower()
+        counters.philosopher_analyses[name] = counters.philosopher_analyses.get(name, 0) + 1
+        counters.philosopher_active[name] = now
+    if symbol:
+        counters.symbol_analyses[symbol] = counters.symbol_analyses.get(symbol, 0) + 1
+        counters.symbol_active[symbol] = now
+    counters.updated = now
+
+
+def _count_signal(counters: _Counters, philosopher: str, is_high_quality: bool):
+    counters.signals += 1
+    if is_high_quality:
+        counters.high_quality += 1
+    if philosopher:
+        name = philosopher.lower()
+        counters.philosopher_signals[name] = counters.philosopher_signals.get(name, 0) + 1
+    counters.updated = time.time()
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
 class SystemStats:
     """Gestiona las estadísticas del sistema de trading"""
     
-    def __init__(self):
-        self.stats_file = "system_stats.json"
+    def __init__(self, stats_file: str = "system_stats.json", flush_interval: float = 5.0,
+                 dirty_threshold: int = 500, per_thread: bool = False, auto_flush: bool = True):
+        self.stats_file = stats_file
+        self.flush_interval = flush_interval
+        self.dirty_threshold = dirty_threshold
+        self.per_thread = per_thread
         self.stats = self.load_stats()
         self.session_start = datetime.now()
         
+        # self.stats + _unflushed es el estado visible; _unflushed se suma al disco en flush()
+        self._lock = threading.RLock()
+        self._unflushed = _Counters()
+        self._file_mtime = self._current_mtime()
+        
+        # Buffers de incremento: uno compartido con lock o uno por hilo sin lock
+        self._shared_lock = threading.Lock()
+        self._shared = _Counters()
+        self._local = threading.local()
+        self._buffers: List[_Counters] = [self._shared]
+        self._seen: List[_Counters] = [_Counters()]
+        self._dirty = 0
+        
+        self._flush_event = threading.Event()
+        self._closed = False
+        self._flush_thread = None
+        if auto_flush:
+            self._flush_thread = threading.Thread(target=self._flush_loop, name='system-stats-flush',
+                                                  daemon=True)
+            self._flush_thread.start()
+            atexit.register(self.close)
+        
     def load_stats(self) -> Dict[str, Any]:
         """Carga estadísticas guardadas o crea nuevas"""
         if os.path.exists(self.stats_file):
@@ -85,55 +209,168 @@ class SystemStats:
             'last_update': datetime.now().isoformat()
         }
     
+    def _thread_counters(self) -> _Counters:
+        """Buffer del hilo actual (se registra la primera vez)"""
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = _Counters()
+            with self._lock:
+                self._buffers.append(counters)
+                self._seen.append(_Counters())
+        return counters
+    
     def increment_analysis(self, symbol: str = None, philosopher: str = None, data_points: int = 0):
         """Incrementa contador de análisis"""
-        # Contadores totales
-        self.stats['total']['analyses_count'] += 1
-        self.stats['session']['analyses_count'] += 1
-        self.stats['last_24h']['analyses_count'] += 1
-        
-        # Data points procesados
-        if data_points > 0:
-            self.stats['total']['data_points_processed'] += data_points
-            self.stats['session']['data_points_processed'] += data_points
-            self.stats['last_24h']['data_points_processed'] += data_points
-        
-        # Por filósofo
-        if philosopher and philosopher.lower() in self.stats['philosophers']:
-            self.stats['philosophers'][philosopher.lower()]['analyses'] += 1
-            self.stats['philosophers'][philosopher.lower()]['last_active'] = datetime.now().isoformat()
-        
-        # Por símbolo
-        if symbol:
-            if symbol not in self.stats['symbols_analysis']:
-                self.stats['symbols_analysis'][symbol] = {
-                    'analyses': 0,
-                    'last_analysis': None
-                }
-            self.stats['symbols_analysis'][symbol]['analyses'] += 1
-            self.stats['symbols_analysis'][symbol]['last_analysis'] = datetime.now().isoformat()
-            
-            # Actualizar contador de símbolos únicos
-            self.stats['total']['symbols_tracked'] = len(self.stats['symbols_analysis'])
-        
-        self.stats['last_update'] = datetime.now().isoformat()
-        self.save_stats()
+        if self.per_thread:
+            try:
+                counters = self._local.counters
+            except AttributeError:
+                counters = self._thread_counters()
+            _count_analysis(counters, symbol, philosopher, data_points)
+        else:
+            with self._shared_lock:
+                _count_analysis(self._shared, symbol, philosopher, data_points)
+        self._mark_dirty()
     
     def increment_signal(self, symbol: str = None, philosopher: str = None, is_high_quality: bool = False):
         """Incrementa contador de señales generadas"""
-        self.stats['total']['signals_generated'] += 1
-        self.stats['session']['signals_generated'] += 1
-        self.stats['last_24h']['signals_generated'] += 1
+        if self.per_thread:
+            try:
+                counters = self._local.counters
+            except AttributeError:
+                counters = self._thread_counters()
+            _count_signal(counters, philosopher, is_high_quality)
+        else:
+            with self._shared_lock:
+                _count_signal(self._shared, philosopher, is_high_quality)
+        self._mark_dirty()
+    
+    def _mark_dirty(self):
+        # Carrera benigna entre hilos: solo decide cuándo adelantar el flush
+        self._dirty += 1
+        if self._dirty >= self.dirty_threshold and not self._flush_event.is_set():
+            self._flush_event.set()
+    
+    # === AGREGACIÓN Y PERSISTENCIA ===
+    
+    def _collect(self):
+        """Pasa lo contado en los buffers a self.stats y a _unflushed"""
+        with self._lock:
+            for counters, seen in zip(self._buffers, self._seen):
+                if counters is self._shared:
+                    with self._shared_lock:
+                        delta = counters.take_delta(seen)
+                else:
+                    delta = counters.take_delta(seen)
+                if delta.is_empty():
+                    continue
+                self._apply(self.stats, delta, session=True)
+                self._unflushed.add(delta)
+    
+    @staticmethod
+    def _apply(stats: Dict[str, Any], delta: _Counters, session: bool):
+        """Suma un delta de contadores sobre un diccionario de estadísticas"""
+        sections = ['total', 'last_24h'] + (['session'] if session else [])
+        for section in sections:
+            stats[section]['analyses_count'] += delta.analyses
+            stats[section]['signals_generated'] += delta.signals
+            stats[section]['data_points_processed'] += delta.data_points
+        stats['total']['high_quality_signals'] += delta.high_quality
         
-        if is_high_quality:
-            self.stats['total']['high_quality_signals'] += 1
+        philosophers = stats['philosophers']
+        for name, count in delta.philosopher_analyses.items():
+            if name in philosophers:
+                philosophers[name]['analyses'] += count
+        for name, count in delta.philosopher_signals.items():
+            if name in philosophers:
+                philosophers[name]['signals'] += count
+        for name, epoch in delta.philosopher_active.items():
+            if name in philosophers:
+                last = philosophers[name]['last_active']
+                philosophers[name]['last_active'] = max(last, _iso(epoch)) if last else _iso(epoch)
         
-        # Por filósofo
-        if philosopher and philosopher.lower() in self.stats['philosophers']:
-            self.stats['philosophers'][philosopher.lower()]['signals'] += 1
+        symbols = stats['symbols_analysis']
+        for symbol, count in delta.symbol_analyses.items():
+            entry = symbols.setdefault(symbol, {'analyses': 0, 'last_analysis': None})
+            entry['analyses'] += count
+        for symbol, epoch in delta.symbol_active.items():
+            entry = symbols.setdefault(symbol, {'analyses': 0, 'last_analysis': None})
+            last = entry['last_analysis']
+            entry['last_analysis'] = max(last, _iso(epoch)) if last else _iso(epoch)
+        stats['total']['symbols_tracked'] = len(symbols)
         
-        self.stats['last_update'] = datetime.now().isoformat()
-        self.save_stats()
+        if delta.updated:
+            stats['last_update'] = max(stats['last_update'], _iso(delta.updated))
+    
+    def _current_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.stats_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _read_file(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.stats_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _merge_from_disk(self):
+        """Si otro proceso escribió el fichero, adopta sus totales + lo pendiente propio"""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._file_mtime:
+            return
+        disk = self._read_file()
+        if disk is None:
+            return
+        disk['session'] = self.stats['session']
+        self._apply(disk, self._unflushed, session=False)
+        self.stats = disk
+        self._file_mtime = mtime
+    
+    def _refresh(self):
+        """Estado visible al día antes de leerlo"""
+        with self._lock:
+            self._collect()
+            self._merge_from_disk()
+    
+    def flush(self, mutate: Callable[[Dict[str, Any]], None] = None):
+        """Escribe los contadores pendientes (sumados a lo que haya en disco)"""
+        with self._lock:
+            self._dirty = 0
+            self._collect()
+            lock_file = None
+            try:
+                if fcntl is not None:
+                    lock_file = open(f"{self.stats_file}.lock", 'a')
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._merge_from_disk()
+                if mutate is not None:
+                    mutate(self.stats)
+                elif self._unflushed.is_empty():
+                    return
+                self.save_stats()
+                self._unflushed = _Counters()
+                self._file_mtime = self._current_mtime()
+            finally:
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+    
+    def _flush_loop(self):
+        while not self._closed:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error guardando estadísticas: {e}")
+    
+    def close(self):
+        """Detiene el flush periódico y escribe lo pendiente"""
+        self._closed = True
+        self._flush_event.set()
+        self.flush()
     
     def get_session_uptime(self) -> str:
         """Calcula el tiempo de actividad de la sesión actual"""
@@ -145,12 +382,14 @@ class SystemStats:
     
     def get_analysis_rate(self) -> float:
         """Calcula análisis por minuto"""
+        self._refresh()
         delta = datetime.now() - datetime.fromisoformat(self.stats['session']['start_time'])
         minutes = max(delta.total_seconds() / 60, 1)
         return round(self.stats['session']['analyses_count'] / minutes, 2)
     
     def get_stats_summary(self) -> Dict[str, Any]:
         """Obtiene resumen de estadísticas"""
+        self._refresh()
         return {
             'uptime': self.get_session_uptime(),
             'analysis_rate': self.get_analysis_rate(),
@@ -175,21 +414,31 @@ class SystemStats:
         }
     
     def save_stats(self):
-        """Guarda estadísticas en archivo"""
+        """Guarda estadísticas en archivo (temporal + rename atómico)"""
+        directory = os.path.dirname(os.path.abspath(self.stats_file))
+        tmp_path = None
         try:
-            with open(self.stats_file, 'w') as f:
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.system_stats.',
+                                             suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
                 json.dump(self.stats, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.stats_file)
         except Exception as e:
             print(f"Error guardando estadísticas: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
     
     def reset_24h_stats(self):
         """Resetea contadores de 24 horas"""
-        self.stats['last_24h'] = {
-            'analyses_count': 0,
-            'signals_generated': 0,
-            'data_points_processed': 0
-        }
-        self.save_stats()
+        def reset(stats):
+            stats['last_24h'] = {
+                'analyses_count': 0,
+                'signals_generated': 0,
+                'data_points_processed': 0
+            }
+        self.flush(mutate=reset)
 
 # Instancia global
 _system_stats = None
@@ -198,5 +447,5 @@ def get_system_stats() -> SystemStats:
     """Obtiene instancia singleton de estadísticas"""
     global _system_stats
     if _system_stats is None:
-        _system_stats = SystemStats()
-    return _system_stats
\ No newline at end of file
+        _system_stats = SystemStats(per_thread=True)
+    return _system_stats
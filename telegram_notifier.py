@@ -9,7 +9,7 @@ import logging
 import os
 from datetime import datetime
 from typing import Dict, Any, Optional
-import aiohttp
+from http_client_pool import get_aiohttp_session
 import json
 
 logger = logging.getLogger(__name__)
@@ -82,15 +82,15 @@ class TelegramNotifier:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=payload) as response:
-                    if response.status == 200:
-                        logger.info("Señal enviada exitosamente a Telegram")
-                        return True
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Error Telegram API: {response.status} - {error_text}")
-                        return False
+            session = get_aiohttp_session()
+            async with session.post(url, data=payload) as response:
+                if response.status == 200:
+                    logger.info("Señal enviada exitosamente a Telegram")
+                    return True
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Error Telegram API: {response.status} - {error_text}")
+                    return False
         except Exception as e:
             logger.error(f"Error HTTP enviando a Telegram: {e}")
             return False
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Tests for the GCRA limiter behind the API security middleware"""
+
+import time
+
+import pytest
+
+from api_rate_limiter import GCRARateLimiter, LocalRateLimitStore, SQLiteRateLimitStore
+
+
+def test_burst_then_steady_rate_and_idle_eviction():
+    store = LocalRateLimitStore(max_keys=3)
+    limiter = GCRARateLimiter(store)
+
+    # 5 requests per 300s: a burst of 5, then one every 60s
+    results = [limiter.check(['ip:1.2.3.4:login'], 5, 300, now=0.0) for _ in range(6)]
+    assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+    assert [remaining for _, remaining, _ in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[5][2] == 60.0
+
+    assert not limiter.check(['ip:1.2.3.4:login'], 5, 300, now=59.0)[0]
+    assert limiter.check(['ip:1.2.3.4:login'], 5, 300, now=60.0)[0]
+
+    # IP and user must both have budget; a rejection spends neither
+    assert limiter.check(['ip:5.6.7.8:login', 'user:42:login'], 1, 10, now=0.0)[0]
+    assert not limiter.check(['ip:9.9.9.9:login', 'user:42:login'], 1, 10, now=0.0)[0]
+    assert limiter.check(['ip:9.9.9.9:login'], 1, 10, now=0.0)[0]
+
+    # Memory is bounded by the LRU cap and idle keys are dropped
+    assert len(store) <= 3
+    for i in range(100):
+        limiter.check([f'ip:10.0.0.{i}:default'], 1000, 3600, now=10_000.0 + i)
+    assert len(store) <= 3
+
+
+def test_sqlite_store_shares_one_budget(tmp_path):
+    path = str(tmp_path / 'rate_limits.db')
+    worker_a = GCRARateLimiter(SQLiteRateLimitStore(path, sweep_every=2))
+    worker_b = GCRARateLimiter(SQLiteRateLimitStore(path, sweep_every=2))
+
+    assert worker_a.check(['ip:1.2.3.4:trading'], 2, 60, now=0.0)[0]
+    assert worker_b.check(['ip:1.2.3.4:trading'], 2, 60, now=0.0)[0]
+    assert not worker_a.check(['ip:1.2.3.4:trading'], 2, 60, now=0.0)[0]
+    assert worker_b.check(['ip:1.2.3.4:trading'], 2, 60, now=30.0)[0]
+
+    # Expired keys are swept
+    worker_a.check(['ip:5.5.5.5:trading'], 2, 60, now=1000.0)
+    worker_a.check(['ip:5.5.5.5:trading'], 2, 60, now=1000.0)
+    assert len(worker_a.store) == 1
+
+
+def test_sqlite_store_recovers_from_tats_ahead_of_the_clock(tmp_path):
+    path = str(tmp_path / 'rate_limits.db')
+    store = SQLiteRateLimitStore(path)
+    assert store.clock is time.time
+
+    # File written on a clock far ahead of the current one (e.g. monotonic before a reboot)
+    store._connection().execute("INSERT INTO rate_limits (key, tat) VALUES (?, ?)",
+                                ('ip:1.2.3.4:login', 500_000.0))
+    limiter = GCRARateLimiter(SQLiteRateLimitStore(path))
+
+    results = [limiter.check(['ip:1.2.3.4:login'], 5, 300, now=100.0) for _ in range(6)]
+    assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+    assert results[0][1] == 4
+
+    # Without an explicit now the shared store runs on wall-clock time
+    assert limiter.check(['ip:5.6.7.8:login'], 5, 300)[2] == pytest.approx(60.0, abs=1.0)
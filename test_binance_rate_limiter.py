@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Test del limitador de peso global y del agrupador de peticiones"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from binance_api_optimized import OptimizedBinanceAPI
+from binance_rate_limiter import RequestCoalescer, WeightRateLimiter
+from error_handler import ApiError
+
+
+def test_used_weight_header_caps_local_budget():
+    limiter = WeightRateLimiter(capacity=1200)
+    limiter.update_from_headers({'X-MBX-USED-WEIGHT-1M': '1150'})
+
+    assert limiter.available <= 50.5
+    limiter.update_from_headers({'x-other': '1'})
+    assert limiter.available <= 51
+
+
+def test_async_acquire_waits_for_refill_without_blocking_loop():
+    limiter = WeightRateLimiter(capacity=10, window=1)  # 10 de peso por segundo
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        for _ in range(3):
+            await limiter.acquire_async(5)
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = asyncio.run(scenario())
+    assert 0.4 <= elapsed < 1.0
+    assert ticks > 10
+
+
+def test_retry_after_pauses_requests():
+    limiter = WeightRateLimiter(capacity=100)
+    limiter.update_from_headers({'Retry-After': '0.2'}, status=429)
+
+    started = time.perf_counter()
+    limiter.acquire(1)
+    assert time.perf_counter() - started >= 0.15
+    assert limiter.get_stats()['penalties'] == 1
+
+
+def test_identical_concurrent_requests_share_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return [[1, '2']]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescer.call(('klines', 'BTCUSDT'), fetch)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [[[1, '2']]] * 8
+
+    async def scenario():
+        async def fetch_async():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'ok'
+        return await asyncio.gather(*(coalescer.call_async('depth', fetch_async) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ['ok'] * 5
+    assert len(calls) == 2
+
+
+def test_optimized_api_never_sleeps_on_the_event_loop():
+    api = OptimizedBinanceAPI()
+    api.rate_limiter = WeightRateLimiter(capacity=4, window=0.4)  # 10 de peso por segundo
+    requests_made = []
+
+    class Response:
+        status_code = 200
+        headers = {}
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'price': '101.5'}
+
+    def fake_get(url, params):
+        requests_made.append(url)
+        return Response()
+
+    api._get = fake_get
+
+    async def scenario():
+        api._check_rate_limit(4)  # con saldo: no espera
+        started = time.perf_counter()
+        with pytest.raises(ApiError):
+            api._check_rate_limit(2)  # sin saldo: falla en vez de time.sleep
+        assert time.perf_counter() - started < 0.05
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        price = await api.get_current_price_async('BTCUSDT')  # espera el refill en el loop
+        task.cancel()
+        return price, ticks
+
+    price, ticks = asyncio.run(scenario())
+    assert price == 101.5 and ticks >= 5
+    assert requests_made == [f"{api.base_url}/api/v3/ticker/price"]
+
+
+def test_sync_methods_fall_back_when_budget_is_exhausted_on_the_loop():
+    api = OptimizedBinanceAPI()
+    api.rate_limiter.try_acquire = lambda weight: False
+    api._get = lambda url, params: pytest.fail('sin saldo no debe haber petición')
+
+    async def scenario():
+        return (api.get_current_price('BTCUSDT'), api.get_24hr_ticker('BTCUSDT'),
+                api.get_order_book('BTCUSDT'), api.get_average_price('BTCUSDT'))
+
+    assert asyncio.run(scenario()) == (0.0, {}, {}, 0.0)
+
+
+def test_fallback_api_error_accepts_message_and_context(monkeypatch):
+    import builtins
+    import importlib
+    import binance_api_optimized
+
+    real_import = builtins.__import__
+
+    def without_error_handler(name, *args, **kwargs):
+        if name == 'error_handler':
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', without_error_handler)
+    fallback = importlib.reload(binance_api_optimized)
+    try:
+        error = fallback.ApiError(message='sin saldo', context={'weight': 2})
+        assert str(error) == 'sin saldo' and error.context == {'weight': 2}
+        assert fallback.NetworkError(message='ping', context={}).message == 'ping'
+    finally:
+        monkeypatch.undo()
+        importlib.reload(binance_api_optimized)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Test del contexto BTC compartido y la validación por lotes"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from btc_context import BTCContextProvider
+from signal_pipeline import SignalValidationPipeline
+
+
+class FakeConnector:
+    """Devuelve velas 1h de BTC alcistas; la última está en formación"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_historical_data(self, symbol, timeframe='1h', limit=500):
+        self.calls += 1
+        now = pd.Timestamp.utcnow().tz_localize(None).floor('h')
+        index = pd.date_range(end=now, periods=limit, freq='h')
+        close = np.linspace(60000, 66000, limit)
+        close[-1] = 1.0  # vela en formación: no debe influir
+        return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                             'volume': 1.0}, index=index)
+
+
+def test_context_is_cached_until_candle_close():
+    connector = FakeConnector()
+    provider = BTCContextProvider(connector=connector)
+
+    first = provider.get_context()
+    second = provider.get_context()
+
+    assert connector.calls == 1
+    assert first is second
+    assert first.trend == 'UP'
+    assert first.sma_short > first.sma_long
+    assert first.price > 60000
+    assert provider._expires_at > time.time()
+
+
+def test_validate_signals_matches_single_validation():
+    connector = FakeConnector()
+    pipeline = SignalValidationPipeline()
+    pipeline.btc_context = BTCContextProvider(connector=connector)
+
+    rng = np.random.default_rng(5)
+    market_data = {}
+    for symbol in ('ETHUSDT', 'SOLUSDT'):
+        prices = list(100 + np.cumsum(rng.normal(0, 1, 100)))
+        market_data[symbol] = {'prices': prices, 'high': [p + 1 for p in prices],
+                               'low': [p - 1 for p in prices], 'volume': list(rng.uniform(1, 5, 100))}
+
+    signals = [{'symbol': s, 'action': a, 'philosopher': 'SOCRATES'}
+               for s in market_data for a in ('BUY', 'SELL')] * 10
+
+    batch = pipeline.validate_signals(signals, market_data)
+    single = [pipeline.validate_signal(s, **market_data[s['symbol']]) for s in signals[:4]]
+
+    assert connector.calls == 1
+    assert len(batch) == len(signals)
+    assert [e.final_score for e in batch[:4]] == [e.final_score for e in single]
+
+
+def test_refresh_runs_outside_the_lock_and_only_once():
+    release = threading.Event()
+
+    class SlowConnector(FakeConnector):
+        def get_historical_data(self, symbol, timeframe='1h', limit=500):
+            release.wait(5)
+            return super().get_historical_data(symbol, timeframe, limit)
+
+    connector = SlowConnector()
+    provider = BTCContextProvider(connector=connector)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(provider.get_context()))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while provider._refreshing is None:
+        time.sleep(0.001)
+
+    # Con la descarga en vuelo el lock está libre
+    assert provider._lock.acquire(timeout=1)
+    provider._lock.release()
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert connector.calls == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+
+
+def test_paper_trader_isolates_symbol_validation_errors():
+    from autonomous_paper_trader import PaperTradingBot
+
+    class Pipeline:
+        def validate_signals(self, signals, market_data):
+            if any(s['symbol'] == 'BADUSDT' for s in signals):
+                raise ValueError("datos corruptos")
+            return [f"ok-{s['symbol']}" for s in signals]
+
+    bot = PaperTradingBot.__new__(PaperTradingBot)
+    bot.signal_pipeline = Pipeline()
+    candidates = [{'symbol': 'ETHUSDT'}, {'symbol': 'BADUSDT'}, {'symbol': 'SOLUSDT'}]
+
+    assert [e for _, e in bot.validate_candidates(candidates, {})] == ['ok-ETHUSDT', 'ok-SOLUSDT']
+    assert bot.validate_candidates([], {}) == []
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Test del planificador por cierre de vela con un reloj simulado"""
+
+import asyncio
+
+from candle_scheduler import CandleCloseScheduler, last_close_time, next_close_time
+
+MINUTE = 60_000
+
+
+class FakeClock:
+    """Reloj que avanza con asyncio.sleep (sin esperas reales)"""
+
+    def __init__(self, start: float):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _patch_sleep(monkeypatch, clock):
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds, *args):
+        clock.now += max(seconds, 0)
+        await real_sleep(0)
+
+    monkeypatch.setattr('candle_scheduler.asyncio.sleep', fake_sleep)
+
+
+def test_close_times_align_with_binance():
+    now = 1_700_000_123_456
+    assert last_close_time('1m', now) == now // MINUTE * MINUTE
+    assert next_close_time('1m', now) == now // MINUTE * MINUTE + MINUTE
+    # Lunes 2023-11-13 00:00 UTC
+    assert last_close_time('1w', 1_700_000_000_000) == 1_699_833_600_000
+
+
+def test_wait_for_close_never_misses_a_close(monkeypatch):
+    clock = FakeClock(1_700_000_010.0)  # 10 s dentro de una vela de 1m
+    _patch_sleep(monkeypatch, clock)
+    scheduler = CandleCloseScheduler(close_delay=1.0, jitter=0, clock=clock)
+
+    async def scenario():
+        first = await scheduler.wait_for_close('1m')
+        assert first == next_close_time('1m', 1_700_000_010_000)
+        assert clock.now == first / 1000 + 1.0
+
+        # El cálculo tarda más de una vela: el cierre perdido sale sin esperar
+        clock.now += 90
+        second = await scheduler.wait_for_close('1m', first)
+        assert second == first + MINUTE
+        assert clock.now == first / 1000 + 91.0
+
+    asyncio.run(scenario())
+
+
+def test_jobs_fire_per_close_and_skip_while_running(monkeypatch):
+    clock = FakeClock(1_700_000_010.0)
+    _patch_sleep(monkeypatch, clock)
+    scheduler = CandleCloseScheduler(close_delay=0, jitter=0, clock=clock)
+    events, slow_started = [], []
+    release = None
+
+    async def fast(event):
+        events.append((event.symbol, event.close_time))
+
+    async def slow(event):
+        slow_started.append(event.close_time)
+        await release.wait()
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        scheduler.add_job('worker', '1m', fast, symbol='BTCUSDT')
+        scheduler.add_job('worker', '1m', fast, symbol='ETHUSDT')
+        scheduler.add_job('slow', '1m', slow)
+        await scheduler.start()
+        while scheduler.stats['closes'] < 3:
+            await asyncio.sleep(0)
+        release.set()
+        await asyncio.sleep(0)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    first_close = next_close_time('1m', 1_700_000_010_000)
+    assert {symbol for symbol, _ in events} == {'BTCUSDT', 'ETHUSDT'}
+    assert sorted({close for _, close in events})[:2] == [first_close, first_close + MINUTE]
+    assert slow_started == [first_close]
+    assert scheduler.stats['skipped'] >= 2
+
+
+def test_run_job_registers_and_unregisters_worker_loops(monkeypatch):
+    clock = FakeClock(1_700_000_010.0)
+    _patch_sleep(monkeypatch, clock)
+    scheduler = CandleCloseScheduler(close_delay=0, jitter=0, clock=clock)
+    scans = []
+
+    async def scan(event):
+        scans.append(event.close_time)
+        if len(scans) == 3:
+            scheduler.remove_job('worker')  # worker.stop()
+
+    async def scenario():
+        await scheduler.run_job('worker', '1m', scan)
+        assert scheduler.get_jobs() == []
+
+        # Cancelar la tarea (stop_bot, Ctrl+C) también da de baja el trabajo
+        task = asyncio.create_task(scheduler.run_job('monitor', '1m', scan, symbol='SOLUSDT'))
+        while len(scans) < 4:
+            await asyncio.sleep(0)
+        assert [job.key for job in scheduler.get_jobs()] == [('monitor', 'SOLUSDT', '1m')]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler.get_jobs() == []
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    first_close = next_close_time('1m', 1_700_000_010_000)
+    # Primer escaneo inmediato (vela ya cerrada) y después uno por cierre
+    assert scans[:3] == [first_close - MINUTE, first_close, first_close + MINUTE]
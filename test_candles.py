@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test del contenedor columnar de velas"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candles import Candles
+from market_replay_server import synthetic_klines
+
+
+def _binance_klines(count):
+    """Klines con el formato exacto de /api/v3/klines (precios como strings)"""
+    return [[k[0], f"{k[1]:.8f}", f"{k[2]:.8f}", f"{k[3]:.8f}", f"{k[4]:.8f}",
+             f"{k[5]:.8f}", k[6], "1234.5", 42, "1.0", "2.0", "0"]
+            for k in synthetic_klines(count)]
+
+
+def test_from_json_matches_reference_parse():
+    klines = _binance_klines(500)
+    body = json.dumps(klines).encode()
+
+    candles = Candles.from_json(body, 'BTCUSDT', '1h')
+    reference = Candles.from_klines(json.loads(body))
+
+    assert len(candles) == 500
+    assert candles.open_time.dtype == np.int64 and candles.close.dtype == np.float64
+    assert list(candles.open_time) == [k[0] for k in klines]
+    assert list(candles.close_time) == [k[6] for k in klines]
+    for name in ('open', 'high', 'low', 'close', 'volume'):
+        column = candles[name]
+        assert column.flags['C_CONTIGUOUS']
+        assert np.array_equal(column, reference[name])
+        assert np.array_equal(column, [float(k[('open', 'high', 'low', 'close', 'volume').index(name) + 1])
+                                       for k in klines])
+
+    # 7 columnas de 8 bytes por vela
+    assert candles.nbytes == 500 * 7 * 8
+    assert len(Candles.from_json(b'[]')) == 0
+    with pytest.raises(ValueError):
+        Candles.from_json(b'[[1, "2.0", "3.0"]]')
+
+
+def test_slices_and_frame_share_memory():
+    candles = Candles.from_json(json.dumps(_binance_klines(50)), 'ETHUSDT', '15m')
+
+    tail = candles.tail(10)
+    assert len(tail) == 10 and np.shares_memory(tail.close, candles.close)
+
+    df = candles.to_frame()
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert df.index[0] == pd.Timestamp(int(candles.open_time[0]), unit='ms')
+    assert df.attrs == {'symbol': 'ETHUSDT', 'timeframe': '15m'}
+    assert np.shares_memory(df['close'].to_numpy(), candles.close)
+    assert not np.shares_memory(candles.copy().close, candles.close)
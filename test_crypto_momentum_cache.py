@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test de la caché de velas y el análisis por lotes de CryptoMomentumDetector"""
+
+import asyncio
+import json
+from collections import Counter
+
+import crypto_momentum_detector
+from crypto_momentum_detector import CryptoMomentumDetector
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self._data
+
+
+class FakeClient:
+    """Responde como Binance y cuenta las peticiones por endpoint"""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    async def get(self, url, params=None, timeout=None):
+        endpoint = url.rsplit('/', 1)[-1]
+        self.calls[endpoint] += 1
+        await asyncio.sleep(0.01)
+        if endpoint == 'klines':
+            return FakeResponse([[i, '1', '1', '1', str(100 + i), str(10 + i % 7)]
+                                 for i in range(params['limit'])])
+        if endpoint == 'depth':
+            return FakeResponse({'bids': [['100', '3']] * 20, 'asks': [['101', '1']] * 20})
+        if endpoint == 'price':
+            return FakeResponse([{'symbol': s, 'price': '100.5'} for s in json.loads(params['symbols'])])
+        if endpoint == 'premiumIndex':
+            return FakeResponse([{'symbol': 'BTCUSDT', 'lastFundingRate': '0.0001'},
+                                 {'symbol': 'ETHUSDT', 'lastFundingRate': '0.0012'}])
+        return FakeResponse([], status_code=404)
+
+
+def test_klines_are_cached_and_shared(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(crypto_momentum_detector, 'get_httpx_client', lambda: client)
+    detector = CryptoMomentumDetector()
+
+    async def scenario():
+        first = await asyncio.gather(*(detector.get_klines('BTCUSDT', '15m', 50) for _ in range(5)))
+        short = await detector.get_klines('BTCUSDT', '15m', 10)
+        return first, short
+
+    first, short = asyncio.run(scenario())
+
+    assert client.calls['klines'] == 1
+    assert all(len(klines) == 50 for klines in first)
+    assert short == first[0][-10:]
+
+
+def test_batch_pulls_tickers_and_funding_once(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(crypto_momentum_detector, 'get_httpx_client', lambda: client)
+    detector = CryptoMomentumDetector()
+    symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+    async def scenario():
+        batch = await detector.get_comprehensive_momentum_batch(symbols)
+        single = await detector.get_comprehensive_momentum('BTCUSDT')
+        entry = await detector.should_enter_position('BTCUSDT', batch['BTCUSDT'])
+        return batch, single, entry
+
+    batch, single, entry = asyncio.run(scenario())
+
+    assert client.calls['price'] == 1
+    assert client.calls['premiumIndex'] == 1
+    # 15m y 5m por símbolo; el análisis individual posterior sale de la caché
+    assert client.calls['klines'] == 2 * len(symbols)
+    assert client.calls['depth'] == len(symbols) + 1
+
+    assert list(batch) == symbols
+    assert batch['BTCUSDT']['price'] == 100.5
+    assert batch['BTCUSDT']['indicators']['funding_rate']['signal'] == 'HEALTHY_MARKET'
+    assert batch['ETHUSDT']['indicators']['funding_rate']['signal'] == 'OVERHEATED'
+    assert batch['SOLUSDT']['indicators']['funding_rate']['health'] == 'UNKNOWN'
+    assert batch['BTCUSDT']['indicators']['volume_roc'] == single['indicators']['volume_roc']
+    assert entry['momentum_data'] is batch['BTCUSDT']
+
+
+def test_batch_bounds_concurrency_and_skips_failed_symbols(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(crypto_momentum_detector, 'get_httpx_client', lambda: client)
+    detector = CryptoMomentumDetector()
+    symbols = [f'C{i}USDT' for i in range(12)]
+    active, peak = set(), 0
+    analyze_volume = detector.calculate_volume_roc
+
+    async def volume_roc(symbol):
+        nonlocal peak
+        active.add(symbol)
+        peak = max(peak, len(active))
+        try:
+            if symbol == 'C3USDT':
+                raise RuntimeError('boom')
+            return await analyze_volume(symbol)
+        finally:
+            active.discard(symbol)
+
+    detector.calculate_volume_roc = volume_roc
+    batch = asyncio.run(detector.get_comprehensive_momentum_batch(symbols, max_concurrency=4))
+
+    assert peak <= 4
+    assert 'C3USDT' not in batch
+    assert list(batch) == [s for s in symbols if s != 'C3USDT']
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Test de TradingDatabase sobre el pool de conexiones y escrituras bulk"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from database import TradingDatabase
+from error_handler import DatabaseError
+
+
+def make_signal(i):
+    return {
+        'id': f'SOLUSDT_{i}', 'user_id': 'system', 'symbol': 'SOLUSDT',
+        'action': 'BUY', 'confidence': 70 + i, 'entry_price': 100.0 + i,
+        'philosopher': 'Socrates', 'rsi': 30.0, 'volume_ratio': 1.5
+    }
+
+
+def make_db(tmp_path):
+    db = TradingDatabase(str(tmp_path / 'bot.db'))
+    db.init_database()
+    return db
+
+
+def test_bulk_writes_match_single_writes(tmp_path):
+    db = make_db(tmp_path)
+
+    assert db.save_signals_bulk(make_signal(i) for i in range(50)) == 50
+    traces = [(f'SOLUSDT_{i}', 'SIGNAL_GENERATED', {'n': i}, 'Socrates') for i in range(50)]
+    traces.append({'signal_id': 'SOLUSDT_0', 'event_type': 'SIGNAL_FILTERED',
+                   'event_data': {'reason': 'Low quality score'}})
+    assert db.save_signal_traces_bulk(traces) == 51
+
+    assert db.save_signal(make_signal(99))
+    assert db.save_signal_trace('SOLUSDT_99', 'SIGNAL_GENERATED', {'n': 99}, 'Socrates')
+
+    assert db.get_statistics()['total_signals'] == 51
+    assert len(db.get_recent_signals(limit=100)) == 51
+    events = db.get_signal_trace('SOLUSDT_0')
+    assert [e['event_type'] for e in events] == ['SIGNAL_GENERATED', 'SIGNAL_FILTERED']
+    assert events[0]['event_data'] == {'n': 0}
+
+    # Todas las conexiones vuelven al pool
+    assert not db.pool._used_connections
+
+
+def test_bulk_write_is_one_transaction(tmp_path):
+    db = make_db(tmp_path)
+    db.save_signal(make_signal(3))
+
+    # El id 3 ya existe: falla todo el lote y no queda ninguna señal a medias
+    assert db.save_signals_bulk([make_signal(1), make_signal(2), make_signal(3)]) == 0
+    assert db.get_statistics()['total_signals'] == 1
+    assert db.save_signals_bulk([]) == 0
+    assert not db.pool._used_connections
+
+
+def test_more_callers_than_connections_wait_for_the_pool(tmp_path):
+    db = make_db(tmp_path)
+    assert db.pool.config.max_connections == 10
+    callers = 25
+    barrier = threading.Barrier(callers)
+
+    def save(i):
+        barrier.wait()  # todos compiten por el pool a la vez
+        with db._connection() as conn:
+            conn.execute("SELECT 1")
+            time.sleep(0.05)  # retiene la conexión: 25 > max_connections
+        return db.save_signal(make_signal(i))
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        assert all(executor.map(save, range(callers)))
+
+    assert db.get_statistics()['total_signals'] == callers
+    assert not db.pool._used_connections
+    stats = db.pool.get_stats()['stats']
+    assert stats['waits'] > 0 and stats['timeouts'] == 0
+
+
+def test_exhausted_pool_times_out_and_wakes_on_release(tmp_path):
+    db = TradingDatabase(str(tmp_path / 'bot.db'), pool_size=1, max_connections=2)
+    held = [db.pool.acquire(), db.pool.acquire()]
+
+    with pytest.raises(DatabaseError):
+        db.pool.acquire(timeout=0.05)
+    assert db.pool.get_stats()['stats']['timeouts'] == 1
+
+    # Una conexión liberada desde otro hilo desbloquea al que espera
+    threading.Timer(0.05, db.pool.release, args=(held.pop(),)).start()
+    conn = db.pool.acquire(timeout=5)
+    db.pool.release(conn)
+    db.pool.release(held.pop())
+    assert not db.pool._used_connections
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test del registro de clientes HTTP compartidos contra un servidor local"""
+
+import asyncio
+
+from aiohttp import web
+
+from http_client_pool import HTTPClientRegistry
+
+
+async def _serve(peers):
+    async def ping(request):
+        peers.add(request.transport.get_extra_info('peername'))
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_get('/ping', ping)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/ping"
+
+
+def test_clients_are_shared_and_keep_connections_alive():
+    registry = HTTPClientRegistry()
+
+    async def scenario():
+        aiohttp_peers, httpx_peers = set(), set()
+        runner_a, url_a = await _serve(aiohttp_peers)
+        runner_b, url_b = await _serve(httpx_peers)
+        try:
+            for _ in range(5):
+                session = registry.aiohttp_session()
+                async with session.get(url_a) as response:
+                    assert (await response.json()) == {'ok': True}
+                response = await registry.httpx_client().get(url_b)
+                assert response.json() == {'ok': True}
+
+            same = registry.aiohttp_session() is registry.aiohttp_session()
+            other = registry.aiohttp_session('telegram') is not registry.aiohttp_session()
+            sessions = [registry.aiohttp_session(), registry.httpx_client()]
+        finally:
+            await registry.close()
+            await runner_a.cleanup()
+            await runner_b.cleanup()
+        return aiohttp_peers, httpx_peers, same, other, sessions
+
+    aiohttp_peers, httpx_peers, same, other, (session, client) = asyncio.run(scenario())
+
+    # Cinco peticiones secuenciales por cliente sobre una sola conexión
+    assert len(aiohttp_peers) == 1
+    assert len(httpx_peers) == 1
+    assert same and other
+    assert session.closed and client.is_closed
+
+    # Otro event loop recibe clientes nuevos
+    async def new_loop():
+        session = registry.aiohttp_session()
+        await registry.close()
+        return session
+    assert asyncio.run(new_loop()) is not session
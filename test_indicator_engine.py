@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Test del motor de indicadores compartido (offline, datos sintéticos)"""
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import INDICATOR_COLUMNS, IndicatorEngine, add_indicators, has_indicators
+
+
+def _make_candles(n: int = 300, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.3, n),
+        'high': close + rng.uniform(0.5, 2, n),
+        'low': close - rng.uniform(0.5, 2, n),
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+def _reference_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Implementación original de PhilosopherTrader.calculate_indicators"""
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['RSI'] = 100 - (100 / (1 + gain / loss))
+    df['EMA_12'] = df['close'].ewm(span=12).mean()
+    df['EMA_26'] = df['close'].ewm(span=26).mean()
+    df['MACD'] = df['EMA_12'] - df['EMA_26']
+    df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+    df['BB_Middle'] = df['close'].rolling(20).mean()
+    bb_std = df['close'].rolling(20).std()
+    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
+    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    ranges = pd.concat([
+        df['high'] - df['low'],
+        np.abs(df['high'] - df['close'].shift()),
+        np.abs(df['low'] - df['close'].shift()),
+    ], axis=1)
+    df['ATR'] = ranges.max(axis=1).rolling(14).mean()
+    df['Volume_SMA'] = df['volume'].rolling(20).mean()
+    df['Volume_Ratio'] = df['volume'] / df['Volume_SMA']
+    return df
+
+
+def test_add_indicators_matches_reference():
+    df = _make_candles()
+    expected = _reference_indicators(df.copy())
+    result = add_indicators(df.copy())
+
+    for column in INDICATOR_COLUMNS:
+        pd.testing.assert_series_equal(result[column], expected[column])
+    assert has_indicators(result)
+
+
+def test_engine_computes_once_per_candle_set():
+    engine = IndicatorEngine()
+    df = _make_candles()
+
+    first = engine.get_frame(df, 'BTCUSDT', '1h')
+    second = engine.get_frame(df, 'BTCUSDT', '1h')
+
+    assert first is second
+    assert engine.get_stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+    # El DataFrame de entrada no se modifica
+    assert 'RSI' not in df.columns
+
+
+def test_engine_recomputes_on_new_candle():
+    engine = IndicatorEngine()
+    df = _make_candles()
+
+    first = engine.get_frame(df.iloc[:-1], 'BTCUSDT', '1h')
+    second = engine.get_frame(df, 'BTCUSDT', '1h')
+
+    assert first is not second
+    assert engine.get_stats()['misses'] == 2
+
+
+def test_shared_view_does_not_leak_columns():
+    engine = IndicatorEngine()
+    frame = engine.get_frame(_make_candles(), 'ETHUSDT', '15m')
+
+    view = IndicatorEngine.shared_view(frame)
+    view['custom'] = 1.0
+
+    assert 'custom' not in frame.columns
+    assert has_indicators(view)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Equivalencia de los kernels NumPy con las implementaciones en Python puro que sustituyen"""
+
+import random
+from collections import deque
+
+import pandas as pd
+import pytest
+
+import indicator_kernels as kernels
+from btc_sol_correlation_monitor import CorrelationMonitor
+from daytrading_pipeline import DaytradingPipeline
+from professional_trading_system import (MarketData, MomentumAnalyzer, ProfessionalTradingSystem,
+                                         TechnicalAnalyzer, VolumeAnalyzer)
+from profit_maximizer_bot import ProfitMaximizerBot
+
+
+# ===========================================
+# REFERENCIAS (copias de las versiones originales)
+# ===========================================
+
+def ref_ema(prices, period):
+    if len(prices) < period:
+        return prices[-1] if prices else 0
+    multiplier = 2 / (period + 1)
+    ema = prices[0]
+    for price in prices[1:]:
+        ema = (price * multiplier) + (ema * (1 - multiplier))
+    return ema
+
+
+def ref_rsi(prices, period=14):
+    if len(prices) < period + 1:
+        return 50
+    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
+    avg_gain = sum(d for d in deltas[-period:] if d > 0) / period
+    avg_loss = sum(-d for d in deltas[-period:] if d < 0) / period
+    if avg_loss == 0:
+        return 100
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def ref_macd_signal(prices, fast=12, slow=26, signal=9):
+    if len(prices) < slow:
+        return 0, 0
+    macd = ref_ema(prices, fast) - ref_ema(prices, slow)
+    macd_values = [ref_ema(prices[:i+1], fast) - ref_ema(prices[:i+1], slow)
+                   for i in range(slow, len(prices))]
+    return macd, ref_ema(macd_values, signal) if len(macd_values) > signal else macd
+
+
+def ref_true_ranges(highs, lows, closes):
+    return [max(highs[i] - lows[i], abs(highs[i] - closes[i-1]), abs(lows[i] - closes[i-1]))
+            for i in range(1, len(highs))]
+
+
+def ref_atr(highs, lows, closes, period=14):
+    if len(highs) < period + 1:
+        return 0
+    true_ranges = ref_true_ranges(highs, lows, closes)
+    return sum(true_ranges[-period:]) / len(true_ranges[-period:])
+
+
+def ref_obv(closes, volumes):
+    obv = [0]
+    for i in range(1, len(closes)):
+        sign = (closes[i] > closes[i-1]) - (closes[i] < closes[i-1])
+        obv.append(obv[-1] + sign * volumes[i])
+    return obv
+
+
+def ref_vpt(closes, volumes):
+    if len(closes) < 2:
+        return 0
+    return sum(volumes[i] * ((closes[i] - closes[i-1]) / closes[i-1] if closes[i-1] > 0 else 0)
+               for i in range(1, len(closes)))
+
+
+def ref_mfi(highs, lows, closes, volumes, period=14):
+    if len(closes) < period + 1:
+        return 50
+    typical = [(h + l + c) / 3 for h, l, c in zip(highs, lows, closes)]
+    flows = [tp * v for tp, v in zip(typical, volumes)]
+    positive = [flows[i] if typical[i] > typical[i-1] else 0 for i in range(1, len(typical))]
+    negative = [0 if typical[i] > typical[i-1] else flows[i] for i in range(1, len(typical))]
+    if sum(negative[-period:]) == 0:
+        return 100
+    return 100 - (100 / (1 + sum(positive[-period:]) / sum(negative[-period:])))
+
+
+def ref_dx(highs, lows, closes, period=14):
+    if len(highs) < period + 1:
+        return 0
+    plus_dm, minus_dm = [], []
+    for i in range(1, len(highs)):
+        high_diff = highs[i] - highs[i-1]
+        low_diff = lows[i-1] - lows[i]
+        plus_dm.append(high_diff if high_diff > low_diff and high_diff > 0 else 0)
+        minus_dm.append(low_diff if low_diff > high_diff and low_diff > 0 else 0)
+    tr = ref_true_ranges(highs, lows, closes)[-period:]
+    atr = sum(tr) / len(tr)
+    if atr <= 0:
+        return 0
+    plus_di = sum(plus_dm[-period:]) / period / atr * 100
+    minus_di = sum(minus_dm[-period:]) / period / atr * 100
+    if plus_di + minus_di == 0:
+        return 0
+    return abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+
+
+def _series(n, seed=7, start=100.0):
+    rng = random.Random(seed)
+    closes, highs, lows, volumes = [], [], [], []
+    price = start
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.01)
+        closes.append(price)
+        highs.append(price * (1 + rng.uniform(0, 0.005)))
+        lows.append(price * (1 - rng.uniform(0, 0.005)))
+        volumes.append(rng.uniform(10, 1000))
+    return closes, highs, lows, volumes
+
+
+# ===========================================
+# TESTS
+# ===========================================
+
+@pytest.mark.parametrize('n', [0, 1, 5, 14, 15, 26, 27, 65, 100, 500])
+def test_kernels_match_reference_implementations(n):
+    closes, highs, lows, volumes = _series(n, seed=n)
+    approx = lambda value: pytest.approx(value, rel=1e-9, abs=1e-9)
+
+    for period in (1, 9, 14, 21, 50):
+        assert kernels.ema_last(closes, period) == approx(ref_ema(closes, period))
+        assert kernels.ema(closes, period).tolist() == approx(
+            [ref_ema(closes[:i+1], 1) if period == 1 else
+             pd.Series(closes[:i+1]).ewm(span=period, adjust=False).mean().iloc[-1]
+             for i in range(n)])
+    if not n:
+        assert kernels.vwap(closes, volumes) == 0
+        return
+
+    assert kernels.rsi_last(closes) == approx(ref_rsi(closes))
+    assert kernels.atr_last(highs, lows, closes) == approx(ref_atr(highs, lows, closes))
+    assert kernels.vwap(closes, volumes) == approx(
+        sum(p * v for p, v in zip(closes, volumes)) / sum(volumes))
+    assert kernels.obv(closes, volumes).tolist() == approx(ref_obv(closes, volumes))
+    assert kernels.vpt(closes, volumes) == approx(ref_vpt(closes, volumes))
+    assert kernels.mfi_last(highs, lows, closes, volumes) == approx(ref_mfi(highs, lows, closes, volumes))
+    assert kernels.dx_last(highs, lows, closes) == approx(ref_dx(highs, lows, closes))
+
+    # Los métodos migrados siguen devolviendo lo mismo
+    bot = ProfitMaximizerBot()
+    assert bot.calculate_macd(closes) == approx(ref_macd_signal(closes))
+    assert bot.calculate_rsi(closes) == approx(ref_rsi(closes))
+    assert CorrelationMonitor().calculate_rsi(deque(closes, maxlen=100)) == approx(ref_rsi(closes[-100:]))
+    pipeline = DaytradingPipeline.__new__(DaytradingPipeline)
+    assert pipeline.calculate_ema(closes, 21) == approx(ref_ema(closes, 21))
+    assert pipeline.calculate_atr(highs, lows, closes) == approx(ref_atr(highs, lows, closes))
+
+    if n >= 26:
+        line = pd.Series(closes).ewm(span=12, adjust=False).mean() - \
+            pd.Series(closes).ewm(span=26, adjust=False).mean()
+        signal = line.ewm(span=9, adjust=False).mean()
+        assert TechnicalAnalyzer()._calculate_macd(closes) == approx(
+            (line.iloc[-1], signal.iloc[-1], line.iloc[-1] - signal.iloc[-1]))
+
+
+def test_edge_cases_and_market_data_columns():
+    flat = [100.0] * 30
+    assert kernels.rsi_last(flat) == 100          # sin pérdidas
+    assert kernels.rsi_last([1.0, 2.0]) == 50     # datos insuficientes
+    assert kernels.rsi_last([float(30 - i) for i in range(30)]) == 0
+    assert kernels.stochastic_last(flat, flat, flat) == (50, 50)
+    assert kernels.dx_last(flat, flat, flat) == 0
+    assert kernels.mfi_last(flat, flat, flat, flat) == ref_mfi(flat, flat, flat, flat) == 0  # sin subidas
+    assert kernels.bollinger_last([5.0, 6.0]) == (6.0, 6.0, 6.0)
+    assert kernels.vwap([10.0, 11.0], [0.0, 0.0]) == 11.0
+    assert kernels.vpt([0.0, 1.0, 2.0], [5.0, 5.0, 5.0]) == pytest.approx(5.0)
+    assert kernels.ema_last([], 9) == 0 and kernels.ema_last([3.0], 9) == 3.0
+
+    closes, highs, lows, volumes = _series(100, seed=11)
+    klines = [{'time': i, 'open': c, 'high': h, 'low': l, 'close': c, 'volume': v}
+              for i, (c, h, l, v) in enumerate(zip(closes, highs, lows, volumes))]
+    data = MarketData(symbol='BTCUSDT', price=closes[-1], volume_24h=1e9, change_24h=0.0,
+                      high_24h=max(highs), low_24h=min(lows), bid=closes[-1], ask=closes[-1],
+                      timestamp=None, klines=klines)
+    columns = data.columns()
+    assert data.columns() is columns               # convertidas una sola vez
+    assert columns['close'].flags['C_CONTIGUOUS'] and columns['high'].tolist() == highs
+
+    momentum = MomentumAnalyzer().analyze(data)['metrics']
+    assert momentum['adx'] == pytest.approx(ref_dx(highs, lows, closes))
+    highest, lowest = max(highs[-14:]), min(lows[-14:])
+    assert momentum['stochastic'] == pytest.approx((closes[-1] - lowest) / (highest - lowest) * 100)
+
+    volume = VolumeAnalyzer().analyze(data)['metrics']
+    assert volume['mfi'] == pytest.approx(ref_mfi(highs, lows, closes, volumes))
+    assert volume['vpt'] == pytest.approx(ref_vpt(closes, volumes))
+
+    technical = TechnicalAnalyzer().analyze(data)['indicators']
+    assert technical['rsi'] == pytest.approx(ref_rsi(closes))
+    system = ProfessionalTradingSystem.__new__(ProfessionalTradingSystem)
+    assert system._calculate_atr(columns) == pytest.approx(ref_atr(highs, lows, closes))
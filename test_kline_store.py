@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test del almacén local de klines con un exchange simulado (offline)"""
+
+import time
+
+import numpy as np
+
+from kline_store import KlineStore, interval_to_ms
+
+HOUR = interval_to_ms('1h')
+
+
+class FakeExchange:
+    """Sirve klines sintéticas de 1h paginando como /api/v3/klines"""
+
+    def __init__(self, candles: int):
+        now = int(time.time() * 1000)
+        self.end = now - now % HOUR
+        self.start = self.end - candles * HOUR
+        self.calls = []
+
+    def kline(self, open_time: int) -> list:
+        price = 100 + (open_time - self.start) / HOUR
+        return [open_time, str(price), str(price + 1), str(price - 1), str(price + 0.5),
+                '10', open_time + HOUR - 1, '0', 0, '0', '0', '0']
+
+    def __call__(self, symbol, interval, limit, start_time=None, end_time=None):
+        self.calls.append((start_time, end_time))
+        if start_time is None:
+            start_time = self.end - (limit - 1) * HOUR
+        start_time = max(start_time, self.start)
+        start_time += (-start_time) % HOUR
+        stop = self.end if end_time is None else min(end_time, self.end)
+        times = range(start_time, stop + 1, HOUR)
+        return [self.kline(t) for t in list(times)[:limit]]
+
+
+def test_sync_pages_history_then_only_fetches_tail(tmp_path):
+    exchange = FakeExchange(candles=2500)
+    store = KlineStore(root=str(tmp_path), fetcher=exchange)
+
+    df = store.get_range('BTC/USDT', '1h', days=100)
+    # ~2400 velas cerradas: la vela en formación no se persiste
+    assert 2399 <= len(df) <= 2400
+    assert df.index[-1].value // 1_000_000 == exchange.end - HOUR
+    assert df.index.is_monotonic_increasing
+    assert len(exchange.calls) == 3
+
+    exchange.calls.clear()
+    assert store.sync('BTCUSDT', '1h') == 0
+    assert len(exchange.calls) == 1
+    assert exchange.calls[0][0] == store.time_range('BTCUSDT', '1h')[1] + HOUR
+
+
+def test_gap_is_filled_and_series_stays_sorted(tmp_path):
+    exchange = FakeExchange(candles=50)
+    store = KlineStore(root=str(tmp_path), fetcher=exchange)
+
+    klines = [exchange.kline(exchange.start + i * HOUR) for i in range(40)]
+    store.import_klines('ETHUSDT', '1h', klines[:10] + klines[20:])
+    assert store.find_gaps('ETHUSDT', '1h') == [(klines[10][0], klines[19][0])]
+
+    store.sync('ETHUSDT', '1h')
+    open_times = store.load('ETHUSDT', '1h').index.asi8 // 1_000_000
+    assert store.find_gaps('ETHUSDT', '1h') == []
+    assert np.all(np.diff(open_times) == HOUR)
+
+
+def test_listing_start_and_exchange_outages_are_not_requested_again(tmp_path):
+    exchange = FakeExchange(candles=200)
+    outage = range(exchange.start + 50 * HOUR, exchange.start + 60 * HOUR, HOUR)
+    serve = exchange.__call__
+    fetcher = lambda *args: [k for k in serve(*args) if k[0] not in outage]
+    store = KlineStore(root=str(tmp_path), fetcher=fetcher)
+
+    # Pide 30 días con solo ~8 días listados: la cabeza empieza en el listado
+    store.get_range('XYZUSDT', '1h', days=30)
+    assert store.time_range('XYZUSDT', '1h')[0] == exchange.start
+    assert store.find_gaps('XYZUSDT', '1h') == [(outage[0], outage[-1])]
+
+    # El hueco se intenta una vez; vuelve vacío y queda anotado como irrellenable
+    store.sync('XYZUSDT', '1h')
+    assert store.find_gaps('XYZUSDT', '1h') == []
+    assert store.find_gaps('XYZUSDT', '1h', include_unfillable=True) == [(outage[0], outage[-1])]
+
+    exchange.calls.clear()
+    assert store.sync('XYZUSDT', '1h', start_time=exchange.start - 30 * 86_400_000) == 0
+    # Solo la cola: ni el rango previo al listado ni la caída se vuelven a pedir
+    assert exchange.calls == [(store.time_range('XYZUSDT', '1h')[1] + HOUR, exchange.calls[0][1])]
+
+    # Los metadatos persisten entre instancias
+    exchange.calls.clear()
+    KlineStore(root=str(tmp_path), fetcher=fetcher).get_range('XYZUSDT', '1h', days=30)
+    assert len(exchange.calls) == 1
+
+
+def test_offline_store_reads_seeded_fixture(tmp_path):
+    exchange = FakeExchange(candles=30)
+    KlineStore(root=str(tmp_path)).import_klines(
+        'SOLUSDT', '1h', [exchange.kline(exchange.start + i * HOUR) for i in range(30)])
+
+    offline = KlineStore(root=str(tmp_path), offline=True)
+    df = offline.get_range('SOLUSDT', '1h', days=365)
+
+    assert len(df) == 30
+    assert df['close'].iloc[0] == 100.5
+    assert offline.load('SOLUSDT', '1h', limit=5).index[0] == df.index[-5]
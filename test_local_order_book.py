@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test de la réplica local del order book con diffs reproducidos"""
+
+import asyncio
+import random
+
+import pytest
+
+import local_order_book
+from local_order_book import LocalOrderBook, OrderBookManager, SequenceGapError
+from market_replay_server import MarketReplayServer
+
+
+def _history(updates=30, seed=3):
+    """
+    Libro de referencia y sus diffs: states[i] es el libro tras el update i
+
+    Returns:
+        (states, diffs) con diffs[i] = (bids, asks) del update i + 1
+    """
+    rng = random.Random(seed)
+    bids = {round(100 - 0.1 * i, 1): 1.0 + i for i in range(1, 21)}
+    asks = {round(100 + 0.1 * i, 1): 1.0 + i for i in range(1, 21)}
+    states = [(dict(bids), dict(asks))]
+    diffs = []
+    for _ in range(updates):
+        changes = ([], [])
+        for book, sign, side in ((bids, -1, changes[0]), (asks, 1, changes[1])):
+            for _ in range(3):
+                price = round(100 + sign * 0.1 * rng.randint(1, 25), 1)
+                quantity = 0.0 if price in book and rng.random() < 0.3 else round(rng.uniform(0.5, 9), 3)
+                if quantity:
+                    book[price] = quantity
+                else:
+                    book.pop(price, None)
+                side.append((price, quantity))
+        diffs.append(changes)
+        states.append((dict(bids), dict(asks)))
+    return states, diffs
+
+
+def _rest_snapshot(states, update_id):
+    bids, asks = states[update_id]
+    return {'lastUpdateId': update_id,
+            'bids': [[str(p), str(q)] for p, q in sorted(bids.items(), reverse=True)],
+            'asks': [[str(p), str(q)] for p, q in sorted(asks.items())]}
+
+
+def _assert_book_equals(book, state):
+    bids, asks = state
+    depth = book.snapshot()
+    assert depth.bids.tolist() == [[p, q] for p, q in sorted(bids.items(), reverse=True)]
+    assert depth.asks.tolist() == [[p, q] for p, q in sorted(asks.items())]
+    assert book.best_bid == max(bids) and book.best_ask == min(asks)
+
+
+def test_local_book_applies_diffs_and_detects_gaps():
+    states, diffs = _history(10)
+    book = LocalOrderBook('BTC/USDT')
+    book.load_snapshot(_rest_snapshot(states, 3))
+
+    def event(first, last):
+        bids = [level for bids, _ in diffs[first - 1:last] for level in bids]
+        asks = [level for _, asks in diffs[first - 1:last] for level in asks]
+        return {'e': 'depthUpdate', 's': 'BTCUSDT', 'U': first, 'u': last, 'b': bids, 'a': asks}
+
+    assert not book.apply_diff(event(1, 3))  # anterior al snapshot
+    assert book.apply_diff(event(2, 5))      # primer evento: U <= 4 <= u
+    _assert_book_equals(book, states[5])
+    first = book.snapshot()
+    assert book.snapshot() is first          # cacheado mientras no cambie
+
+    assert book.apply_diff(event(6, 6))
+    _assert_book_equals(book, states[6])
+    assert book.snapshot() is not first
+    assert book.depth_within(5)['bid_quantity'] == pytest.approx(sum(states[6][0].values()))
+
+    with pytest.raises(SequenceGapError):
+        book.apply_diff(event(8, 9))         # falta el 7
+    assert book.last_update_id == 6
+
+
+def test_manager_syncs_from_replayed_diffs_and_resyncs_after_gap(monkeypatch):
+    states, diffs = _history(30)
+    server = MarketReplayServer()
+    for update_id, (bids, asks) in enumerate(diffs, start=1):
+        if update_id != 18:  # evento perdido: obliga a resincronizar
+            server.add_depth_update('BTCUSDT', update_id, update_id, bids, asks)
+    snapshot_ids = iter([5, 25])
+
+    async def fetcher(symbol, limit):
+        await asyncio.sleep(0.05)  # los diffs llegan mientras tanto
+        return _rest_snapshot(states, next(snapshot_ids))
+
+    async def scenario():
+        async with server:
+            manager = OrderBookManager(['BTCUSDT'], base_url=server.url, fetcher=fetcher,
+                                       reconnect_delay=0.01)
+            await manager.start()
+            for _ in range(300):
+                if manager.books['BTCUSDT'].last_update_id == 30:
+                    break
+                await asyncio.sleep(0.01)
+
+            monkeypatch.setattr(local_order_book, '_order_book_manager', manager)
+            from crypto_momentum_detector import CryptoMomentumDetector
+            imbalance = await CryptoMomentumDetector().get_order_book_imbalance('BTCUSDT')
+            depth = local_order_book.get_local_depth('BTCUSDT', 20)
+            await manager.stop()
+            return manager, imbalance, depth
+
+    manager, imbalance, depth = asyncio.run(scenario())
+
+    assert manager.stream_names() == ['btcusdt@depth@100ms']
+    _assert_book_equals(manager.books['BTCUSDT'], states[30])
+    assert manager.stats['gaps'] == 1
+    assert manager.stats['snapshots'] == 2
+    assert manager.stats['diffs_applied'] == (17 - 5) + (30 - 25)
+
+    # El detector leyó el libro local en lugar de pedir /depth
+    bids = sorted(states[30][0].items(), reverse=True)[:20]
+    assert imbalance['bid_volume'] == pytest.approx(sum(p * q for p, q in bids))
+    assert len(depth.bids) == 20
+    # Con la réplica detenida los consumidores vuelven a REST
+    assert manager.get_depth('BTCUSDT') is None
+
+
+def test_incremental_sides_match_full_rebuild_and_snapshots_stay_frozen():
+    rng = random.Random(11)
+    book = LocalOrderBook('ETHUSDT')
+    book.load_snapshot({'lastUpdateId': 0, 'bids': [], 'asks': []})
+    bids, asks = {}, {}
+    snapshots = []
+    for update_id in range(1, 300):
+        event = {'U': update_id, 'u': update_id, 'b': [], 'a': []}
+        for levels, sign, side in ((bids, -1, event['b']), (asks, 1, event['a'])):
+            for _ in range(rng.randint(0, 6)):
+                price = round(2000 + sign * 0.5 * rng.randint(1, 60), 1)
+                quantity = 0.0 if rng.random() < 0.3 else round(rng.uniform(0.1, 5), 3)
+                if quantity:
+                    levels[price] = quantity
+                else:
+                    levels.pop(price, None)
+                side.append([str(price), str(quantity)])
+        book.apply_diff(event)
+        if update_id % 7 == 0:
+            if bids and asks:
+                _assert_book_equals(book, (bids, asks))
+            depth = book.snapshot()
+            for side, levels in (('bids', bids), ('asks', asks)):
+                quantity, notional = depth._cumsums(side)
+                assert quantity[-1] == pytest.approx(sum(levels.values()))
+                assert notional[-1] == pytest.approx(sum(p * q for p, q in levels.items()))
+            snapshots.append((depth, depth.bids.tolist(), depth.asks.tolist()))
+
+    # Los snapshots ya entregados no cambian con las escrituras posteriores
+    for depth, bid_levels, ask_levels in snapshots:
+        assert depth.bids.tolist() == bid_levels and depth.asks.tolist() == ask_levels
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test del gateway asíncrono de klines contra un servidor local aiohttp"""
+
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+from market_data_gateway import AsyncMarketDataGateway
+
+DELAY = 0.2
+
+
+async def _serve(state):
+    async def klines(request):
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(DELAY)
+        state['active'] -= 1
+        if request.query['symbol'] == 'BADUSDT':
+            return web.Response(status=400)
+        limit = int(request.query['limit'])
+        return web.json_response([
+            [i * 60_000, '1', '2', '0.5', '1.5', '10', i * 60_000 + 59_999, '0', 0, '0', '0', '0']
+            for i in range(limit)
+        ])
+
+    app = web.Application()
+    app.router.add_get('/api/v3/klines', klines)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_fetch_many_is_concurrent_and_bounded():
+    async def scenario():
+        state = {'active': 0, 'peak': 0}
+        runner, url = await _serve(state)
+        gateway = AsyncMarketDataGateway(base_url=url, max_concurrency=4)
+        try:
+            pairs = [(symbol, tf) for symbol in ('BTCUSDT', 'ETHUSDT', 'BADUSDT') for tf in ('1m', '1h')]
+            started = time.perf_counter()
+            frames = await gateway.fetch_many(pairs, limit=5)
+            elapsed = time.perf_counter() - started
+        finally:
+            await gateway.close()
+            await runner.cleanup()
+        return frames, elapsed, state
+
+    frames, elapsed, state = asyncio.run(scenario())
+
+    # 6 peticiones de 0.2s con 4 a la vez: dos tandas, no seis
+    assert elapsed < DELAY * 4
+    assert state['peak'] == 4
+    assert len(frames[('BTCUSDT', '1h')]) == 5
+    assert list(frames[('ETHUSDT', '1m')].columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert frames[('BADUSDT', '1m')].empty
+
+
+def test_session_from_previous_loop_is_closed_on_its_own_loop():
+    state = {'active': 0, 'peak': 0}
+    gateway = AsyncMarketDataGateway(max_concurrency=2)
+
+    # Loop B corre en otro hilo (servidor incluido); loop A se detiene sin cerrar la sesión
+    loop_b = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop_b.run_forever, daemon=True)
+    thread.start()
+    on_b = lambda coro: asyncio.run_coroutine_threadsafe(coro, loop_b).result(5)
+    runner, gateway.base_url = on_b(_serve(state))
+
+    loop_a = asyncio.new_event_loop()
+    loop_a.run_until_complete(gateway.get_klines_raw('BTCUSDT', '1m', 5))
+    session_a = gateway._session
+
+    on_b(gateway.get_klines_raw('ETHUSDT', '1m', 5))
+    session_b = gateway._session
+
+    async def on_main_loop():
+        await gateway.get_klines_raw('SOLUSDT', '1m', 5)
+        await gateway.close()
+
+    try:
+        assert session_a.closed
+        asyncio.run(on_main_loop())
+        deadline = time.monotonic() + 2
+        while not session_b.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert session_b.closed
+        assert gateway._session is None
+    finally:
+        on_b(runner.cleanup())
+        loop_b.call_soon_threadsafe(loop_b.stop)
+        thread.join(5)
+        loop_b.close()
+        loop_a.close()
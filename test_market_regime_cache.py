@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test de la caché stale-while-revalidate de indicadores macro"""
+
+import asyncio
+
+from market_regime_detector import MarketRegimeDetector
+from ttl_cache import StaleWhileRevalidateCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stale_while_revalidate_and_persistence(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    clock = FakeClock()
+    calls = []
+
+    async def loader():
+        calls.append(clock.now)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def failing():
+        raise RuntimeError("API caída")
+
+    async def scenario():
+        cache = StaleWhileRevalidateCache(path=path, max_wait=0.01, retry_after=30, clock=clock)
+        # Sin valor y loader lento: fallback inmediato, la petición sigue en segundo plano
+        assert await cache.get('x', loader, ttl=60, fallback=-1) == -1
+        await cache.wait_idle()
+        assert await cache.get('x', loader, ttl=60) == 1        # fresco
+        clock.now += 120
+        assert await cache.get('x', loader, ttl=60) == 1        # caducado: valor viejo al momento
+        assert await cache.get('x', loader, ttl=60) == 1        # sin segundo refresco en vuelo
+        await cache.wait_idle()
+        assert await cache.get('x', loader, ttl=60) == 2
+        assert len(calls) == 2
+
+        # Un fallo no se reintenta hasta retry_after
+        assert await cache.get('y', failing, ttl=60, fallback='def') == 'def'
+        assert await cache.get('y', loader, ttl=60, fallback='def') == 'def'
+        clock.now += 31
+        assert await cache.get('y', loader, ttl=60, fallback='def', max_wait=1) == 3
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.stats['stale_hits'] == 2 and cache.stats['errors'] == 1
+
+    # Arranque en frío: parte de los valores persistidos, aunque estén caducados
+    clock.now += 3600
+    restored = StaleWhileRevalidateCache(path=path, clock=clock)
+    assert restored.peek('x') == (2, 3600 + 31)
+
+    async def never():
+        await asyncio.sleep(10)
+
+    async def cold_start():
+        return await restored.get('x', never, ttl=60, fallback=-1)
+
+    assert asyncio.run(cold_start()) == 2
+
+    # Más viejo que max_stale: no se sirve y se espera al loader
+    async def fresh():
+        return 'nuevo'
+
+    assert asyncio.run(restored.get('x', fresh, ttl=60, max_stale=60, max_wait=0.5)) == 'nuevo'
+
+
+def test_regime_detector_reuses_cached_macro_inputs(monkeypatch):
+    responses = {
+        'https://api.coingecko.com/api/v3/global': {'data': {
+            'market_cap_percentage': {'btc': 48.0},
+            'total_market_cap': {'usd': 3e12}, 'total_volume': {'usd': 1e11},
+            'market_cap_change_percentage_24h_usd': 1.5}},
+        'https://api.alternative.me/fng/': {'data': [{'value': '72', 'value_classification': 'Greed'}]},
+        'https://api.coingecko.com/api/v3/coins/tether': {'market_data': {
+            'market_cap': {'usd': 1.2e11}, 'market_cap_change_percentage_24h': 0.8}},
+        'https://api.binance.com/api/v3/ticker/24hr': {'priceChangePercent': '-1.0'},
+    }
+    requests = []
+
+    async def fake_get_json(self, url, params=None, timeout=10.0):
+        requests.append(url)
+        await asyncio.sleep(0.01)
+        return responses[url]
+
+    monkeypatch.setattr(MarketRegimeDetector, '_get_json', fake_get_json)
+    detector = MarketRegimeDetector(cache=StaleWhileRevalidateCache(max_wait=1))
+
+    async def scenario():
+        first = await detector.detect_market_regime()
+        filters = await detector.get_market_filters()
+        decision = await detector.should_trade()
+        return first, filters, decision
+
+    first, filters, decision = asyncio.run(scenario())
+
+    assert first['regime'] == 'BULL_MARKET' and first['conditions']['btc_dominance'] == 48.0
+    assert filters['all_pass'] and decision['can_trade']
+    # /global se pidió una sola vez para dominancia y market cap; después todo sale de la caché
+    assert sorted(requests) == sorted(responses)
+
+
+def test_btc_stability_is_not_served_hours_old(monkeypatch):
+    clock = FakeClock()
+    change = {'value': '-5.0'}
+
+    async def fake_get_json(self, url, params=None, timeout=10.0):
+        return {'priceChangePercent': change['value']}
+
+    monkeypatch.setattr(MarketRegimeDetector, '_get_json', fake_get_json)
+    detector = MarketRegimeDetector(cache=StaleWhileRevalidateCache(max_wait=1, clock=clock))
+
+    async def scenario():
+        dumping = await detector._check_btc_stability()
+        change['value'] = '1.0'
+        clock.now += 2 * 3600
+        # Dos horas después el valor viejo ya no se sirve: se espera a la API
+        return dumping, await detector._check_btc_stability()
+
+    assert asyncio.run(scenario()) == (False, True)
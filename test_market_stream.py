@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Test del stream de mercado contra el servidor local de replay"""
+
+import asyncio
+
+import numpy as np
+
+import market_stream
+from market_replay_server import MarketReplayServer, synthetic_klines
+from market_stream import BinanceMarketStream, CandleRingBuffer
+
+
+def _row(kline):
+    return (kline[0], *map(float, kline[1:6]), kline[6])
+
+
+def test_ring_buffer_views_are_contiguous_and_ordered():
+    buffer = CandleRingBuffer(capacity=4)
+    klines = synthetic_klines(6)
+    for kline in klines:
+        buffer.update(_row(kline), closed=True)
+    # Vela en formación: se sobrescribe en su sitio
+    forming = list(klines[-1])
+    forming[4] = 123.0
+    buffer.update(_row(forming), closed=False)
+
+    view = buffer.view()
+    assert list(view['open_time']) == [k[0] for k in klines[-4:]]
+    assert view['close'][-1] == 123.0
+    assert view['close'].flags['C_CONTIGUOUS'] and not view['close'].flags.writeable
+    assert np.shares_memory(view['close'], buffer._columns['close'])
+    assert list(buffer.view(closed_only=True)['open_time']) == [k[0] for k in klines[-4:-1]]
+    assert not buffer.update(_row(klines[0]), closed=True)  # antigua: se ignora
+
+
+def test_stream_ingests_replayed_klines_and_book_ticker(monkeypatch):
+    klines = synthetic_klines(30)
+    server = MarketReplayServer()
+    server.add_klines('BTCUSDT', '1m', klines, last_open=True)
+    server.add_klines('ETHUSDT', '5m', klines)  # stream no suscrito
+    server.add_book_ticker('BTCUSDT', 99.0, 1.5, 101.0, 2.0)
+
+    async def scenario():
+        async with server:
+            stream = BinanceMarketStream(['BTC/USDT'], ['1m'], capacity=20,
+                                         base_url=server.url, backfill=False)
+            await stream.start()
+            for _ in range(200):
+                if stream.stats['book_updates']:
+                    break
+                await asyncio.sleep(0.01)
+
+            monkeypatch.setattr(market_stream, '_market_stream', stream)
+            from market_data_gateway import AsyncMarketDataGateway
+            gateway = AsyncMarketDataGateway()
+            df = await gateway.get_klines('BTCUSDT', '1m', 10)
+            await stream.stop()
+            return stream, gateway, df
+
+    stream, gateway, df = asyncio.run(scenario())
+
+    candles = stream.get_candles('BTCUSDT', '1m')
+    assert len(candles['close']) == 20
+    assert candles['close'][-1] == float(klines[-1][4])
+    assert len(stream.get_candles('BTCUSDT', '1m', closed_only=True)['close']) == 19
+    assert stream.stats['kline_updates'] == 30
+    assert stream.get_book_ticker('BTCUSDT')['ask'] == 101.0
+    assert server.stats['sent'] == 31
+
+    # El gateway sirvió las velas desde memoria, sin REST
+    assert gateway.stats == {'requests': 0, 'errors': 0, 'stream_hits': 1}
+    assert list(df['close']) == [float(k[4]) for k in klines[-10:]]
+
+
+def test_backfill_merges_rest_history_with_streamed_candles():
+    klines = synthetic_klines(12)
+
+    async def fetcher(symbol, interval, limit):
+        return klines[:10]
+
+    stream = BinanceMarketStream(['BTCUSDT'], ['1m'], capacity=8, book_ticker=False,
+                                 fetcher=fetcher)
+    # Llegó por el socket durante la descarga: no debe pisarse
+    stream.buffers[('BTCUSDT', '1m')].update(_row(klines[11]), closed=False)
+    asyncio.run(stream.backfill())
+
+    candles = stream.get_candles('BTCUSDT', '1m')
+    assert list(candles['open_time']) == [k[0] for k in klines[3:10]] + [klines[11][0]]
+    assert not stream.buffers[('BTCUSDT', '1m')].last_closed
+
+
+def test_klines_are_served_only_after_reconnect_backfill():
+    klines = synthetic_klines(30)
+    server = MarketReplayServer()
+    server.add_klines('BTCUSDT', '1m', klines)
+    release = None
+    cancelled = []
+
+    async def fetcher(symbol, interval, limit):
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.append(symbol)
+            raise
+        return klines[-limit:]
+
+    async def scenario():
+        nonlocal release
+        async with server:
+            release = asyncio.Event()
+            stream = BinanceMarketStream(['BTCUSDT'], ['1m'], capacity=20, book_ticker=False,
+                                         base_url=server.url, fetcher=fetcher)
+            await stream.start()
+            while stream.stats['kline_updates'] < 30:
+                await asyncio.sleep(0.01)
+
+            # Conectado y con velas, pero el hueco aún no está cubierto
+            assert stream.connected and len(stream.buffers[('BTCUSDT', '1m')]) == 20
+            assert not stream.has_klines('BTCUSDT', '1m', 10)
+
+            release.set()
+            while stream._backfill_task is not None and not stream._backfill_task.done():
+                await asyncio.sleep(0.01)
+            assert stream.has_klines('BTCUSDT', '1m', 10)
+
+            # Un backfill pendiente se cancela al parar el stream
+            release.clear()
+            stream._synced.clear()
+            stream._backfill_task = asyncio.create_task(stream.backfill())
+            await asyncio.sleep(0.01)
+            await stream.stop()
+            return stream
+
+    stream = asyncio.run(scenario())
+    assert cancelled == ['BTCUSDT']
+    assert stream._backfill_task is None and not stream.has_klines('BTCUSDT', '1m', 10)
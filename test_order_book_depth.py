@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test del snapshot vectorizado del order book"""
+
+import random
+
+import numpy as np
+import pytest
+
+from order_book_depth import DepthSnapshot, price_bands
+
+
+def _depth(levels=500, mid=100.0, tick=0.01, seed=7):
+    """Respuesta de /depth sintética (strings, como Binance) con algunos bloques grandes"""
+    rng = random.Random(seed)
+    bids, asks = [], []
+    for i in range(levels):
+        bid_qty = rng.uniform(0.5, 5.0) * (40 if i % 97 == 13 else 1)
+        ask_qty = rng.uniform(0.5, 5.0) * (40 if i % 89 == 21 else 1)
+        bids.append([f"{mid - tick * (i + 1):.2f}", f"{bid_qty:.5f}"])
+        asks.append([f"{mid + tick * (i + 1):.2f}", f"{ask_qty:.5f}"])
+    return {'lastUpdateId': 123, 'bids': bids, 'asks': asks}
+
+
+def _reference_band(levels, low, high):
+    """Bucle original: nocional y órdenes con low <= precio <= high"""
+    notional, orders = 0.0, 0
+    for price, qty in levels:
+        price, qty = float(price), float(qty)
+        if low <= price <= high:
+            notional += price * qty
+            orders += 1
+    return notional, orders
+
+
+def test_band_sums_match_loop():
+    raw = _depth()
+    depth = DepthSnapshot.from_depth(raw, 'TESTUSDT')
+    assert depth.bids.shape == depth.asks.shape == (500, 2)
+    assert depth.last_update_id == 123
+    assert depth.mid_price == pytest.approx(100.0)
+
+    for side, bounds in (('bids', [(0.99, 0.985), (0.98, 0.97), (0.96, 0.95)]),
+                         ('asks', [(1.01, 1.015), (1.02, 1.03), (1.04, 1.05)])):
+        low, high = price_bands(100.0, bounds)
+        sums = depth.band_sums(side, low, high)
+        for i in range(len(bounds)):
+            notional, orders = _reference_band(raw[side], low[i], high[i])
+            assert sums['notional'][i] == pytest.approx(notional)
+            assert sums['orders'][i] == orders
+            assert orders > 0
+
+    # Banda fuera del libro y banda invertida: vacías
+    assert depth.band_sums('asks', 200.0, 210.0)['orders'] == 0
+    assert depth.band_sums('asks', 101.0, 100.5)['notional'] == 0
+
+    total_bids = sum(float(p) * float(q) for p, q in raw['bids'])
+    total_asks = sum(float(p) * float(q) for p, q in raw['asks'])
+    assert depth.imbalance(notional=True) == pytest.approx(
+        (total_bids - total_asks) / (total_bids + total_asks) * 100)
+
+
+def test_enhanced_analyzer_matches_loop_reference():
+    from liquidity_enhanced_system import LiquidityAnalyzer
+
+    raw = _depth(mid=2500.0, tick=0.5)
+    depth = DepthSnapshot.from_depth(raw).top(100)
+    bids = [[float(p), float(q)] for p, q in raw['bids'][:100]]
+    asks = [[float(p), float(q)] for p, q in raw['asks'][:100]]
+    current_price = (bids[0][0] + asks[0][0]) / 2
+    analyzer = LiquidityAnalyzer()
+
+    # Órdenes grandes: > 3x la media de los 50 mejores niveles
+    large = analyzer._detect_large_orders(depth, current_price)
+    threshold = np.mean([b[1] for b in bids[:50]]) * 3
+    expected = [b for b in bids[:50] if b[1] > threshold]
+    assert [(o['price'], o['volume']) for o in large['large_bids']] == [tuple(b) for b in expected]
+    assert large['total_large_bid_volume'] == pytest.approx(sum(b[1] for b in expected))
+    assert large['large_bids'][0]['distance_pct'] == pytest.approx(
+        (current_price - expected[0][0]) / current_price * 100)
+
+    # Liquidez acumulada por porcentaje
+    score = analyzer._calculate_liquidity_score(depth, current_price)
+    for pct in (0.5, 1.0, 2.0, 5.0):
+        offset = current_price * pct / 100
+        assert score[f"{pct}%"]['bid_liquidity'] == pytest.approx(
+            sum(b[1] for b in bids if b[0] >= current_price - offset))
+        assert score[f"{pct}%"]['ask_liquidity'] == pytest.approx(
+            sum(a[1] for a in asks if a[0] <= current_price + offset))
+
+    # Soportes: agrupados a decenas, ordenados por volumen
+    grouped = {}
+    for price, volume in bids[:30]:
+        grouped[round(price, -1)] = grouped.get(round(price, -1), 0) + volume
+    expected_levels = sorted(grouped.items(), key=lambda x: x[1], reverse=True)[:5]
+    support = analyzer._find_support_resistance(depth, current_price, "support")
+    assert [level['price'] for level in support] == [level for level, _ in expected_levels]
+    assert [level['volume'] for level in support] == pytest.approx([v for _, v in expected_levels])
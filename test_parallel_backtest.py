@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test del runner paralelo de backtesting sobre un almacén de klines temporal"""
+
+import math
+
+import complete_pair_backtest
+import balanced_backtest
+from kline_store import KlineStore, interval_to_ms
+from parallel_backtest import ParallelBacktestRunner, make_jobs, merge_results
+
+HOUR = interval_to_ms('1h')
+END = 1_700_000_000_000 - 1_700_000_000_000 % HOUR
+
+
+def _klines(candles: int, base: float, wave: float = 0.0) -> list:
+    start = END - candles * HOUR
+    klines = []
+    for i in range(candles):
+        price = base + i + wave * base * math.sin(i / 7)
+        klines.append([start + i * HOUR, str(price), str(price * 1.01), str(price * 0.99),
+                       str(price), str(10 + i % 5), start + (i + 1) * HOUR - 1, '0', 0, '0', '0', '0'])
+    return klines
+
+
+def summarize(job, df):
+    """Trabajo de ejemplo: una fila por trabajo con el último cierre"""
+    return [(job.symbol, job.timeframe, job.param_dict.get('k', 0), len(df), float(df['close'].iloc[-1]))]
+
+
+def _store(tmp_path) -> KlineStore:
+    store = KlineStore(root=str(tmp_path), offline=True)
+    store.import_klines('ETHUSDT', '1h', _klines(200, 2000))
+    store.import_klines('BTCUSDT', '1h', _klines(300, 30000))
+    return store
+
+
+def test_results_are_sorted_and_match_sequential(tmp_path):
+    store = _store(tmp_path)
+    jobs = make_jobs(['ETHUSDT', 'BTCUSDT'], ['1h'], [{'k': 2}, {'k': 1}])
+
+    sequential = ParallelBacktestRunner(summarize, store=store, workers=1).run(jobs, days=30, end_time=END)
+    parallel = ParallelBacktestRunner(summarize, store=store, workers=2).run(jobs, days=30, end_time=END)
+
+    assert [r.result for r in sequential] == [r.result for r in parallel]
+    # Mismo orden que los trabajos (p. ej. TRADING_PAIRS), no alfabético
+    assert [(r.job.symbol, r.job.param_dict['k']) for r in parallel] == \
+        [('ETHUSDT', 2), ('ETHUSDT', 1), ('BTCUSDT', 2), ('BTCUSDT', 1)]
+    assert all(r.error is None for r in parallel)
+
+    merged = merge_results(parallel)
+    assert [row[0] for row in merged[(('k', 1),)]] == ['ETHUSDT', 'BTCUSDT']
+    assert merged[(('k', 1),)][1][3] == 300
+
+
+def test_job_errors_are_captured_per_job(tmp_path):
+    store = _store(tmp_path)
+    results = ParallelBacktestRunner(summarize, store=store, workers=1).run(
+        make_jobs(['SOLUSDT'], ['1h']), days=30, end_time=END)
+
+    assert results[0].error is not None
+
+
+def test_pair_backtests_run_as_parallel_jobs(tmp_path):
+    store = KlineStore(root=str(tmp_path), offline=True)
+    for symbol, base in (('BTCUSDT', 30000), ('SOLUSDT', 150)):
+        store.import_klines(symbol, '1h', _klines(400, base, wave=0.05))
+    jobs = make_jobs(['SOLUSDT', 'BTCUSDT'], ['1h'])
+
+    for job_fn in (complete_pair_backtest.run_pair_job, balanced_backtest.run_balanced_job):
+        sequential = ParallelBacktestRunner(job_fn, store=store, workers=1).run(jobs, days=30, end_time=END)
+        parallel = ParallelBacktestRunner(job_fn, store=store, workers=2).run(jobs, days=30, end_time=END)
+
+        assert all(r.error is None for r in sequential)
+        assert [r.job.symbol for r in parallel] == ['SOLUSDT', 'BTCUSDT']
+        assert [r.result for r in parallel] == [r.result for r in sequential]
+        assert all('total_trades' in r.result for r in parallel)
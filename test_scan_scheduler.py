@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Test del escaneo concurrente de símbolos"""
+
+import asyncio
+
+from scan_scheduler import SymbolScanScheduler
+
+
+def test_scan_is_bounded_and_ordered_by_confidence():
+    scheduler = SymbolScanScheduler(max_concurrency=3, symbol_timeout=0.5)
+    confidences = {'A': 70, 'B': 90, 'C': None, 'D': 80, 'E': 60, 'F': 75}
+    active = {'now': 0, 'peak': 0}
+
+    async def analyze(symbol):
+        active['now'] += 1
+        active['peak'] = max(active['peak'], active['now'])
+        await asyncio.sleep(0.01)
+        active['now'] -= 1
+        if symbol == 'BOOM':
+            raise RuntimeError("fallo de API")
+        if symbol == 'SLOW':
+            await asyncio.sleep(5)
+        confidence = confidences[symbol]
+        return None if confidence is None else {'symbol': symbol, 'confidence': confidence}
+
+    signals = asyncio.run(scheduler.scan(list(confidences) + ['BOOM', 'SLOW'], analyze))
+
+    assert active['peak'] == 3
+    assert [s['symbol'] for s in signals] == ['B', 'D', 'F', 'A', 'E']
+    assert scheduler.stats['errors'] == 1
+    assert scheduler.stats['timeouts'] == 1
+
+
+def test_select_caps_after_ranking():
+    signals = [{'symbol': s, 'confidence': c}
+               for s, c in [('B', 90), ('D', 80), ('F', 75), ('A', 70), ('E', 60)]]
+
+    accepted, rejected = SymbolScanScheduler.select(signals, min_confidence=65, max_signals=3)
+
+    assert [s['symbol'] for s in accepted] == ['B', 'D', 'F']
+    assert [s['symbol'] for s in rejected] == ['A', 'E']
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Test de la detección de patrones en una pasada frente a ventana a ventana"""
+
+import numpy as np
+import pandas as pd
+
+from multi_timeframe_signal_detector import PatternDetector, PatternType
+from series_pattern_detector import SeriesPatternDetector
+
+WINDOW = 100
+
+
+def _frame(n: int = 600, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.8, n))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 0.2, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    volume = rng.uniform(1, 10, n)
+
+    # Triángulo ascendente
+    close[400:440] = np.linspace(100, 101, 40)
+    high[400:440] = 102.0
+    low[400:440] = np.linspace(98, 100.5, 40)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+
+def _key(signal):
+    return (signal.pattern_type, signal.stage, signal.confidence,
+            round(float(signal.entry_price), 8), round(float(signal.stop_loss), 8),
+            round(float(signal.take_profit_1), 8), round(float(signal.take_profit_2), 8))
+
+
+def test_matches_window_by_window_detection():
+    df = _frame()
+    detector = PatternDetector()
+    bars = range(WINDOW - 1, len(df))
+
+    expected = {
+        t: [_key(s) for s in detector.detect_all_patterns(df.iloc[t - WINDOW + 1:t + 1].copy(), 'BTCUSDT', '1h')]
+        for t in bars
+    }
+    got = {t: [] for t in bars}
+    for t, signal in SeriesPatternDetector(detector).detect_all(df, 'BTCUSDT', '1h', bars=bars):
+        got[t].append(_key(signal))
+
+    assert got == expected
+    patterns = {k[0] for signals in expected.values() for k in signals}
+    assert {PatternType.DOUBLE_BOTTOM, PatternType.DOUBLE_TOP, PatternType.TRIANGLE_ASC} <= patterns
+
+
+def test_only_selected_bars_and_input_untouched():
+    df = _frame()
+    columns = list(df.columns)
+
+    found = SeriesPatternDetector().detect_all(df, 'BTCUSDT', '1h', bars=[150, 300])
+
+    assert {bar for bar, _ in found} <= {150, 300}
+    assert list(df.columns) == columns
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test de los snapshots compartidos por símbolo"""
+
+import asyncio
+
+from snapshot_hub import SnapshotHub
+
+
+def test_cost_is_flat_with_many_readers_and_subscribers():
+    calls = []
+
+    async def compute(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        return {'symbol': symbol, 'n': calls.count(symbol)}
+
+    hub = SnapshotHub(compute, interval=0.05, idle_timeout=0.1)
+
+    async def viewer(received):
+        async for symbol, snapshot in hub.subscribe(['BTCUSDT', 'ETHUSDT']):
+            received.append((symbol, snapshot.data['n']))
+            if len(received) >= 4:
+                return
+
+    async def scenario():
+        # 20 lecturas REST simultáneas comparten el primer cálculo
+        first = await asyncio.gather(*(hub.get('BTCUSDT') for _ in range(20)))
+        assert len({id(s) for s in first}) == 1
+        assert calls == ['BTCUSDT']
+
+        views = [[] for _ in range(10)]
+        await asyncio.gather(*(viewer(received) for received in views))
+        await hub.stop()
+        return views
+
+    views = asyncio.run(scenario())
+
+    # 10 suscriptores, pero cada símbolo se calculó una vez por intervalo
+    assert calls.count('ETHUSDT') <= 3 and calls.count('BTCUSDT') <= 4
+    assert all({symbol for symbol, _ in received} == {'BTCUSDT', 'ETHUSDT'} for received in views)
+    # Todos ven la misma serie de versiones
+    assert len({tuple(received) for received in views}) == 1
+
+
+def test_failures_keep_last_snapshot_and_idle_producers_stop():
+    state = {'fail': False, 'calls': 0}
+
+    async def compute(symbol):
+        state['calls'] += 1
+        if state['fail']:
+            raise RuntimeError("API caída")
+        return {'symbol': symbol, 'price': 100}
+
+    hub = SnapshotHub(compute, interval=0.01, idle_timeout=0.05)
+
+    async def scenario():
+        snapshot = await hub.get('SOLUSDT')
+        state['fail'] = True
+        await asyncio.sleep(0.03)
+        assert (await hub.get('SOLUSDT')).data == {'symbol': 'SOLUSDT', 'price': 100}
+        assert snapshot.json == '{"symbol": "SOLUSDT", "price": 100}'
+        await asyncio.sleep(0.2)
+        return hub.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['errors'] >= 1
+    assert stats['producers'] == []
+    assert state['calls'] < 30
+
+
+def test_read_after_idle_waits_for_fresh_compute_and_keys_are_bounded():
+    state = {'calls': 0, 'fail': False}
+
+    async def compute(symbol):
+        state['calls'] += 1
+        await asyncio.sleep(0.01)
+        if state['fail']:
+            raise RuntimeError("API caída")
+        return {'symbol': symbol, 'n': state['calls']}
+
+    hub = SnapshotHub(compute, interval=0.05, idle_timeout=0.1, max_age=0.3, keys=['BTCUSDT'])
+
+    async def scenario():
+        first = await hub.get('BTCUSDT')
+        await asyncio.sleep(0.4)               # el productor se para por inactividad
+        assert hub.get_stats()['producers'] == []
+        assert not hub._snapshots and not hub._last_demand and not hub._attempts
+
+        again = await hub.get('BTCUSDT')       # no sirve el snapshot viejo
+        assert again.data['n'] > first.data['n'] and again.age < 0.05
+
+        try:
+            await hub.get('XYZUSDT')
+            raise AssertionError("clave desconocida aceptada")
+        except KeyError:
+            pass
+        assert 'XYZUSDT' not in hub._last_demand
+
+        # Fallos: se sirve el anterior hasta max_age, después el error
+        state['fail'] = True
+        await asyncio.sleep(0.07)
+        assert (await hub.get('BTCUSDT')).error is None
+        await asyncio.sleep(0.35)
+        failed = await hub.get('BTCUSDT')
+        await hub.stop()
+        return failed
+
+    failed = asyncio.run(scenario())
+    assert failed.error == "API caída" and failed.data == {'symbol': 'BTCUSDT', 'error': "API caída"}
+
+
+def test_unified_endpoint_maps_errors_and_unknown_symbols(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    import unified_signals_api
+
+    async def compute(symbol):
+        if symbol == 'ETHUSDT':
+            raise RuntimeError("sin datos")
+        return {'symbol': symbol}
+
+    monkeypatch.setattr(unified_signals_api, 'snapshots',
+                        SnapshotHub(compute, interval=5, keys=unified_signals_api.snapshots.keys))
+
+    async def status(symbol):
+        try:
+            await unified_signals_api.get_unified_analysis(symbol)
+        except HTTPException as e:
+            return e.status_code
+        return 200
+
+    async def scenario():
+        codes = [await status(symbol) for symbol in ('BTCUSDT', 'ETHUSDT', 'NOPEUSDT')]
+        multi = await unified_signals_api.get_multi_analysis('BTCUSDT,ETHUSDT')
+        with pytest.raises(HTTPException):
+            await unified_signals_api.get_multi_analysis('BTCUSDT,NOPEUSDT')
+        await unified_signals_api.snapshots.stop()
+        return codes, multi
+
+    codes, multi = asyncio.run(scenario())
+    assert codes == [200, 500, 404]
+    assert multi[0] == {'symbol': 'BTCUSDT'} and multi[1]['error'] == "sin datos"
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test de indicadores incrementales frente al recálculo completo (offline)"""
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import add_indicators
+from streaming_indicators import IndicatorState, StreamingIndicatorStore, StreamingRSI
+
+COMPARED = ('RSI', 'EMA_12', 'EMA_26', 'MACD', 'MACD_Signal',
+            'BB_Middle', 'BB_Upper', 'BB_Lower', 'ATR', 'Volume_SMA', 'Volume_Ratio')
+
+
+def _make_candles(n: int = 400, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'open': close,
+        'high': close + rng.uniform(0, 2, n),
+        'low': close - rng.uniform(0, 2, n),
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='15min'))
+
+
+def test_seeded_state_matches_full_recompute():
+    df = _make_candles()
+    reference = add_indicators(df.copy()).iloc[-1]
+    state = IndicatorState.from_history(df)
+
+    for column in COMPARED:
+        assert np.isclose(state.values[column], reference[column], rtol=1e-9), column
+
+
+def test_peek_does_not_advance_state():
+    df = _make_candles()
+    state = IndicatorState.from_history(df.iloc[:-1])
+    before = dict(state.values)
+
+    last = df.iloc[-1]
+    peeked = state.peek(last['high'], last['low'], last['close'], last['volume'])
+    reference = add_indicators(df.copy()).iloc[-1]
+
+    assert state.values == before
+    assert np.isclose(peeked['MACD'], reference['MACD'], rtol=1e-9)
+    assert np.isclose(peeked['ATR'], reference['ATR'], rtol=1e-9)
+
+
+def test_store_only_consumes_new_candles():
+    df = _make_candles()
+    store = StreamingIndicatorStore()
+
+    store.sync('BTCUSDT', '15m', df.iloc[:300])
+    state = store.get_state('BTCUSDT', '15m')
+    assert state.candles == 299
+
+    latest = store.sync('BTCUSDT', '15m', df.iloc[5:305])
+    assert store.get_state('BTCUSDT', '15m') is state
+    assert state.candles == 304
+
+    reference = add_indicators(df.iloc[:305].copy()).iloc[-1]
+    for column in COMPARED:
+        assert np.isclose(latest[column], reference[column], rtol=1e-9), column
+
+
+def test_wilder_rsi():
+    closes = _make_candles()['close'].to_numpy()
+    rsi = StreamingRSI(14, smoothing='wilder')
+    for close in closes:
+        value = rsi.update(close)
+
+    delta = np.diff(closes, prepend=closes[0])
+    gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+    for gain, loss in zip(gains[14:], losses[14:]):
+        avg_gain = (avg_gain * 13 + gain) / 14
+        avg_loss = (avg_loss * 13 + loss) / 14
+
+    assert np.isclose(value, 100 - 100 / (1 + avg_gain / avg_loss))
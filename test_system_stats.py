@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Test de los contadores en memoria y el flush atómico de SystemStats"""
+
+import json
+import threading
+
+from system_stats import SystemStats
+
+
+def make_stats(path, **kwargs):
+    return SystemStats(stats_file=str(path), auto_flush=False, **kwargs)
+
+
+def test_per_thread_counters_are_flushed_once(tmp_path):
+    path = tmp_path / 'system_stats.json'
+    stats = make_stats(path, per_thread=True)
+
+    def worker():
+        for _ in range(1000):
+            stats.increment_analysis(symbol='SOLUSDT', philosopher='Socrates', data_points=6)
+        stats.increment_signal(philosopher='Socrates', is_high_quality=True)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Nada se escribe hasta el flush
+    assert not path.exists()
+    summary = stats.get_stats_summary()
+    assert summary['session_analyses'] == 4000
+    assert summary['high_quality_signals'] == 4
+
+    stats.flush()
+    saved = json.loads(path.read_text())
+    assert saved['total']['analyses_count'] == 4000
+    assert saved['total']['data_points_processed'] == 24000
+    assert saved['philosophers']['socrates'] == {
+        'analyses': 4000, 'signals': 4, 'last_active': saved['philosophers']['socrates']['last_active']}
+    assert saved['symbols_analysis']['SOLUSDT']['analyses'] == 4000
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == '.tmp'] == []
+
+
+def test_two_writers_on_the_same_file_do_not_overwrite_each_other(tmp_path):
+    path = tmp_path / 'system_stats.json'
+    worker, api = make_stats(path), make_stats(path)
+
+    for _ in range(3):
+        worker.increment_analysis(symbol='SOLUSDT')
+    worker.flush()
+    api.increment_signal()
+    api.flush()
+
+    saved = json.loads(path.read_text())
+    assert saved['total']['analyses_count'] == 3
+    assert saved['total']['signals_generated'] == 1
+    assert worker.get_stats_summary()['total_signals'] == 1
+
+    worker.reset_24h_stats()
+    assert json.loads(path.read_text())['last_24h']['analyses_count'] == 0
+    assert json.loads(path.read_text())['total']['analyses_count'] == 3
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test del simulador vectorizado de salidas frente al bucle vela a vela"""
+
+import numpy as np
+
+from trade_simulator import EXIT_SL, EXIT_TIME, simulate_exits
+
+
+def _reference_exit(high, low, close, start, is_long, sl, tp1, tp2, max_bars):
+    """Bucle original de EnhancedBacktester.simulate_trade"""
+    end = min(start + max_bars, len(close))
+    for j in range(start, end):
+        if is_long:
+            if low[j] <= sl:
+                return j, sl, 'SL'
+            if high[j] >= tp2:
+                return j, tp2, 'TP2'
+            if high[j] >= tp1:
+                return j, tp1, 'TP1'
+        else:
+            if high[j] >= sl:
+                return j, sl, 'SL'
+            if low[j] <= tp2:
+                return j, tp2, 'TP2'
+            if low[j] <= tp1:
+                return j, tp1, 'TP1'
+    return end - 1, close[end - 1], 'TIME'
+
+
+def test_matches_reference_loop():
+    rng = np.random.default_rng(11)
+    n = 2000
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+
+    m = 500
+    starts = rng.integers(1, n - 1, m)
+    entry = close[starts - 1]
+    is_long = rng.random(m) < 0.5
+    distance = rng.uniform(0.5, 6, m)
+    direction = np.where(is_long, 1, -1)
+    sl = entry - direction * distance
+    tp1 = entry + direction * distance
+    tp2 = entry + direction * distance * 2
+
+    exits = simulate_exits(high, low, close, starts, is_long, sl, np.c_[tp1, tp2], max_bars=50)
+    reasons = exits.reasons()
+
+    for k in range(m):
+        index, price, reason = _reference_exit(high, low, close, starts[k], is_long[k],
+                                               sl[k], tp1[k], tp2[k], 50)
+        assert reasons[k] == reason
+        assert exits.exit_index[k] == index
+        assert np.isclose(exits.exit_price[k], price)
+
+
+def test_stop_loss_wins_on_same_candle():
+    high = np.array([100.0, 106.0])
+    low = np.array([100.0, 94.0])
+    close = np.array([100.0, 100.0])
+
+    exits = simulate_exits(high, low, close, [1], [True], [95.0], [[105.0]], max_bars=5)
+
+    assert exits.exit_code[0] == EXIT_SL
+    assert exits.exit_price[0] == 95.0
+
+
+def test_time_exit_at_end_of_series():
+    close = np.linspace(100, 101, 10)
+    exits = simulate_exits(close + 0.1, close - 0.1, close, [7], [True], [90.0], [[120.0]], max_bars=50)
+
+    assert exits.exit_code[0] == EXIT_TIME
+    assert exits.exit_index[0] == 9
+    assert exits.exit_price[0] == close[-1]
+    assert np.isclose(exits.pnl_percent([100.0], [True])[0], 1.0)
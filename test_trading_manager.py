@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Test de las cadencias del TradingManager (señales por vela, posiciones por tiempo)"""
+
+import asyncio
+
+import fastapi_server
+from fastapi_server import BotStatus, TradingManager
+
+
+class OneCandleScheduler:
+    """Ejecuta el trabajo una vez y después espera a una vela que no llega"""
+
+    async def run_job(self, name, timeframe, job):
+        await job()
+        await asyncio.Event().wait()
+
+
+def test_positions_update_between_candle_closes(monkeypatch):
+    monkeypatch.setattr(fastapi_server, 'POSITION_UPDATE_SECONDS', 0.01)
+    monkeypatch.setattr(fastapi_server, 'get_candle_scheduler', OneCandleScheduler)
+
+    manager = TradingManager.__new__(TradingManager)
+    manager.bot_status = BotStatus.RUNNING
+    manager.positions_lock = asyncio.Lock()
+    calls = {'cycle': 0, 'positions': 0, 'updates': 0}
+
+    async def fetch_market_data():
+        calls['cycle'] += 1
+        return {}
+
+    async def analyze_with_philosophers(market_data):
+        return []
+
+    async def update_positions():
+        calls['positions'] += 1
+
+    async def send_updates():
+        calls['updates'] += 1
+
+    manager.fetch_market_data = fetch_market_data
+    manager.analyze_with_philosophers = analyze_with_philosophers
+    manager.update_positions = update_positions
+    manager.send_updates = send_updates
+
+    async def scenario():
+        task = asyncio.create_task(manager.trading_loop())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    # Una sola vela, pero los stops se revisan varias veces entre cierres
+    assert calls['cycle'] == 1
+    assert calls['positions'] >= 3 and calls['updates'] == calls['positions']
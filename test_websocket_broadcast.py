@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test of the queued broadcast fan-out in ThreadSafeWebSocketManager"""
+
+import asyncio
+import json
+import time
+
+from websocket_manager import MessageType, ThreadSafeWebSocketManager, WebSocketMessage
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self):
+        self.closed = True
+
+
+def test_slow_client_does_not_delay_others_and_is_dropped():
+    async def scenario():
+        manager = ThreadSafeWebSocketManager(send_timeout=0.2, max_queue_size=10)
+        fast = [FakeWebSocket() for _ in range(20)]
+        slow = FakeWebSocket(delay=10)
+        for ws in fast + [slow]:
+            await manager.connect(ws)
+
+        started = time.perf_counter()
+        for n in range(3):
+            results = await manager.send_message(
+                WebSocketMessage(type=MessageType.MARKET_DATA, data={'n': n}), broadcast=True)
+        broadcast_time = time.perf_counter() - started
+
+        await asyncio.sleep(0.4)
+        stats = manager.get_statistics()
+        await manager.shutdown()
+        return fast, slow, results, broadcast_time, stats
+
+    fast, slow, results, broadcast_time, stats = asyncio.run(scenario())
+
+    assert broadcast_time < 0.1
+    assert len(results) == 21 and all(results.values())
+    assert all([m['data']['n'] for m in ws.sent[1:]] == [0, 1, 2] for ws in fast)
+    assert slow.closed
+    assert stats['current_connections'] == 20
+
+
+def test_laggard_with_full_queue_is_disconnected():
+    async def scenario():
+        manager = ThreadSafeWebSocketManager(send_timeout=5, max_queue_size=2, max_dropped_messages=3)
+        slow = FakeWebSocket()
+        await manager.connect(slow)
+        await asyncio.sleep(0)
+        slow.delay = 1  # stalls after the initial state message
+
+        dropped = []
+        for n in range(8):
+            results = await manager.send_message(
+                WebSocketMessage(type=MessageType.HEARTBEAT, data={'n': n}), broadcast=True)
+            dropped.append(results)
+        stats = manager.get_statistics()
+        await manager.shutdown()
+        return slow, dropped, stats
+
+    slow, dropped, stats = asyncio.run(scenario())
+
+    assert stats['laggards_disconnected'] == 1
+    assert stats['messages_dropped'] == 3
+    assert dropped[-1] == {}
+    assert slow.closed
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test de la escritura diferida de trazas, análisis y performance"""
+
+import asyncio
+import threading
+
+from database import TradingDatabase
+from write_behind_queue import WriteBehindWriter
+
+
+def make_db(tmp_path):
+    db = TradingDatabase(str(tmp_path / 'bot.db'))
+    db.init_database()
+    return db
+
+
+def analysis(signal_id):
+    return {'signal_id': signal_id, 'quality_score': 80.0, 'recommendation': 'BUY',
+            'confidence_level': 0.8, 'execution_priority': 2}
+
+
+def performance(signal_id):
+    return {'philosopher': 'Socrates', 'symbol': 'SOLUSDT', 'signal_id': signal_id,
+            'entry_price': 100.0, 'exit_price': 110.0, 'profit_loss': 10.0, 'win': True}
+
+
+def test_records_are_batched_and_flushed_on_stop(tmp_path):
+    db = make_db(tmp_path)
+    writer = WriteBehindWriter(db, max_queue_size=8, batch_size=50, flush_interval=0.05)
+
+    async def scenario():
+        await writer.start()
+        for i in range(40):
+            await writer.put('signal_trace', (f'S{i}', 'SIGNAL_GENERATED', {'n': i}, 'Socrates'))
+        writer.submit_signal_analysis(analysis('S0'))
+        writer.submit_philosopher_performance(performance('S0'))
+        # Un registro inválido no debe perder el resto del lote
+        writer.submit('signal_analysis', {'signal_id': 'S1'})
+        # Desde otro hilo submit espera hueco en la cola
+        thread = threading.Thread(
+            target=writer.submit_signal_trace, args=('S0', 'SIGNAL_FILTERED', {}, 'Socrates'))
+        thread.start()
+        await asyncio.to_thread(thread.join)
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert [e['event_type'] for e in db.get_signal_trace('S0')] == ['SIGNAL_GENERATED', 'SIGNAL_FILTERED']
+    assert db.get_statistics()['total_signals'] == 0
+    assert db.get_signal_analysis('S0')['quality_score'] == 80.0
+    assert len(db.get_philosopher_performance('Socrates')) == 1
+    stats = writer.get_stats()
+    assert stats['written'] == 43 and stats['failed'] == 1
+    assert stats['backpressure_waits'] > 0  # la cola (8) se llenó
+    assert stats['pending'] == 0 and not stats['running']
+
+
+def test_without_worker_writes_are_synchronous(tmp_path):
+    db = make_db(tmp_path)
+    writer = WriteBehindWriter(db)
+
+    writer.submit_signal_trace('S1', 'SIGNAL_GENERATED', {'n': 1})
+    assert len(db.get_signal_trace('S1')) == 1
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+===========================================
+TIMEFRAMES DE BINANCE
+===========================================
+
+Duración de cada intervalo de vela de Binance. Módulo sin dependencias
+(solo biblioteca estándar) para que planificadores y workers ligeros
+puedan usarlo sin arrastrar numpy/pandas de kline_store.
+"""
+
+from typing import Dict
+
+INTERVAL_MS: Dict[str, int] = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 3_600_000,
+    '2h': 2 * 3_600_000,
+    '4h': 4 * 3_600_000,
+    '6h': 6 * 3_600_000,
+    '8h': 8 * 3_600_000,
+    '12h': 12 * 3_600_000,
+    '1d': 86_400_000,
+    '3d': 3 * 86_400_000,
+    '1w': 7 * 86_400_000,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Duración de una vela en milisegundos"""
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Intervalo no soportado: {interval}")
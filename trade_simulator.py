@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+===========================================
+SIMULADOR VECTORIZADO DE SALIDAS
+===========================================
+
+Resuelve de una vez la salida de miles de operaciones: para cada señal
+construye la ventana de velas futuras como matriz (señales x velas),
+marca con máscaras booleanas dónde se toca el SL o algún TP y toma la
+primera vela con argmax. Sustituye los bucles iterrows() de los
+backtesters.
+
+Reglas (las mismas que EnhancedBacktester.simulate_trade):
+- En la vela de salida el SL tiene prioridad sobre los TP
+- Si se tocan varios TP en la misma vela gana el más lejano
+- Sin SL ni TP en la ventana, la salida es por tiempo al último cierre
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Códigos de salida: k >= 1 significa TPk
+EXIT_TIME = 0
+EXIT_SL = -1
+
+
+@dataclass
+class ExitResults:
+    """Resultado por señal (arrays alineados con la entrada)"""
+    exit_index: np.ndarray  # Vela de salida (-1 si la ventana está vacía)
+    exit_price: np.ndarray
+    exit_code: np.ndarray  # EXIT_SL, EXIT_TIME o número de TP
+
+    def __len__(self) -> int:
+        return len(self.exit_code)
+
+    def reasons(self, labels: Optional[Dict[int, str]] = None) -> np.ndarray:
+        """Códigos traducidos a etiquetas ('SL', 'TP1', 'TP2', 'TIME')"""
+        labels = labels or {}
+        out = np.empty(len(self.exit_code), dtype=object)
+        for code in np.unique(self.exit_code):
+            if code == EXIT_SL:
+                label = labels.get(EXIT_SL, 'SL')
+            elif code == EXIT_TIME:
+                label = labels.get(EXIT_TIME, 'TIME')
+            else:
+                label = labels.get(int(code), f'TP{code}')
+            out[self.exit_code == code] = label
+        return out
+
+    def pnl_percent(self, entry_price: np.ndarray, is_long: np.ndarray) -> np.ndarray:
+        """PnL porcentual sin apalancamiento"""
+        entry_price = np.asarray(entry_price, dtype=float)
+        direction = np.where(np.asarray(is_long, dtype=bool), 1.0, -1.0)
+        return direction * (self.exit_price - entry_price) / entry_price * 100
+
+
+def simulate_exits(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                   start_index: np.ndarray, is_long: np.ndarray,
+                   stop_loss: np.ndarray, take_profits: np.ndarray,
+                   max_bars: int, chunk_size: int = 4096) -> ExitResults:
+    """
+    Primera vela que toca SL/TP para cada señal
+
+    Args:
+        high, low, close: Series OHLC completas (1-D)
+        start_index: Primera vela a evaluar de cada señal (inclusive)
+        is_long: True para LONG, False para SHORT
+        stop_loss: Nivel de SL de cada señal
+        take_profits: (n,) o (n, k) con TP1..TPk del más cercano al más lejano
+        max_bars: Velas evaluadas como máximo desde start_index
+        chunk_size: Señales por bloque (acota la memoria de las matrices)
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    start_index = np.asarray(start_index, dtype=np.int64)
+    is_long = np.asarray(is_long, dtype=bool)
+    stop_loss = np.asarray(stop_loss, dtype=float)
+    take_profits = np.asarray(take_profits, dtype=float)
+    if take_profits.ndim == 1:
+        take_profits = take_profits[:, None]
+
+    n_bars = len(close)
+    n_signals = len(start_index)
+    exit_index = np.full(n_signals, -1, dtype=np.int64)
+    exit_price = np.full(n_signals, np.nan)
+    exit_code = np.full(n_signals, EXIT_TIME, dtype=np.int64)
+    if n_signals == 0 or max_bars <= 0:
+        return ExitResults(exit_index, exit_price, exit_code)
+
+    # Relleno con NaN al final: las comparaciones con NaN nunca disparan
+    padded_high = np.concatenate([high, np.full(max_bars, np.nan)])
+    padded_low = np.concatenate([low, np.full(max_bars, np.nan)])
+    offsets = np.arange(max_bars)
+
+    for lo in range(0, n_signals, chunk_size):
+        hi = min(lo + chunk_size, n_signals)
+        starts = np.clip(start_index[lo:hi], 0, n_bars)
+        window = starts[:, None] + offsets  # (m, max_bars)
+        highs = padded_high[window]
+        lows = padded_low[window]
+
+        long_side = is_long[lo:hi, None]
+        sl = stop_loss[lo:hi, None]
+        sl_hit = np.where(long_side, lows <= sl, highs >= sl)
+
+        tps = take_profits[lo:hi]
+        # tp_hits[k] -> (m, max_bars)
+        tp_hits = [np.where(long_side, highs >= tps[:, k, None], lows <= tps[:, k, None])
+                   for k in range(tps.shape[1])]
+        any_tp = np.logical_or.reduce(tp_hits)
+        any_hit = sl_hit | any_tp
+
+        rows = np.arange(hi - lo)
+        first = np.argmax(any_hit, axis=1)
+        hit = any_hit[rows, first]
+
+        # Código en la vela de salida: SL primero, luego el TP más lejano
+        code = np.full(hi - lo, EXIT_TIME, dtype=np.int64)
+        for k, tp_hit in enumerate(tp_hits):
+            code = np.where(hit & tp_hit[rows, first], k + 1, code)
+        code = np.where(hit & sl_hit[rows, first], EXIT_SL, code)
+
+        price = np.where(code == EXIT_SL, stop_loss[lo:hi], np.nan)
+        for k in range(tps.shape[1]):
+            price = np.where(code == k + 1, tps[:, k], price)
+
+        # Salida por tiempo: último cierre disponible de la ventana
+        last_bar = np.minimum(starts + max_bars, n_bars) - 1
+        has_window = last_bar >= starts
+        time_exit = ~hit & has_window
+        safe_last = np.clip(last_bar, 0, max(n_bars - 1, 0))
+        price = np.where(time_exit, close[safe_last] if n_bars else np.nan, price)
+
+        exit_index[lo:hi] = np.where(hit, starts + first, np.where(has_window, last_bar, -1))
+        exit_price[lo:hi] = price
+        exit_code[lo:hi] = code
+
+    return ExitResults(exit_index, exit_price, exit_code)
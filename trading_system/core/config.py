@@ -41,6 +41,7 @@ class Config:
             },
             'monitoring': {
                 'refresh_interval': 30,
+                'candle_timeframe': '1m',
                 'enable_alerts': True
             },
             'targets': {
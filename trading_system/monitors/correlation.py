@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.config import config
 from core.alerts import trading_alerts, AlertType
 from core.market_data import market_fetcher
+from candle_scheduler import get_candle_scheduler
 
 
 class CorrelationMonitor:
@@ -29,6 +30,7 @@ class CorrelationMonitor:
         self.correlation_history = deque(maxlen=50)
         
         # Load configuration
+        self.timeframe = config.get('monitoring.candle_timeframe', '1m')
         self.sol_target_low = config.get('targets.sol.buy_zones', [{"price": 180}])[0]['price']
         self.btc_recovery_threshold = config.get('targets.btc.recovery_level', 110000)
         self.correlation_threshold = 0.7
@@ -300,96 +302,94 @@ class CorrelationMonitor:
         
         print('\nStarting real-time monitoring...\n')
         
-        while True:
-            try:
-                status = await self.monitor_step()
-                
-                if "error" in status:
-                    print(f'❌ {status["error"]}')
-                    await asyncio.sleep(30)
-                    continue
-                
-                # Clear screen for clean display
-                print('\033[2J\033[H')
-                
-                timestamp = datetime.now().strftime('%H:%M:%S')
-                print(f'⏰ {timestamp} - BTC/SOL CORRELATION ANALYSIS')
-                print('='*70)
-                
-                # Current prices
-                prices = status['prices']
-                changes = status['changes_24h']
-                print(f'\n📊 CURRENT PRICES:')
-                print(f'BTC: ${prices["btc"]:,.2f} ({changes["btc"]:+.2f}%)')
-                print(f'SOL: ${prices["sol"]:.2f} ({changes["sol"]:+.2f}%)')
-                
-                # Analysis
-                analysis = status['analysis']
-                correlation = analysis['correlation']
-                print(f'\n🔗 CORRELATION (10 periods): {correlation:.3f}')
-                
-                if correlation > 0.8:
-                    print('   → Very strong positive correlation')
-                elif correlation > 0.6:
-                    print('   → Strong positive correlation')
-                elif correlation > 0.3:
-                    print('   → Moderate correlation')
-                elif correlation > -0.3:
-                    print('   → Weak/No correlation')
-                else:
-                    print('   → Negative correlation (divergence)')
-                
-                # RSI indicators
-                print(f'\n📊 RSI INDICATORS:')
-                btc_rsi = analysis['btc_rsi']
-                sol_rsi = analysis['sol_rsi']
-                print(f'BTC RSI: {btc_rsi:.1f} {"(Oversold)" if btc_rsi < 30 else "(Overbought)" if btc_rsi > 70 else ""}')
-                print(f'SOL RSI: {sol_rsi:.1f} {"(Oversold)" if sol_rsi < 30 else "(Overbought)" if sol_rsi > 70 else ""}')
-                
-                # Divergence pattern
-                print(f'\n🔄 DIVERGENCE PATTERN: {analysis["divergence"]}')
-                
-                # Entry score
-                entry_score = analysis['entry_score']
-                print(f'\n🎯 ENTRY SCORE: {entry_score}/100')
-                
-                # Show factors
-                if analysis['factors']:
-                    print('\n📋 FACTORS:')
-                    for factor in analysis['factors']:
-                        print(f'   {factor}')
-                
-                # Recommendation
-                rec = status['recommendation']
-                print(f'\n💡 RECOMMENDATION: {rec["action"]} ({rec["confidence"]} confidence)')
-                
-                if rec['entry_details']:
-                    details = rec['entry_details']
-                    print(f'   → Entry: ${details["entry_price"]:.2f}')
-                    print(f'   → Size: {details["position_size"]}')
-                    print(f'   → Stop: ${details["stop_loss"]:.2f}')
-                    print(f'   → Target: ${details["target_1"]:.2f}-${details["target_2"]:.2f}')
-                
-                # Key levels
-                levels = status['key_levels']
-                print(f'\n📍 KEY LEVELS TO WATCH:')
-                print(f'BTC support: ${levels["btc_support"]:,} | resistance: ${levels["btc_resistance"]:,}')
-                print(f'SOL support: ${levels["sol_support"]} | resistance: ${levels["sol_resistance"]}')
-                
-                # Correlation trend
-                print(f'\n📈 CORRELATION TREND: {analysis["correlation_trend"]}')
-                
-                print(f'\n{"="*70}')
-                print(f'Refreshing in 30 seconds... (Ctrl+C to stop)')
-                
-                await asyncio.sleep(30)
-                
-            except KeyboardInterrupt:
-                print('\n\n⏹️ Correlation monitor stopped')
-                break
-            except Exception as e:
-                print(f'\n❌ Error: {e}')
-                await asyncio.sleep(10)
+        # One refresh per candle close, as a job of the shared scheduler
+        # (jittered, never overlapping; cancelling this task removes the job)
+        try:
+            await get_candle_scheduler().run_job('correlation_monitor', self.timeframe, self.refresh,
+                                                 symbol='SOLUSDT')
+        except KeyboardInterrupt:
+            print('\n\n⏹️ Correlation monitor stopped')
+    
+    async def refresh(self, close=None):
+        """One monitoring refresh: fetch, analyse and display the status"""
+        status = await self.monitor_step()
+        
+        if "error" in status:
+            print(f'❌ {status["error"]}')
+            return
+        
+        # Clear screen for clean display
+        print('\033[2J\033[H')
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f'⏰ {timestamp} - BTC/SOL CORRELATION ANALYSIS')
+        print('='*70)
+        
+        # Current prices
+        prices = status['prices']
+        changes = status['changes_24h']
+        print(f'\n📊 CURRENT PRICES:')
+        print(f'BTC: ${prices["btc"]:,.2f} ({changes["btc"]:+.2f}%)')
+        print(f'SOL: ${prices["sol"]:.2f} ({changes["sol"]:+.2f}%)')
+        
+        # Analysis
+        analysis = status['analysis']
+        correlation = analysis['correlation']
+        print(f'\n🔗 CORRELATION (10 periods): {correlation:.3f}')
+        
+        if correlation > 0.8:
+            print('   → Very strong positive correlation')
+        elif correlation > 0.6:
+            print('   → Strong positive correlation')
+        elif correlation > 0.3:
+            print('   → Moderate correlation')
+        elif correlation > -0.3:
+            print('   → Weak/No correlation')
+        else:
+            print('   → Negative correlation (divergence)')
+        
+        # RSI indicators
+        print(f'\n📊 RSI INDICATORS:')
+        btc_rsi = analysis['btc_rsi']
+        sol_rsi = analysis['sol_rsi']
+        print(f'BTC RSI: {btc_rsi:.1f} {"(Oversold)" if btc_rsi < 30 else "(Overbought)" if btc_rsi > 70 else ""}')
+        print(f'SOL RSI: {sol_rsi:.1f} {"(Oversold)" if sol_rsi < 30 else "(Overbought)" if sol_rsi > 70 else ""}')
+        
+        # Divergence pattern
+        print(f'\n🔄 DIVERGENCE PATTERN: {analysis["divergence"]}')
+        
+        # Entry score
+        entry_score = analysis['entry_score']
+        print(f'\n🎯 ENTRY SCORE: {entry_score}/100')
+        
+        # Show factors
+        if analysis['factors']:
+            print('\n📋 FACTORS:')
+            for factor in analysis['factors']:
+                print(f'   {factor}')
+        
+        # Recommendation
+        rec = status['recommendation']
+        print(f'\n💡 RECOMMENDATION: {rec["action"]} ({rec["confidence"]} confidence)')
+        
+        if rec['entry_details']:
+            details = rec['entry_details']
+            print(f'   → Entry: ${details["entry_price"]:.2f}')
+            print(f'   → Size: {details["position_size"]}')
+            print(f'   → Stop: ${details["stop_loss"]:.2f}')
+            print(f'   → Target: ${details["target_1"]:.2f}-${details["target_2"]:.2f}')
+        
+        # Key levels
+        levels = status['key_levels']
+        print(f'\n📍 KEY LEVELS TO WATCH:')
+        print(f'BTC support: ${levels["btc_support"]:,} | resistance: ${levels["btc_resistance"]:,}')
+        print(f'SOL support: ${levels["sol_support"]} | resistance: ${levels["sol_resistance"]}')
+        
+        # Correlation trend
+        print(f'\n📈 CORRELATION TREND: {analysis["correlation_trend"]}')
+        
+        print(f'\n{"="*70}')
+        print(f'Refreshing at the next {self.timeframe} candle close... (Ctrl+C to stop)')
 
 
 # Export the monitor for use by main controller
@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.config import config
 from core.alerts import trading_alerts, AlertType
 from core.market_data import market_fetcher
+from candle_scheduler import get_candle_scheduler
 
 
 class EntryAlertMonitor:
@@ -27,6 +28,7 @@ class EntryAlertMonitor:
         self.price_history = deque(maxlen=10)
         
         # Load configuration
+        self.timeframe = config.get('monitoring.candle_timeframe', '1m')
         self.sol_buy_zones = config.get('targets.sol.buy_zones', [
             {"price": 180, "priority": "primary", "position_size": 60},
             {"price": 183, "priority": "secondary", "position_size": 40},
@@ -223,82 +225,80 @@ class EntryAlertMonitor:
         print('='*70)
         print('Will alert you when optimal entry conditions are met\n')
         
-        while True:
-            try:
-                status = await self.monitor_step()
-                
-                if "error" in status:
-                    print(f'❌ {status["error"]}')
-                    await asyncio.sleep(20)
-                    continue
-                
-                # Clear screen and display status
-                print('\033[2J\033[H')
-                
-                timestamp = datetime.now().strftime('%H:%M:%S')
-                print(f'⏰ {timestamp} - ENTRY ALERT MONITOR')
-                print('='*70)
-                
-                # Market status
-                btc = status['btc']
-                sol = status['sol']
-                print(f'\n📊 MARKET STATUS:')
-                print(f'BTC: ${btc["price"]:,.2f} ({btc["change_24h"]:+.2f}%)')
-                print(f'SOL: ${sol["price"]:.2f} ({sol["change_24h"]:+.2f}%)')
-                print(f'SOL 24h Low: ${sol["low_24h"]:.2f}')
-                
-                # Analysis
-                analysis = status['analysis']
-                score = analysis['entry_score']
-                print(f'\n🎯 ENTRY SCORE: {score}/100')
-                
-                # Visual score bar
-                bar_length = 40
-                filled = int(bar_length * score / 100)
-                bar = '█' * filled + '░' * (bar_length - filled)
-                color = '\033[92m' if score >= 70 else '\033[93m' if score >= 50 else '\033[91m'
-                print(f'{color}[{bar}]\033[0m')
-                
-                # Factors
-                if analysis['factors']:
-                    print('\n📋 SIGNALS:')
-                    for factor in analysis['factors'][:5]:
-                        print(f'   {factor}')
-                
-                # Action status
-                if score >= 70 and analysis['action'] != "WAIT":
-                    print(f'\n🚨🚨🚨 ALERT: {analysis["action"]} 🚨🚨🚨')
-                    print(f'Confidence: {analysis["strength"]}')
-                elif score >= self.min_entry_score and analysis['action'] != "WAIT":
-                    print(f'\n⚠️ MODERATE ALERT: {analysis["action"]}')
-                    print(f'Confidence: {analysis["strength"]}')
-                else:
-                    print(f'\n💤 Status: WAITING for better conditions')
-                
-                # Target zones
-                print(f'\n📍 TARGET ZONES:')
-                for target in status['targets']:
-                    distance = ((sol['price'] - target['price']) / sol['price']) * 100
-                    status_text = "✅ HIT" if target['hit'] else f"{distance:+.1f}%"
-                    print(f'   ${target["price"]}: ${target["amount"]} position | {status_text}')
-                
-                # Position status
-                pos = status['position']
-                print(f'\n💼 YOUR POSITION:')
-                print(f'Liquidation: ${pos["liquidation_price"]} ({pos["distance_to_liquidation"]:.1f}% away)')
-                print(f'Status: {pos["status"]}')
-                
-                print(f'\n{"="*70}')
-                print(f'Monitoring... Next check in 20 seconds (Ctrl+C to stop)')
-                
-                await asyncio.sleep(20)
-                
-            except KeyboardInterrupt:
-                print('\n\n⏹️ Entry alert monitor stopped')
-                break
-            except Exception as e:
-                print(f'\n❌ Error: {e}')
-                await asyncio.sleep(10)
+        # One refresh per candle close, as a job of the shared scheduler
+        # (jittered, never overlapping; cancelling this task removes the job)
+        try:
+            await get_candle_scheduler().run_job('entry_alert_monitor', self.timeframe, self.refresh,
+                                                 symbol='SOLUSDT')
+        except KeyboardInterrupt:
+            print('\n\n⏹️ Entry alert monitor stopped')
+    
+    async def refresh(self, close=None):
+        """One monitoring refresh: fetch, analyse and display the status"""
+        status = await self.monitor_step()
+        
+        if "error" in status:
+            print(f'❌ {status["error"]}')
+            return
+        
+        # Clear screen and display status
+        print('\033[2J\033[H')
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f'⏰ {timestamp} - ENTRY ALERT MONITOR')
+        print('='*70)
+        
+        # Market status
+        btc = status['btc']
+        sol = status['sol']
+        print(f'\n📊 MARKET STATUS:')
+        print(f'BTC: ${btc["price"]:,.2f} ({btc["change_24h"]:+.2f}%)')
+        print(f'SOL: ${sol["price"]:.2f} ({sol["change_24h"]:+.2f}%)')
+        print(f'SOL 24h Low: ${sol["low_24h"]:.2f}')
+        
+        # Analysis
+        analysis = status['analysis']
+        score = analysis['entry_score']
+        print(f'\n🎯 ENTRY SCORE: {score}/100')
+        
+        # Visual score bar
+        bar_length = 40
+        filled = int(bar_length * score / 100)
+        bar = '█' * filled + '░' * (bar_length - filled)
+        color = '\033[92m' if score >= 70 else '\033[93m' if score >= 50 else '\033[91m'
+        print(f'{color}[{bar}]\033[0m')
+        
+        # Factors
+        if analysis['factors']:
+            print('\n📋 SIGNALS:')
+            for factor in analysis['factors'][:5]:
+                print(f'   {factor}')
+        
+        # Action status
+        if score >= 70 and analysis['action'] != "WAIT":
+            print(f'\n🚨🚨🚨 ALERT: {analysis["action"]} 🚨🚨🚨')
+            print(f'Confidence: {analysis["strength"]}')
+        elif score >= self.min_entry_score and analysis['action'] != "WAIT":
+            print(f'\n⚠️ MODERATE ALERT: {analysis["action"]}')
+            print(f'Confidence: {analysis["strength"]}')
+        else:
+            print(f'\n💤 Status: WAITING for better conditions')
+        
+        # Target zones
+        print(f'\n📍 TARGET ZONES:')
+        for target in status['targets']:
+            distance = ((sol['price'] - target['price']) / sol['price']) * 100
+            status_text = "✅ HIT" if target['hit'] else f"{distance:+.1f}%"
+            print(f'   ${target["price"]}: ${target["amount"]} position | {status_text}')
+        
+        # Position status
+        pos = status['position']
+        print(f'\n💼 YOUR POSITION:')
+        print(f'Liquidation: ${pos["liquidation_price"]} ({pos["distance_to_liquidation"]:.1f}% away)')
+        print(f'Status: {pos["status"]}')
+        
+        print(f'\n{"="*70}')
+        print(f'Monitoring... Next check at the next {self.timeframe} candle close (Ctrl+C to stop)')
 
 
 # Export the monitor for use by main controller
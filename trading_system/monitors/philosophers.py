@@ -10,6 +10,13 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import numpy as np
 
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import config
+from candle_scheduler import get_candle_scheduler
+
 class PhilosopherCouncil:
     """Consejo de filósofos para análisis de trading"""
     
@@ -311,13 +318,13 @@ async def monitor_step():
     """Función para compatibilidad con el sistema de monitores"""
     return await philosopher_council.analyze_signal('SOL')
 
+async def _refresh(close=None):
+    analysis = await philosopher_council.analyze_signal('SOL')
+    print(f"\n🎭 Análisis Filosófico: Score {analysis['consensus']['average_score']}")
+
 async def monitor_continuous():
-    """Monitor continuo para el sistema"""
-    while True:
-        try:
-            analysis = await philosopher_council.analyze_signal('SOL')
-            print(f"\n🎭 Análisis Filosófico: Score {analysis['consensus']['average_score']}")
-            await asyncio.sleep(60)  # Cada minuto
-        except Exception as e:
-            print(f"Error en monitor filosófico: {e}")
-            await asyncio.sleep(30)
\ No newline at end of file
+    """Monitor continuo: un análisis por cierre de vela de monitoring.candle_timeframe"""
+    # Trabajo del planificador compartido (con jitter y sin solaparse);
+    # cancelar esta tarea da de baja el trabajo
+    timeframe = config.get('monitoring.candle_timeframe', '1m')
+    await get_candle_scheduler().run_job('philosopher_monitor', timeframe, _refresh, symbol='SOLUSDT')
@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.config import config
 from core.alerts import trading_alerts, AlertType
 from core.market_data import market_fetcher
+from candle_scheduler import get_candle_scheduler
 
 
 class WaitStrategyMonitor:
@@ -21,6 +22,7 @@ class WaitStrategyMonitor:
     
     def __init__(self):
         # Load configuration
+        self.timeframe = config.get('monitoring.candle_timeframe', '1m')
         self.sol_target = config.get('targets.sol.buy_zones', [{"price": 180}])[0]['price']
         self.btc_recovery_level = config.get('targets.btc.recovery_level', 110000)
         self.btc_critical_support = config.get('targets.btc.critical_support', 108000)
@@ -157,104 +159,102 @@ class WaitStrategyMonitor:
         print('3. HOLD posición actual - liquidación segura')
         print('='*60)
         
-        while True:
-            try:
-                status = await self.monitor_step()
-                
-                if "error" in status:
-                    print(f'❌ {status["error"]}')
-                    await asyncio.sleep(30)
-                    continue
-                
-                # Clear screen for clean display
-                print('\033[2J\033[H')
-                
-                timestamp = datetime.now().strftime('%H:%M:%S')
-                print(f'⏰ {timestamp} - MONITORING WAIT STRATEGY')
-                print('='*60)
-                
-                # BTC Status
-                btc = status['btc']
-                print(f'\n₿ BTC: ${btc["price"]:,.2f} ({btc["change_24h"]:+.2f}%)')
-                print(f'Status: {btc["status"]}')
-                print(f'Key levels: $108k | $110k | $112k')
-                
-                # BTC recovery signals
-                print(f'\n📊 BTC RECOVERY SIGNALS ({btc["recovery_signals"]}/3):')
-                for signal in btc["signals"]:
-                    print(f'   {signal}')
-                
-                # SOL Status
-                sol = status['sol']
-                print(f'\n📉 SOL: ${sol["price"]:.2f} ({sol["change_24h"]:+.2f}%)')
-                print(f'24h Low: ${sol["low_24h"]:.2f}')
-                print(f'Distance to ${sol["target"]}: {sol["distance_to_target"]:+.1f}%')
-                
-                # Conditions check
-                print(f'\n🎯 CONDITIONS CHECK:')
-                sol_status = "✅ READY" if sol["at_target"] else f"❌ Wait (${sol['price']:.2f})"
-                btc_ready_status = "✅ CONFIRMED" if btc["ready"] else f"❌ Wait ({btc['recovery_signals']}/3 signals)"
-                
-                print(f'SOL ≤ ${sol["target"]}: {sol_status}')
-                print(f'BTC Recovery: {btc_ready_status}')
-                
-                # Action status
-                analysis = status['analysis']
-                if analysis['action_status'] == "ACTION_TRIGGER":
-                    print(f'\n🚨 ACTION TRIGGER! 🚨')
-                    print(f'✅ SOL at target zone!')
-                    print(f'✅ BTC showing recovery!')
-                    print(f'→ CONSIDERAR RECOMPRA AHORA')
-                    
-                    if analysis['suggested_action']:
-                        action = analysis['suggested_action']
-                        print(f'\n💰 SUGGESTED BUY:')
-                        print(f'• Amount: {action["amount"]}')
-                        print(f'• Entry: ${action["entry"]:.2f}')
-                        print(f'• Stop loss: ${action["stop_loss"]}')
-                        print(f'• Target: ${action["target"]}')
-                
-                elif analysis['action_status'] == "SOL_READY":
-                    print(f'\n⚠️ SOL AT TARGET BUT BTC WEAK')
-                    print(f'→ WAIT for BTC recovery')
-                    print(f'→ Risk of more downside')
-                
-                elif analysis['action_status'] == "BTC_READY":
-                    print(f'\n📈 BTC RECOVERING BUT SOL NOT AT TARGET')
-                    print(f'→ May not reach ${sol["target"]}')
-                    print(f'→ Consider $183-185 entry')
-                
-                else:
-                    print(f'\n⏳ WAITING...')
-                    print(f'→ {analysis["action_description"]}')
-                
-                # Position status
-                pos = status['position']
-                print(f'\n💼 YOUR POSITION:')
-                print(f'Current P&L: ~${pos["current_pnl"]:.2f}')
-                print(f'Liquidation: ${pos["liquidation_price"]}')
-                print(f'Safety buffer: {pos["distance_to_liquidation"]:.1f}%')
-                print(f'{pos["safety_status"]}')
-                
-                # Market overview
-                print(f'\n🌍 MARKET MOOD: {analysis["market_mood"]}')
-                
-                # Key levels reminder
-                print(f'\n📍 KEY LEVELS:')
-                print(f'SOL targets: ${sol["target"]} → $183 → $185')
-                print(f'BTC signals: $108k → $110k → $112k')
-                
-                print(f'\n{"="*60}')
-                print(f'Refreshing in 30 seconds... (Ctrl+C to stop)')
-                
-                await asyncio.sleep(30)
-                
-            except KeyboardInterrupt:
-                print('\n\n⏹️ Wait strategy monitor stopped')
-                break
-            except Exception as e:
-                print(f'\n❌ Error: {e}')
-                await asyncio.sleep(10)
+        # One refresh per candle close, as a job of the shared scheduler
+        # (jittered, never overlapping; cancelling this task removes the job)
+        try:
+            await get_candle_scheduler().run_job('wait_strategy_monitor', self.timeframe, self.refresh,
+                                                 symbol='SOLUSDT')
+        except KeyboardInterrupt:
+            print('\n\n⏹️ Wait strategy monitor stopped')
+    
+    async def refresh(self, close=None):
+        """One monitoring refresh: fetch, analyse and display the status"""
+        status = await self.monitor_step()
+        
+        if "error" in status:
+            print(f'❌ {status["error"]}')
+            return
+        
+        # Clear screen for clean display
+        print('\033[2J\033[H')
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f'⏰ {timestamp} - MONITORING WAIT STRATEGY')
+        print('='*60)
+        
+        # BTC Status
+        btc = status['btc']
+        print(f'\n₿ BTC: ${btc["price"]:,.2f} ({btc["change_24h"]:+.2f}%)')
+        print(f'Status: {btc["status"]}')
+        print(f'Key levels: $108k | $110k | $112k')
+        
+        # BTC recovery signals
+        print(f'\n📊 BTC RECOVERY SIGNALS ({btc["recovery_signals"]}/3):')
+        for signal in btc["signals"]:
+            print(f'   {signal}')
+        
+        # SOL Status
+        sol = status['sol']
+        print(f'\n📉 SOL: ${sol["price"]:.2f} ({sol["change_24h"]:+.2f}%)')
+        print(f'24h Low: ${sol["low_24h"]:.2f}')
+        print(f'Distance to ${sol["target"]}: {sol["distance_to_target"]:+.1f}%')
+        
+        # Conditions check
+        print(f'\n🎯 CONDITIONS CHECK:')
+        sol_status = "✅ READY" if sol["at_target"] else f"❌ Wait (${sol['price']:.2f})"
+        btc_ready_status = "✅ CONFIRMED" if btc["ready"] else f"❌ Wait ({btc['recovery_signals']}/3 signals)"
+        
+        print(f'SOL ≤ ${sol["target"]}: {sol_status}')
+        print(f'BTC Recovery: {btc_ready_status}')
+        
+        # Action status
+        analysis = status['analysis']
+        if analysis['action_status'] == "ACTION_TRIGGER":
+            print(f'\n🚨 ACTION TRIGGER! 🚨')
+            print(f'✅ SOL at target zone!')
+            print(f'✅ BTC showing recovery!')
+            print(f'→ CONSIDERAR RECOMPRA AHORA')
+        
+            if analysis['suggested_action']:
+                action = analysis['suggested_action']
+                print(f'\n💰 SUGGESTED BUY:')
+                print(f'• Amount: {action["amount"]}')
+                print(f'• Entry: ${action["entry"]:.2f}')
+                print(f'• Stop loss: ${action["stop_loss"]}')
+                print(f'• Target: ${action["target"]}')
+        
+        elif analysis['action_status'] == "SOL_READY":
+            print(f'\n⚠️ SOL AT TARGET BUT BTC WEAK')
+            print(f'→ WAIT for BTC recovery')
+            print(f'→ Risk of more downside')
+        
+        elif analysis['action_status'] == "BTC_READY":
+            print(f'\n📈 BTC RECOVERING BUT SOL NOT AT TARGET')
+            print(f'→ May not reach ${sol["target"]}')
+            print(f'→ Consider $183-185 entry')
+        
+        else:
+            print(f'\n⏳ WAITING...')
+            print(f'→ {analysis["action_description"]}')
+        
+        # Position status
+        pos = status['position']
+        print(f'\n💼 YOUR POSITION:')
+        print(f'Current P&L: ~${pos["current_pnl"]:.2f}')
+        print(f'Liquidation: ${pos["liquidation_price"]}')
+        print(f'Safety buffer: {pos["distance_to_liquidation"]:.1f}%')
+        print(f'{pos["safety_status"]}')
+        
+        # Market overview
+        print(f'\n🌍 MARKET MOOD: {analysis["market_mood"]}')
+        
+        # Key levels reminder
+        print(f'\n📍 KEY LEVELS:')
+        print(f'SOL targets: ${sol["target"]} → $183 → $185')
+        print(f'BTC signals: $108k → $110k → $112k')
+        
+        print(f'\n{"="*60}')
+        print(f'Refreshing at the next {self.timeframe} candle close... (Ctrl+C to stop)')
 
 
 # Export the monitor for use by main controller
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+===========================================
+CACHÉ TTL CON STALE-WHILE-REVALIDATE
+===========================================
+
+Caché asíncrona por clave para datos lentos de terceros (dominancia de
+BTC, Fear & Greed, capitalización total...) que cambian en escalas de
+horas pero se consultan en cada escaneo:
+
+- Valor fresco (edad < ttl): se devuelve sin esperar a nada
+- Valor caducado: se devuelve el último conocido al momento y se
+  refresca en segundo plano (una sola petición en vuelo por clave)
+- Sin valor: se espera al loader como mucho max_wait segundos; si tarda
+  más o falla se devuelve el fallback y la petición sigue en segundo plano
+- Tras un fallo no se reintenta hasta retry_after segundos después
+- Los últimos valores se guardan en un JSON (temporal + rename atómico)
+  para que un arranque en frío parta de ellos en lugar de los defaults
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Espera máxima por una clave sin ningún valor conocido (segundos)
+DEFAULT_MAX_WAIT = 3.0
+
+# Pausa tras un fallo antes de volver a intentar (segundos)
+DEFAULT_RETRY_AFTER = 30.0
+
+_MISSING = object()
+
+
+class StaleWhileRevalidateCache:
+    """Caché TTL por clave con refresco en segundo plano y persistencia opcional"""
+
+    def __init__(self, path: Optional[str] = None, max_wait: float = DEFAULT_MAX_WAIT,
+                 retry_after: float = DEFAULT_RETRY_AFTER,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: JSON donde persistir los valores (None = solo memoria)
+            clock: reloj de pared (las edades sobreviven a reinicios)
+        """
+        self.path = path
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.clock = clock
+
+        # clave -> (valor, obtenido en clock())
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0,
+                      'errors': 0, 'timeouts': 0, 'fallbacks': 0}
+        self._load()
+
+    # ===========================================
+    # PERSISTENCIA
+    # ===========================================
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+            for key, entry in stored.items():
+                self._entries[key] = (entry['value'], float(entry['fetched_at']))
+            logger.info(f"Caché cargada desde {self.path}: {', '.join(sorted(stored))}")
+        except Exception as e:
+            logger.warning(f"No se pudo leer la caché {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.ttl_cache.',
+                                             suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                json.dump({key: {'value': value, 'fetched_at': fetched_at}
+                           for key, (value, fetched_at) in self._entries.items()}, f, default=str)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la caché {self.path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # ===========================================
+    # LECTURA
+    # ===========================================
+
+    def peek(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(valor, edad en segundos) sin disparar refrescos, o None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[0], self.clock() - entry[1]
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (value, self.clock())
+        self._failed_at.pop(key, None)
+        self._save()
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float,
+                  fallback: Any = None, max_stale: Optional[float] = None,
+                  max_wait: Optional[float] = None) -> Any:
+        """
+        Valor de la clave según la política stale-while-revalidate
+
+        Args:
+            loader: corrutina que obtiene el valor (debe lanzar si falla)
+            ttl: segundos durante los que el valor se considera fresco
+            fallback: valor si no hay ninguno conocido y el loader no llega a tiempo
+            max_stale: edad a partir de la cual un valor viejo ya no se sirve
+        """
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and max_stale is not None and now - entry[1] > max_stale:
+            entry = None
+
+        if entry is not None and now - entry[1] < ttl:
+            self.stats['hits'] += 1
+            return entry[0]
+
+        task = self._refresh(key, loader, now)
+        if entry is not None:
+            self.stats['stale_hits'] += 1
+            return entry[0]
+
+        self.stats['misses'] += 1
+        if task is not None:
+            max_wait = self.max_wait if max_wait is None else max_wait
+            try:
+                value = await asyncio.wait_for(asyncio.shield(task), max_wait)
+                if value is not _MISSING:
+                    return value
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                logger.warning(f"{key}: sin respuesta en {max_wait}s, usando valor por defecto")
+        self.stats['fallbacks'] += 1
+        return fallback
+
+    def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]],
+                 now: float) -> Optional[asyncio.Task]:
+        """Tarea de refresco en vuelo de la clave (la crea si hace falta)"""
+        inflight_key = (id(asyncio.get_running_loop()), key)
+        task = self._inflight.get(inflight_key)
+        if task is not None and not task.done():
+            return task
+        if now - self._failed_at.get(key, float('-inf')) < self.retry_after:
+            return None
+        task = asyncio.create_task(self._run(key, loader))
+        self._inflight[inflight_key] = task
+        task.add_done_callback(lambda _: self._forget(inflight_key, task))
+        return task
+
+    def _forget(self, inflight_key: Tuple[int, str], task: asyncio.Task):
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+
+    async def _run(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+        except Exception as e:
+            self.stats['errors'] += 1
+            self._failed_at[key] = self.clock()
+            logger.error(f"Error refrescando {key}: {e}")
+            return _MISSING
+        self.stats['refreshes'] += 1
+        self.set(key, value)
+        return value
+
+    async def wait_idle(self):
+        """Espera a que terminen los refrescos en vuelo (tests y apagado)"""
+        tasks = list(self._inflight.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        now = self.clock()
+        stats['ages'] = {key: round(now - fetched_at, 1)
+                         for key, (_, fetched_at) in self._entries.items()}
+        return stats
@@ -3,16 +3,19 @@
 Unified Signals API - Combines liquidity, trend, and bot signals
 """
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 import httpx
 import json
+import os
 from datetime import datetime
 import uvicorn
 from typing import Dict, List
 import numpy as np
 
+from snapshot_hub import SnapshotHub
+
 app = FastAPI()
 
 # Enable CORS
@@ -414,49 +417,64 @@ class UnifiedAnalyzer:
 
 analyzer = UnifiedAnalyzer()
 
+# One background producer per symbol; REST and WebSocket clients share its snapshots
+UPDATE_INTERVAL = 10  # seconds
+DEFAULT_SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+# Only these symbols get a producer, so arbitrary paths cannot grow the hub
+SUPPORTED_SYMBOLS = os.getenv(
+    "UNIFIED_SYMBOLS",
+    "BTCUSDT,ETHUSDT,SOLUSDT,BNBUSDT,XRPUSDT,ADAUSDT,DOGEUSDT,AVAXUSDT,LINKUSDT,DOTUSDT"
+).upper().split(",")
+snapshots = SnapshotHub(analyzer.analyze_complete, interval=UPDATE_INTERVAL,
+                        keys=DEFAULT_SYMBOLS + SUPPORTED_SYMBOLS)
+
+def _check_symbols(symbols: List[str]):
+    unknown = [symbol for symbol in symbols if symbol not in snapshots.keys]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unsupported symbol(s): {', '.join(unknown)}")
+
+@app.on_event("shutdown")
+async def stop_snapshot_producers():
+    await snapshots.stop()
+
 @app.get("/")
 async def root():
     return {"status": "Unified Signals API Running"}
 
-@app.get("/api/unified/{symbol}")
-async def get_unified_analysis(symbol: str):
-    """Get complete analysis for a symbol"""
-    data = await analyzer.analyze_complete(symbol)
-    return data
-
 @app.get("/api/unified/multi")
 async def get_multi_analysis(symbols: str = "BTCUSDT,ETHUSDT,SOLUSDT,BNBUSDT"):
     """Get analysis for multiple symbols"""
-    symbol_list = symbols.split(",") if "," in symbols else ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+    symbol_list = symbols.split(",") if "," in symbols else DEFAULT_SYMBOLS
+    _check_symbols(symbol_list)
     
     results = []
-    for symbol in symbol_list:
-        try:
-            data = await analyzer.analyze_complete(symbol)
-            results.append(data)
-        except Exception as e:
-            print(f"Error analyzing {symbol}: {e}")
-            results.append({
-                "symbol": symbol,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            })
+    for symbol, snapshot in (await snapshots.get_many(symbol_list)).items():
+        results.append(snapshot.data)
     
     return results
 
+# Declared after /multi so that path is not captured as a symbol
+@app.get("/api/unified/{symbol}")
+async def get_unified_analysis(symbol: str):
+    """Get complete analysis for a symbol"""
+    _check_symbols([symbol])
+    snapshot = await snapshots.get(symbol)
+    if snapshot.error:
+        raise HTTPException(status_code=500, detail=snapshot.error)
+    return snapshot.data
+
 @app.get("/api/market/status")
 async def get_market_status():
     """Get global market status and sentiment"""
-    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+    symbols = DEFAULT_SYMBOLS
     
-    # Analyze all symbols
+    # Shared snapshots of all symbols (failed analyses are skipped)
     analyses = []
-    for symbol in symbols:
-        try:
-            data = await analyzer.analyze_complete(symbol)
-            analyses.append(data)
-        except:
-            continue
+    analyzed_symbols = []
+    for symbol, snapshot in (await snapshots.get_many(symbols)).items():
+        if not snapshot.error:
+            analyses.append(snapshot.data)
+            analyzed_symbols.append(symbol)
     
     if not analyses:
         return {"status": "UNKNOWN", "message": "Unable to analyze market"}
@@ -549,7 +567,7 @@ async def get_market_status():
                 "strength": analysis.get("tradingBias", {}).get("strength", 0),
                 "signal": analysis.get("botSignals", {}).get("type")
             }
-            for symbol, analysis in zip(symbols, analyses)
+            for symbol, analysis in zip(analyzed_symbols, analyses)
         },
         "timestamp": datetime.now().isoformat()
     }
@@ -559,15 +577,12 @@ async def websocket_unified(websocket: WebSocket):
     """WebSocket for real-time unified updates"""
     await websocket.accept()
     
-    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+    symbols = DEFAULT_SYMBOLS
     
     try:
-        while True:
-            for symbol in symbols:
-                data = await analyzer.analyze_complete(symbol)
-                await websocket.send_json(data)
-            
-            await asyncio.sleep(10)  # Update every 10 seconds
+        # Current snapshots first, then every update (one analysis per symbol for all clients)
+        async for symbol, snapshot in snapshots.subscribe(symbols):
+            await websocket.send_text(snapshot.json)
             
     except Exception as e:
         print(f"WebSocket error: {e}")
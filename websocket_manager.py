@@ -80,6 +80,7 @@ class ConnectionInfo:
     subscriptions: Set[str] = field(default_factory=set)
     message_count: int = 0
     is_authenticated: bool = False
+    dropped_messages: int = 0  # Consecutive broadcasts dropped (full send queue)
 
 # Thread-Safe WebSocket Manager
 # =============================
@@ -95,11 +96,13 @@ class ThreadSafeWebSocketManager:
     - User-specific subscriptions
     - Heartbeat monitoring
     - Message delivery guarantees
+    - Broadcast fan-out: serialize once, per-connection bounded send queues
     - Performance monitoring
     """
     
     def __init__(self, max_connections: int = 100, heartbeat_interval: int = 30,
-                 cleanup_interval: int = 60, max_queue_size: int = 1000):
+                 cleanup_interval: int = 60, max_queue_size: int = 1000,
+                 send_timeout: float = 5.0, max_dropped_messages: int = 50):
         """
         Initialize WebSocket manager.
         
@@ -108,6 +111,8 @@ class ThreadSafeWebSocketManager:
             heartbeat_interval: Heartbeat check interval in seconds
             cleanup_interval: Dead connection cleanup interval in seconds
             max_queue_size: Maximum messages in queue per connection
+            send_timeout: Seconds a single send may take before the client is dropped
+            max_dropped_messages: Consecutive broadcasts dropped before disconnecting a laggard
         """
         # Thread-safe connection storage
         self._connections: Dict[str, ConnectionInfo] = {}
@@ -118,11 +123,17 @@ class ThreadSafeWebSocketManager:
         self._message_queues: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_queue_size))
         self._queue_lock = threading.RLock()
         
+        # Broadcast fan-out: one bounded queue and one sender task per connection
+        self._send_queues: Dict[str, asyncio.Queue] = {}
+        self._sender_tasks: Dict[str, asyncio.Task] = {}
+        
         # Configuration
         self.max_connections = max_connections
         self.heartbeat_interval = heartbeat_interval
         self.cleanup_interval = cleanup_interval
         self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self.max_dropped_messages = max_dropped_messages
         
         # Worker management
         self._worker_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ws_worker")
@@ -134,6 +145,9 @@ class ThreadSafeWebSocketManager:
             'total_connections': 0,
             'messages_sent': 0,
             'messages_failed': 0,
+            'messages_dropped': 0,
+            'broadcasts': 0,
+            'laggards_disconnected': 0,
             'dead_connections_cleaned': 0,
             'start_time': datetime.now()
         }
@@ -188,6 +202,12 @@ class ThreadSafeWebSocketManager:
                 if user_id:
                     self._user_connections[user_id].add(connection_id)
             
+            # Start broadcast sender
+            self._send_queues[connection_id] = asyncio.Queue(maxsize=self.max_queue_size)
+            self._sender_tasks[connection_id] = asyncio.create_task(
+                self._sender_worker(connection_info, self._send_queues[connection_id])
+            )
+            
             # Update statistics
             with self._stats_lock:
                 self._stats['total_connections'] += 1
@@ -242,10 +262,16 @@ class ThreadSafeWebSocketManager:
                 if connection_id in self._message_queues:
                     del self._message_queues[connection_id]
             
-            # Close WebSocket if still open
+            # Stop broadcast sender (unless the sender itself is disconnecting)
+            self._send_queues.pop(connection_id, None)
+            sender = self._sender_tasks.pop(connection_id, None)
+            if sender is not None and sender is not asyncio.current_task():
+                sender.cancel()
+            
+            # Close WebSocket if still open (bounded: a stuck client must not block us)
             try:
                 if connection_info.websocket:
-                    await connection_info.websocket.close()
+                    await asyncio.wait_for(connection_info.websocket.close(), self.send_timeout)
             except Exception:
                 pass  # Connection might already be closed
             
@@ -299,13 +325,89 @@ class ThreadSafeWebSocketManager:
             elif broadcast:
                 target_connections = list(self._connections.values())
         
-        # Send to each target connection
-        for connection_info in target_connections:
-            success = await self._send_to_connection(connection_info, message)
+        if broadcast:
+            return await self._broadcast(message, target_connections)
+        
+        # Send to each target connection concurrently
+        successes = await asyncio.gather(*(
+            self._send_to_connection(connection_info, message)
+            for connection_info in target_connections
+        ))
+        for connection_info, success in zip(target_connections, successes):
             results[connection_info.connection_id] = success
         
         return results
     
+    async def _broadcast(self, message: WebSocketMessage,
+                         target_connections: List[ConnectionInfo]) -> Dict[str, bool]:
+        """
+        Fan a message out to many connections without waiting on any of them.
+        
+        The payload is serialized once and pushed onto each connection's
+        bounded send queue; the per-connection sender tasks do the actual
+        writes. A connection whose queue is full misses the message, and
+        after max_dropped_messages consecutive misses it is disconnected.
+        
+        Returns:
+            Dictionary mapping connection IDs to whether the message was queued
+        """
+        payload = json.dumps(message.to_dict())
+        results = {}
+        laggards = []
+        
+        with self._stats_lock:
+            self._stats['broadcasts'] += 1
+        
+        for connection_info in target_connections:
+            connection_id = connection_info.connection_id
+            queue = self._send_queues.get(connection_id)
+            if queue is None:
+                results[connection_id] = False
+                continue
+            
+            try:
+                queue.put_nowait(payload)
+                connection_info.dropped_messages = 0
+                results[connection_id] = True
+            except asyncio.QueueFull:
+                connection_info.dropped_messages += 1
+                results[connection_id] = False
+                with self._stats_lock:
+                    self._stats['messages_dropped'] += 1
+                if connection_info.dropped_messages >= self.max_dropped_messages:
+                    laggards.append(connection_id)
+        
+        for connection_id in laggards:
+            with self._stats_lock:
+                self._stats['laggards_disconnected'] += 1
+            await self.disconnect(connection_id, "slow_consumer")
+        
+        return results
+    
+    async def _sender_worker(self, connection_info: ConnectionInfo, queue: asyncio.Queue) -> None:
+        """Drain one connection's send queue; drop the client on timeout or error"""
+        reason = None
+        while reason is None:
+            payload = await queue.get()
+            try:
+                await asyncio.wait_for(connection_info.websocket.send_text(payload), self.send_timeout)
+                connection_info.message_count += 1
+                with self._stats_lock:
+                    self._stats['messages_sent'] += 1
+            except asyncio.CancelledError:
+                raise
+            except WebSocketDisconnect:
+                reason = "client_disconnect"
+            except asyncio.TimeoutError:
+                reason = "send_timeout"
+            except Exception as e:
+                logger.debug(f"Send failed for {connection_info.connection_id}: {e}")
+                reason = "send_error"
+        
+        with self._stats_lock:
+            self._stats['messages_failed'] += 1
+        await self.disconnect(connection_info.connection_id, reason)
+    
     async def _send_to_connection(self, connection_info: ConnectionInfo, 
                                  message: WebSocketMessage) -> bool:
         """Send message to a specific connection"""
@@ -318,7 +420,7 @@ class ThreadSafeWebSocketManager:
             json_message = json.dumps(message.to_dict())
             
             # Send message
-            await connection_info.websocket.send_text(json_message)
+            await asyncio.wait_for(connection_info.websocket.send_text(json_message), self.send_timeout)
             
             # Update statistics
             connection_info.message_count += 1
@@ -494,6 +596,7 @@ class ThreadSafeWebSocketManager:
         
         with self._queue_lock:
             stats['queued_messages'] = sum(len(queue) for queue in self._message_queues.values())
+        stats['queued_messages'] += sum(queue.qsize() for queue in list(self._send_queues.values()))
         
         stats['uptime_seconds'] = (datetime.now() - stats['start_time']).total_seconds()
         
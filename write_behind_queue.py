@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+===========================================
+ESCRITURA DIFERIDA (WRITE-BEHIND) A SQLITE
+===========================================
+
+Trazas de señales, análisis BI y performance de filósofos se encolan en
+una cola asyncio acotada y un worker los escribe agrupados en una sola
+transacción (por tamaño de lote o ventana de tiempo) desde un hilo, así
+que los commits de SQLite no bloquean el event loop ni suman latencia a
+la generación de señales.
+
+- put(): espera si la cola está llena (backpressure para código async)
+- submit(): para código síncrono; desde otro hilo espera hueco en la
+  cola, en el hilo del loop escribe directamente si la cola está llena
+- Sin worker en marcha las escrituras son síncronas, como antes
+- stop() vacía la cola y escribe todo lo pendiente
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from database import BULK_RECORD_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Registro pendiente: (tipo, datos) con tipo en database.BULK_RECORD_TYPES
+Record = Tuple[str, object]
+
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.5  # segundos
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """Worker que agrupa escrituras en transacciones fuera del event loop"""
+
+    def __init__(self, database=None, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self._database = database
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # La cola y el worker pertenecen al loop en el que se llamó a start()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'failed': 0,
+                      'direct_writes': 0, 'backpressure_waits': 0}
+
+    @property
+    def database(self):
+        """TradingDatabase destino (por defecto la instancia global)"""
+        if self._database is None:
+            from database import db
+            self._database = db
+        return self._database
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self):
+        """Arranca el worker en el loop actual"""
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Write-behind iniciado")
+
+    async def stop(self):
+        """Deja de aceptar registros y escribe todo lo pendiente"""
+        if not self._running:
+            return
+        self._running = False
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info(f"Write-behind detenido ({self.stats['written']} registros escritos)")
+
+    async def put(self, record_type: str, payload):
+        """Encola un registro; espera si la cola está llena"""
+        self._check_type(record_type)
+        if not self._running:
+            await asyncio.to_thread(self._write_direct, [(record_type, payload)])
+            return
+        if self._queue.full():
+            self.stats['backpressure_waits'] += 1
+        await self._queue.put((record_type, payload))
+        self.stats['queued'] += 1
+
+    def submit(self, record_type: str, payload):
+        """Encola un registro desde código síncrono"""
+        self._check_type(record_type)
+        loop = self._loop
+        if not self._running or loop is None or loop.is_closed():
+            self._write_direct([(record_type, payload)])
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+
+        if not on_loop:
+            # Otro hilo: esperar hueco en la cola es la backpressure
+            asyncio.run_coroutine_threadsafe(self.put(record_type, payload), loop).result()
+            return
+
+        try:
+            self._queue.put_nowait((record_type, payload))
+            self.stats['queued'] += 1
+        except asyncio.QueueFull:
+            # Sin poder esperar dentro del loop: se paga la escritura aquí
+            self.stats['backpressure_waits'] += 1
+            self._write_direct([(record_type, payload)])
+
+    def submit_signal_trace(self, signal_id: str, event_type: str, event_data: Dict,
+                            philosopher: str = None):
+        """Equivalente diferido de TradingDatabase.save_signal_trace"""
+        self.submit('signal_trace', (signal_id, event_type, event_data, philosopher))
+
+    def submit_signal_analysis(self, analysis: Dict):
+        """Equivalente diferido de TradingDatabase.save_signal_analysis"""
+        self.submit('signal_analysis', analysis)
+
+    def submit_philosopher_performance(self, performance: Dict):
+        """Equivalente diferido de TradingDatabase.save_philosopher_performance"""
+        self.submit('philosopher_performance', performance)
+
+    @staticmethod
+    def _check_type(record_type: str):
+        if record_type not in BULK_RECORD_TYPES:
+            raise ValueError(f"Tipo de registro no soportado: {record_type}")
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch: List[Record] = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                self.stats['failed'] += len(batch)
+                logger.error(f"Error escribiendo lote diferido: {e}")
+
+    def _write_batch(self, batch: List[Record]):
+        """Una transacción por lote; si falla, registro a registro"""
+        written = self.database.save_records_bulk(batch)
+        self.stats['batches'] += 1
+        if written == len(batch):
+            self.stats['written'] += written
+            return
+        # Un registro inválido no debe arrastrar al resto del lote
+        self._write_direct(batch)
+
+    def _write_direct(self, records: List[Record]):
+        for record in records:
+            if self.database.save_records_bulk([record]):
+                self.stats['written'] += 1
+            else:
+                self.stats['failed'] += 1
+        self.stats['direct_writes'] += len(records)
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['running'] = self._running
+        stats['pending'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+
+# Instancia global
+_write_behind_writer = None
+
+
+def get_write_behind_writer() -> WriteBehindWriter:
+    """Obtiene el writer diferido global"""
+    global _write_behind_writer
+    if _write_behind_writer is None:
+        _write_behind_writer = WriteBehindWriter()
+    return _write_behind_writer